@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from app.schemas.assistant_schema import ChatRequest, ChatResponse
-from app.services.assistant_service import AssistantService
+from app.services.assistant_service import assistant_configured, assistant_service
 from typing import Dict, Any
 import logging
 import traceback
@@ -9,7 +9,8 @@ import traceback
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/assistant", tags=["assistant"])
-assistant_service = AssistantService()
+
+NOT_CONFIGURED = "AI assistant is not configured (OPENAI_API_KEY is not set)"
 
 
 @router.post("/chat", response_model=ChatResponse)
@@ -18,6 +19,9 @@ async def chat(request: ChatRequest) -> ChatResponse:
     Send a message to the AI assistant and get a response.
     The assistant will use the knowledge graph for context.
     """
+    if not assistant_configured():
+        raise HTTPException(status_code=503, detail=NOT_CONFIGURED)
+    
     try:
         # Convert conversation history to dict format
         history = None
@@ -46,6 +50,9 @@ async def chat_stream(request: ChatRequest):
     Stream chat responses for real-time display.
     Returns a stream of Server-Sent Events (SSE).
     """
+    if not assistant_configured():
+        raise HTTPException(status_code=503, detail=NOT_CONFIGURED)
+    
     try:
         # Convert conversation history to dict format
         history = None
@@ -69,5 +76,5 @@ async def chat_stream(request: ChatRequest):
 
 @router.get("/health")
 async def health_check() -> Dict[str, str]:
-    """Check if the assistant service is running."""
-    return {"status": "ok", "service": "AI Assistant"}
+    """Check if the assistant service is running (or disabled for lack of a key)."""
+    return {"status": "ok" if assistant_configured() else "disabled", "service": "AI Assistant"}
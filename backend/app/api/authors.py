@@ -0,0 +1,23 @@
+from fastapi import APIRouter, HTTPException, Query
+from app.services.authors_service import authors_service
+
+router = APIRouter(prefix="/authors", tags=["authors"])
+
+@router.get("/{author_id}", response_model=dict)
+async def get_author(author_id: str):
+    """Get author profile: paper count, top concepts, first/last publication and recent papers"""
+    author = authors_service.get_author(author_id)
+    if not author:
+        raise HTTPException(status_code=404, detail="Author not found")
+    return author
+
+@router.get("/{author_id}/coauthors", response_model=dict)
+async def get_coauthors(
+    author_id: str,
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Get co-authors weighted by number of shared papers"""
+    result = authors_service.get_coauthors(author_id, limit=limit)
+    if not result:
+        raise HTTPException(status_code=404, detail="Author not found")
+    return result
@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from app.services.export_service import export_service
+from datetime import date, datetime
+from typing import List, Optional
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+@router.get("/papers.ndjson")
+async def export_papers(
+    published_from: Optional[date] = Query(None, description="Earliest published_date (inclusive)"),
+    published_to: Optional[date] = Query(None, description="Latest published_date (inclusive)"),
+    category: Optional[List[str]] = Query(None, description="Match papers in any of these categories"),
+    updated_since: Optional[datetime] = Query(None, description="Only papers updated at or after this time")
+):
+    """Stream papers as NDJSON, one paper per line"""
+    return StreamingResponse(
+        export_service.export_papers(
+            published_from=published_from,
+            published_to=published_to,
+            categories=category,
+            updated_since=updated_since
+        ),
+        media_type=NDJSON_MEDIA_TYPE
+    )
+
+@router.get("/graph.ndjson")
+async def export_graph(
+    published_from: Optional[date] = Query(None, description="Earliest published_date (inclusive)"),
+    published_to: Optional[date] = Query(None, description="Latest published_date (inclusive)"),
+    category: Optional[List[str]] = Query(None, description="Match papers in any of these categories"),
+    updated_since: Optional[datetime] = Query(None, description="Only papers updated at or after this time")
+):
+    """Stream matching papers, their neighbors and relationships as NDJSON"""
+    return StreamingResponse(
+        export_service.export_graph(
+            published_from=published_from,
+            published_to=published_to,
+            categories=category,
+            updated_since=updated_since
+        ),
+        media_type=NDJSON_MEDIA_TYPE
+    )
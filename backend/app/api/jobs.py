@@ -0,0 +1,42 @@
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Query
+from app.schemas.job_schema import IngestJobRequest, EnrichJobRequest
+from app.services.jobs_service import jobs_service, INGEST_JOB, ENRICH_JOB
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+@router.post("/ingest", response_model=dict, status_code=202)
+def submit_ingest_job(
+    request: IngestJobRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """Queue arXiv / Hugging Face ingestion; new papers are enriched as they arrive"""
+    return jobs_service.submit(INGEST_JOB, request.model_dump(), key=idempotency_key)
+
+@router.post("/enrich", response_model=dict, status_code=202)
+def submit_enrich_job(
+    request: EnrichJobRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """Queue enrichment of papers still missing authors, entities or Hugging Face data"""
+    return jobs_service.submit(ENRICH_JOB, request.model_dump(), key=idempotency_key)
+
+@router.get("/", response_model=dict)
+def list_jobs(
+    status: Optional[str] = Query(None, pattern="^(queued|running|succeeded|failed)$"),
+    type: Optional[str] = Query(None, pattern="^(ingest|enrich)$"),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """Most recent jobs, with counts per status"""
+    return {
+        "jobs": jobs_service.list_jobs(status=status, job_type=type, limit=limit),
+        "counts": jobs_service.counts(),
+    }
+
+@router.get("/{job_id}", response_model=dict)
+def get_job(job_id: str):
+    """Job status, attempts, last error and progress (per-stage pipeline counters)"""
+    job = jobs_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.core.query_metrics import query_metrics
+
+router = APIRouter(tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Query metrics in the Prometheus text exposition format"""
+    return PlainTextResponse(query_metrics.render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
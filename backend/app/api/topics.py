@@ -0,0 +1,9 @@
+from fastapi import APIRouter, Query
+from app.services.topics_service import topics_service
+
+router = APIRouter(prefix="/topics", tags=["topics"])
+
+@router.get("/", response_model=dict)
+async def list_topics(limit: int = Query(50, ge=1, le=500)):
+    """Concept/method communities with their most used concepts and methods"""
+    return {"topics": topics_service.list_topics(limit=limit)}
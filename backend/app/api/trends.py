@@ -0,0 +1,27 @@
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Query
+from app.services.trends_service import trends_service, TREND_HISTORY_PERIODS, TREND_MIN_COUNT
+
+router = APIRouter(prefix="/trends", tags=["trends"])
+
+@router.get("/", response_model=dict)
+async def get_trends(
+    dimension: str = Query("concept", pattern="^(concept|method|dataset|category)$"),
+    granularity: str = Query("month", pattern="^(week|month)$"),
+    period: Optional[date] = Query(None, description="Any day in the period to rank; defaults to the latest period with data"),
+    history: int = Query(TREND_HISTORY_PERIODS, ge=1, le=52),
+    min_count: int = Query(TREND_MIN_COUNT, ge=1),
+    sort: str = Query("zscore", pattern="^(zscore|growth|count)$"),
+    limit: int = Query(20, ge=1, le=200)
+):
+    """Fastest-growing concepts, methods, datasets or categories, from the precomputed rollups"""
+    return trends_service.get_trends(
+        dimension=dimension,
+        granularity=granularity,
+        period=period,
+        history=history,
+        min_count=min_count,
+        sort=sort,
+        limit=limit
+    )
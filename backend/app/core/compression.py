@@ -0,0 +1,54 @@
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+from typing import Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # brotli is optional
+    BrotliMiddleware = None
+
+
+class CompressionMiddleware:
+    """
+    Compress responses above `minimum_size` with brotli (when brotli-asgi is
+    installed and enabled, falling back to gzip per Accept-Encoding) or gzip.
+    Paths ending in `excluded_suffixes` (e.g. SSE streams) pass through
+    uncompressed so chunks are not held back by the compressor.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli: bool = True,
+        brotli_quality: int = 4,
+        excluded_suffixes: Tuple[str, ...] = ("/stream",)
+    ):
+        self.app = app
+        self.excluded_suffixes = excluded_suffixes
+
+        if brotli and BrotliMiddleware is not None:
+            self.compressor = BrotliMiddleware(
+                app,
+                quality=brotli_quality,
+                minimum_size=minimum_size,
+                gzip_fallback=True
+            )
+            logger.info("Response compression: brotli (gzip fallback)")
+        else:
+            self.compressor = GZipMiddleware(
+                app,
+                minimum_size=minimum_size,
+                compresslevel=gzip_level
+            )
+            logger.info("Response compression: gzip")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and not scope["path"].endswith(self.excluded_suffixes):
+            await self.compressor(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
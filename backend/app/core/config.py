@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 class Settings(BaseSettings):
     # App
@@ -11,6 +12,34 @@ class Settings(BaseSettings):
     NEO4J_URI: str = "bolt://localhost:7687"
     NEO4J_USER: str = "neo4j"
     NEO4J_PASSWORD: str = "neo4j123"
+    # Named database ("" = the user's home database, resolved per session
+    # with an extra round trip)
+    NEO4J_DATABASE: str = ""
+    
+    # Neo4j connection pool (per server address). Sessions wait up to the
+    # acquisition timeout for a free connection when the pool is exhausted.
+    NEO4J_MAX_CONNECTION_POOL_SIZE: int = 50
+    NEO4J_CONNECTION_ACQUISITION_TIMEOUT: float = 60.0
+    NEO4J_MAX_CONNECTION_LIFETIME: int = 3600
+    # TCP keep-alive on pooled connections, and an optional liveness check
+    # (RESET round trip) for connections idle longer than this many seconds
+    NEO4J_KEEP_ALIVE: bool = True
+    NEO4J_LIVENESS_CHECK_TIMEOUT: Optional[float] = None
+    # Records per round trip for query results
+    NEO4J_FETCH_SIZE: int = 1000
+    # Managed transactions (including driver.transaction() and
+    # batch_writer() units of work) retry transient errors for this long
+    NEO4J_MAX_TRANSACTION_RETRY_TIME: float = 30.0
+    # With a neo4j:// (routing) URI, read transactions go to followers/read
+    # replicas; set False to send reads to the leader as well
+    NEO4J_READ_FROM_FOLLOWERS: bool = True
+    
+    # Graph storage: "neo4j", or "memory" to run fully in-process (offline
+    # dev, CI, load generators). MEMORY_GRAPH_PATH persists the in-memory
+    # graph to a JSON file between runs. scripts/snapshot_graph.py needs
+    # Neo4j and refuses the memory backend (copy that file instead).
+    GRAPH_BACKEND: str = "neo4j"
+    MEMORY_GRAPH_PATH: str = ""
     
     # OpenAI
     OPENAI_API_KEY: str = ""
@@ -19,6 +48,57 @@ class Settings(BaseSettings):
     # API
     API_PREFIX: str = "/api/v1"
     
+    # Query instrumentation: statements slower than this go to the
+    # app.slow_query log (0 disables). With QUERY_PROFILE_CAPTURE, slow
+    # reads are re-run under PROFILE (writes EXPLAINed) and the plan is
+    # written to QUERY_PROFILE_DIR, once per query per interval.
+    SLOW_QUERY_THRESHOLD_MS: int = 500
+    QUERY_PROFILE_CAPTURE: bool = False
+    QUERY_PROFILE_DIR: str = "query_profiles"
+    QUERY_PROFILE_INTERVAL_SECONDS: int = 300
+    
+    # Tracing: spans for requests, graph queries and LLM calls. Finished
+    # traces go to TRACE_EXPORTERS (comma-separated: "json" appends to
+    # TRACE_FILE, "otel" needs the optional opentelemetry-api package).
+    # TRACE_DEBUG_HEADER adds X-Trace-Id and Server-Timing to responses;
+    # off by default since it exposes internal timings to every client.
+    TRACING_ENABLED: bool = True
+    TRACE_EXPORTERS: str = ""
+    TRACE_FILE: str = "traces.ndjson"
+    TRACE_DEBUG_HEADER: bool = False
+    
+    # Search ranking: full-text scores are multiplied by
+    # (1 + PAGERANK_SEARCH_BOOST * p.pagerank), where p.pagerank (0-1) is
+    # written by scripts/compute_pagerank.py. 0 ranks by text only.
+    PAGERANK_SEARCH_BOOST: float = 0.5
+    
+    # GET /topics responses are cached in-process for this many seconds
+    # (topics only change when scripts/detect_topics.py runs)
+    TOPICS_CACHE_SECONDS: int = 300
+    
+    # Background jobs (POST /jobs/*, run by scripts/job_worker.py): SQLite
+    # queue file shared by the API and the workers on this host. A job is
+    # retried with exponential backoff (JOB_RETRY_BACKOFF_SECONDS doubling
+    # up to JOB_RETRY_BACKOFF_MAX_SECONDS) until JOB_MAX_ATTEMPTS; a
+    # worker that stops renewing its JOB_LEASE_SECONDS lease loses the job.
+    # A run in which more than JOB_MAX_FAILURE_RATIO of the papers failed
+    # counts as a failed attempt (the failed papers stay in the backlog).
+    JOB_QUEUE_PATH: str = "jobs.sqlite3"
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_LEASE_SECONDS: int = 300
+    JOB_MAX_FAILURE_RATIO: float = 0.5
+    JOB_RETRY_BACKOFF_SECONDS: float = 30
+    JOB_RETRY_BACKOFF_MAX_SECONDS: float = 3600
+    
+    # Streaming exports: records per server round trip
+    EXPORT_FETCH_SIZE: int = 1000
+    
+    # Response compression (brotli requires the optional brotli-asgi package)
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    GZIP_COMPRESSION_LEVEL: int = 6
+    BROTLI_ENABLED: bool = True
+    BROTLI_QUALITY: int = 4
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,533 @@
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import date
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Query name for batches written without one
+BATCH_QUERY = "batch"
+
+# (query, parameters, name)
+Statement = Tuple[str, Dict, Optional[str]]
+
+
+class UnitOfWork:
+    """
+    Write statements buffered by run() and committed together in one
+    managed write transaction, replayed as a whole on transient errors.
+    """
+
+    def __init__(self, backend: "GraphBackend", name: Optional[str] = None):
+        self.backend = backend
+        self.name = name
+        self.statements: List[Statement] = []
+
+    def run(self, query: str, parameters: Dict = None, name: Optional[str] = None):
+        """Buffer a statement; results are returned by commit()"""
+        self.statements.append((query, parameters or {}, name))
+
+    def commit(self) -> List[List[Dict]]:
+        """Write the buffered statements; records per statement, in order"""
+        if not self.statements:
+            return []
+        statements, self.statements = self.statements, []
+        return self.backend.execute_write_batch(statements, name=self.name)
+
+    def rollback(self):
+        """Drop the buffered statements"""
+        self.statements = []
+
+
+class BatchWriter(UnitOfWork):
+    """Unit of work that commits every `batch_size` statements"""
+
+    def __init__(self, backend: "GraphBackend", batch_size: int, name: Optional[str] = None):
+        super().__init__(backend, name)
+        self.batch_size = batch_size
+        self.committed = 0
+
+    def run(self, query: str, parameters: Dict = None, name: Optional[str] = None):
+        super().run(query, parameters, name)
+        if len(self.statements) >= self.batch_size:
+            self.commit()
+
+    def commit(self) -> List[List[Dict]]:
+        pending = len(self.statements)
+        results = super().commit()
+        self.committed += pending
+        return results
+
+
+class GraphBackend(ABC):
+    """
+    Storage interface behind get_neo4j_driver().
+
+    Queries are written in Cypher and carry a stable `name`. Neo4j runs the
+    Cypher; backends that do not speak Cypher (see InMemoryGraphBackend)
+    dispatch on the name instead, so every query the app and scripts rely
+    on must be named.
+    """
+
+    @abstractmethod
+    def connect(self):
+        """Open the backend"""
+
+    @abstractmethod
+    def close(self):
+        """Release the backend"""
+
+    @abstractmethod
+    def verify_connectivity(self) -> bool:
+        """Test connection"""
+
+    @abstractmethod
+    def execute_read(self, query: str, parameters: Dict = None, name: Optional[str] = None) -> List[Dict]:
+        """Execute read query"""
+
+    @abstractmethod
+    def execute_write(self, query: str, parameters: Dict = None, name: Optional[str] = None) -> List[Dict]:
+        """Execute write query"""
+
+    @abstractmethod
+    def execute_auto_commit(self, query: str, parameters: Dict = None, name: Optional[str] = None) -> List[Dict]:
+        """Execute query in an auto-commit transaction"""
+
+    @abstractmethod
+    def execute_read_raw(self, query: str, parameters: Dict = None, name: Optional[str] = None) -> List[Dict]:
+        """Execute read query, leaving values in the backend's native types"""
+
+    @abstractmethod
+    def stream_read(
+        self,
+        query: str,
+        parameters: Dict = None,
+        fetch_size: int = 1000,
+        name: Optional[str] = None
+    ) -> Iterator[Dict]:
+        """Stream raw records without materializing the whole result"""
+
+    @abstractmethod
+    def execute_write_batch(self, statements: List[Statement], name: Optional[str] = None) -> List[List[Dict]]:
+        """Execute write statements in one transaction; records per statement"""
+
+    # Units of work
+    @contextmanager
+    def transaction(self, name: Optional[str] = None) -> Iterator[UnitOfWork]:
+        """
+        Buffer writes and commit them in one transaction when the block
+        exits; nothing is written if it raises.
+
+            with driver.transaction(name='enrich.paper') as tx:
+                tx.run(query, params, name='enrich.concept')
+        """
+        unit = UnitOfWork(self, name)
+        try:
+            yield unit
+        except BaseException:
+            unit.rollback()
+            raise
+        unit.commit()
+
+    @contextmanager
+    def batch_writer(self, batch_size: int = 500, name: Optional[str] = None) -> Iterator[BatchWriter]:
+        """
+        Buffer writes and commit them `batch_size` statements per
+        transaction. Batches already committed stay written if the block
+        raises; the pending remainder is dropped.
+        """
+        writer = BatchWriter(self, batch_size, name)
+        try:
+            yield writer
+        except BaseException:
+            if writer.statements:
+                logger.warning(f"Dropping {len(writer.statements)} uncommitted statements of {name or BATCH_QUERY}")
+            writer.rollback()
+            raise
+        writer.commit()
+
+    # Paper operations
+    def create_paper(self, paper_data: Dict) -> str:
+        """Create or update paper"""
+        query = """
+        MERGE (p:Paper {arxiv_id: $arxiv_id})
+        ON CREATE SET
+            p.title = $title,
+            p.abstract = $abstract,
+            p.published_date = date($published_date),
+            p.categories = $categories,
+            p.pdf_url = $pdf_url,
+            p.citation_count = COALESCE($citation_count, 0),
+            p.created_at = datetime(),
+            p.updated_at = datetime()
+        ON MATCH SET
+            p.updated_at = datetime(),
+            p.citation_count = COALESCE($citation_count, p.citation_count)
+        RETURN p.arxiv_id as arxiv_id
+        """
+        result = self.execute_write(query, paper_data, name='papers.create')
+        return result[0]['arxiv_id'] if result else None
+
+    def get_paper(self, arxiv_id: str) -> Optional[Dict]:
+        """Get paper by arXiv ID with authors, concepts, and methods"""
+        query = """
+        MATCH (p:Paper)
+        WHERE p.arxiv_id = $arxiv_id
+           OR (p.arxiv_base_id IS NOT NULL AND p.arxiv_base_id = $arxiv_id)
+        OPTIONAL MATCH (p)-[:AUTHORED_BY]->(a:Author)
+        OPTIONAL MATCH (p)-[:INTRODUCES]->(c:Concept)
+        OPTIONAL MATCH (p)-[:PROPOSES]->(m:Method)
+        WITH p,
+             collect(DISTINCT a.name) as authors,
+             collect(DISTINCT c.name) as graph_concepts,
+             collect(DISTINCT m.name) as graph_methods
+        RETURN p {
+            .*,
+            authors: CASE WHEN size(authors) > 0 THEN authors ELSE [] END,
+            graph_concepts: graph_concepts,
+            graph_methods: graph_methods
+        } as paper
+        LIMIT 1
+        """
+        result = self.execute_read(query, {'arxiv_id': arxiv_id}, name='papers.get')
+        return result[0]['paper'] if result else None
+
+    LIST_PAPERS_QUERY = """
+        MATCH (p:Paper)
+        OPTIONAL MATCH (p)-[:AUTHORED_BY]->(a:Author)
+        OPTIONAL MATCH (p)-[:INTRODUCES]->(c:Concept)
+        OPTIONAL MATCH (p)-[:PROPOSES]->(m:Method)
+        WITH p,
+             collect(DISTINCT a.name) as authors,
+             collect(DISTINCT c.name) as graph_concepts,
+             collect(DISTINCT m.name) as graph_methods
+        RETURN p {
+            .*,
+            authors: CASE WHEN size(authors) > 0 THEN authors ELSE [] END,
+            graph_concepts: graph_concepts,
+            graph_methods: graph_methods
+        } as paper
+        ORDER BY %s
+        SKIP $offset
+        LIMIT $limit
+        """
+
+    # list_papers sort -> ORDER BY; papers without a PageRank score rank last
+    LIST_PAPERS_ORDER = {
+        'date': "p.published_date DESC",
+        'influence': "COALESCE(p.pagerank, 0.0) DESC, p.published_date DESC",
+    }
+
+    def _list_papers_query(self, sort: str) -> str:
+        if sort not in self.LIST_PAPERS_ORDER:
+            raise ValueError(f"Unknown sort: {sort!r} (expected one of {', '.join(self.LIST_PAPERS_ORDER)})")
+        return self.LIST_PAPERS_QUERY % self.LIST_PAPERS_ORDER[sort]
+
+    def list_papers(self, limit: int = 100, offset: int = 0, sort: str = 'date') -> List[Dict]:
+        """List papers with pagination, authors, concepts, and methods"""
+        result = self.execute_read(
+            self._list_papers_query(sort), {'limit': limit, 'offset': offset, 'sort': sort}, name='papers.list'
+        )
+        return [r['paper'] for r in result]
+
+    def list_papers_raw(self, limit: int = 100, offset: int = 0, sort: str = 'date') -> List[Any]:
+        """List papers with raw backend values, for serialization with dumps_raw()"""
+        result = self.execute_read_raw(
+            self._list_papers_query(sort), {'limit': limit, 'offset': offset, 'sort': sort}, name='papers.list'
+        )
+        return [r['paper'] for r in result]
+
+    def count_papers(self) -> int:
+        """Total papers (an unfiltered label count, answered from the count store)"""
+        result = self.execute_read("MATCH (p:Paper) RETURN count(p) as total", name='papers.count')
+        return result[0]['total'] if result else 0
+
+    def search_papers(self, search_term: str, limit: int = 20, pagerank_boost: float = 0.0) -> List[Dict]:
+        """
+        Full-text search papers with authors, concepts, and methods. The
+        text score is scaled by (1 + pagerank_boost * p.pagerank).
+        """
+        query = """
+        CALL db.index.fulltext.queryNodes(
+            'paper_fulltext',
+            $search_term
+        ) YIELD node, score
+        WITH node as p, score * (1 + $pagerank_boost * COALESCE(node.pagerank, 0.0)) as score
+        OPTIONAL MATCH (p)-[:AUTHORED_BY]->(a:Author)
+        OPTIONAL MATCH (p)-[:INTRODUCES]->(c:Concept)
+        OPTIONAL MATCH (p)-[:PROPOSES]->(m:Method)
+        WITH p, score,
+             collect(DISTINCT a.name) as authors,
+             collect(DISTINCT c.name) as graph_concepts,
+             collect(DISTINCT m.name) as graph_methods
+        RETURN p {
+            .*,
+            authors: CASE WHEN size(authors) > 0 THEN authors ELSE [] END,
+            graph_concepts: graph_concepts,
+            graph_methods: graph_methods
+        } as paper, score
+        ORDER BY score DESC
+        LIMIT $limit
+        """
+        result = self.execute_read(query, {
+            'search_term': search_term,
+            'limit': limit,
+            'pagerank_boost': pagerank_boost
+        }, name='papers.search')
+        return [{'paper': r['paper'], 'score': r['score']} for r in result]
+
+    def debug_paper(self, arxiv_id: str) -> Optional[Dict]:
+        """Paper identifiers and authors, for checking relationships"""
+        query = """
+        MATCH (p:Paper)
+        WHERE p.arxiv_id = $arxiv_id
+           OR (p.arxiv_base_id IS NOT NULL AND p.arxiv_base_id = $arxiv_id)
+        OPTIONAL MATCH (p)-[r:AUTHORED_BY]->(a:Author)
+        WITH p, collect(DISTINCT a.name) as authors
+        RETURN p.arxiv_id as arxiv_id,
+               p.arxiv_base_id as arxiv_base_id,
+               p.title as title,
+               authors,
+               size(authors) as author_count
+        """
+        result = self.execute_read(query, {'arxiv_id': arxiv_id}, name='papers.debug')
+        return result[0] if result else None
+
+    def get_paper_graph(self, arxiv_id: str) -> Optional[Dict]:
+        """Paper neighborhood as nodes and edges for visualization"""
+        query = """
+        MATCH (p:Paper)
+        WHERE p.arxiv_id = $arxiv_id
+           OR (p.arxiv_base_id IS NOT NULL AND p.arxiv_base_id = $arxiv_id)
+
+        // Get all connected nodes and relationships
+        OPTIONAL MATCH (p)-[r]-(n)
+        WHERE n:Author OR n:Concept OR n:Method OR n:Dataset OR n:Metric
+
+        WITH p, collect(DISTINCT {
+            node: n,
+            relationship: r,
+            rel_type: type(r),
+            node_labels: labels(n)
+        }) as connections
+
+        // Build nodes array
+        WITH p, connections,
+             [{
+                id: p.arxiv_id,
+                label: p.title,
+                type: 'Paper',
+                properties: {
+                    title: p.title,
+                    arxiv_id: p.arxiv_id,
+                    published_date: toString(p.published_date),
+                    categories: p.categories
+                }
+             }] +
+             [conn in connections | {
+                id: CASE
+                    WHEN conn.node.name IS NOT NULL THEN conn.node.name
+                    WHEN conn.node.id IS NOT NULL THEN conn.node.id
+                    ELSE toString(id(conn.node))
+                END,
+                label: CASE
+                    WHEN conn.node.name IS NOT NULL THEN conn.node.name
+                    WHEN conn.node.id IS NOT NULL THEN conn.node.id
+                    ELSE 'Unknown'
+                END,
+                type: conn.node_labels[0],
+                properties: properties(conn.node)
+             }] as nodes,
+
+             // Build edges array
+             [conn in connections WHERE conn.relationship IS NOT NULL | {
+                source: p.arxiv_id,
+                target: CASE
+                    WHEN conn.node.name IS NOT NULL THEN conn.node.name
+                    WHEN conn.node.id IS NOT NULL THEN conn.node.id
+                    ELSE toString(id(conn.node))
+                END,
+                type: conn.rel_type,
+                label: conn.rel_type
+             }] as edges
+
+        RETURN {
+            nodes: nodes,
+            edges: edges,
+            center_node: p.arxiv_id
+        } as graph
+        """
+        result = self.execute_read(query, {'arxiv_id': arxiv_id}, name='papers.graph')
+        return result[0].get('graph') if result else None
+
+    def get_related_papers(self, arxiv_id: str, limit: int = 10) -> Optional[Dict]:
+        """
+        Precomputed related papers (SIMILAR_TO, written by
+        scripts/compute_related_papers.py), best first
+        """
+        query = """
+        MATCH (p:Paper)
+        WHERE p.arxiv_id = $arxiv_id
+           OR (p.arxiv_base_id IS NOT NULL AND p.arxiv_base_id = $arxiv_id)
+        WITH p LIMIT 1
+        OPTIONAL MATCH (p)-[s:SIMILAR_TO]->(q:Paper)
+        WITH p, s, q
+        ORDER BY s.rank
+        WITH p, collect(q {
+            .arxiv_id,
+            .title,
+            .published_date,
+            .categories,
+            .pagerank,
+            score: s.score
+        })[..$limit] as related
+        RETURN p.arxiv_id as arxiv_id,
+               p.related_at as computed_at,
+               related
+        """
+        result = self.execute_read(query, {'arxiv_id': arxiv_id, 'limit': limit}, name='papers.related')
+        return result[0] if result else None
+
+    # Authors
+    def get_author(self, author_id: str, recent_papers: int = 10) -> Optional[Dict]:
+        """
+        Author profile from materialized aggregates (paper_count,
+        first/last_published, top_concepts) plus the most recent papers
+        """
+        query = """
+        MATCH (a:Author {id: $author_id})
+        RETURN a {
+            .id,
+            .name,
+            .paper_count,
+            .first_published,
+            .last_published,
+            top_concepts: COALESCE(a.top_concepts, []),
+            coauthor_count: COUNT { (a)-[:COAUTHORED]-() },
+            recent_papers: COLLECT {
+                MATCH (a)<-[:AUTHORED_BY]-(p:Paper)
+                WITH p
+                ORDER BY p.published_date DESC
+                LIMIT $recent_papers
+                RETURN p { .arxiv_id, .title, .published_date }
+            }
+        } as author
+        """
+        result = self.execute_read(
+            query, {'author_id': author_id, 'recent_papers': recent_papers}, name='authors.get'
+        )
+        return result[0]['author'] if result else None
+
+    def get_coauthors(self, author_id: str, limit: int = 20) -> Optional[Dict]:
+        """Co-authors by number of shared papers, from the materialized COAUTHORED relationships"""
+        query = """
+        MATCH (a:Author {id: $author_id})
+        OPTIONAL MATCH (a)-[c:COAUTHORED]-(b:Author)
+        WITH a, c, b
+        ORDER BY c.weight DESC, c.last_collaborated DESC
+        RETURN a.id as id,
+               a.name as name,
+               collect(b {
+                   .id,
+                   .name,
+                   .paper_count,
+                   weight: c.weight,
+                   first_collaborated: c.first_collaborated,
+                   last_collaborated: c.last_collaborated
+               })[..$limit] as coauthors
+        """
+        result = self.execute_read(query, {'author_id': author_id, 'limit': limit}, name='authors.coauthors')
+        return result[0] if result else None
+
+    # Topics
+    def list_topics(self, limit: int = 50) -> List[Dict]:
+        """Topic summaries written by scripts/detect_topics.py, most papers first"""
+        query = """
+        MATCH (t:Topic)
+        RETURN t {.*} as topic
+        ORDER BY t.paper_count DESC
+        LIMIT $limit
+        """
+        result = self.execute_read(query, {'limit': limit}, name='topics.list')
+        return [r['topic'] for r in result]
+
+    # Trends
+    def latest_trend_period(self, dimension: str, granularity: str) -> Optional[date]:
+        """Start of the most recent TrendBucket period for a dimension"""
+        query = """
+        MATCH (b:TrendBucket)
+        WHERE b.dimension = $dimension AND b.granularity = $granularity
+        RETURN max(b.start) as start
+        """
+        result = self.execute_read(
+            query, {'dimension': dimension, 'granularity': granularity}, name='trends.latest'
+        )
+        start = result[0]['start'] if result else None
+        return date.fromisoformat(str(start)[:10]) if start else None
+
+    def get_trend_buckets(self, dimension: str, granularity: str, since: date, until: date) -> List[Dict]:
+        """Per-name counts of the TrendBuckets starting between since and until"""
+        query = """
+        MATCH (b:TrendBucket)
+        WHERE b.dimension = $dimension AND b.granularity = $granularity
+          AND b.start >= $since AND b.start <= $until
+        RETURN b.name as name, b.start as start, b.count as count
+        """
+        return self.execute_read(query, {
+            'dimension': dimension,
+            'granularity': granularity,
+            'since': since,
+            'until': until
+        }, name='trends.buckets')
+
+    # Assistant retrieval
+    def find_papers_by_term(self, term: str, limit: int = 5) -> List[Dict]:
+        """Papers whose title or abstract contains `term`, with a few authors, concepts and methods"""
+        query = """
+        MATCH (p:Paper)
+        WHERE toLower(p.title) CONTAINS toLower($query)
+           OR toLower(p.abstract) CONTAINS toLower($query)
+        OPTIONAL MATCH (p)-[:AUTHORED_BY]->(a:Author)
+        OPTIONAL MATCH (p)-[:INTRODUCES]->(c:Concept)
+        OPTIONAL MATCH (p)-[:PROPOSES]->(m:Method)
+        RETURN p {.*} as paper,
+               collect(DISTINCT a.name)[0..3] as authors,
+               collect(DISTINCT c.name)[0..5] as concepts,
+               collect(DISTINCT m.name)[0..3] as methods
+        LIMIT $limit
+        """
+        return self.execute_read(query, {'query': term, 'limit': limit}, name='assistant.papers')
+
+    def find_concepts_by_term(self, term: str, limit: int = 5) -> List[Dict]:
+        """
+        Concepts whose name contains `term`, most used first. Uses the
+        materialized paper_count, so hub concepts are not recounted on
+        every call; concepts written before the counters existed (until
+        recompute_entity_degrees.py has run) are counted live instead.
+        """
+        query = """
+        MATCH (c:Concept)
+        WHERE toLower(c.name) CONTAINS toLower($query)
+        WITH c, COALESCE(c.paper_count, COUNT { MATCH (c)--(p:Paper) RETURN DISTINCT p }) as paper_count
+        RETURN c.name as name,
+               c.category as category,
+               paper_count
+        ORDER BY paper_count DESC
+        LIMIT $limit
+        """
+        return self.execute_read(query, {'query': term, 'limit': limit}, name='assistant.concepts')
+
+    def find_methods_by_term(self, term: str, limit: int = 5) -> List[Dict]:
+        """Methods whose name contains `term`, most used first (materialized paper_count, else a live count)"""
+        query = """
+        MATCH (m:Method)
+        WHERE toLower(m.name) CONTAINS toLower($query)
+        WITH m, COALESCE(m.paper_count, COUNT { MATCH (m)--(p:Paper) RETURN DISTINCT p }) as paper_count
+        RETURN m.name as name,
+               m.algorithm_type as type,
+               paper_count
+        ORDER BY paper_count DESC
+        LIMIT $limit
+        """
+        return self.execute_read(query, {'query': term, 'limit': limit}, name='assistant.methods')
@@ -0,0 +1,277 @@
+import json
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    key TEXT UNIQUE,
+    type TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_after REAL NOT NULL,
+    claimed_by TEXT,
+    lease_until REAL,
+    progress TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_claimable ON jobs (status, run_after);
+"""
+
+JSON_COLUMNS = ('params', 'progress', 'result')
+
+
+def default_worker_id() -> str:
+    """host:pid, unique among the workers sharing a queue or a backlog"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def retry_delay(attempts: int, base_seconds: float, max_seconds: float) -> float:
+    """Exponential backoff after the `attempts`-th failure, with up to 10% jitter"""
+    delay = min(base_seconds * 2 ** (attempts - 1), max_seconds)
+    return delay * random.uniform(1.0, 1.1)
+
+
+class JobQueue:
+    """
+    Durable job queue in a local SQLite file, shared by the API (which
+    enqueues) and any number of worker processes on the same host.
+
+    Workers claim a job with a lease; a job whose lease runs out (the
+    worker crashed or hung) is claimable again. Failed attempts are
+    retried with exponential backoff up to max_attempts. Jobs enqueued
+    with the same key are one job.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_attempts: int = 5,
+        lease_seconds: float = 300,
+        backoff_seconds: float = 30,
+        backoff_max_seconds: float = 3600
+    ):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self._local = threading.local()
+        self._schema_ready = False
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Autocommit; transactions are opened explicitly in _transaction()
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            # WAL lets the API read job status while a worker writes
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            if not self._schema_ready:
+                connection.executescript(SCHEMA)
+                self._schema_ready = True
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction holding the database write lock from the start"""
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    @staticmethod
+    def _job(row: Optional[sqlite3.Row]) -> Optional[Dict]:
+        if row is None:
+            return None
+        job = dict(row)
+        for column in JSON_COLUMNS:
+            if job[column] is not None:
+                job[column] = json.loads(job[column])
+        return job
+
+    def enqueue(
+        self,
+        job_type: str,
+        params: Dict,
+        key: Optional[str] = None,
+        max_attempts: Optional[int] = None
+    ) -> Dict:
+        """
+        Add a job, or return the existing one enqueued with the same key
+        (whatever its status). The returned job has created=True if it is new.
+        """
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._transaction() as connection:
+            if key is not None:
+                existing = connection.execute("SELECT * FROM jobs WHERE key = ?", (key,)).fetchone()
+                if existing is not None:
+                    return {**self._job(existing), 'created': False}
+            connection.execute(
+                """
+                INSERT INTO jobs (id, key, type, params, status, max_attempts, run_after, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (job_id, key, job_type, json.dumps(params), QUEUED,
+                 max_attempts or self.max_attempts, now, now, now)
+            )
+            job = connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return {**self._job(job), 'created': True}
+
+    def claim(self, worker_id: str, job_types: Optional[Iterable[str]] = None) -> Optional[Dict]:
+        """
+        Atomically take the oldest due job (queued, or running with an
+        expired lease) and lease it to worker_id. None if nothing is due.
+        """
+        now = time.time()
+        types = list(job_types or [])
+        type_filter = f"AND type IN ({', '.join('?' * len(types))})" if types else ""
+        with self._transaction() as connection:
+            # A worker that dies on a job's last attempt leaves nothing to retry
+            connection.execute(
+                """
+                UPDATE jobs
+                SET status = ?, error = COALESCE(error, 'Lease expired'), lease_until = NULL,
+                    updated_at = ?, finished_at = ?
+                WHERE status = ? AND lease_until < ? AND attempts >= max_attempts
+                """,
+                (FAILED, now, now, RUNNING, now)
+            )
+            row = connection.execute(
+                f"""
+                SELECT id FROM jobs
+                WHERE ((status = ? AND run_after <= ?) OR (status = ? AND lease_until < ?))
+                {type_filter}
+                ORDER BY run_after
+                LIMIT 1
+                """,
+                (QUEUED, now, RUNNING, now, *types)
+            ).fetchone()
+            if row is None:
+                return None
+            job = connection.execute(
+                """
+                UPDATE jobs
+                SET status = ?, claimed_by = ?, lease_until = ?, attempts = attempts + 1, updated_at = ?
+                WHERE id = ?
+                RETURNING *
+                """,
+                (RUNNING, worker_id, now + self.lease_seconds, now, row['id'])
+            ).fetchone()
+        return self._job(job)
+
+    def heartbeat(self, job_id: str, worker_id: str, progress: Optional[Dict] = None) -> bool:
+        """Extend the lease and record progress; False if the job is no longer this worker's"""
+        now = time.time()
+        with self._transaction() as connection:
+            updated = connection.execute(
+                """
+                UPDATE jobs
+                SET lease_until = ?, progress = COALESCE(?, progress), updated_at = ?
+                WHERE id = ? AND status = ? AND claimed_by = ?
+                """,
+                (now + self.lease_seconds, json.dumps(progress) if progress is not None else None,
+                 now, job_id, RUNNING, worker_id)
+            ).rowcount
+        return updated == 1
+
+    def complete(self, job_id: str, worker_id: str, result: Optional[Dict] = None) -> bool:
+        now = time.time()
+        with self._transaction() as connection:
+            updated = connection.execute(
+                """
+                UPDATE jobs
+                SET status = ?, result = ?, error = NULL, lease_until = NULL, updated_at = ?, finished_at = ?
+                WHERE id = ? AND status = ? AND claimed_by = ?
+                """,
+                (SUCCEEDED, json.dumps(result), now, now, job_id, RUNNING, worker_id)
+            ).rowcount
+        return updated == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> Optional[Dict]:
+        """Record a failed attempt: requeue with backoff, or fail for good after max_attempts"""
+        now = time.time()
+        with self._transaction() as connection:
+            job = connection.execute(
+                "SELECT * FROM jobs WHERE id = ? AND status = ? AND claimed_by = ?",
+                (job_id, RUNNING, worker_id)
+            ).fetchone()
+            if job is None:
+                return None
+            if job['attempts'] < job['max_attempts']:
+                delay = retry_delay(job['attempts'], self.backoff_seconds, self.backoff_max_seconds)
+                updated = connection.execute(
+                    """
+                    UPDATE jobs
+                    SET status = ?, run_after = ?, error = ?, claimed_by = NULL, lease_until = NULL, updated_at = ?
+                    WHERE id = ?
+                    RETURNING *
+                    """,
+                    (QUEUED, now + delay, error, now, job_id)
+                ).fetchone()
+            else:
+                updated = connection.execute(
+                    """
+                    UPDATE jobs
+                    SET status = ?, error = ?, lease_until = NULL, updated_at = ?, finished_at = ?
+                    WHERE id = ?
+                    RETURNING *
+                    """,
+                    (FAILED, error, now, now, job_id)
+                ).fetchone()
+        return self._job(updated)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row)
+
+    def list(self, status: Optional[str] = None, job_type: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """Most recent jobs first"""
+        filters, params = [], []
+        if status:
+            filters.append("status = ?")
+            params.append(status)
+        if job_type:
+            filters.append("type = ?")
+            params.append(job_type)
+        where = f"WHERE {' AND '.join(filters)}" if filters else ""
+        rows = self._connection().execute(
+            f"SELECT * FROM jobs {where} ORDER BY created_at DESC LIMIT ?", (*params, limit)
+        ).fetchall()
+        return [self._job(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """Jobs per status"""
+        rows = self._connection().execute("SELECT status, count(*) AS jobs FROM jobs GROUP BY status").fetchall()
+        return {row['status']: row['jobs'] for row in rows}
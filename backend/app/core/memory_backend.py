@@ -0,0 +1,1694 @@
+import copy
+import heapq
+import os
+import re
+import threading
+import time
+from array import array
+from bisect import insort
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from math import log
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import logging
+import orjson
+
+from .graph_backend import GraphBackend, Statement
+from .query_metrics import query_metrics
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Lookup indexes per label, mirroring shared/graph_schema.cypher
+INDEXED_PROPERTIES = {
+    'Paper': ('arxiv_id', 'arxiv_base_id'),
+    'Author': ('name', 'id'),
+    'Concept': ('name', 'canonical_key'),
+    'Method': ('name', 'canonical_key'),
+    'Dataset': ('name', 'id'),
+    'Metric': ('name',),
+    'Repository': ('url',),
+    'Model': ('id',),
+    'Space': ('id',),
+    'Topic': ('id',),
+    'TrendBucket': ('key',),
+}
+
+# Node types shown around a paper in the graph view
+NEIGHBORHOOD_LABELS = frozenset({'Author', 'Concept', 'Method', 'Dataset', 'Metric'})
+
+# Node types carrying materialized paper_count / degree
+DEGREE_LABELS = frozenset({'Author', 'Concept', 'Method', 'Dataset', 'Metric'})
+
+# Full-text weight of a title token relative to an abstract token
+TITLE_WEIGHT = 2.0
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+_EMPTY = array('l')
+
+# Query name -> handler(backend, parameters), filled by @handles
+_HANDLERS: Dict[str, Callable] = {}
+
+
+def handles(*names: str):
+    """Register a method as the in-memory implementation of named queries"""
+    def register(func):
+        for name in names:
+            _HANDLERS[name] = func
+        return func
+    return register
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _date(value) -> str:
+    """Validate like Cypher date() and store as an ISO date string"""
+    return date.fromisoformat(str(value)[:10]).isoformat()
+
+
+def _datetime(value) -> Optional[datetime]:
+    if not value:
+        return None
+    parsed = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _tokenize(text: Optional[str]) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+def _widened(props: Dict, value, first: str, last: str) -> Dict:
+    """first/last updates so [props[first], props[last]] covers value, like the CASE expressions in the writers"""
+    update = {}
+    if value is None:
+        return update
+    if props.get(first) is None or value < props[first]:
+        update[first] = value
+    if props.get(last) is None or value > props[last]:
+        update[last] = value
+    return update
+
+
+def _coalesce(*values):
+    return next((value for value in values if value is not None), None)
+
+
+class _UndoLog:
+    """Pre-images of the nodes and relationships a write batch touched"""
+
+    def __init__(self, node_count: int, dirty: bool):
+        # Nodes from node_count on were created by the batch
+        self.node_count = node_count
+        self.dirty = dirty
+        self.nodes: Dict[int, Tuple[Tuple[str, ...], Dict]] = {}
+        # None: the relationship did not exist
+        self.relationships: Dict[Tuple[str, int, int], Optional[Dict]] = {}
+
+
+class InMemoryGraphBackend(GraphBackend):
+    """
+    In-process graph store answering the named queries of the API and the
+    ingest/enrichment scripts, so both run without a Neo4j server.
+
+    Nodes are integer ids into parallel label/property lists. Every
+    relationship type keeps outgoing and incoming neighbors per node as
+    compact array('l') adjacency lists; relationship properties live in a
+    dict keyed by (type, start, end), which also makes MERGE idempotent.
+    Values are stored the way the Neo4j path returns them after
+    conversion (dates and datetimes as ISO strings).
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._labels: List[Tuple[str, ...]] = []
+        self._props: List[Dict] = []
+        self._by_label: Dict[str, List[int]] = defaultdict(list)
+        self._indexes: Dict[Tuple[str, str], Dict] = defaultdict(dict)
+        self._out: Dict[str, Dict[int, array]] = defaultdict(dict)
+        self._in: Dict[str, Dict[int, array]] = defaultdict(dict)
+        self._rel_props: Dict[Tuple[str, int, int], Dict] = {}
+        # token -> {paper node id: weight}
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        # list_papers sort -> paper node ids in that order
+        self._paper_orders: Dict[str, List[int]] = {}
+        # Set while a write batch runs, so a failed batch can be rolled back
+        self._undo: Optional[_UndoLog] = None
+        self._loaded = False
+        self._dirty = False
+
+    def connect(self):
+        """Load the persisted graph, if any"""
+        if self._loaded:
+            return
+        if self.path and os.path.exists(self.path):
+            self.load(self.path)
+        self._loaded = True
+        logger.info(
+            f"In-memory graph ready: {len(self._props)} nodes, "
+            f"{len(self._rel_props)} relationships"
+        )
+
+    def close(self):
+        """Persist the graph when a path is configured"""
+        if self.path and self._dirty:
+            self.save(self.path)
+            logger.info(f"In-memory graph saved to {self.path}")
+
+    def verify_connectivity(self) -> bool:
+        """Always reachable"""
+        return True
+
+    def execute_read(self, query: str, parameters: Dict = None, name: Optional[str] = None) -> List[Dict]:
+        """Execute read query by name"""
+        return self._dispatch(name, parameters, 'read')
+
+    def execute_write(self, query: str, parameters: Dict = None, name: Optional[str] = None) -> List[Dict]:
+        """Execute write query by name"""
+        return self._dispatch(name, parameters, 'write')
+
+    def execute_auto_commit(self, query: str, parameters: Dict = None, name: Optional[str] = None) -> List[Dict]:
+        """Execute query by name; there are no transactions to batch"""
+        return self._dispatch(name, parameters, 'auto_commit')
+
+    def execute_read_raw(self, query: str, parameters: Dict = None, name: Optional[str] = None) -> List[Dict]:
+        """Values are already plain Python types"""
+        return self._dispatch(name, parameters, 'read')
+
+    def execute_write_batch(self, statements: List[Statement], name: Optional[str] = None) -> List[List[Dict]]:
+        """
+        Execute named statements in order, holding the lock throughout.
+        All or nothing: if a statement raises, what the batch wrote is
+        undone from the pre-images of the nodes and relationships it
+        touched, like an aborted transaction.
+        """
+        for _, _, statement_name in statements:
+            self._handler(statement_name, 'batch')
+        with self._lock:
+            self._undo = _UndoLog(len(self._props), self._dirty)
+            try:
+                return [
+                    self._dispatch(statement_name, parameters, 'write')
+                    for _, parameters, statement_name in statements
+                ]
+            except BaseException:
+                undo, self._undo = self._undo, None
+                self._rollback(undo)
+                raise
+            finally:
+                self._undo = None
+
+    def stream_read(
+        self,
+        query: str,
+        parameters: Dict = None,
+        fetch_size: int = 1000,
+        name: Optional[str] = None
+    ) -> Iterator[Dict]:
+        """Yield records of a named query"""
+        for record in self._dispatch(name, parameters, 'stream'):
+            yield record
+
+    @staticmethod
+    def _handler(name: Optional[str], mode: str) -> Callable:
+        handler = _HANDLERS.get(name)
+        if handler is None:
+            query_metrics.observe_error(name, mode)
+            raise NotImplementedError(
+                f"Query {name or '<unnamed>'} has no in-memory implementation; "
+                "run it with GRAPH_BACKEND=neo4j"
+            )
+        return handler
+
+    def _dispatch(self, name: Optional[str], parameters: Optional[Dict], mode: str) -> List[Dict]:
+        handler = self._handler(name, mode)
+        with span('db.query', **{'db.system': 'memory', 'db.query.name': name, 'db.mode': mode}) as current:
+            start = time.perf_counter()
+            with self._lock:
+                records = handler(self, parameters or {})
+            query_metrics.observe(name, mode, time.perf_counter() - start, len(records))
+            if current is not None:
+                current.set(**{'db.rows': len(records)})
+            return records
+
+    # Persistence
+    def save(self, path: str):
+        """Write nodes and relationships to a JSON file atomically"""
+        with self._lock:
+            data = orjson.dumps({
+                'nodes': [
+                    {'labels': list(labels), 'properties': props}
+                    for labels, props in zip(self._labels, self._props)
+                ],
+                'relationships': [
+                    {'type': rel_type, 'start': start, 'end': end, 'properties': props}
+                    for (rel_type, start, end), props in self._rel_props.items()
+                ],
+            })
+            self._dirty = False
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str):
+        """Replace the graph with the contents of a file written by save()"""
+        with open(path, 'rb') as f:
+            data = orjson.loads(f.read())
+        with self._lock:
+            self._reset()
+            for node in data['nodes']:
+                self._create_node(node['labels'], node['properties'])
+            for rel in data['relationships']:
+                self._merge_relationship(rel['type'], rel['start'], rel['end'], rel['properties'])
+            self._dirty = False
+
+    # Storage primitives
+    def _create_node(self, labels, properties: Dict) -> int:
+        node_id = len(self._props)
+        self._labels.append(tuple(labels))
+        self._props.append({})
+        for label in labels:
+            self._by_label[label].append(node_id)
+        if 'Paper' in labels:
+            self._paper_orders.clear()
+        self._set(node_id, properties)
+        return node_id
+
+    def _set(self, node_id: int, properties: Dict):
+        self._touch_node(node_id)
+        props = self._props[node_id]
+        labels = self._labels[node_id]
+        for label in labels:
+            for key in INDEXED_PROPERTIES.get(label, ()):
+                if key not in properties:
+                    continue
+                index = self._indexes[(label, key)]
+                old = props.get(key)
+                if old is not None and index.get(old) == node_id:
+                    del index[old]
+                if properties[key] is not None:
+                    index.setdefault(properties[key], node_id)
+
+        is_paper = 'Paper' in labels
+        reindex_text = is_paper and ('title' in properties or 'abstract' in properties)
+        if reindex_text:
+            self._unindex_text(node_id)
+        if is_paper and ('published_date' in properties or 'pagerank' in properties):
+            self._paper_orders.clear()
+
+        props.update(properties)
+        if reindex_text:
+            self._index_text(node_id)
+        self._dirty = True
+
+    def _text_weights(self, node_id: int) -> Dict[str, float]:
+        props = self._props[node_id]
+        weights: Dict[str, float] = defaultdict(float)
+        for token in _tokenize(props.get('title')):
+            weights[token] += TITLE_WEIGHT
+        for token in _tokenize(props.get('abstract')):
+            weights[token] += 1.0
+        return weights
+
+    def _index_text(self, node_id: int):
+        for token, weight in self._text_weights(node_id).items():
+            self._postings[token][node_id] = weight
+
+    def _unindex_text(self, node_id: int):
+        for token in self._text_weights(node_id):
+            self._postings[token].pop(node_id, None)
+
+    def _find(self, label: str, key: str, value) -> Optional[int]:
+        if value is None:
+            return None
+        if key in INDEXED_PROPERTIES.get(label, ()):
+            return self._indexes[(label, key)].get(value)
+        return next(
+            (node_id for node_id in self._by_label[label] if self._props[node_id].get(key) == value),
+            None
+        )
+
+    def _merge_node(self, label: str, key: str, value, on_create: Dict = None, on_match: Dict = None) -> int:
+        node_id = self._find(label, key, value)
+        if node_id is None:
+            return self._create_node((label,), {key: value, **(on_create or {})})
+        if on_match:
+            self._set(node_id, on_match)
+        return node_id
+
+    def _merge_relationship(self, rel_type: str, start: int, end: int, on_create: Dict = None) -> Dict:
+        key = (rel_type, start, end)
+        # Callers update the returned properties in place
+        self._touch_relationship(key)
+        props = self._rel_props.get(key)
+        if props is None:
+            props = self._rel_props[key] = dict(on_create or {})
+            self._append(self._out[rel_type], start, end)
+            self._append(self._in[rel_type], end, start)
+            self._dirty = True
+        return props
+
+    def _link_count(self, a: int, b: int) -> int:
+        """Relationships of any type between a and b, either direction (COUNT { (a)--(b) })"""
+        return sum(
+            ((rel_type, a, b) in self._rel_props) + (a != b and (rel_type, b, a) in self._rel_props)
+            for rel_type in self._out
+        )
+
+    def _merge_counted_relationship(self, rel_type: str, start: int, end: int, on_create: Dict = None) -> Dict:
+        """
+        _merge_relationship for writers: a new relationship bumps degree, and
+        paper_count when it is the first link to that paper, like the Cypher writers
+        """
+        created = (rel_type, start, end) not in self._rel_props
+        props = self._merge_relationship(rel_type, start, end, on_create)
+        if created:
+            first_link = self._link_count(start, end) == 1
+            for node_id, other in ((start, end), (end, start)):
+                if DEGREE_LABELS.isdisjoint(self._labels[node_id]):
+                    continue
+                node = self._props[node_id]
+                update = {'degree': (node.get('degree') or 0) + 1}
+                if 'Paper' in self._labels[other] and first_link:
+                    update['paper_count'] = (node.get('paper_count') or 0) + 1
+                self._set(node_id, update)
+        return props
+
+    def _delete_node(self, node_id: int):
+        """DETACH DELETE; the id stays allocated as an unlabelled empty node"""
+        self._touch_node(node_id)
+        for rel_type, _, start, end in list(self._relationships(node_id)):
+            self._delete_relationship(rel_type, start, end)
+        if 'Paper' in self._labels[node_id]:
+            self._paper_orders.clear()
+        self._unplace_node(node_id)
+        self._labels[node_id] = ()
+        self._props[node_id] = {}
+        self._dirty = True
+
+    def _unplace_node(self, node_id: int):
+        """Drop a node from the label lists, lookup indexes and text index"""
+        props = self._props[node_id]
+        for label in self._labels[node_id]:
+            self._by_label[label].remove(node_id)
+            for key in INDEXED_PROPERTIES.get(label, ()):
+                index = self._indexes[(label, key)]
+                if props.get(key) is not None and index.get(props[key]) == node_id:
+                    del index[props[key]]
+        if 'Paper' in self._labels[node_id]:
+            self._unindex_text(node_id)
+
+    def _place_node(self, node_id: int, labels: Tuple[str, ...], props: Dict):
+        """Put a node back with the given labels and properties (undoes _unplace_node)"""
+        self._labels[node_id] = labels
+        self._props[node_id] = props
+        for label in labels:
+            # Label lists are in node id order
+            insort(self._by_label[label], node_id)
+            for key in INDEXED_PROPERTIES.get(label, ()):
+                if props.get(key) is not None:
+                    self._indexes[(label, key)].setdefault(props[key], node_id)
+        if 'Paper' in labels:
+            self._index_text(node_id)
+
+    def _delete_relationship(self, rel_type: str, start: int, end: int):
+        self._touch_relationship((rel_type, start, end))
+        if self._rel_props.pop((rel_type, start, end), None) is None:
+            return
+        self._out[rel_type][start].remove(end)
+        self._in[rel_type][end].remove(start)
+        self._dirty = True
+
+    # Write batch rollback
+    def _touch_node(self, node_id: int):
+        """Record a node's pre-image before the running batch first changes it"""
+        undo = self._undo
+        if undo is not None and node_id < undo.node_count and node_id not in undo.nodes:
+            undo.nodes[node_id] = (self._labels[node_id], copy.deepcopy(self._props[node_id]))
+
+    def _touch_relationship(self, key: Tuple[str, int, int]):
+        """Record a relationship's pre-image before the running batch first changes it"""
+        undo = self._undo
+        if undo is not None and key not in undo.relationships:
+            props = self._rel_props.get(key)
+            undo.relationships[key] = None if props is None else copy.deepcopy(props)
+
+    def _rollback(self, undo: _UndoLog):
+        """Undo a failed batch: relationships first, then created nodes, then changed ones"""
+        for (rel_type, start, end), props in undo.relationships.items():
+            current = self._rel_props.get((rel_type, start, end))
+            if props is None:
+                self._delete_relationship(rel_type, start, end)
+            elif current is None:
+                self._merge_relationship(rel_type, start, end, props)
+            else:
+                current.clear()
+                current.update(props)
+        for node_id in range(undo.node_count, len(self._props)):
+            self._unplace_node(node_id)
+            for adjacency in (*self._out.values(), *self._in.values()):
+                adjacency.pop(node_id, None)
+        del self._labels[undo.node_count:]
+        del self._props[undo.node_count:]
+        for node_id, (labels, props) in undo.nodes.items():
+            self._unplace_node(node_id)
+            self._place_node(node_id, labels, props)
+        self._paper_orders.clear()
+        self._dirty = undo.dirty
+
+    @staticmethod
+    def _append(adjacency: Dict[int, array], node_id: int, other: int):
+        neighbors = adjacency.get(node_id)
+        if neighbors is None:
+            neighbors = adjacency[node_id] = array('l')
+        neighbors.append(other)
+
+    def _targets(self, node_id: int, rel_type: str) -> array:
+        return self._out[rel_type].get(node_id, _EMPTY)
+
+    def _sources(self, node_id: int, rel_type: str) -> array:
+        return self._in[rel_type].get(node_id, _EMPTY)
+
+    def _relationships(self, node_id: int) -> Iterator[Tuple[str, int, int, int]]:
+        """(type, other node, start, end) for every relationship touching a node"""
+        for rel_type, adjacency in self._out.items():
+            for other in adjacency.get(node_id, _EMPTY):
+                yield rel_type, other, node_id, other
+        for rel_type, adjacency in self._in.items():
+            for other in adjacency.get(node_id, _EMPTY):
+                if other != node_id:
+                    yield rel_type, other, other, node_id
+
+    def _names(self, node_id: int, rel_type: str, distinct: bool = True) -> List:
+        names = [self._props[target].get('name') for target in self._targets(node_id, rel_type)]
+        if not distinct:
+            return names
+        return list(dict.fromkeys(name for name in names if name is not None))
+
+    def _node_key(self, node_id: int):
+        props = self._props[node_id]
+        return _coalesce(
+            props.get('arxiv_id'), props.get('id'), props.get('name'), props.get('url'), str(node_id)
+        )
+
+    def _match_paper(self, arxiv_id: str) -> Optional[int]:
+        node_id = self._find('Paper', 'arxiv_id', arxiv_id)
+        if node_id is None:
+            node_id = self._find('Paper', 'arxiv_base_id', arxiv_id)
+        return node_id
+
+    def _paper_view(self, node_id: int) -> Dict:
+        return {
+            **self._props[node_id],
+            'authors': self._names(node_id, 'AUTHORED_BY'),
+            'graph_concepts': self._names(node_id, 'INTRODUCES'),
+            'graph_methods': self._names(node_id, 'PROPOSES'),
+        }
+
+    def _papers_by_date(self) -> List[int]:
+        """Papers by published_date descending, undated first as in Cypher"""
+        order = self._paper_orders.get('date')
+        if order is None:
+            papers = self._by_label['Paper']
+            dated = [node_id for node_id in papers if self._props[node_id].get('published_date')]
+            dated.sort(key=lambda node_id: self._props[node_id]['published_date'], reverse=True)
+            undated = [node_id for node_id in papers if not self._props[node_id].get('published_date')]
+            order = self._paper_orders['date'] = undated + dated
+        return order
+
+    def _papers_by_influence(self) -> List[int]:
+        """Papers by pagerank descending (unscored as 0), ties by date"""
+        order = self._paper_orders.get('influence')
+        if order is None:
+            # Stable sort keeps the date order among equal scores
+            order = self._paper_orders['influence'] = sorted(
+                self._papers_by_date(),
+                key=lambda node_id: self._props[node_id].get('pagerank') or 0.0,
+                reverse=True
+            )
+        return order
+
+    def _add_authors(self, paper_id: int, authors: List[str], now: str, max_coauthors: int):
+        existing = set(self._targets(paper_id, 'AUTHORED_BY'))
+        published = self._props[paper_id].get('published_date')
+        author_ids = []
+        for position, author_name in enumerate(authors):
+            author_id = self._merge_node('Author', 'name', author_name, on_create={
+                'id': author_name.replace(' ', '-').lower(),
+                'created_at': now,
+                'paper_count': 0,
+                'degree': 0,
+            })
+            if ('AUTHORED_BY', paper_id, author_id) not in self._rel_props:
+                self._merge_counted_relationship('AUTHORED_BY', paper_id, author_id, {
+                    'created_at': now,
+                    'position': position,
+                })
+                self._set(author_id, _widened(self._props[author_id], published, 'first_published', 'last_published'))
+            author_ids.append(author_id)
+
+        author_ids = list(dict.fromkeys(author_ids))
+        if len(author_ids) > max_coauthors:
+            return
+        for a in author_ids:
+            for b in author_ids:
+                if not self._props[a]['name'] < self._props[b]['name']:
+                    continue
+                if a in existing and b in existing:
+                    continue
+                rel = self._merge_counted_relationship('COAUTHORED', a, b, {'weight': 0})
+                rel['weight'] += 1
+                rel.update(_widened(rel, published, 'first_collaborated', 'last_collaborated'))
+
+    # Papers API
+    @handles('papers.create')
+    def _create_paper(self, params: Dict) -> List[Dict]:
+        now = _now()
+        node_id = self._find('Paper', 'arxiv_id', params['arxiv_id'])
+        if node_id is None:
+            self._create_node(('Paper',), {
+                'arxiv_id': params['arxiv_id'],
+                'title': params.get('title'),
+                'abstract': params.get('abstract'),
+                'published_date': _date(params['published_date']),
+                'categories': params.get('categories'),
+                'pdf_url': params.get('pdf_url'),
+                'citation_count': _coalesce(params.get('citation_count'), 0),
+                'created_at': now,
+                'updated_at': now,
+            })
+        else:
+            self._set(node_id, {
+                'updated_at': now,
+                'citation_count': _coalesce(
+                    params.get('citation_count'), self._props[node_id].get('citation_count')
+                ),
+            })
+        return [{'arxiv_id': params['arxiv_id']}]
+
+    @handles('papers.get')
+    def _get_paper(self, params: Dict) -> List[Dict]:
+        node_id = self._match_paper(params['arxiv_id'])
+        return [] if node_id is None else [{'paper': self._paper_view(node_id)}]
+
+    @handles('papers.list')
+    def _list_papers(self, params: Dict) -> List[Dict]:
+        offset = params.get('offset', 0)
+        papers = self._papers_by_influence() if params.get('sort') == 'influence' else self._papers_by_date()
+        page = papers[offset:offset + params.get('limit', 100)]
+        return [{'paper': self._paper_view(node_id)} for node_id in page]
+
+    @handles('papers.count')
+    def _count_papers(self, params: Dict) -> List[Dict]:
+        return [{'total': len(self._by_label['Paper'])}]
+
+    @handles('papers.search')
+    def _search_papers(self, params: Dict) -> List[Dict]:
+        total = len(self._by_label['Paper']) or 1
+        scores: Dict[int, float] = defaultdict(float)
+        for token in set(_tokenize(params['search_term'])):
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            idf = log(1 + total / len(postings))
+            for node_id, weight in postings.items():
+                scores[node_id] += weight * idf
+        boost = params.get('pagerank_boost') or 0.0
+        if boost:
+            for node_id in scores:
+                scores[node_id] *= 1 + boost * (self._props[node_id].get('pagerank') or 0.0)
+        top = heapq.nlargest(params.get('limit', 20), scores.items(), key=lambda item: item[1])
+        return [{'paper': self._paper_view(node_id), 'score': score} for node_id, score in top]
+
+    @handles('papers.debug')
+    def _debug_paper(self, params: Dict) -> List[Dict]:
+        node_id = self._match_paper(params['arxiv_id'])
+        if node_id is None:
+            return []
+        props = self._props[node_id]
+        authors = self._names(node_id, 'AUTHORED_BY')
+        return [{
+            'arxiv_id': props.get('arxiv_id'),
+            'arxiv_base_id': props.get('arxiv_base_id'),
+            'title': props.get('title'),
+            'authors': authors,
+            'author_count': len(authors),
+        }]
+
+    @handles('papers.graph')
+    def _paper_graph(self, params: Dict) -> List[Dict]:
+        node_id = self._match_paper(params['arxiv_id'])
+        if node_id is None:
+            return []
+        paper = self._props[node_id]
+        nodes = [{
+            'id': paper.get('arxiv_id'),
+            'label': paper.get('title'),
+            'type': 'Paper',
+            'properties': {
+                'title': paper.get('title'),
+                'arxiv_id': paper.get('arxiv_id'),
+                'published_date': paper.get('published_date'),
+                'categories': paper.get('categories'),
+            },
+        }]
+        edges = []
+        for rel_type, other, _, _ in self._relationships(node_id):
+            labels = self._labels[other]
+            if NEIGHBORHOOD_LABELS.isdisjoint(labels):
+                continue
+            props = self._props[other]
+            key = _coalesce(props.get('name'), props.get('id'), str(other))
+            nodes.append({
+                'id': key,
+                'label': _coalesce(props.get('name'), props.get('id'), 'Unknown'),
+                'type': labels[0],
+                'properties': dict(props),
+            })
+            edges.append({
+                'source': paper.get('arxiv_id'),
+                'target': key,
+                'type': rel_type,
+                'label': rel_type,
+            })
+        return [{'graph': {'nodes': nodes, 'edges': edges, 'center_node': paper.get('arxiv_id')}}]
+
+    @handles('papers.related')
+    def _related_papers(self, params: Dict) -> List[Dict]:
+        node_id = self._match_paper(params['arxiv_id'])
+        if node_id is None:
+            return []
+        related = sorted(
+            ((self._rel_props[('SIMILAR_TO', node_id, other)], other) for other in self._targets(node_id, 'SIMILAR_TO')),
+            key=lambda item: item[0].get('rank', 0)
+        )
+        return [{
+            'arxiv_id': self._props[node_id].get('arxiv_id'),
+            'computed_at': self._props[node_id].get('related_at'),
+            'related': [
+                {
+                    'arxiv_id': self._props[other].get('arxiv_id'),
+                    'title': self._props[other].get('title'),
+                    'published_date': self._props[other].get('published_date'),
+                    'categories': self._props[other].get('categories'),
+                    'pagerank': self._props[other].get('pagerank'),
+                    'score': rel.get('score'),
+                }
+                for rel, other in related[:params['limit']]
+            ],
+        }]
+
+    # Authors API
+    def _author_pairs(self, node_id: int) -> Iterator[Tuple[Dict, int]]:
+        """(COAUTHORED properties, other author) in either direction"""
+        for other in self._targets(node_id, 'COAUTHORED'):
+            yield self._rel_props[('COAUTHORED', node_id, other)], other
+        for other in self._sources(node_id, 'COAUTHORED'):
+            yield self._rel_props[('COAUTHORED', other, node_id)], other
+
+    @handles('authors.get')
+    def _get_author(self, params: Dict) -> List[Dict]:
+        node_id = self._find('Author', 'id', params['author_id'])
+        if node_id is None:
+            return []
+        props = self._props[node_id]
+        papers = [other for other in self._sources(node_id, 'AUTHORED_BY') if 'Paper' in self._labels[other]]
+        # Undated first, as ORDER BY ... DESC sorts nulls in Cypher
+        papers.sort(
+            key=lambda other: (self._props[other].get('published_date') is None, self._props[other].get('published_date') or ''),
+            reverse=True
+        )
+        return [{'author': {
+            'id': props.get('id'),
+            'name': props.get('name'),
+            'paper_count': props.get('paper_count'),
+            'first_published': props.get('first_published'),
+            'last_published': props.get('last_published'),
+            'top_concepts': props.get('top_concepts') or [],
+            'coauthor_count': sum(1 for _ in self._author_pairs(node_id)),
+            'recent_papers': [
+                {key: self._props[other].get(key) for key in ('arxiv_id', 'title', 'published_date')}
+                for other in papers[:params['recent_papers']]
+            ],
+        }}]
+
+    @handles('authors.coauthors')
+    def _get_coauthors(self, params: Dict) -> List[Dict]:
+        node_id = self._find('Author', 'id', params['author_id'])
+        if node_id is None:
+            return []
+        pairs = sorted(
+            self._author_pairs(node_id),
+            key=lambda pair: (pair[0].get('weight') or 0, pair[0].get('last_collaborated') or ''),
+            reverse=True
+        )
+        return [{
+            'id': self._props[node_id].get('id'),
+            'name': self._props[node_id].get('name'),
+            'coauthors': [
+                {
+                    'id': self._props[other].get('id'),
+                    'name': self._props[other].get('name'),
+                    'paper_count': self._props[other].get('paper_count'),
+                    'weight': rel.get('weight'),
+                    'first_collaborated': rel.get('first_collaborated'),
+                    'last_collaborated': rel.get('last_collaborated'),
+                }
+                for rel, other in pairs[:params['limit']]
+            ],
+        }]
+
+    # Assistant retrieval
+    @handles('assistant.papers')
+    def _find_papers_by_term(self, params: Dict) -> List[Dict]:
+        term = params['query'].lower()
+        rows = []
+        for node_id in self._by_label['Paper']:
+            props = self._props[node_id]
+            if term not in (props.get('title') or '').lower() and term not in (props.get('abstract') or '').lower():
+                continue
+            rows.append({
+                'paper': dict(props),
+                'authors': self._names(node_id, 'AUTHORED_BY')[:3],
+                'concepts': self._names(node_id, 'INTRODUCES')[:5],
+                'methods': self._names(node_id, 'PROPOSES')[:3],
+            })
+            if len(rows) >= params.get('limit', 5):
+                break
+        return rows
+
+    def _find_entities_by_term(self, params: Dict, label: str, field: str, as_field: str) -> List[Dict]:
+        term = params['query'].lower()
+        rows = []
+        for node_id in self._by_label[label]:
+            props = self._props[node_id]
+            if term not in (props.get('name') or '').lower():
+                continue
+            paper_count = props.get('paper_count')
+            if paper_count is None:
+                paper_count = len({
+                    other for _, other, _, _ in self._relationships(node_id) if 'Paper' in self._labels[other]
+                })
+            rows.append({
+                'name': props.get('name'),
+                as_field: props.get(field),
+                'paper_count': paper_count,
+            })
+        rows.sort(key=lambda row: row['paper_count'], reverse=True)
+        return rows[:params.get('limit', 5)]
+
+    @handles('assistant.concepts')
+    def _find_concepts_by_term(self, params: Dict) -> List[Dict]:
+        return self._find_entities_by_term(params, 'Concept', 'category', 'category')
+
+    @handles('assistant.methods')
+    def _find_methods_by_term(self, params: Dict) -> List[Dict]:
+        return self._find_entities_by_term(params, 'Method', 'algorithm_type', 'type')
+
+    # NDJSON export
+    def _exported_papers(self, params: Dict) -> Iterator[int]:
+        since = _datetime(params.get('updated_since'))
+        categories = set(params.get('categories') or ())
+        for node_id in self._by_label['Paper']:
+            props = self._props[node_id]
+            published = props.get('published_date')
+            if 'published_from' in params and (not published or published < params['published_from']):
+                continue
+            if 'published_to' in params and (not published or published > params['published_to']):
+                continue
+            if categories and categories.isdisjoint(props.get('categories') or ()):
+                continue
+            if since:
+                updated = _datetime(props.get('updated_at'))
+                if not updated or updated < since:
+                    continue
+            yield node_id
+
+    def _node_record(self, node_id: int) -> Dict:
+        return {
+            'type': 'node',
+            'id': str(node_id),
+            'key': self._node_key(node_id),
+            'labels': list(self._labels[node_id]),
+            'properties': dict(self._props[node_id]),
+        }
+
+    @handles('export.papers')
+    def _export_papers(self, params: Dict) -> List[Dict]:
+        return [
+            {'paper': {
+                **self._props[node_id],
+                'authors': self._names(node_id, 'AUTHORED_BY', distinct=False),
+                'graph_concepts': self._names(node_id, 'INTRODUCES', distinct=False),
+                'graph_methods': self._names(node_id, 'PROPOSES', distinct=False),
+                'graph_datasets': self._names(node_id, 'EVALUATES_ON', distinct=False),
+                'graph_metrics': self._names(node_id, 'USES_METRIC', distinct=False),
+            }}
+            for node_id in self._exported_papers(params)
+        ]
+
+    @handles('export.graph_papers')
+    def _export_graph_papers(self, params: Dict) -> List[Dict]:
+        return [self._node_record(node_id) for node_id in self._exported_papers(params)]
+
+    @handles('export.graph_neighbors')
+    def _export_graph_neighbors(self, params: Dict) -> List[Dict]:
+        # Each non-paper node once, if it touches a matching paper
+        papers = set(self._exported_papers(params))
+        return [
+            self._node_record(node_id)
+            for node_id, labels in enumerate(self._labels)
+            if labels and 'Paper' not in labels
+            and any(other in papers for _, other, _, _ in self._relationships(node_id))
+        ]
+
+    @handles('export.graph_relationships')
+    def _export_graph_relationships(self, params: Dict) -> List[Dict]:
+        # From the start node when it is a matching paper, otherwise from the end
+        papers = list(self._exported_papers(params))
+        matching = set(papers)
+        relationships = [
+            (rel_type, start, end)
+            for node_id in papers
+            for rel_type, _, start, end in self._relationships(node_id)
+            if start == node_id
+        ] + [
+            (rel_type, start, end)
+            for node_id in papers
+            for rel_type, _, start, end in self._relationships(node_id)
+            if end == node_id and start not in matching
+        ]
+        return [
+            {
+                'type': 'relationship',
+                'id': f"{rel_type}:{start}:{end}",
+                'rel_type': rel_type,
+                'start': str(start),
+                'start_key': self._node_key(start),
+                'end': str(end),
+                'end_key': self._node_key(end),
+                'properties': dict(self._rel_props[(rel_type, start, end)]),
+            }
+            for rel_type, start, end in relationships
+        ]
+
+    # Ingestion scripts
+    @handles('ingest.arxiv_paper')
+    def _ingest_arxiv_paper(self, params: Dict) -> List[Dict]:
+        now = _now()
+        paper_id = self._merge_node('Paper', 'arxiv_id', params['arxiv_id'], on_create={
+            'title': params['title'],
+            'abstract': params['abstract'],
+            'published_date': _date(params['published_date']),
+            'pdf_url': params['pdf_url'],
+            'categories': params['categories'],
+            'created_at': now,
+            'updated_at': now,
+            'source': 'arxiv',
+            'enriched': False,
+        }, on_match={'updated_at': now})
+        self._add_authors(paper_id, params['authors'], now, params['max_coauthors'])
+        return []
+
+    @handles('ingest.hf_paper')
+    def _ingest_hf_paper(self, params: Dict) -> List[Dict]:
+        now = _now()
+        self._merge_node('Paper', 'arxiv_id', params['arxiv_id'], on_create={
+            'title': params['title'],
+            'abstract': params['abstract'],
+            'published_date': _date(params['published_date']),
+            'pdf_url': params['pdf_url'],
+            'hf_url': params['hf_url'],
+            'hf_upvotes': params['upvotes'],
+            'on_huggingface': True,
+            'created_at': now,
+            'updated_at': now,
+            'source': 'huggingface',
+            'enriched': False,
+        }, on_match={
+            'hf_upvotes': params['upvotes'],
+            'on_huggingface': True,
+            'updated_at': now,
+        })
+        return []
+
+    # Entity enrichment
+    @staticmethod
+    def _leased(props: Dict, field: str, now: datetime) -> bool:
+        lease_until = _datetime(props.get(field))
+        return lease_until is not None and lease_until >= now
+
+    @handles('enrich.claim_papers')
+    def _claim_unenriched(self, params: Dict) -> List[Dict]:
+        now = datetime.now(timezone.utc)
+        lease_until = (now + timedelta(seconds=params['lease_seconds'])).isoformat()
+        rows = []
+        for node_id in self._by_label['Paper']:
+            if len(rows) >= params['limit']:
+                break
+            props = self._props[node_id]
+            if props.get('enriched') or self._leased(props, 'lease_until', now):
+                continue
+            self._set(node_id, {'claimed_by': params['worker_id'], 'lease_until': lease_until})
+            rows.append({
+                'arxiv_id': props.get('arxiv_id'),
+                'title': props.get('title'),
+                'abstract': props.get('abstract'),
+                'published_date': props.get('published_date'),
+            })
+        return rows
+
+    @handles('enrich.has_unclaimed')
+    def _has_unclaimed(self, params: Dict) -> List[Dict]:
+        now = datetime.now(timezone.utc)
+        unclaimed = any(
+            not self._props[node_id].get('enriched') and not self._leased(self._props[node_id], 'lease_until', now)
+            for node_id in self._by_label['Paper']
+        )
+        return [{'unclaimed': unclaimed}]
+
+    @handles('enrich.claim_papers_by_id')
+    def _claim_papers_by_id(self, params: Dict) -> List[Dict]:
+        now = datetime.now(timezone.utc)
+        lease_until = (now + timedelta(seconds=params['lease_seconds'])).isoformat()
+        rows = []
+        for arxiv_id in params['arxiv_ids']:
+            node_id = self._find('Paper', 'arxiv_id', arxiv_id)
+            if node_id is None:
+                continue
+            props = self._props[node_id]
+            if props.get('enriched') or (
+                self._leased(props, 'lease_until', now) and props.get('claimed_by') != params['worker_id']
+            ):
+                continue
+            self._set(node_id, {'claimed_by': params['worker_id'], 'lease_until': lease_until})
+            rows.append({
+                'arxiv_id': props.get('arxiv_id'),
+                'title': props.get('title'),
+                'abstract': props.get('abstract'),
+                'published_date': props.get('published_date'),
+            })
+        return rows
+
+    @handles('enrich.release_claim')
+    def _release_claim(self, params: Dict) -> List[Dict]:
+        node_id = self._find('Paper', 'arxiv_id', params['arxiv_id'])
+        if node_id is not None and self._props[node_id].get('claimed_by') == params['worker_id']:
+            self._set(node_id, {'claimed_by': None, 'lease_until': None})
+        return []
+
+    def _merge_canonical_entity(self, label: str, rel_type: str, params: Dict, on_create: Dict) -> int:
+        # A node written under this name before canonicalization (or under
+        # an older key) is adopted only when no node has the key yet...
+        legacy_id = self._find(label, 'name', params['name'])
+        if (
+            legacy_id is not None
+            and self._props[legacy_id].get('canonical_key') != params['canonical_key']
+            and self._find(label, 'canonical_key', params['canonical_key']) is None
+        ):
+            self._set(legacy_id, {'canonical_key': params['canonical_key']})
+
+        node_id = self._merge_node(label, 'canonical_key', params['canonical_key'], on_create={
+            'name': params['name'],
+            'created_at': _now(),
+            'paper_count': 0,
+            'degree': 0,
+            **on_create,
+        })
+        aliases = self._props[node_id].get('aliases') or []
+        if params['name'] not in aliases:
+            aliases = aliases + [params['name']]
+
+        # ...otherwise it is folded into the keyed node
+        if legacy_id is not None and legacy_id != node_id:
+            for paper_id in list(self._sources(legacy_id, rel_type)):
+                self._merge_counted_relationship(
+                    rel_type, paper_id, node_id, dict(self._rel_props[(rel_type, paper_id, legacy_id)])
+                )
+            legacy = self._props[legacy_id]
+            for alias in legacy.get('aliases') or [legacy['name']]:
+                if alias not in aliases:
+                    aliases = aliases + [alias]
+            self._delete_node(legacy_id)
+
+        if aliases != self._props[node_id].get('aliases'):
+            self._set(node_id, {'aliases': aliases})
+        return node_id
+
+    def _link_paper(self, arxiv_id: str, rel_type: str, entity_id: int, on_create: Dict = None):
+        paper_id = self._find('Paper', 'arxiv_id', arxiv_id)
+        if paper_id is not None:
+            self._merge_counted_relationship(rel_type, paper_id, entity_id, on_create)
+
+    @handles('enrich.concept')
+    def _enrich_concept(self, params: Dict) -> List[Dict]:
+        concept_id = self._merge_canonical_entity('Concept', 'INTRODUCES', params, {
+            'description': params['description'],
+            'category': params['category'],
+        })
+        self._link_paper(params['arxiv_id'], 'INTRODUCES', concept_id, {'confidence': params['confidence']})
+        return []
+
+    @handles('enrich.method')
+    def _enrich_method(self, params: Dict) -> List[Dict]:
+        method_id = self._merge_canonical_entity('Method', 'PROPOSES', params, {
+            'description': '',
+            'algorithm_type': params['algorithm_type'],
+        })
+        self._link_paper(params['arxiv_id'], 'PROPOSES', method_id, {'is_primary': True})
+        return []
+
+    @handles('enrich.dataset')
+    def _enrich_dataset(self, params: Dict) -> List[Dict]:
+        dataset_id = self._merge_node('Dataset', 'name', params['name'], on_create={
+            'description': '',
+            'domain': params['domain'],
+            'created_at': _now(),
+            'paper_count': 0,
+            'degree': 0,
+        })
+        self._link_paper(params['arxiv_id'], 'EVALUATES_ON', dataset_id)
+        return []
+
+    @handles('enrich.metric')
+    def _enrich_metric(self, params: Dict) -> List[Dict]:
+        metric_id = self._merge_node('Metric', 'name', params['name'], on_create={
+            'description': '',
+            'higher_is_better': params['higher_is_better'],
+            'created_at': _now(),
+            'paper_count': 0,
+            'degree': 0,
+        })
+        self._link_paper(params['arxiv_id'], 'USES_METRIC', metric_id)
+        return []
+
+    @handles('enrich.mark_enriched')
+    def _mark_enriched(self, params: Dict) -> List[Dict]:
+        node_id = self._find('Paper', 'arxiv_id', params['arxiv_id'])
+        if node_id is not None:
+            now = _now()
+            self._set(node_id, {
+                'enriched': True,
+                'enriched_at': now,
+                'updated_at': now,
+                'hf_next_refresh': _coalesce(self._props[node_id].get('hf_next_refresh'), now),
+                'claimed_by': None,
+                'lease_until': None,
+            })
+        return []
+
+    # Author enrichment
+    @handles('authors.select_missing')
+    def _select_missing_authors(self, params: Dict) -> List[Dict]:
+        rows = []
+        for node_id in self._by_label['Paper']:
+            props = self._props[node_id]
+            if props.get('arxiv_id') is None or any(
+                'Author' in self._labels[target] for target in self._targets(node_id, 'AUTHORED_BY')
+            ):
+                continue
+            rows.append({'arxiv_id': props['arxiv_id'], 'title': props.get('title')})
+            if len(rows) >= params['limit']:
+                break
+        return rows
+
+    @handles('authors.add_batch')
+    def _add_authors_batch(self, params: Dict) -> List[Dict]:
+        now = _now()
+        papers = 0
+        for paper in params['papers']:
+            node_id = self._find('Paper', 'arxiv_id', paper['arxiv_id'])
+            if node_id is None:
+                continue
+            self._set(node_id, {'arxiv_base_id': paper['arxiv_base_id'], 'updated_at': now})
+            self._add_authors(node_id, paper['authors'], now, params['max_coauthors'])
+            papers += 1 if paper['authors'] else 0
+        return [{'papers': papers}]
+
+    # Hugging Face enrichment
+    HF_ENTITY_WRITES = (
+        # (parameter, label, key, relationship, count column, fields set on create, fields set on match)
+        ('repositories', 'Repository', 'url', 'IMPLEMENTS', 'repo_count',
+         ('name', 'stars'), ('stars',)),
+        ('models', 'Model', 'id', 'CITES', 'model_count',
+         ('likes', 'downloads', 'url', 'author'), ('likes', 'downloads')),
+        ('datasets', 'Dataset', 'id', 'REFERENCES', 'dataset_count',
+         ('likes', 'downloads', 'url', 'author'), ('likes', 'downloads')),
+        ('spaces', 'Space', 'id', 'DEMONSTRATES', 'space_count',
+         ('likes', 'url', 'author', 'sdk'), ('likes',)),
+    )
+
+    @handles('hf.write_enrichment')
+    def _write_hf_enrichment(self, params: Dict) -> List[Dict]:
+        paper_id = self._find('Paper', 'arxiv_id', params['arxiv_id'])
+        if paper_id is None:
+            return []
+        now = _now()
+        self._set(paper_id, {
+            'hf_upvotes': params['upvotes'],
+            'hf_discussion_id': params['discussion_id'],
+            'hf_ai_summary': params['ai_summary'],
+            'hf_keywords': params['keywords'],
+            'hf_url': params['hf_url'],
+            'hf_published_at': params['published_at'],
+            'hf_enriched': True,
+            'hf_enriched_at': now,
+            'hf_refresh_tier': params['refresh_tier'],
+            'hf_next_refresh': _datetime(params['next_refresh']).isoformat(),
+            'on_huggingface': True,
+            'hf_claimed_by': None,
+            'hf_lease_until': None,
+            'updated_at': now,
+        })
+
+        counts = {}
+        for param, label, key, rel_type, count_key, create_fields, match_fields in self.HF_ENTITY_WRITES:
+            for item in params[param]:
+                on_create = {field: item[field] for field in create_fields}
+                on_create.setdefault('name', item[key])
+                if label == 'Repository':
+                    on_create['source'] = 'huggingface'
+                on_create['created_at'] = now
+                if label in DEGREE_LABELS:
+                    on_create.update(paper_count=0, degree=0)
+                on_match = {field: item[field] for field in match_fields}
+                on_match['updated_at'] = now
+                entity_id = self._merge_node(label, key, item[key], on_create=on_create, on_match=on_match)
+                self._merge_counted_relationship(rel_type, entity_id, paper_id, {'source': 'huggingface'})
+            counts[count_key] = len(params[param])
+        return [counts]
+
+    @handles('hf.mark_not_found')
+    def _mark_not_on_huggingface(self, params: Dict) -> List[Dict]:
+        node_id = self._find('Paper', 'arxiv_id', params['arxiv_id'])
+        if node_id is not None:
+            self._set(node_id, {
+                'hf_enriched': True,
+                'hf_enriched_at': _now(),
+                'hf_refresh_tier': params['refresh_tier'],
+                'hf_next_refresh': _datetime(params['next_refresh']).isoformat(),
+                'on_huggingface': False,
+                'hf_claimed_by': None,
+                'hf_lease_until': None,
+            })
+        return []
+
+    @handles('hf.reschedule_retry')
+    def _reschedule_hf_retry(self, params: Dict) -> List[Dict]:
+        node_id = self._find('Paper', 'arxiv_id', params['arxiv_id'])
+        if node_id is not None:
+            self._set(node_id, {
+                'hf_next_refresh': _datetime(params['next_refresh']).isoformat(),
+                'hf_claimed_by': None,
+                'hf_lease_until': None,
+            })
+        return []
+
+    @handles('hf.schedule_unscheduled')
+    def _schedule_unscheduled(self, params: Dict) -> List[Dict]:
+        now = _now()
+        scheduled = 0
+        for node_id in self._by_label['Paper']:
+            if scheduled >= params['batch_size']:
+                break
+            props = self._props[node_id]
+            if props.get('enriched') is True and props.get('hf_next_refresh') is None:
+                self._set(node_id, {'hf_next_refresh': now})
+                scheduled += 1
+        return [{'scheduled': scheduled}]
+
+    @handles('hf.claim_due')
+    def _claim_due(self, params: Dict) -> List[Dict]:
+        now = datetime.now(timezone.utc)
+        lease_until = (now + timedelta(seconds=params['lease_seconds'])).isoformat()
+        due = []
+        for node_id in self._by_label['Paper']:
+            props = self._props[node_id]
+            next_refresh = _datetime(props.get('hf_next_refresh'))
+            if next_refresh and next_refresh <= now and not self._leased(props, 'hf_lease_until', now):
+                due.append((next_refresh, node_id))
+        due.sort()
+        rows = []
+        for _, node_id in due[:params['limit']]:
+            self._set(node_id, {'hf_claimed_by': params['worker_id'], 'hf_lease_until': lease_until})
+            rows.append({
+                'arxiv_id': self._props[node_id].get('arxiv_id'),
+                'title': self._props[node_id].get('title'),
+                'published_date': self._props[node_id].get('published_date'),
+            })
+        return rows
+
+    @handles('hf.has_unclaimed_due')
+    def _has_unclaimed_due(self, params: Dict) -> List[Dict]:
+        now = datetime.now(timezone.utc)
+        for node_id in self._by_label['Paper']:
+            props = self._props[node_id]
+            next_refresh = _datetime(props.get('hf_next_refresh'))
+            if next_refresh and next_refresh <= now and not self._leased(props, 'hf_lease_until', now):
+                return [{'unclaimed': True}]
+        return [{'unclaimed': False}]
+
+    @handles('hf.claim_papers')
+    def _claim_hf_papers(self, params: Dict) -> List[Dict]:
+        now = datetime.now(timezone.utc)
+        lease_until = (now + timedelta(seconds=params['lease_seconds'])).isoformat()
+        rows = []
+        for arxiv_id in params['arxiv_ids']:
+            node_id = self._find('Paper', 'arxiv_id', arxiv_id)
+            if node_id is None:
+                continue
+            props = self._props[node_id]
+            next_refresh = _datetime(props.get('hf_next_refresh'))
+            if not next_refresh or next_refresh > now or (
+                self._leased(props, 'hf_lease_until', now) and props.get('hf_claimed_by') != params['worker_id']
+            ):
+                continue
+            self._set(node_id, {'hf_claimed_by': params['worker_id'], 'hf_lease_until': lease_until})
+            rows.append({
+                'arxiv_id': props.get('arxiv_id'),
+                'title': props.get('title'),
+                'published_date': props.get('published_date'),
+            })
+        return rows
+
+    # Materialized degrees
+    def _recount(self, node_id: int):
+        """paper_count (distinct linked papers) and degree (all relationships) from the graph"""
+        papers = set()
+        degree = 0
+        for _, other, _, _ in self._relationships(node_id):
+            degree += 1
+            if 'Paper' in self._labels[other]:
+                papers.add(other)
+        self._set(node_id, {'paper_count': len(papers), 'degree': degree})
+
+    @handles('degrees.recompute')
+    def _recompute_degrees(self, params: Dict) -> List[Dict]:
+        for node_id in self._by_label[params['label']]:
+            self._recount(node_id)
+        return []
+
+    @handles('degrees.top')
+    def _top_entities(self, params: Dict) -> List[Dict]:
+        rows = [
+            {'name': props.get('name'), 'paper_count': props['paper_count'], 'degree': props.get('degree')}
+            for props in (self._props[node_id] for node_id in self._by_label[params['label']])
+            if props.get('paper_count') is not None
+        ]
+        rows.sort(key=lambda row: row['paper_count'], reverse=True)
+        return rows[:params['limit']]
+
+    # Graph analytics
+    @handles('analytics.papers')
+    def _analytics_papers(self, params: Dict) -> List[Dict]:
+        return [
+            {'node': str(node_id), 'arxiv_id': self._props[node_id].get('arxiv_id')}
+            for node_id in self._by_label['Paper']
+        ]
+
+    @handles('analytics.paper_edges')
+    def _analytics_paper_edges(self, params: Dict) -> List[Dict]:
+        rel_types = set(params['rel_types'])
+        return [
+            {'paper': str(node_id), 'node': str(other), 'rel_type': rel_type}
+            for node_id in self._by_label['Paper']
+            for rel_type, other, _, _ in self._relationships(node_id)
+            if rel_type in rel_types
+        ]
+
+    @handles('analytics.write_pagerank')
+    def _write_pagerank(self, params: Dict) -> List[Dict]:
+        now = _now()
+        for row in params['rows']:
+            node_id = self._find('Paper', 'arxiv_id', row['arxiv_id'])
+            if node_id is not None:
+                self._set(node_id, {'pagerank': row['score'], 'pagerank_at': now})
+        return []
+
+    @handles('analytics.select_stale_related')
+    def _select_stale_related(self, params: Dict) -> List[Dict]:
+        return [
+            {'arxiv_id': props.get('arxiv_id')}
+            for props in (self._props[node_id] for node_id in self._by_label['Paper'])
+            if props.get('enriched') is True
+            and (props.get('related_at') is None or props['related_at'] < props.get('enriched_at', ''))
+        ]
+
+    @handles('analytics.write_similar')
+    def _write_similar(self, params: Dict) -> List[Dict]:
+        now = _now()
+        for row in params['rows']:
+            node_id = self._find('Paper', 'arxiv_id', row['arxiv_id'])
+            if node_id is None:
+                continue
+            for other in list(self._targets(node_id, 'SIMILAR_TO')):
+                self._delete_relationship('SIMILAR_TO', node_id, other)
+            self._set(node_id, {'related_at': now})
+            for rank, related in enumerate(row['related'], start=1):
+                other = self._find('Paper', 'arxiv_id', related['arxiv_id'])
+                if other is not None:
+                    self._merge_relationship('SIMILAR_TO', node_id, other, {'score': related['score'], 'rank': rank})
+        return []
+
+    # Co-authorship backfill
+    @handles('coauthors.delete')
+    def _delete_coauthored(self, params: Dict) -> List[Dict]:
+        for _, start, end in [key for key in self._rel_props if key[0] == 'COAUTHORED']:
+            self._delete_relationship('COAUTHORED', start, end)
+        return []
+
+    @handles('coauthors.build')
+    def _build_coauthored(self, params: Dict) -> List[Dict]:
+        for paper_id in self._by_label['Paper']:
+            authors = [other for other in self._targets(paper_id, 'AUTHORED_BY') if 'Author' in self._labels[other]]
+            if len(authors) > params['max_coauthors']:
+                continue
+            published = self._props[paper_id].get('published_date')
+            for a in authors:
+                for b in authors:
+                    if self._props[a]['name'] < self._props[b]['name']:
+                        rel = self._merge_relationship('COAUTHORED', a, b, {'weight': 0})
+                        rel['weight'] += 1
+                        rel.update(_widened(rel, published, 'first_collaborated', 'last_collaborated'))
+        return []
+
+    @handles('coauthors.backfill')
+    def _backfill_coauthored(self, params: Dict) -> List[Dict]:
+        pairs: Dict[Tuple[int, int], List] = {}
+        for paper_id in self._by_label['Paper']:
+            authors = [other for other in self._targets(paper_id, 'AUTHORED_BY') if 'Author' in self._labels[other]]
+            if len(authors) > params['max_coauthors']:
+                continue
+            published = self._props[paper_id].get('published_date')
+            for a in authors:
+                for b in authors:
+                    if self._props[a]['name'] < self._props[b]['name'] and ('COAUTHORED', a, b) not in self._rel_props:
+                        pairs.setdefault((a, b), []).append(published)
+        for (a, b), dates in pairs.items():
+            dates = [date for date in dates if date is not None]
+            self._merge_relationship('COAUTHORED', a, b, {
+                'weight': len(pairs[(a, b)]),
+                'first_collaborated': min(dates, default=None),
+                'last_collaborated': max(dates, default=None),
+            })
+        return [{'created': len(pairs)}]
+
+    @handles('authors.refresh_profiles')
+    def _refresh_author_profiles(self, params: Dict) -> List[Dict]:
+        for node_id in self._by_label['Author']:
+            dates = []
+            concepts: Dict[str, int] = defaultdict(int)
+            for paper_id in self._sources(node_id, 'AUTHORED_BY'):
+                if self._props[paper_id].get('published_date') is not None:
+                    dates.append(self._props[paper_id]['published_date'])
+                for concept_id in self._targets(paper_id, 'INTRODUCES'):
+                    concepts[self._props[concept_id].get('name')] += 1
+            top = sorted(concepts.items(), key=lambda item: (-item[1], item[0]))[:params['top_concepts']]
+            self._set(node_id, {
+                'first_published': min(dates, default=None),
+                'last_published': max(dates, default=None),
+                'top_concepts': [name for name, _ in top],
+            })
+        return []
+
+    # Entity canonicalization
+    @handles('canonicalize.fetch_entities')
+    def _canonicalize_fetch_entities(self, params: Dict) -> List[Dict]:
+        return [
+            {
+                'name': self._props[node_id].get('name'),
+                'canonical_key': self._props[node_id].get('canonical_key'),
+                'degree': sum('Paper' in self._labels[other] for other in self._sources(node_id, params['rel_type'])),
+            }
+            for node_id in self._by_label[params['label']]
+        ]
+
+    @handles('canonicalize.relationship_types')
+    def _canonicalize_relationship_types(self, params: Dict) -> List[Dict]:
+        types = {}
+        for name in params['names']:
+            dup = self._find(params['label'], 'name', name)
+            if dup is None:
+                continue
+            for rel_type, _, start, _ in self._relationships(dup):
+                types[(rel_type, start == dup)] = None
+        return [{'type': rel_type, 'outgoing': outgoing} for rel_type, outgoing in types]
+
+    @handles('canonicalize.move_relationships')
+    def _canonicalize_move_relationships(self, params: Dict) -> List[Dict]:
+        rel_type, outgoing = params['rel_type'], params['outgoing']
+        moved = 0
+        for merge in params['merges']:
+            keep = self._find(params['label'], 'name', merge['keep'])
+            dup = self._find(params['label'], 'name', merge['duplicate'])
+            if keep is None or dup is None:
+                continue
+            others = self._targets(dup, rel_type) if outgoing else self._sources(dup, rel_type)
+            for other in list(others):
+                if other in (keep, dup):
+                    continue
+                old = self._rel_props[(rel_type, dup, other) if outgoing else (rel_type, other, dup)]
+                start, end = (keep, other) if outgoing else (other, keep)
+                self._merge_relationship(rel_type, start, end, old)
+                moved += 1
+        return [{'moved': moved}]
+
+    @handles('canonicalize.merge')
+    def _canonicalize_merge(self, params: Dict) -> List[Dict]:
+        kept = {}
+        for merge in params['merges']:
+            keep = self._find(params['label'], 'name', merge['keep'])
+            dup = self._find(params['label'], 'name', merge['duplicate'])
+            if keep is None or dup is None:
+                continue
+            aliases = []
+            for node_id in (keep, dup):
+                props = self._props[node_id]
+                aliases += props['aliases'] if props.get('aliases') is not None else [props['name']]
+            self._set(keep, {'aliases': list(dict.fromkeys(aliases))})
+            self._delete_node(dup)
+            kept[keep] = None
+        for keep in kept:
+            self._recount(keep)
+        return []
+
+    @handles('canonicalize.clear_keys')
+    def _canonicalize_clear_keys(self, params: Dict) -> List[Dict]:
+        for name in params['names']:
+            node_id = self._find(params['label'], 'name', name)
+            if node_id is not None:
+                self._set(node_id, {'canonical_key': None})
+        return []
+
+    @handles('canonicalize.backfill_keys')
+    def _canonicalize_backfill_keys(self, params: Dict) -> List[Dict]:
+        for update in params['updates']:
+            node_id = self._find(params['label'], 'name', update['name'])
+            if node_id is not None:
+                self._set(node_id, {'canonical_key': update['canonical_key']})
+        return []
+
+    @handles('canonicalize.drop_key_index', 'canonicalize.key_constraint')
+    def _canonicalize_schema(self, params: Dict) -> List[Dict]:
+        # Lookup indexes are fixed (INDEXED_PROPERTIES); no constraints to create
+        return []
+
+    # Legacy AUTHORED migration
+    def _legacy_authored(self) -> List[Tuple[int, int]]:
+        """(author, paper) of every (:Author)-[:AUTHORED]->(:Paper)"""
+        return [
+            (start, end) for rel_type, start, end in self._rel_props
+            if rel_type == 'AUTHORED' and 'Author' in self._labels[start] and 'Paper' in self._labels[end]
+        ]
+
+    @handles('migrate.count_legacy_edges')
+    def _count_legacy_edges(self, params: Dict) -> List[Dict]:
+        return [{'edges': len(self._legacy_authored())}]
+
+    @handles('migrate.id_collisions')
+    def _author_id_collisions(self, params: Dict) -> List[Dict]:
+        names: Dict[str, List[str]] = {}
+        for author_id in dict.fromkeys(author for author, _ in self._legacy_authored()):
+            props = self._props[author_id]
+            if props.get('id') is None:
+                names.setdefault(props['name'].replace(' ', '-').lower(), []).append(props['name'])
+        rows = []
+        for derived, group in sorted(names.items()):
+            holder = self._find('Author', 'id', derived)
+            if len(group) > 1 or holder is not None:
+                rows.append({
+                    'id': derived,
+                    'names': group,
+                    'holder': self._props[holder].get('name') if holder is not None else None,
+                })
+        return rows
+
+    @handles('migrate.authored_edges')
+    def _migrate_authored_edges(self, params: Dict) -> List[Dict]:
+        colliding = set(params['colliding'])
+        for author_id, paper_id in self._legacy_authored():
+            props = self._props[author_id]
+            if props.get('id') is None and props['name'] not in colliding:
+                self._set(author_id, {'id': props['name'].replace(' ', '-').lower()})
+            old = self._rel_props[('AUTHORED', author_id, paper_id)]
+            self._merge_relationship('AUTHORED_BY', paper_id, author_id, {'created_at': old.get('created_at') or _now()})
+            self._delete_relationship('AUTHORED', author_id, paper_id)
+        return []
+
+    # Topics
+    @handles('analytics.entities')
+    def _analytics_entities(self, params: Dict) -> List[Dict]:
+        return [
+            {
+                'node': str(node_id),
+                'label': self._labels[node_id][0],
+                'name': self._props[node_id].get('name'),
+                'paper_count': self._props[node_id].get('paper_count'),
+            }
+            for label in params['labels']
+            for node_id in self._by_label[label]
+        ]
+
+    @handles('analytics.write_communities')
+    def _write_communities(self, params: Dict) -> List[Dict]:
+        for row in params['rows']:
+            self._set(int(row['node']), {'community_id': row['community']})
+        return []
+
+    @handles('analytics.delete_stale_topics')
+    def _delete_stale_topics(self, params: Dict) -> List[Dict]:
+        ids = set(params['ids'])
+        for node_id in list(self._by_label['Topic']):
+            if self._props[node_id].get('id') not in ids:
+                self._delete_node(node_id)
+        return []
+
+    @handles('analytics.write_topics')
+    def _write_topics(self, params: Dict) -> List[Dict]:
+        now = _now()
+        for topic in params['topics']:
+            node_id = self._merge_node('Topic', 'id', topic['id'])
+            self._set(node_id, {**topic, 'computed_at': now})
+        return []
+
+    @handles('topics.list')
+    def _list_topics(self, params: Dict) -> List[Dict]:
+        topics = [dict(self._props[node_id]) for node_id in self._by_label['Topic']]
+        topics.sort(key=lambda topic: topic.get('paper_count') or 0, reverse=True)
+        return [{'topic': topic} for topic in topics[:params['limit']]]
+
+    # Trend rollups
+    def _rollup_paper(self, paper_id: int, dimensions: Dict[str, str]):
+        props = self._props[paper_id]
+        if not props.get('published_date'):
+            return
+        names = []
+        for rel_type, dimension in dimensions.items():
+            for other in self._targets(paper_id, rel_type):
+                rel = self._rel_props[(rel_type, paper_id, other)]
+                if rel.get('rolled_up') is None and self._props[other].get('name') is not None:
+                    self._touch_relationship((rel_type, paper_id, other))
+                    rel['rolled_up'] = True
+                    names.append((dimension, self._props[other]['name']))
+        if props.get('categories_rolled_up') is None:
+            self._set(paper_id, {'categories_rolled_up': True})
+            names.extend(('category', category) for category in props.get('categories') or [])
+
+        published = date.fromisoformat(props['published_date'][:10])
+        periods = (
+            ('week', (published - timedelta(days=published.weekday())).isoformat()),
+            ('month', published.replace(day=1).isoformat()),
+        )
+        for dimension, name in names:
+            for granularity, start in periods:
+                bucket_id = self._merge_node('TrendBucket', 'key', f"{dimension}|{name}|{granularity}|{start}", {
+                    'dimension': dimension,
+                    'name': name,
+                    'granularity': granularity,
+                    'start': start,
+                    'count': 0,
+                })
+                self._set(bucket_id, {'count': self._props[bucket_id]['count'] + 1})
+        self._dirty = True
+
+    @handles('trends.rollup_paper')
+    def _rollup_paper_trends(self, params: Dict) -> List[Dict]:
+        node_id = self._find('Paper', 'arxiv_id', params['arxiv_id'])
+        if node_id is not None:
+            self._rollup_paper(node_id, params['dimensions'])
+        return []
+
+    @handles('trends.rollup_all')
+    def _rollup_all_trends(self, params: Dict) -> List[Dict]:
+        for node_id in self._by_label['Paper']:
+            self._rollup_paper(node_id, params['dimensions'])
+        return []
+
+    @handles('trends.delete_buckets')
+    def _delete_trend_buckets(self, params: Dict) -> List[Dict]:
+        for node_id in list(self._by_label['TrendBucket']):
+            self._delete_node(node_id)
+        return []
+
+    @handles('trends.reset_links')
+    def _reset_rolled_up_links(self, params: Dict) -> List[Dict]:
+        for key, rel in self._rel_props.items():
+            if key[0] in ('INTRODUCES', 'PROPOSES', 'EVALUATES_ON') and 'rolled_up' in rel:
+                self._touch_relationship(key)
+                rel.pop('rolled_up')
+        self._dirty = True
+        return []
+
+    @handles('trends.reset_papers')
+    def _reset_rolled_up_papers(self, params: Dict) -> List[Dict]:
+        for node_id in self._by_label['Paper']:
+            if 'categories_rolled_up' in self._props[node_id]:
+                self._touch_node(node_id)
+                self._props[node_id].pop('categories_rolled_up')
+        self._dirty = True
+        return []
+
+    def _trend_buckets(self, params: Dict) -> Iterator[Dict]:
+        for node_id in self._by_label['TrendBucket']:
+            props = self._props[node_id]
+            if props['dimension'] == params['dimension'] and props['granularity'] == params['granularity']:
+                yield props
+
+    @handles('trends.latest')
+    def _latest_trend_period(self, params: Dict) -> List[Dict]:
+        return [{'start': max((props['start'] for props in self._trend_buckets(params)), default=None)}]
+
+    @handles('trends.buckets')
+    def _trend_bucket_counts(self, params: Dict) -> List[Dict]:
+        since, until = _date(params['since']), _date(params['until'])
+        return [
+            {'name': props['name'], 'start': props['start'], 'count': props['count']}
+            for props in self._trend_buckets(params)
+            if since <= props['start'] <= until
+        ]
+
+    # Pipeline routing
+    @handles('pipeline.paper_status')
+    def _pipeline_paper_status(self, params: Dict) -> List[Dict]:
+        rows = []
+        for arxiv_id in params['arxiv_ids']:
+            node_id = self._find('Paper', 'arxiv_id', arxiv_id)
+            if node_id is None:
+                continue
+            props = self._props[node_id]
+            rows.append({
+                'arxiv_id': arxiv_id,
+                'title': props.get('title'),
+                'abstract': props.get('abstract'),
+                'published_date': props.get('published_date'),
+                'has_authors': any('Author' in self._labels[other] for other in self._targets(node_id, 'AUTHORED_BY')),
+                'enriched': _coalesce(props.get('enriched'), False),
+            })
+        return rows
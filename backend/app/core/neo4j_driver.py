@@ -1,209 +1,456 @@
-from neo4j import GraphDatabase, ManagedTransaction
-from typing import Dict, List, Optional, Any
+from neo4j import GraphDatabase, ManagedTransaction, READ_ACCESS, ResultSummary, WRITE_ACCESS
+from neo4j.graph import Node, Relationship
+from neo4j.time import DateTime, Date, Time, Duration
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Any, Tuple
 import logging
+import threading
+import time
+import orjson
 from .config import settings
+from .graph_backend import BATCH_QUERY, GraphBackend, Statement
+from .memory_backend import InMemoryGraphBackend
+from .query_metrics import query_metrics, redact_parameters, UNNAMED_QUERY
+from .tracing import record_span, span
 
 logger = logging.getLogger(__name__)
 
-class Neo4jDriver:
+# ----------------------------------------------------------------------
+# Result conversion: Neo4j types -> JSON-friendly Python types.
+# Dispatch is by exact type, resolved once per type and cached.
+# ----------------------------------------------------------------------
+
+_PRIMITIVE_TYPES = frozenset({str, int, float, bool, type(None)})
+
+
+def _convert_entity(value):
+    return {k: convert_value(v) for k, v in value.items()}
+
+
+def _convert_temporal(value):
+    return value.to_native().isoformat()
+
+
+def _convert_duration(value):
+    return value.seconds
+
+
+def _convert_list(value):
+    if all(type(item) in _PRIMITIVE_TYPES for item in value):
+        return value
+    return [convert_value(item) for item in value]
+
+
+def _convert_dict(value):
+    return {k: convert_value(v) for k, v in value.items()}
+
+
+def _identity(value):
+    return value
+
+
+_CONVERTERS: Dict[type, Callable[[Any], Any]] = {
+    Node: _convert_entity,
+    Relationship: _convert_entity,
+    DateTime: _convert_temporal,
+    Date: _convert_temporal,
+    Time: _convert_temporal,
+    Duration: _convert_duration,
+    list: _convert_list,
+    dict: _convert_dict,
+}
+
+
+def _resolve_converter(value_type: type) -> Callable[[Any], Any]:
+    """Find the converter for a subclass (e.g. per-type Relationship classes) and cache it"""
+    for base in value_type.__mro__:
+        if base in _CONVERTERS:
+            converter = _CONVERTERS[base]
+            break
+    else:
+        converter = _identity
+    _CONVERTERS[value_type] = converter
+    return converter
+
+
+def convert_value(value):
+    """Convert a Neo4j value to Python types (temporal values as ISO strings)"""
+    value_type = type(value)
+    if value_type in _PRIMITIVE_TYPES:
+        return value
+    converter = _CONVERTERS.get(value_type) or _resolve_converter(value_type)
+    return converter(value)
+
+
+def convert_records(result) -> List[Dict]:
+    """Convert every record of a result into a dict"""
+    keys = result.keys()
+    return [dict(zip(keys, map(convert_value, record))) for record in result]
+
+
+def _orjson_default(value):
+    """orjson fallback for Neo4j types; everything else is serialized natively"""
+    if isinstance(value, (Node, Relationship)):
+        return dict(value)
+    if isinstance(value, (DateTime, Date, Time)):
+        return value.to_native()
+    if isinstance(value, Duration):
+        return value.seconds
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps_raw(value) -> bytes:
+    """Serialize raw Neo4j values straight to JSON bytes"""
+    return orjson.dumps(value, default=_orjson_default)
+
+class Neo4jDriver(GraphBackend):
     """Production-grade Neo4j driver with connection pooling."""
     
     def __init__(self):
         self.driver = None
+        self._profile_lock = threading.Lock()
+        self._profiled_at: Dict[str, float] = {}
+        self._sessions_lock = threading.Lock()
+        self._open_sessions = 0
         
     def connect(self):
-        """Initialize driver connection"""
+        """Initialize driver connection with the pool settings from NEO4J_*"""
         if not self.driver:
+            config = {
+                'max_connection_lifetime': settings.NEO4J_MAX_CONNECTION_LIFETIME,
+                'max_connection_pool_size': settings.NEO4J_MAX_CONNECTION_POOL_SIZE,
+                'connection_acquisition_timeout': settings.NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+                'keep_alive': settings.NEO4J_KEEP_ALIVE,
+                'max_transaction_retry_time': settings.NEO4J_MAX_TRANSACTION_RETRY_TIME,
+            }
+            if settings.NEO4J_LIVENESS_CHECK_TIMEOUT is not None:
+                config['liveness_check_timeout'] = settings.NEO4J_LIVENESS_CHECK_TIMEOUT
             self.driver = GraphDatabase.driver(
                 settings.NEO4J_URI,
                 auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
-                max_connection_lifetime=3600,
-                max_connection_pool_size=50,
-                connection_acquisition_timeout=60,
+                **config
+            )
+            query_metrics.register_collector(self._pool_metrics)
+            logger.info(
+                f"Connected to Neo4j at {settings.NEO4J_URI} "
+                f"(database={settings.NEO4J_DATABASE or 'default'}, "
+                f"pool={settings.NEO4J_MAX_CONNECTION_POOL_SIZE}, fetch_size={settings.NEO4J_FETCH_SIZE})"
             )
-            logger.info(f"Connected to Neo4j at {settings.NEO4J_URI}")
     
     def close(self):
         """Close driver connection"""
         if self.driver:
+            query_metrics.unregister_collector(self._pool_metrics)
             self.driver.close()
+            self.driver = None
             logger.info("Neo4j connection closed")
     
     def verify_connectivity(self) -> bool:
         """Test connection"""
         try:
-            with self.driver.session() as session:
+            with self._session(READ_ACCESS) as session:
                 result = session.run("RETURN 1 as test")
                 return result.single()["test"] == 1
         except Exception as e:
             logger.error(f"Connection failed: {e}")
             return False
     
-    def execute_read(self, query: str, parameters: Dict = None) -> List[Dict]:
+    @contextmanager
+    def _session(self, access_mode: str = WRITE_ACCESS, **config):
+        """
+        Session on the configured database. `access_mode` picks the cluster
+        member for auto-commit queries under a neo4j:// URI; transaction
+        functions route by execute_read/execute_write.
+        """
+        config = {
+            'database': settings.NEO4J_DATABASE or None,
+            'fetch_size': settings.NEO4J_FETCH_SIZE,
+            'default_access_mode': access_mode,
+            **config,
+        }
+        with self._sessions_lock:
+            self._open_sessions += 1
+        try:
+            with self.driver.session(**config) as session:
+                yield session
+        finally:
+            with self._sessions_lock:
+                self._open_sessions -= 1
+    
+    @staticmethod
+    def _read_function(session):
+        """Read transactions go to followers unless NEO4J_READ_FROM_FOLLOWERS is off"""
+        return session.execute_read if settings.NEO4J_READ_FROM_FOLLOWERS else session.execute_write
+    
+    @staticmethod
+    def _read_access() -> str:
+        return READ_ACCESS if settings.NEO4J_READ_FROM_FOLLOWERS else WRITE_ACCESS
+    
+    def execute_read(self, query: str, parameters: Dict = None, name: Optional[str] = None) -> List[Dict]:
         """Execute read query"""
-        with self.driver.session() as session:
-            result = session.execute_read(
-                self._run_query, query, parameters or {}
+        with self._session(self._read_access()) as session:
+            return self._execute(
+                'read', name, query, parameters, self._read_function(session), self._run_query
             )
-            return result
     
-    def execute_write(self, query: str, parameters: Dict = None) -> List[Dict]:
+    def execute_write(self, query: str, parameters: Dict = None, name: Optional[str] = None) -> List[Dict]:
         """Execute write query"""
-        with self.driver.session() as session:
-            result = session.execute_write(
-                self._run_query, query, parameters or {}
+        with self._session() as session:
+            return self._execute(
+                'write', name, query, parameters, session.execute_write, self._run_query
             )
-            return result
+    
+    def execute_auto_commit(self, query: str, parameters: Dict = None, name: Optional[str] = None) -> List[Dict]:
+        """
+        Execute query in an auto-commit transaction.
+        Required for CALL { } IN TRANSACTIONS batching, which cannot run
+        inside a managed transaction.
+        """
+        with self._session() as session:
+            return self._execute(
+                'auto_commit', name, query, parameters,
+                lambda work, *args: work(session, *args), self._run_query
+            )
+    
+    def execute_read_raw(self, query: str, parameters: Dict = None, name: Optional[str] = None) -> List[Dict]:
+        """
+        Execute read query without converting Neo4j types.
+        Records are meant to be serialized directly with dumps_raw().
+        """
+        with self._session(self._read_access()) as session:
+            return self._execute(
+                'read', name, query, parameters, self._read_function(session), self._run_query_raw
+            )
+    
+    def execute_write_batch(self, statements: List[Statement], name: Optional[str] = None) -> List[List[Dict]]:
+        """
+        Execute write statements in one managed transaction. The driver
+        retries the whole transaction on transient errors (deadlocks,
+        leader switches) for up to NEO4J_MAX_TRANSACTION_RETRY_TIME.
+        Recorded as one query named `name` in mode "batch".
+        """
+        name = name or BATCH_QUERY
+        with span('db.query', **{'db.system': 'neo4j', 'db.query.name': name, 'db.mode': 'batch', 'db.statements': len(statements)}) as current:
+            start = time.perf_counter()
+            try:
+                with self._session() as session:
+                    results = session.execute_write(self._run_batch, statements)
+            except Exception:
+                query_metrics.observe_error(name, 'batch')
+                raise
+            rows = sum(len(records) for records in results)
+            self._observe(
+                'batch', name, None, {'statements': [statement_name for _, _, statement_name in statements]},
+                time.perf_counter() - start, rows, None
+            )
+            if current is not None:
+                current.set(**{'db.rows': rows})
+            return results
+    
+    def stream_read(
+        self,
+        query: str,
+        parameters: Dict = None,
+        fetch_size: int = 1000,
+        name: Optional[str] = None
+    ) -> Iterator[Dict]:
+        """
+        Stream raw records from a result cursor, fetching `fetch_size`
+        records per round trip so memory stays constant. The session is
+        closed when the generator is exhausted or closed. The recorded
+        duration includes the time the consumer spends between records.
+        """
+        start = time.perf_counter()
+        start_ns = time.time_ns()
+        rows = 0
+        summary = None
+        failed = False
+        error = None
+        try:
+            with self._session(self._read_access(), fetch_size=fetch_size) as session:
+                result = session.run(query, parameters or {})
+                keys = result.keys()
+                for record in result:
+                    rows += 1
+                    yield dict(zip(keys, record))
+                summary = result.consume()
+        except Exception as e:
+            failed = True
+            error = f"{type(e).__name__}: {e}"
+            query_metrics.observe_error(name, 'stream')
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            # The generator is resumed from the consumer's context, so the
+            # span is recorded afterwards rather than entered
+            record_span(
+                'db.query', start_ns, int(duration * 1e9), error,
+                **{'db.system': 'neo4j', 'db.query.name': name or UNNAMED_QUERY, 'db.mode': 'stream', 'db.rows': rows}
+            )
+            if not failed:
+                self._observe('stream', name, query, parameters, duration, rows, summary)
     
     @staticmethod
-    def _run_query(tx: ManagedTransaction, query: str, parameters: Dict) -> List[Dict]:
+    def _run_query(tx: ManagedTransaction, query: str, parameters: Dict) -> Tuple[List[Dict], ResultSummary]:
         """Run query in transaction and convert Neo4j types to Python types"""
         result = tx.run(query, parameters)
+        return convert_records(result), result.consume()
+    
+    @staticmethod
+    def _run_query_raw(tx: ManagedTransaction, query: str, parameters: Dict) -> Tuple[List[Dict], ResultSummary]:
+        """Run query in transaction and return records with raw Neo4j values"""
+        result = tx.run(query, parameters)
+        keys = result.keys()
+        return [dict(zip(keys, record)) for record in result], result.consume()
+    
+    @staticmethod
+    def _run_batch(tx: ManagedTransaction, statements: List[Statement]) -> List[List[Dict]]:
+        """Run statements in order in one transaction"""
+        return [convert_records(tx.run(query, parameters)) for query, parameters, _ in statements]
+    
+    # Instrumentation
+    def _execute(self, mode: str, name: Optional[str], query: str, parameters: Optional[Dict], runner, work) -> List[Dict]:
+        """Run `work` through `runner` (a session transaction function) and record metrics and a span"""
+        with span('db.query', **{'db.system': 'neo4j', 'db.query.name': name or UNNAMED_QUERY, 'db.mode': mode}) as current:
+            start = time.perf_counter()
+            try:
+                records, summary = runner(work, query, parameters or {})
+            except Exception:
+                query_metrics.observe_error(name, mode)
+                raise
+            self._observe(mode, name, query, parameters, time.perf_counter() - start, len(records), summary)
+            if current is not None:
+                current.set(**{'db.rows': len(records)})
+            return records
+    
+    def _observe(
+        self,
+        mode: str,
+        name: Optional[str],
+        query: Optional[str],
+        parameters: Optional[Dict],
+        duration: float,
+        rows: int,
+        summary: Optional[ResultSummary]
+    ):
+        available = summary.result_available_after if summary else None
+        consumed = summary.result_consumed_after if summary else None
+        query_metrics.observe(name, mode, duration, rows, available, consumed)
         
-        def convert_value(value):
-            """Recursively convert Neo4j types to Python types"""
-            from neo4j.graph import Node, Relationship
-            from neo4j.time import DateTime, Date, Time, Duration
-            from datetime import datetime, date, time, timedelta
-            
-            if isinstance(value, Node):
-                # Convert Node properties recursively
-                return {k: convert_value(v) for k, v in dict(value).items()}
-            elif isinstance(value, Relationship):
-                # Convert Relationship properties recursively
-                return {k: convert_value(v) for k, v in dict(value).items()}
-            elif isinstance(value, DateTime):
-                # Convert Neo4j DateTime to Python datetime
-                return datetime(
-                    value.year, value.month, value.day,
-                    value.hour, value.minute, value.second,
-                    value.nanosecond // 1000
-                ).isoformat()
-            elif isinstance(value, Date):
-                # Convert Neo4j Date to Python date
-                return date(value.year, value.month, value.day).isoformat()
-            elif isinstance(value, Time):
-                # Convert Neo4j Time to Python time
-                return time(value.hour, value.minute, value.second, value.nanosecond // 1000).isoformat()
-            elif isinstance(value, Duration):
-                # Convert Neo4j Duration to total seconds
-                return value.seconds
-            elif isinstance(value, list):
-                return [convert_value(item) for item in value]
-            elif isinstance(value, dict):
-                return {k: convert_value(v) for k, v in value.items()}
-            else:
-                return value
-        
-        return [
-            {key: convert_value(value) for key, value in record.items()}
-            for record in result
-        ]
-
+        threshold = settings.SLOW_QUERY_THRESHOLD_MS
+        if threshold > 0 and duration * 1000 >= threshold:
+            query_metrics.observe_slow(name, mode, duration, rows, parameters, available, consumed)
+            # Batches have no single statement to profile
+            if settings.QUERY_PROFILE_CAPTURE and query is not None:
+                self._capture_profile(mode, name, query, parameters)
     
-    # Paper operations
-    def create_paper(self, paper_data: Dict) -> str:
-        """Create or update paper"""
-        query = """
-        MERGE (p:Paper {arxiv_id: $arxiv_id})
-        ON CREATE SET
-            p.title = $title,
-            p.abstract = $abstract,
-            p.published_date = date($published_date),
-            p.categories = $categories,
-            p.pdf_url = $pdf_url,
-            p.citation_count = COALESCE($citation_count, 0),
-            p.created_at = datetime(),
-            p.updated_at = datetime()
-        ON MATCH SET
-            p.updated_at = datetime(),
-            p.citation_count = COALESCE($citation_count, p.citation_count)
-        RETURN p.arxiv_id as arxiv_id
+    def _capture_profile(self, mode: str, name: Optional[str], query: str, parameters: Optional[Dict]):
+        """Dump a plan for a slow query, at most once per query per QUERY_PROFILE_INTERVAL_SECONDS"""
+        key = name or query
+        now = time.monotonic()
+        with self._profile_lock:
+            last = self._profiled_at.get(key)
+            if last is not None and now - last < settings.QUERY_PROFILE_INTERVAL_SECONDS:
+                return
+            self._profiled_at[key] = now
+        threading.Thread(
+            target=self._dump_profile,
+            args=(mode, name, query, dict(parameters or {})),
+            daemon=True
+        ).start()
+    
+    def _dump_profile(self, mode: str, name: Optional[str], query: str, parameters: Dict):
         """
-        result = self.execute_write(query, paper_data)
-        return result[0]['arxiv_id'] if result else None
-    
-    def get_paper(self, arxiv_id: str) -> Optional[Dict]:
-        """Get paper by arXiv ID with authors, concepts, and methods"""
-        query = """
-        MATCH (p:Paper)
-        WHERE p.arxiv_id = $arxiv_id 
-           OR (p.arxiv_base_id IS NOT NULL AND p.arxiv_base_id = $arxiv_id)
-        OPTIONAL MATCH (p)-[:AUTHORED_BY]->(a:Author)
-        OPTIONAL MATCH (p)-[:INTRODUCES]->(c:Concept)
-        OPTIONAL MATCH (p)-[:PROPOSES]->(m:Method)
-        WITH p, 
-             collect(DISTINCT a.name) as authors,
-             collect(DISTINCT c.name) as graph_concepts,
-             collect(DISTINCT m.name) as graph_methods
-        RETURN p {
-            .*, 
-            authors: CASE WHEN size(authors) > 0 THEN authors ELSE [] END,
-            graph_concepts: graph_concepts,
-            graph_methods: graph_methods
-        } as paper
-        LIMIT 1
+        Re-run read queries under PROFILE in a read transaction. Writes are
+        only EXPLAINed so they never execute twice.
         """
-        result = self.execute_read(query, {'arxiv_id': arxiv_id})
-        return result[0]['paper'] if result else None
-    
-    def list_papers(self, limit: int = 100, offset: int = 0) -> List[Dict]:
-        """List papers with pagination, authors, concepts, and methods"""
-        query = """
-        MATCH (p:Paper)
-        OPTIONAL MATCH (p)-[:AUTHORED_BY]->(a:Author)
-        OPTIONAL MATCH (p)-[:INTRODUCES]->(c:Concept)
-        OPTIONAL MATCH (p)-[:PROPOSES]->(m:Method)
-        WITH p, 
-             collect(DISTINCT a.name) as authors,
-             collect(DISTINCT c.name) as graph_concepts,
-             collect(DISTINCT m.name) as graph_methods
-        RETURN p {
-            .*, 
-            authors: CASE WHEN size(authors) > 0 THEN authors ELSE [] END,
-            graph_concepts: graph_concepts,
-            graph_methods: graph_methods
-        } as paper
-        ORDER BY p.published_date DESC
-        SKIP $offset
-        LIMIT $limit
+        command = 'PROFILE' if mode in ('read', 'stream') else 'EXPLAIN'
+        try:
+            with self._session(self._read_access()) as session:
+                if command == 'PROFILE':
+                    plan = self._read_function(session)(
+                        lambda tx: tx.run(f"PROFILE {query}", parameters).consume()
+                    ).profile
+                else:
+                    plan = session.run(f"EXPLAIN {query}", parameters).consume().plan
+            
+            captured_at = datetime.now(timezone.utc)
+            profile_dir = Path(settings.QUERY_PROFILE_DIR)
+            profile_dir.mkdir(parents=True, exist_ok=True)
+            path = profile_dir / f"{name or UNNAMED_QUERY}-{captured_at:%Y%m%dT%H%M%S}.json"
+            path.write_bytes(orjson.dumps({
+                'name': name,
+                'mode': mode,
+                'command': command,
+                'captured_at': captured_at.isoformat(),
+                'query': query,
+                'parameters': redact_parameters(parameters),
+                'plan': plan,
+            }, default=str, option=orjson.OPT_INDENT_2))
+            logger.info(f"Captured {command} plan for {name or UNNAMED_QUERY}: {path}")
+        except Exception as e:
+            logger.warning(f"Plan capture failed for {name or UNNAMED_QUERY}: {e}")
+
+
+    # Pool utilization
+    def pool_stats(self) -> Dict[str, Any]:
         """
-        result = self.execute_read(query, {'limit': limit, 'offset': offset})
-        return [r['paper'] for r in result]
-    
-    def search_papers(self, search_term: str, limit: int = 20) -> List[Dict]:
-        """Full-text search papers with authors, concepts, and methods"""
-        query = """
-        CALL db.index.fulltext.queryNodes(
-            'paper_fulltext', 
-            $search_term
-        ) YIELD node, score
-        WITH node as p, score
-        OPTIONAL MATCH (p)-[:AUTHORED_BY]->(a:Author)
-        OPTIONAL MATCH (p)-[:INTRODUCES]->(c:Concept)
-        OPTIONAL MATCH (p)-[:PROPOSES]->(m:Method)
-        WITH p, score,
-             collect(DISTINCT a.name) as authors,
-             collect(DISTINCT c.name) as graph_concepts,
-             collect(DISTINCT m.name) as graph_methods
-        RETURN p {
-            .*, 
-            authors: CASE WHEN size(authors) > 0 THEN authors ELSE [] END,
-            graph_concepts: graph_concepts,
-            graph_methods: graph_methods
-        } as paper, score
-        ORDER BY score DESC
-        LIMIT $limit
+        Connections in use and idle per server address, and sessions waiting
+        for a connection (open sessions beyond the connections in use, i.e.
+        blocked in acquisition while the pool is exhausted). The driver has
+        no public pool API, so this reads its pool under the pool lock.
         """
-        result = self.execute_read(query, {
-            'search_term': search_term,
-            'limit': limit
-        })
-        return [{'paper': r['paper'], 'score': r['score']} for r in result]
+        addresses = {}
+        pool = getattr(self.driver, '_pool', None)
+        if pool is not None:
+            with pool.lock:
+                for address, connections in pool.connections.items():
+                    in_use = sum(1 for connection in connections if connection.in_use)
+                    addresses[str(address)] = {'in_use': in_use, 'idle': len(connections) - in_use}
+        with self._sessions_lock:
+            open_sessions = self._open_sessions
+        in_use = sum(counts['in_use'] for counts in addresses.values())
+        return {
+            'max_size': settings.NEO4J_MAX_CONNECTION_POOL_SIZE,
+            'addresses': addresses,
+            'open_sessions': open_sessions,
+            'waiters': max(0, open_sessions - in_use),
+        }
+    
+    def _pool_metrics(self) -> List[str]:
+        stats = self.pool_stats()
+        lines = [
+            "# HELP graph_pool_connections Connections in the Neo4j driver pool",
+            "# TYPE graph_pool_connections gauge",
+        ]
+        for address, counts in sorted(stats['addresses'].items()):
+            for state in ('in_use', 'idle'):
+                lines.append(f'graph_pool_connections{{address="{address}",state="{state}"}} {counts[state]}')
+        lines += [
+            "# HELP graph_pool_max_connections Configured pool size per address (NEO4J_MAX_CONNECTION_POOL_SIZE)",
+            "# TYPE graph_pool_max_connections gauge",
+            f"graph_pool_max_connections {stats['max_size']}",
+            "# HELP graph_pool_waiters Sessions waiting for a pooled connection",
+            "# TYPE graph_pool_waiters gauge",
+            f"graph_pool_waiters {stats['waiters']}",
+        ]
+        return lines
+
+
+def create_graph_backend(backend: str = None) -> GraphBackend:
+    """Build the storage backend selected by GRAPH_BACKEND"""
+    backend = backend or settings.GRAPH_BACKEND
+    if backend == "memory":
+        return InMemoryGraphBackend(path=settings.MEMORY_GRAPH_PATH or None)
+    if backend == "neo4j":
+        return Neo4jDriver()
+    raise ValueError(f"Unknown GRAPH_BACKEND: {backend!r} (expected 'neo4j' or 'memory')")
 
 # Singleton instance
-neo4j_driver = Neo4jDriver()
+neo4j_driver = create_graph_backend()
 
-def get_neo4j_driver() -> Neo4jDriver:
+def get_neo4j_driver() -> GraphBackend:
     """Get driver instance"""
     return neo4j_driver
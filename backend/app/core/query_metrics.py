@@ -0,0 +1,196 @@
+from bisect import bisect_left
+from collections import defaultdict
+from threading import Lock
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("app.slow_query")
+
+# Histogram bucket upper bounds
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROW_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, 10000)
+
+# Label for queries issued without a name
+UNNAMED_QUERY = "unnamed"
+
+# List items kept (redacted) per list parameter in the slow-query log
+REDACTED_PREVIEW_ITEMS = 3
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense"""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, metric: str, labels: str) -> Iterator[str]:
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{metric}_bucket{{{labels},le="+Inf"}} {self.count}'
+        yield f'{metric}_sum{{{labels}}} {self.sum}'
+        yield f'{metric}_count{{{labels}}} {self.count}'
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def redact_parameters(parameters: Optional[Dict]) -> Dict:
+    """Keep parameter names and shapes, drop the values"""
+    def redact(value):
+        if value is None or isinstance(value, bool):
+            return value
+        if isinstance(value, (int, float)):
+            return f"<{type(value).__name__}>"
+        if isinstance(value, str):
+            return f"<str len={len(value)}>"
+        if isinstance(value, dict):
+            return {key: redact(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            preview = [redact(item) for item in value[:REDACTED_PREVIEW_ITEMS]]
+            return {"len": len(value), "items": preview}
+        return f"<{type(value).__name__}>"
+
+    return {key: redact(value) for key, value in (parameters or {}).items()}
+
+
+class QueryMetrics:
+    """Per-query-name latency, row and error statistics, rendered for Prometheus."""
+
+    METRICS = (
+        # (attribute, metric name, help)
+        ("_duration", "graph_query_duration_seconds", "Client-side query time, including retries"),
+        ("_available", "graph_query_result_available_seconds", "Server time until the first record was available"),
+        ("_consumed", "graph_query_result_consumed_seconds", "Server time until the last record was consumed"),
+        ("_rows", "graph_query_rows", "Records returned per query"),
+    )
+
+    def __init__(self):
+        self._lock = Lock()
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+        self.reset()
+    
+    def register_collector(self, collector: Callable[[], Iterable[str]]):
+        """Add a callable yielding extra exposition lines (e.g. gauges), rendered on every scrape"""
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+    
+    def unregister_collector(self, collector: Callable[[], Iterable[str]]):
+        with self._lock:
+            if collector in self._collectors:
+                self._collectors.remove(collector)
+
+    def reset(self):
+        with self._lock:
+            self._duration: Dict[Tuple[str, str], Histogram] = {}
+            self._available: Dict[Tuple[str, str], Histogram] = {}
+            self._consumed: Dict[Tuple[str, str], Histogram] = {}
+            self._rows: Dict[Tuple[str, str], Histogram] = {}
+            self._errors: Dict[Tuple[str, str], int] = defaultdict(int)
+            self._slow: Dict[Tuple[str, str], int] = defaultdict(int)
+
+    @staticmethod
+    def _histogram(series: Dict, key: Tuple[str, str], buckets: Tuple[float, ...]) -> Histogram:
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = Histogram(buckets)
+        return histogram
+
+    def observe(
+        self,
+        name: Optional[str],
+        mode: str,
+        duration: float,
+        rows: int,
+        available_after_ms: Optional[int] = None,
+        consumed_after_ms: Optional[int] = None
+    ):
+        """Record one successful query"""
+        key = (name or UNNAMED_QUERY, mode)
+        with self._lock:
+            self._histogram(self._duration, key, DURATION_BUCKETS).observe(duration)
+            self._histogram(self._rows, key, ROW_BUCKETS).observe(rows)
+            if available_after_ms is not None:
+                self._histogram(self._available, key, DURATION_BUCKETS).observe(available_after_ms / 1000)
+            if consumed_after_ms is not None:
+                self._histogram(self._consumed, key, DURATION_BUCKETS).observe(consumed_after_ms / 1000)
+
+    def observe_error(self, name: Optional[str], mode: str):
+        with self._lock:
+            self._errors[(name or UNNAMED_QUERY, mode)] += 1
+
+    def observe_slow(
+        self,
+        name: Optional[str],
+        mode: str,
+        duration: float,
+        rows: int,
+        parameters: Optional[Dict] = None,
+        available_after_ms: Optional[int] = None,
+        consumed_after_ms: Optional[int] = None
+    ):
+        """Count a query over the slow threshold and log it with redacted parameters"""
+        with self._lock:
+            self._slow[(name or UNNAMED_QUERY, mode)] += 1
+        slow_query_logger.warning(
+            f"Slow query {name or UNNAMED_QUERY} ({mode}): {duration * 1000:.1f} ms, {rows} rows, "
+            f"available after {available_after_ms} ms, consumed after {consumed_after_ms} ms, "
+            f"params={redact_parameters(parameters)}"
+        )
+
+    def summary(self) -> Dict[str, Dict]:
+        """Count and mean duration per query name, slowest first"""
+        with self._lock:
+            rows = {
+                f"{name}:{mode}": {
+                    "count": histogram.count,
+                    "mean_ms": round(histogram.sum / histogram.count * 1000, 3) if histogram.count else 0,
+                    "errors": self._errors.get((name, mode), 0),
+                    "slow": self._slow.get((name, mode), 0),
+                }
+                for (name, mode), histogram in self._duration.items()
+            }
+        return dict(sorted(rows.items(), key=lambda item: item[1]["mean_ms"] * item[1]["count"], reverse=True))
+
+    def render_prometheus(self) -> str:
+        """All series in the Prometheus text exposition format"""
+        lines: List[str] = []
+        with self._lock:
+            for attribute, metric, help_text in self.METRICS:
+                series = getattr(self, attribute)
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} histogram")
+                for (name, mode), histogram in sorted(series.items()):
+                    lines.extend(histogram.render(metric, f'query="{_escape(name)}",mode="{mode}"'))
+
+            for series, metric, help_text in (
+                (self._errors, "graph_query_errors_total", "Queries that raised"),
+                (self._slow, "graph_slow_queries_total", "Queries over SLOW_QUERY_THRESHOLD_MS"),
+            ):
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} counter")
+                for (name, mode), count in sorted(series.items()):
+                    lines.append(f'{metric}{{query="{_escape(name)}",mode="{mode}"}} {count}')
+            collectors = list(self._collectors)
+        
+        for collector in collectors:
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                logger.warning(f"Metrics collector {collector!r} failed: {e}")
+        return "\n".join(lines) + "\n"
+
+
+query_metrics = QueryMetrics()
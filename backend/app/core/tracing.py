@@ -0,0 +1,255 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterator, List, Optional
+import logging
+import os
+import time
+import orjson
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # opentelemetry is optional
+    otel_trace = None
+
+# Span attribute values exported as-is; anything else is stringified
+_ATTRIBUTE_TYPES = (str, bool, int, float)
+
+
+class Trace:
+    """Spans of one unit of work (an HTTP request, a paper enrichment), in finish order"""
+
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self):
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List["Span"] = []
+
+
+class Span:
+    __slots__ = ("name", "trace", "span_id", "parent_id", "attributes", "start_ns", "duration_ns", "error", "_start")
+
+    def __init__(self, name: str, trace: Trace, parent_id: Optional[str], attributes: Dict):
+        self.name = name
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.duration_ns: Optional[int] = None
+        self.error: Optional[str] = None
+        self._start = time.perf_counter_ns()
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def elapsed_ns(self) -> int:
+        if self.duration_ns is not None:
+            return self.duration_ns
+        return time.perf_counter_ns() - self._start
+
+    def finish(self):
+        self.duration_ns = time.perf_counter_ns() - self._start
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": datetime.fromtimestamp(self.start_ns / 1e9, timezone.utc).isoformat(),
+            "duration_ms": round(self.elapsed_ns() / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+class JsonFileExporter:
+    """Append one JSON line per finished trace"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = Lock()
+
+    def export(self, trace: Trace, root: Span):
+        line = orjson.dumps({
+            "trace_id": trace.trace_id,
+            "name": root.name,
+            "duration_ms": round(root.elapsed_ns() / 1e6, 3),
+            "spans": [span.to_dict() for span in trace.spans],
+        }, default=str)
+        with self._lock:
+            with self.path.open("ab") as f:
+                f.write(line + b"\n")
+
+
+class OpenTelemetryExporter:
+    """
+    Replay finished traces into OpenTelemetry with their original timings.
+    Spans go to whatever TracerProvider the process configured (e.g. the
+    OTLP exporter set up by opentelemetry-instrument).
+    """
+
+    def __init__(self):
+        self.tracer = otel_trace.get_tracer("researchgraph")
+
+    def export(self, trace: Trace, root: Span):
+        started = {}
+        for span in sorted(trace.spans, key=lambda span: span.start_ns):
+            parent = started.get(span.parent_id)
+            otel_span = self.tracer.start_span(
+                span.name,
+                context=otel_trace.set_span_in_context(parent) if parent is not None else None,
+                start_time=span.start_ns,
+                attributes={
+                    key: value if isinstance(value, _ATTRIBUTE_TYPES) else str(value)
+                    for key, value in span.attributes.items() if value is not None
+                },
+            )
+            if span.error:
+                otel_span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR, span.error))
+            started[span.span_id] = otel_span
+        for span in trace.spans:
+            started[span.span_id].end(end_time=span.start_ns + span.elapsed_ns())
+
+
+class Tracer:
+    """Creates spans in the current context and hands finished traces to the exporters"""
+
+    def __init__(self, enabled: bool = True, exporters: Optional[List] = None):
+        self.enabled = enabled
+        self.exporters = exporters or []
+
+    def export(self, trace: Trace, root: Span):
+        for exporter in self.exporters:
+            try:
+                exporter.export(trace, root)
+            except Exception as e:
+                logger.warning(f"Trace export failed ({type(exporter).__name__}): {e}")
+
+
+def create_exporters(names: str) -> List:
+    """Exporters for a comma-separated TRACE_EXPORTERS value ("json", "otel")"""
+    exporters = []
+    for name in filter(None, (part.strip() for part in names.split(","))):
+        if name == "json":
+            exporters.append(JsonFileExporter(settings.TRACE_FILE))
+        elif name == "otel":
+            if otel_trace is None:
+                logger.warning("TRACE_EXPORTERS includes otel but opentelemetry-api is not installed")
+            else:
+                exporters.append(OpenTelemetryExporter())
+        else:
+            raise ValueError(f"Unknown trace exporter: {name!r} (expected 'json' or 'otel')")
+    return exporters
+
+
+tracer = Tracer(settings.TRACING_ENABLED, create_exporters(settings.TRACE_EXPORTERS))
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Optional[Span]]:
+    """
+    Time a block as a child of the current span. Without a current span
+    the block starts a new trace, which is exported when it finishes.
+    Yields None when tracing is disabled.
+    """
+    if not tracer.enabled:
+        yield None
+        return
+    parent = _current_span.get()
+    trace = parent.trace if parent is not None else Trace()
+    current = Span(name, trace, parent.span_id if parent is not None else None, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.finish()
+        _current_span.reset(token)
+        trace.spans.append(current)
+        if parent is None:
+            tracer.export(trace, current)
+
+
+def record_span(name: str, start_ns: int, duration_ns: int, error: Optional[str] = None, **attributes):
+    """
+    Add an already-timed span under the current span, without entering it.
+    For work that spans yields of a generator, where a context manager
+    cannot reset the context variable it set.
+    """
+    parent = _current_span.get()
+    if not tracer.enabled or parent is None:
+        return
+    finished = Span(name, parent.trace, parent.span_id, attributes)
+    finished.start_ns = start_ns
+    finished.duration_ns = duration_ns
+    finished.error = error
+    parent.trace.spans.append(finished)
+
+
+def server_timing(root: Span) -> str:
+    """Server-Timing header value: total time per span name finished so far under `root`"""
+    totals: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0])
+    for finished in root.trace.spans:
+        totals[finished.name][0] += finished.elapsed_ns() / 1e6
+        totals[finished.name][1] += 1
+    entries = [
+        f'{name};dur={duration:.3f};desc="{count}x"'
+        for name, (duration, count) in sorted(totals.items(), key=lambda item: -item[1][0])
+    ]
+    entries.append(f"total;dur={root.elapsed_ns() / 1e6:.3f}")
+    return ", ".join(entries)
+
+
+class TracingMiddleware:
+    """
+    Root span per HTTP request, named after the matched route. With
+    `debug_header`, responses carry X-Trace-Id and a Server-Timing header
+    breaking the request down by span name (spans finished before the
+    response started; streamed bodies are only in the exported trace).
+    """
+
+    def __init__(self, app: ASGIApp, debug_header: bool = True):
+        self.app = app
+        self.debug_header = debug_header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        with span(f"{scope['method']} {scope['path']}", **{
+            "http.method": scope["method"],
+            "http.target": scope["path"],
+        }) as root:
+            async def send_with_timing(message: Message):
+                if message["type"] == "http.response.start":
+                    route = scope.get("route")
+                    if route is not None:
+                        root.name = f"{scope['method']} {route.path}"
+                        root.set(**{"http.route": route.path})
+                    root.set(**{"http.status_code": message["status"]})
+                    if self.debug_header:
+                        headers = MutableHeaders(scope=message)
+                        headers.append("X-Trace-Id", root.trace.trace_id)
+                        headers.append("Server-Timing", server_timing(root))
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
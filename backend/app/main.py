@@ -1,11 +1,15 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 import logging
 
 from app.core.config import settings
+from app.core.compression import CompressionMiddleware
 from app.core.neo4j_driver import get_neo4j_driver
-from app.api import papers, assistant
+from app.core.tracing import TracingMiddleware
+from app.services.assistant_service import assistant_configured
+from app.api import papers, authors, topics, trends, jobs, assistant, export, metrics
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,6 +24,9 @@ async def lifespan(app: FastAPI):
         logger.info("✓ Neo4j connected successfully")
     else:
         logger.error("✗ Neo4j connection failed")
+    # The OpenAI client is built on the first assistant request
+    if not assistant_configured():
+        logger.warning("✗ OPENAI_API_KEY not set, AI assistant disabled")
     
     yield
     
@@ -30,7 +37,17 @@ async def lifespan(app: FastAPI):
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.VERSION,
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
+
+# Compression middleware (gzip, or brotli when available)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.GZIP_COMPRESSION_LEVEL,
+    brotli=settings.BROTLI_ENABLED,
+    brotli_quality=settings.BROTLI_QUALITY
 )
 
 # CORS middleware
@@ -47,9 +64,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Tracing middleware (outermost, so the root span covers the whole request)
+app.add_middleware(TracingMiddleware, debug_header=settings.TRACE_DEBUG_HEADER)
+
 # Include routers
 app.include_router(papers.router, prefix=settings.API_PREFIX)
+app.include_router(authors.router, prefix=settings.API_PREFIX)
+app.include_router(topics.router, prefix=settings.API_PREFIX)
+app.include_router(trends.router, prefix=settings.API_PREFIX)
+app.include_router(jobs.router, prefix=settings.API_PREFIX)
 app.include_router(assistant.router, prefix=settings.API_PREFIX)
+app.include_router(export.router, prefix=settings.API_PREFIX)
+app.include_router(metrics.router)
 
 @app.get("/")
 async def root():
@@ -0,0 +1,14 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class IngestJobRequest(BaseModel):
+    arxiv: bool = True
+    huggingface_daily: bool = True
+    categories: Optional[List[str]] = Field(None, description="arXiv categories (default: AI/ML categories)")
+    max_results: int = Field(100, ge=1, le=2000, description="Max papers per arXiv category")
+    days_back: int = Field(7, ge=1, le=365)
+
+
+class EnrichJobRequest(BaseModel):
+    limit: int = Field(1000, ge=1, le=100000, description="Max papers taken from each stage's backlog")
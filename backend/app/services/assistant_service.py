@@ -1,25 +1,51 @@
 from typing import List, Dict, Any, Optional
-from openai import OpenAI
 from app.core.config import settings
 from app.core.neo4j_driver import get_neo4j_driver
+from app.core.tracing import record_span, span
 import json
 import logging
-
-from dotenv import load_dotenv
-load_dotenv()
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+# Values shipped in example configs that mean "no key"
+PLACEHOLDER_API_KEYS = ("your-api-key-here", "sk-your-api-key-here")
+
+
+class AssistantNotConfigured(ValueError):
+    """The assistant is disabled because no OpenAI API key is set"""
+
+
+def assistant_configured() -> bool:
+    return bool(settings.OPENAI_API_KEY) and settings.OPENAI_API_KEY not in PLACEHOLDER_API_KEYS
+
+
 class AssistantService:
     def __init__(self):
-        if not settings.OPENAI_API_KEY or settings.OPENAI_API_KEY == "your-api-key-here":
-            raise ValueError(
-                "OpenAI API key not configured. Please set OPENAI_API_KEY in your .env file. "
-                "Get your API key from: https://platform.openai.com/api-keys"
-            )
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
         self.neo4j_driver = get_neo4j_driver()  # Use singleton instance
         self.model = settings.OPENAI_MODEL
+        self._client = None
+        self._client_lock = threading.Lock()
+    
+    @property
+    def client(self):
+        """
+        OpenAI client, built on first use: importing the SDK and creating
+        its HTTP client stay off the startup path, and a missing key only
+        disables the assistant instead of the whole API.
+        """
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    if not assistant_configured():
+                        raise AssistantNotConfigured(
+                            "OpenAI API key not configured. Please set OPENAI_API_KEY in your .env file. "
+                            "Get your API key from: https://platform.openai.com/api-keys"
+                        )
+                    from openai import OpenAI
+                    self._client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        return self._client
     
     def _extract_search_terms(self, query: str) -> List[str]:
         """
@@ -43,12 +69,14 @@ Return only the search terms as a comma-separated list, or "NONE". Examples:
 
 Search terms:"""
 
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",  # Use faster model for extraction
-                messages=[{"role": "user", "content": extraction_prompt}],
-                temperature=0,
-                max_tokens=50
-            )
+            with span("llm.openai", **{"llm.model": "gpt-3.5-turbo", "llm.purpose": "extract_search_terms"}) as current:
+                response = self.client.chat.completions.create(
+                    model="gpt-3.5-turbo",  # Use faster model for extraction
+                    messages=[{"role": "user", "content": extraction_prompt}],
+                    temperature=0,
+                    max_tokens=50
+                )
+                self._record_usage(current, response)
             
             result = response.choices[0].message.content.strip()
             
@@ -66,6 +94,15 @@ Search terms:"""
             # Fallback to simple extraction
             return self._simple_term_extraction(query)
     
+    @staticmethod
+    def _record_usage(current, response):
+        """Token counts on an llm.openai span"""
+        if current is not None and response.usage is not None:
+            current.set(**{
+                "llm.prompt_tokens": response.usage.prompt_tokens,
+                "llm.completion_tokens": response.usage.completion_tokens,
+            })
+    
     def _simple_term_extraction(self, query: str) -> List[str]:
         """Fallback: Simple keyword extraction if OpenAI extraction fails."""
         # Just look for common technical terms as fallback
@@ -100,92 +137,51 @@ Search terms:"""
             return context
         
         # Search for relevant papers using extracted terms
-        with self.neo4j_driver.driver.session() as session:
-            # Search with each term
-            for search_term in search_terms:
-                papers_query = """
-                MATCH (p:Paper)
-                WHERE toLower(p.title) CONTAINS toLower($query) 
-                   OR toLower(p.abstract) CONTAINS toLower($query)
-                OPTIONAL MATCH (p)-[:AUTHORED_BY]->(a:Author)
-                OPTIONAL MATCH (p)-[:INTRODUCES]->(c:Concept)
-                OPTIONAL MATCH (p)-[:PROPOSES]->(m:Method)
-                RETURN p, 
-                       collect(DISTINCT a.name)[0..3] as authors,
-                       collect(DISTINCT c.name)[0..5] as concepts,
-                       collect(DISTINCT m.name)[0..3] as methods
-                LIMIT $limit
-                """
-                result = session.run(papers_query, {"query": search_term, "limit": limit})
-                
-                papers_found = 0
-                for record in result:
-                    papers_found += 1
-                    paper = record["p"]
-                    arxiv_id = paper.get("arxiv_id")
-                    
-                    # Avoid duplicates
-                    if not any(p["arxiv_id"] == arxiv_id for p in context["papers"]):
-                        context["papers"].append({
-                            "arxiv_id": arxiv_id,
-                            "title": paper.get("title"),
-                            "abstract": paper.get("abstract"),
-                            "published_date": str(paper.get("published_date")) if paper.get("published_date") else None,
-                            "authors": record["authors"],
-                            "concepts": record["concepts"],
-                            "methods": record["methods"]
-                        })
+        for search_term in search_terms:
+            papers_found = 0
+            for record in self.neo4j_driver.find_papers_by_term(search_term, limit=limit):
+                papers_found += 1
+                paper = record["paper"]
+                arxiv_id = paper.get("arxiv_id")
                 
-                if papers_found > 0:
-                    logger.info(f"Found {papers_found} papers for search term: '{search_term}'")
+                # Avoid duplicates
+                if not any(p["arxiv_id"] == arxiv_id for p in context["papers"]):
+                    context["papers"].append({
+                        "arxiv_id": arxiv_id,
+                        "title": paper.get("title"),
+                        "abstract": paper.get("abstract"),
+                        "published_date": str(paper.get("published_date")) if paper.get("published_date") else None,
+                        "authors": record["authors"],
+                        "concepts": record["concepts"],
+                        "methods": record["methods"]
+                    })
             
-            logger.info(f"Total unique papers found: {len(context['papers'])}")
-            
-            # Search for relevant concepts using search terms
-            for search_term in search_terms:
-                concepts_query = """
-                MATCH (c:Concept)
-                WHERE toLower(c.name) CONTAINS toLower($query)
-                OPTIONAL MATCH (p:Paper)-[:INTRODUCES]->(c)
-                RETURN c.name as name, 
-                       c.category as category,
-                       count(p) as paper_count
-                ORDER BY paper_count DESC
-                LIMIT 5
-                """
-                result = session.run(concepts_query, {"query": search_term})
-            
-                for record in result:
-                    concept_name = record["name"]
-                    if not any(c["name"] == concept_name for c in context["concepts"]):
-                        context["concepts"].append({
-                            "name": concept_name,
-                            "category": record["category"],
-                            "paper_count": record["paper_count"]
-                        })
-            
-            # Search for relevant methods using search terms
-            for search_term in search_terms:
-                methods_query = """
-                MATCH (m:Method)
-                WHERE toLower(m.name) CONTAINS toLower($query)
-                OPTIONAL MATCH (p:Paper)-[:PROPOSES]->(m)
-                RETURN m.name as name,
-                       m.algorithm_type as type,
-                       count(p) as paper_count
-                ORDER BY paper_count DESC
-                LIMIT 5
-                """
-                result = session.run(methods_query, {"query": search_term})
-            
-                for record in result:
-                    method_name = record["name"]
-                    if not any(m["name"] == method_name for m in context["methods"]):
-                        context["methods"].append({
-                            "name": method_name,
-                            "type": record["type"],
-                            "paper_count": record["paper_count"]
-                        })
+            if papers_found > 0:
+                logger.info(f"Found {papers_found} papers for search term: '{search_term}'")
+        
+        logger.info(f"Total unique papers found: {len(context['papers'])}")
+        
+        # Search for relevant concepts using search terms
+        for search_term in search_terms:
+            for record in self.neo4j_driver.find_concepts_by_term(search_term, limit=5):
+                concept_name = record["name"]
+                if not any(c["name"] == concept_name for c in context["concepts"]):
+                    context["concepts"].append({
+                        "name": concept_name,
+                        "category": record["category"],
+                        "paper_count": record["paper_count"]
+                    })
+        
+        # Search for relevant methods using search terms
+        for search_term in search_terms:
+            for record in self.neo4j_driver.find_methods_by_term(search_term, limit=5):
+                method_name = record["name"]
+                if not any(m["name"] == method_name for m in context["methods"]):
+                    context["methods"].append({
+                        "name": method_name,
+                        "type": record["type"],
+                        "paper_count": record["paper_count"]
+                    })
         
         return context
     
@@ -283,10 +279,12 @@ Always be helpful, accurate, and research-focused."""
         
         # Get response from OpenAI
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages
-            )
+            with span("llm.openai", **{"llm.model": self.model, "llm.purpose": "chat"}) as current:
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages
+                )
+                self._record_usage(current, response)
             
             assistant_message = response.choices[0].message.content
             
@@ -340,7 +338,11 @@ Always be helpful, accurate, and research-focused."""
         user_message = f"Context from Knowledge Graph:\n{context_prompt}\n\nUser Question: {message}"
         messages.append({"role": "user", "content": user_message})
         
-        # Stream response from OpenAI
+        # Stream response from OpenAI. The completion span covers the whole
+        # stream and is recorded once it ends (see record_span).
+        start_ns = time.time_ns()
+        started = time.perf_counter_ns()
+        first_chunk_ms = None
         try:
             stream = self.client.chat.completions.create(
                 model=self.model,
@@ -356,12 +358,19 @@ Always be helpful, accurate, and research-focused."""
             
             # Then stream the response
             for chunk in stream:
+                if first_chunk_ms is None:
+                    first_chunk_ms = round((time.perf_counter_ns() - started) / 1e6, 3)
                 if chunk.choices[0].delta.content:
                     yield json.dumps({
                         "type": "content",
                         "data": chunk.choices[0].delta.content
                     }) + "\n"
             
+            record_span(
+                "llm.openai", start_ns, time.perf_counter_ns() - started,
+                **{"llm.model": self.model, "llm.purpose": "stream_chat", "llm.first_chunk_ms": first_chunk_ms}
+            )
+            
             # Finally send done signal
             yield json.dumps({
                 "type": "done",
@@ -369,7 +378,13 @@ Always be helpful, accurate, and research-focused."""
             }) + "\n"
         
         except Exception as e:
+            record_span(
+                "llm.openai", start_ns, time.perf_counter_ns() - started, f"{type(e).__name__}: {e}",
+                **{"llm.model": self.model, "llm.purpose": "stream_chat", "llm.first_chunk_ms": first_chunk_ms}
+            )
             yield json.dumps({
                 "type": "error",
                 "data": str(e)
             }) + "\n"
+
+assistant_service = AssistantService()
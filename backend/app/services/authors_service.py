@@ -0,0 +1,19 @@
+from typing import Optional
+from app.core.neo4j_driver import get_neo4j_driver
+import logging
+
+logger = logging.getLogger(__name__)
+
+class AuthorsService:
+    def __init__(self):
+        self.driver = get_neo4j_driver()
+    
+    def get_author(self, author_id: str) -> Optional[dict]:
+        """Get author profile by ID"""
+        return self.driver.get_author(author_id)
+    
+    def get_coauthors(self, author_id: str, limit: int = 20) -> Optional[dict]:
+        """Get an author's co-authors, most shared papers first"""
+        return self.driver.get_coauthors(author_id, limit)
+
+authors_service = AuthorsService()
@@ -0,0 +1,116 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from collections import defaultdict
+from difflib import SequenceMatcher
+import logging
+import re
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+# Normalized key -> canonical key for synonyms normalization can't catch
+ENTITY_ALIASES: Dict[str, str] = {
+    'vit': 'vision transformer',
+    'llm': 'large language model',
+    'nlp': 'natural language processing',
+    'rl': 'reinforcement learning',
+    'rlhf': 'reinforcement learning from human feedback',
+    'gan': 'generative adversarial network',
+    'cnn': 'convolutional neural network',
+    'rnn': 'recurrent neural network',
+    'lstm': 'long short term memory',
+    'rag': 'retrieval augmented generation',
+    'mha': 'multi head attention',
+    'sgd': 'stochastic gradient descent',
+    'cot': 'chain of thought',
+    'moe': 'mixture of expert',
+}
+
+# Trailing words that don't change what the entity is
+GENERIC_SUFFIXES = {'mechanism', 'method', 'approach', 'technique', 'framework', 'algorithm'}
+
+# Words ending in these are not plurals
+NON_PLURAL_ENDINGS = ('ss', 'us', 'is', 'as', 'os', 'ics')
+
+_PUNCTUATION = re.compile(r"[^\w\s]|_")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _singularize(token: str) -> str:
+    if len(token) <= 3 or token.endswith(NON_PLURAL_ENDINGS):
+        return token
+    if token.endswith('ies'):
+        return token[:-3] + 'y'
+    if token.endswith(('sses', 'xes', 'ches', 'shes')):
+        return token[:-2]
+    if token.endswith('s'):
+        return token[:-1]
+    return token
+
+
+class EntityCanonicalizer:
+    """Resolves LLM-produced Concept/Method names to a normalized canonical key."""
+
+    def __init__(self, aliases: Optional[Dict[str, str]] = None):
+        self.aliases = dict(ENTITY_ALIASES if aliases is None else aliases)
+
+    def normalize(self, name: str) -> str:
+        """Casefold, strip accents/punctuation/plurals and generic suffixes"""
+        text = unicodedata.normalize('NFKD', name or '')
+        text = ''.join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+        text = _PUNCTUATION.sub(' ', text)
+        tokens = [_singularize(token) for token in _WHITESPACE.split(text) if token]
+
+        while len(tokens) > 1 and tokens[-1] in GENERIC_SUFFIXES:
+            tokens.pop()
+
+        return ' '.join(tokens)
+
+    def canonical_key(self, name: str) -> str:
+        """Normalized key with the alias table applied"""
+        key = self.normalize(name)
+        return self.aliases.get(key, key)
+
+    def group_duplicates(self, names: Iterable[str]) -> Dict[str, List[str]]:
+        """Group raw names by canonical key, keeping only keys with 2+ names"""
+        groups = defaultdict(list)
+        for name in names:
+            groups[self.canonical_key(name)].append(name)
+        return {key: group for key, group in groups.items() if len(group) > 1}
+
+    def suggest_merges(
+        self,
+        keys: Iterable[str],
+        threshold: float = 0.9,
+        max_block_size: int = 200
+    ) -> List[Tuple[str, str, float]]:
+        """
+        Fuzzy merge suggestions between distinct canonical keys.
+        Only compares keys sharing a token; very common tokens
+        (blocks above max_block_size) are skipped to stay sub-quadratic.
+        """
+        keys = sorted(set(keys))
+        blocks = defaultdict(list)
+        for key in keys:
+            for token in set(key.split()):
+                if len(token) >= 3:
+                    blocks[token].append(key)
+
+        seen = set()
+        suggestions = []
+        for block in blocks.values():
+            if len(block) < 2 or len(block) > max_block_size:
+                continue
+            for i, left in enumerate(block):
+                for right in block[i + 1:]:
+                    if (left, right) in seen:
+                        continue
+                    seen.add((left, right))
+                    score = SequenceMatcher(None, left, right).ratio()
+                    if score >= threshold:
+                        suggestions.append((left, right, round(score, 3)))
+
+        return sorted(suggestions, key=lambda s: -s[2])
+
+
+# Singleton instance
+entity_canonicalizer = EntityCanonicalizer()
@@ -0,0 +1,147 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+from datetime import date, datetime
+from app.core.config import settings
+from app.core.neo4j_driver import get_neo4j_driver, dumps_raw
+import logging
+
+logger = logging.getLogger(__name__)
+
+# NDJSON lines buffered per chunk written to the response
+EXPORT_CHUNK_LINES = 500
+
+# Stable key for any node across exports
+NODE_KEY = "COALESCE(n.arxiv_id, n.id, n.name, n.url, elementId(n))"
+
+
+class ExportService:
+    """Streams the knowledge graph as NDJSON straight from graph result cursors."""
+
+    def __init__(self):
+        self.driver = get_neo4j_driver()
+
+    @staticmethod
+    def _paper_conditions(
+        node: str = 'p',
+        published_from: Optional[date] = None,
+        published_to: Optional[date] = None,
+        categories: Optional[List[str]] = None,
+        updated_since: Optional[datetime] = None
+    ) -> Tuple[List[str], Dict]:
+        """Predicates on paper `node` for the filters given, so indexes can be used"""
+        clauses = []
+        params = {}
+
+        if published_from:
+            clauses.append(f"{node}.published_date >= date($published_from)")
+            params['published_from'] = published_from.isoformat()
+        if published_to:
+            clauses.append(f"{node}.published_date <= date($published_to)")
+            params['published_to'] = published_to.isoformat()
+        if categories:
+            clauses.append(f"any(category IN {node}.categories WHERE category IN $categories)")
+            params['categories'] = categories
+        if updated_since:
+            clauses.append(f"{node}.updated_at >= datetime($updated_since)")
+            params['updated_since'] = updated_since.isoformat()
+
+        return clauses, params
+
+    @classmethod
+    def _paper_filter(cls, node: str = 'p', **filters) -> Tuple[str, Dict]:
+        """Build a WHERE clause on paper `node` only for the filters given"""
+        clauses, params = cls._paper_conditions(node, **filters)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def _ndjson(self, query: str, params: Dict, name: str) -> Iterator[bytes]:
+        """Serialize streamed records as NDJSON, a chunk of lines at a time"""
+        lines = []
+        records = self.driver.stream_read(query, params, fetch_size=settings.EXPORT_FETCH_SIZE, name=name)
+        for record in records:
+            lines.append(dumps_raw(record))
+            if len(lines) >= EXPORT_CHUNK_LINES:
+                yield b"\n".join(lines) + b"\n"
+                lines = []
+        if lines:
+            yield b"\n".join(lines) + b"\n"
+
+    def export_papers(self, **filters) -> Iterator[bytes]:
+        """One paper per line, with authors, concepts, methods, datasets and metrics"""
+        where, params = self._paper_filter(**filters)
+        query = f"""
+        MATCH (p:Paper)
+        {where}
+        RETURN p {{
+            .*,
+            authors: [(p)-[:AUTHORED_BY]->(a:Author) | a.name],
+            graph_concepts: [(p)-[:INTRODUCES]->(c:Concept) | c.name],
+            graph_methods: [(p)-[:PROPOSES]->(m:Method) | m.name],
+            graph_datasets: [(p)-[:EVALUATES_ON]->(d:Dataset) | d.name],
+            graph_metrics: [(p)-[:USES_METRIC]->(met:Metric) | met.name]
+        }} as paper
+        """
+        for chunk in self._ndjson(query, params, 'export.papers'):
+            yield chunk
+
+    def export_graph(self, **filters) -> Iterator[bytes]:
+        """
+        Matching papers plus their direct neighbors as `node` lines, then
+        every relationship touching a matching paper as `relationship` lines.
+
+        Each node and relationship is emitted once by construction, not with
+        DISTINCT, which would hold every row seen so far on the server:
+        neighbors are scanned once each, and a relationship is emitted from
+        its start node when that is a matching paper, otherwise from its end.
+        """
+        where, params = self._paper_filter(**filters)
+        start_where, _ = self._paper_filter('s', **filters)
+        end_where, _ = self._paper_filter('e', **filters)
+        start_clauses, _ = self._paper_conditions('s', **filters)
+        start_matches = ' AND '.join(['s:Paper'] + start_clauses)
+
+        papers_query = f"""
+        MATCH (p:Paper)
+        {where}
+        WITH p as n
+        RETURN 'node' as type, elementId(n) as id, {NODE_KEY} as key,
+               labels(n) as labels, properties(n) as properties
+        """
+        neighbors_query = f"""
+        MATCH (n)
+        WHERE NOT n:Paper AND EXISTS {{
+            MATCH (n)--(p:Paper)
+            {where}
+        }}
+        RETURN 'node' as type, elementId(n) as id, {NODE_KEY} as key,
+               labels(n) as labels, properties(n) as properties
+        """
+        relationship_columns = """
+        RETURN 'relationship' as type, elementId(r) as id, type(r) as rel_type,
+               elementId(s) as start, COALESCE(s.arxiv_id, s.id, s.name, s.url, elementId(s)) as start_key,
+               elementId(e) as end, COALESCE(e.arxiv_id, e.id, e.name, e.url, elementId(e)) as end_key,
+               properties(r) as properties
+        """
+        relationships_query = f"""
+        MATCH (s:Paper)
+        {start_where}
+        MATCH (s)-[r]->(e)
+        {relationship_columns}
+        UNION ALL
+        MATCH (e:Paper)
+        {end_where}
+        MATCH (s)-[r]->(e)
+        WHERE NOT COALESCE({start_matches}, false)
+        {relationship_columns}
+        """
+
+        queries = (
+            (papers_query, 'export.graph_papers'),
+            (neighbors_query, 'export.graph_neighbors'),
+            (relationships_query, 'export.graph_relationships'),
+        )
+        for query, name in queries:
+            for chunk in self._ndjson(query, params, name):
+                yield chunk
+
+
+export_service = ExportService()
@@ -0,0 +1,614 @@
+from array import array
+from typing import Dict, Iterator, List, Tuple
+import logging
+import time
+import numpy as np
+from scipy import sparse
+from app.core.config import settings
+from app.core.neo4j_driver import get_neo4j_driver
+
+logger = logging.getLogger(__name__)
+
+# Relationship type -> (edge weight, direction) in the PageRank graph.
+# "both": rank flows paper -> entity -> paper, so papers sharing concepts,
+# methods, datasets or authors reinforce each other; low weights keep hub
+# metrics ("Accuracy") from flattening the scores. "to_paper": the other
+# end only endorses the paper (a Model citing it, a Space demonstrating it).
+PAGERANK_RELATIONSHIPS: Dict[str, Tuple[float, str]] = {
+    'INTRODUCES': (1.0, 'both'),
+    'PROPOSES': (1.0, 'both'),
+    'EVALUATES_ON': (0.5, 'both'),
+    'USES_METRIC': (0.2, 'both'),
+    'AUTHORED_BY': (0.5, 'both'),
+    'CITES': (1.0, 'to_paper'),
+    'DEMONSTRATES': (1.0, 'to_paper'),
+}
+
+PAGERANK_DAMPING = 0.85
+# Stop when the L1 change of the whole rank vector falls below this
+PAGERANK_TOLERANCE = 1e-6
+PAGERANK_MAX_ITERATIONS = 200
+
+# Papers per score write transaction
+SCORE_WRITE_BATCH_SIZE = 5000
+
+# Relationship type -> feature weight for related-paper similarity
+SIMILARITY_RELATIONSHIPS: Dict[str, float] = {
+    'INTRODUCES': 1.0,
+    'PROPOSES': 1.0,
+    'EVALUATES_ON': 0.5,
+}
+# Neighbors kept per paper as SIMILAR_TO relationships
+SIMILAR_PAPERS_K = 10
+SIMILARITY_MIN_SCORE = 0.05
+# Entities on more than this share of papers are dropped: they say little
+# about relatedness and make the similarity product dense
+SIMILARITY_MAX_DF = 0.2
+# Papers per similarity product (bounds the memory of one block)
+SIMILARITY_BLOCK_SIZE = 2048
+# Papers per SIMILAR_TO write transaction
+SIMILAR_WRITE_BATCH_SIZE = 500
+
+# Entity relationships clustered into topics (Concepts and Methods)
+TOPIC_RELATIONSHIPS = ('INTRODUCES', 'PROPOSES')
+# Entities on more than this share of papers are left out of the
+# co-occurrence graph and attached to their best community afterwards
+TOPIC_MAX_DF = 0.05
+# Pairs co-occurring on fewer papers are dropped as noise
+TOPIC_MIN_COOCCURRENCE = 2
+# Smaller communities get no community_id
+TOPIC_MIN_SIZE = 3
+# Names kept per label in a topic summary
+TOPIC_SUMMARY_NAMES = 10
+LABEL_PROPAGATION_MAX_ITERATIONS = 30
+# Share of nodes relabelled per iteration; relabelling all at once oscillates
+LABEL_PROPAGATION_UPDATE_FRACTION = 0.5
+# Stop when fewer than this share of nodes change label
+LABEL_PROPAGATION_TOLERANCE = 1e-3
+# Entities per community_id write transaction
+COMMUNITY_WRITE_BATCH_SIZE = 5000
+
+
+class NodeIndex:
+    """Dense matrix rows for graph node ids, in first-seen order"""
+
+    def __init__(self):
+        self.rows: Dict[str, int] = {}
+        self.ids: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, node_id: str) -> int:
+        row = self.rows.get(node_id)
+        if row is None:
+            row = self.rows[node_id] = len(self.ids)
+            self.ids.append(node_id)
+        return row
+
+
+class PaperGraph:
+    """
+    Weighted directed graph around papers as a sparse adjacency matrix.
+    Papers occupy the first rows, in the order of `arxiv_ids`.
+    """
+
+    def __init__(self, arxiv_ids: List[str], nodes: NodeIndex, adjacency: sparse.csr_matrix, edges: int):
+        self.arxiv_ids = arxiv_ids
+        self.nodes = nodes
+        self.adjacency = adjacency
+        self.edges = edges
+
+    @property
+    def paper_count(self) -> int:
+        return len(self.arxiv_ids)
+
+
+def adjacency_matrix(sources: np.ndarray, targets: np.ndarray, weights: np.ndarray, size: int) -> sparse.csr_matrix:
+    """CSR adjacency from edge arrays; parallel edges are summed"""
+    return sparse.csr_matrix((weights, (sources, targets)), shape=(size, size))
+
+
+def pagerank(
+    adjacency: sparse.csr_matrix,
+    damping: float = PAGERANK_DAMPING,
+    tolerance: float = PAGERANK_TOLERANCE,
+    max_iterations: int = PAGERANK_MAX_ITERATIONS
+) -> Tuple[np.ndarray, int]:
+    """
+    Weighted PageRank by power iteration: one sparse matrix-vector product
+    per step. Rank of dangling nodes (no out-edges) is spread uniformly,
+    like the teleport. Returns scores summing to 1 and the iterations run.
+    """
+    size = adjacency.shape[0]
+    if size == 0:
+        return np.zeros(0), 0
+
+    out_weight = np.asarray(adjacency.sum(axis=1)).ravel()
+    dangling = out_weight == 0
+    inverse = np.divide(1.0, out_weight, out=np.zeros(size), where=~dangling)
+    # transition[j, i] = share of i's rank that flows to j
+    transition = (sparse.diags(inverse) @ adjacency).T.tocsr()
+
+    rank = np.full(size, 1.0 / size)
+    teleport = (1.0 - damping) / size
+    for iteration in range(1, max_iterations + 1):
+        updated = damping * (transition @ rank + rank[dangling].sum() / size) + teleport
+        delta = np.abs(updated - rank).sum()
+        rank = updated
+        if delta < tolerance:
+            return rank, iteration
+    logger.warning(f"PageRank did not converge in {max_iterations} iterations (delta {delta:.2e})")
+    return rank, max_iterations
+
+
+def tfidf_rows(features: sparse.csr_matrix, max_df: float = SIMILARITY_MAX_DF) -> sparse.csr_matrix:
+    """
+    TF-IDF weight and L2-normalize feature rows, so row dot products are
+    cosine similarities. Columns present in more than `max_df` of the rows
+    are zeroed.
+    """
+    rows = features.shape[0]
+    df = np.diff(features.tocsc().indptr)
+    idf = np.log((1 + rows) / (1 + df)) + 1.0
+    idf[df > max_df * rows] = 0.0
+    weighted = (features @ sparse.diags(idf)).tocsr()
+    norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+    inverse = np.divide(1.0, norms, out=np.zeros(rows), where=norms > 0)
+    normalized = (sparse.diags(inverse) @ weighted).tocsr()
+    normalized.eliminate_zeros()
+    return normalized
+
+
+def top_k_similar(
+    vectors: sparse.csr_matrix,
+    rows: np.ndarray,
+    k: int = SIMILAR_PAPERS_K,
+    min_score: float = SIMILARITY_MIN_SCORE,
+    block_size: int = SIMILARITY_BLOCK_SIZE
+) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """
+    (row, neighbor rows, scores) for each of `rows`, best first, from
+    block-wise sparse products vectors[block] @ vectors.T. Only pairs that
+    share a feature are ever materialized.
+    """
+    transposed = vectors.T.tocsr()
+    for start in range(0, len(rows), block_size):
+        block = rows[start:start + block_size]
+        products = (vectors[block] @ transposed).tocsr()
+        for offset, row in enumerate(block):
+            lo, hi = products.indptr[offset], products.indptr[offset + 1]
+            neighbors, scores = products.indices[lo:hi], products.data[lo:hi]
+            keep = (neighbors != row) & (scores >= min_score)
+            neighbors, scores = neighbors[keep], scores[keep]
+            if len(scores) > k:
+                best = np.argpartition(-scores, k)[:k]
+                neighbors, scores = neighbors[best], scores[best]
+            order = np.argsort(-scores, kind='stable')
+            yield int(row), neighbors[order], scores[order]
+
+
+def cooccurrence_matrix(features: sparse.csr_matrix, min_count: int = TOPIC_MIN_COOCCURRENCE) -> sparse.csr_matrix:
+    """Column x column count of rows containing both, without the diagonal"""
+    binary = features.copy()
+    binary.data[:] = 1.0
+    cooccurrence = (binary.T @ binary).tocsr()
+    cooccurrence.setdiag(0)
+    cooccurrence.data[cooccurrence.data < min_count] = 0
+    cooccurrence.eliminate_zeros()
+    return cooccurrence
+
+
+def membership_matrix(labels: np.ndarray, communities: int) -> sparse.csr_matrix:
+    """One-hot rows: node x community; nodes labelled -1 get an empty row"""
+    rows = np.flatnonzero(labels >= 0)
+    return sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, labels[rows])), shape=(len(labels), communities)
+    )
+
+
+def label_propagation(
+    adjacency: sparse.csr_matrix,
+    max_iterations: int = LABEL_PROPAGATION_MAX_ITERATIONS,
+    update_fraction: float = LABEL_PROPAGATION_UPDATE_FRACTION,
+    tolerance: float = LABEL_PROPAGATION_TOLERANCE,
+    seed: int = 0
+) -> Tuple[np.ndarray, int]:
+    """
+    Weighted label propagation on a symmetric adjacency matrix. Each
+    iteration is one sparse product (node x label weights) and a row
+    argmax; a random `update_fraction` of nodes adopt their best label,
+    and a node keeps its label on ties. Returns labels (node ids of the
+    seed node of each community) and the iterations run.
+    """
+    size = adjacency.shape[0]
+    labels = np.arange(size)
+    if size == 0:
+        return labels, 0
+    rng = np.random.default_rng(seed)
+    connected = np.diff(adjacency.indptr) > 0
+    for iteration in range(1, max_iterations + 1):
+        membership = membership_matrix(labels, size)
+        # A bonus below any edge weight (co-occurrence counts) keeps the current label on ties
+        scores = (adjacency @ membership + membership * 0.5).tocsr()
+        best = np.asarray(scores.argmax(axis=1)).ravel()
+        update = connected & (rng.random(size) < update_fraction)
+        changed = np.count_nonzero(update & (best != labels))
+        labels = np.where(update, best, labels)
+        if changed <= tolerance * size:
+            return labels, iteration
+    return labels, max_iterations
+
+
+class GraphAnalyticsService:
+    """Offline graph analytics: exports the graph into sparse matrices and writes scores back."""
+
+    def __init__(self):
+        self.driver = get_neo4j_driver()
+
+    def _papers(self) -> Iterator[Dict]:
+        query = """
+        MATCH (p:Paper)
+        RETURN elementId(p) as node, p.arxiv_id as arxiv_id
+        """
+        return self.driver.stream_read(query, fetch_size=settings.EXPORT_FETCH_SIZE, name='analytics.papers')
+
+    def _paper_edges(self, rel_types: List[str]) -> Iterator[Dict]:
+        query = """
+        MATCH (p:Paper)-[r]-(n)
+        WHERE type(r) IN $rel_types
+        RETURN elementId(p) as paper, elementId(n) as node, type(r) as rel_type
+        """
+        return self.driver.stream_read(
+            query, {'rel_types': rel_types}, fetch_size=settings.EXPORT_FETCH_SIZE, name='analytics.paper_edges'
+        )
+
+    def load_paper_graph(self, relationships: Dict[str, Tuple[float, str]] = PAGERANK_RELATIONSHIPS) -> PaperGraph:
+        """Stream papers and their relationships of the given types into a PaperGraph"""
+        nodes = NodeIndex()
+        arxiv_ids = []
+        for record in self._papers():
+            nodes.add(record['node'])
+            arxiv_ids.append(record['arxiv_id'])
+
+        sources, targets, weights = array('q'), array('q'), array('d')
+        for record in self._paper_edges(list(relationships)):
+            paper = nodes.rows.get(record['paper'])
+            if paper is None:
+                # Paper created after the papers were read
+                continue
+            node = nodes.add(record['node'])
+            weight, direction = relationships[record['rel_type']]
+            sources.append(node)
+            targets.append(paper)
+            weights.append(weight)
+            if direction == 'both':
+                sources.append(paper)
+                targets.append(node)
+                weights.append(weight)
+
+        adjacency = adjacency_matrix(
+            np.frombuffer(sources, dtype=np.int64),
+            np.frombuffer(targets, dtype=np.int64),
+            np.frombuffer(weights, dtype=np.float64),
+            len(nodes)
+        )
+        return PaperGraph(arxiv_ids, nodes, adjacency, len(weights))
+
+    def load_paper_features(
+        self,
+        relationships: Dict[str, float] = SIMILARITY_RELATIONSHIPS
+    ) -> Tuple[List[str], NodeIndex, sparse.csr_matrix]:
+        """
+        arxiv_ids, entity ids and the weighted paper x entity incidence
+        matrix (rows in arxiv_ids order, columns in entity order)
+        """
+        papers = NodeIndex()
+        arxiv_ids = []
+        for record in self._papers():
+            papers.add(record['node'])
+            arxiv_ids.append(record['arxiv_id'])
+
+        entities = NodeIndex()
+        rows, columns, weights = array('q'), array('q'), array('d')
+        for record in self._paper_edges(list(relationships)):
+            paper = papers.rows.get(record['paper'])
+            if paper is None:
+                continue
+            rows.append(paper)
+            columns.append(entities.add(record['node']))
+            weights.append(relationships[record['rel_type']])
+
+        features = sparse.csr_matrix(
+            (np.frombuffer(weights, dtype=np.float64),
+             (np.frombuffer(rows, dtype=np.int64), np.frombuffer(columns, dtype=np.int64))),
+            shape=(len(papers), len(entities))
+        )
+        return arxiv_ids, entities, features
+
+    def write_paper_scores(self, arxiv_ids: List[str], scores: np.ndarray, batch_size: int = SCORE_WRITE_BATCH_SIZE) -> int:
+        """Set p.pagerank in UNWIND batches, one write transaction per batch"""
+        query = """
+        UNWIND $rows AS row
+        MATCH (p:Paper {arxiv_id: row.arxiv_id})
+        SET p.pagerank = row.score,
+            p.pagerank_at = datetime()
+        """
+        written = 0
+        for offset in range(0, len(arxiv_ids), batch_size):
+            rows = [
+                {'arxiv_id': arxiv_id, 'score': score}
+                for arxiv_id, score in zip(arxiv_ids[offset:offset + batch_size], scores[offset:offset + batch_size].tolist())
+                if arxiv_id is not None
+            ]
+            self.driver.execute_write(query, {'rows': rows}, name='analytics.write_pagerank')
+            written += len(rows)
+        return written
+
+    def compute_pagerank(
+        self,
+        damping: float = PAGERANK_DAMPING,
+        tolerance: float = PAGERANK_TOLERANCE,
+        max_iterations: int = PAGERANK_MAX_ITERATIONS,
+        batch_size: int = SCORE_WRITE_BATCH_SIZE,
+        write: bool = True
+    ) -> Dict:
+        """
+        Export, rank and write back. Paper scores are scaled so the most
+        influential paper scores 1.0, which keeps the search boost
+        independent of graph size.
+        """
+        timings = {}
+        start = time.perf_counter()
+        graph = self.load_paper_graph()
+        timings['load_s'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        rank, iterations = pagerank(graph.adjacency, damping, tolerance, max_iterations)
+        paper_scores = rank[:graph.paper_count]
+        top = paper_scores.max() if graph.paper_count else 0.0
+        if top > 0:
+            paper_scores = paper_scores / top
+        timings['rank_s'] = time.perf_counter() - start
+
+        written = 0
+        if write:
+            start = time.perf_counter()
+            written = self.write_paper_scores(graph.arxiv_ids, paper_scores, batch_size)
+            timings['write_s'] = time.perf_counter() - start
+
+        order = np.argsort(-paper_scores)[:10]
+        return {
+            'papers': graph.paper_count,
+            'nodes': len(graph.nodes),
+            'edges': graph.edges,
+            'iterations': iterations,
+            'written': written,
+            'top': [(graph.arxiv_ids[row], round(float(paper_scores[row]), 4)) for row in order],
+            **{key: round(value, 3) for key, value in timings.items()},
+        }
+
+    def select_stale_related(self) -> List[str]:
+        """Enriched papers whose SIMILAR_TO list predates their enrichment"""
+        query = """
+        MATCH (p:Paper)
+        WHERE p.enriched = true
+          AND (p.related_at IS NULL OR p.related_at < p.enriched_at)
+        RETURN p.arxiv_id as arxiv_id
+        """
+        return [
+            record['arxiv_id']
+            for record in self.driver.stream_read(
+                query, fetch_size=settings.EXPORT_FETCH_SIZE, name='analytics.select_stale_related'
+            )
+        ]
+
+    def write_similar_papers(self, rows: List[Dict], batch_size: int = SIMILAR_WRITE_BATCH_SIZE) -> int:
+        """
+        Replace each paper's outgoing SIMILAR_TO relationships with
+        row['related'] ({arxiv_id, score} best first) and stamp related_at.
+        """
+        query = """
+        UNWIND $rows AS row
+        MATCH (p:Paper {arxiv_id: row.arxiv_id})
+        CALL {
+            WITH p
+            MATCH (p)-[old:SIMILAR_TO]->()
+            DELETE old
+        }
+        SET p.related_at = datetime()
+        WITH p, row
+        UNWIND range(0, size(row.related) - 1) AS rank
+        WITH p, rank, row.related[rank] AS related
+        MATCH (q:Paper {arxiv_id: related.arxiv_id})
+        CREATE (p)-[:SIMILAR_TO {score: related.score, rank: rank + 1}]->(q)
+        """
+        for offset in range(0, len(rows), batch_size):
+            self.driver.execute_write(query, {'rows': rows[offset:offset + batch_size]}, name='analytics.write_similar')
+        return len(rows)
+
+    def refresh_related_papers(
+        self,
+        full: bool = False,
+        k: int = SIMILAR_PAPERS_K,
+        min_score: float = SIMILARITY_MIN_SCORE,
+        max_df: float = SIMILARITY_MAX_DF,
+        batch_size: int = SIMILAR_WRITE_BATCH_SIZE
+    ) -> Dict:
+        """
+        Rebuild SIMILAR_TO top-k lists from TF-IDF cosine similarity over
+        the papers' concepts, methods and datasets. Incrementally (the
+        default) only stale papers are recomputed, plus the papers they
+        now rank among, whose lists the new paper may have entered.
+        """
+        timings = {}
+        start = time.perf_counter()
+        arxiv_ids, _, features = self.load_paper_features()
+        vectors = tfidf_rows(features, max_df)
+        timings['load_s'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if full:
+            rows = np.arange(len(arxiv_ids))
+        else:
+            stale = set(self.select_stale_related())
+            rows = np.array([row for row, arxiv_id in enumerate(arxiv_ids) if arxiv_id in stale], dtype=np.int64)
+
+        lists: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        for row, neighbors, scores in top_k_similar(vectors, rows, k, min_score):
+            lists[row] = (neighbors, scores)
+        if not full:
+            affected = np.array(sorted({
+                int(neighbor) for neighbors, _ in lists.values() for neighbor in neighbors
+            } - lists.keys()), dtype=np.int64)
+            for row, neighbors, scores in top_k_similar(vectors, affected, k, min_score):
+                lists[row] = (neighbors, scores)
+        timings['similarity_s'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        written = self.write_similar_papers([
+            {
+                'arxiv_id': arxiv_ids[row],
+                'related': [
+                    {'arxiv_id': arxiv_ids[neighbor], 'score': round(score, 4)}
+                    for neighbor, score in zip(neighbors.tolist(), scores.tolist())
+                ],
+            }
+            for row, (neighbors, scores) in lists.items()
+            if arxiv_ids[row] is not None
+        ], batch_size)
+        timings['write_s'] = time.perf_counter() - start
+
+        return {
+            'papers': len(arxiv_ids),
+            'features': features.shape[1],
+            'refreshed': written,
+            'with_related': sum(1 for neighbors, _ in lists.values() if len(neighbors)),
+            **{key: round(value, 3) for key, value in timings.items()},
+        }
+
+    def _entities(self, labels: List[str]) -> Iterator[Dict]:
+        query = """
+        MATCH (n)
+        WHERE any(label IN labels(n) WHERE label IN $labels)
+        RETURN elementId(n) as node, labels(n)[0] as label, n.name as name, n.paper_count as paper_count
+        """
+        return self.driver.stream_read(
+            query, {'labels': labels}, fetch_size=settings.EXPORT_FETCH_SIZE, name='analytics.entities'
+        )
+
+    def write_communities(self, rows: List[Dict], batch_size: int = COMMUNITY_WRITE_BATCH_SIZE) -> int:
+        """Set n.community_id ({node, community}, null removes it) in UNWIND batches"""
+        query = """
+        UNWIND $rows AS row
+        MATCH (n)
+        WHERE elementId(n) = row.node
+        SET n.community_id = row.community
+        """
+        for offset in range(0, len(rows), batch_size):
+            self.driver.execute_write(query, {'rows': rows[offset:offset + batch_size]}, name='analytics.write_communities')
+        return len(rows)
+
+    def write_topics(self, topics: List[Dict]):
+        """Replace the Topic summary nodes in one transaction, so readers never see a partial set"""
+        delete_query = """
+        MATCH (t:Topic)
+        WHERE NOT t.id IN $ids
+        DETACH DELETE t
+        """
+        write_query = """
+        UNWIND $topics AS topic
+        MERGE (t:Topic {id: topic.id})
+        SET t += topic,
+            t.computed_at = datetime()
+        """
+        with self.driver.transaction(name='analytics.topics') as tx:
+            tx.run(delete_query, {'ids': [topic['id'] for topic in topics]}, name='analytics.delete_stale_topics')
+            tx.run(write_query, {'topics': topics}, name='analytics.write_topics')
+
+    def detect_topics(
+        self,
+        max_df: float = TOPIC_MAX_DF,
+        min_cooccurrence: int = TOPIC_MIN_COOCCURRENCE,
+        min_size: int = TOPIC_MIN_SIZE,
+        summary_names: int = TOPIC_SUMMARY_NAMES,
+        batch_size: int = COMMUNITY_WRITE_BATCH_SIZE
+    ) -> Dict:
+        """
+        Cluster Concepts and Methods by co-occurrence on papers with label
+        propagation, write community_id on every entity and a Topic node
+        per community (size, paper_count, most used concepts and methods).
+        """
+        timings = {}
+        start = time.perf_counter()
+        arxiv_ids, entities, features = self.load_paper_features(dict.fromkeys(TOPIC_RELATIONSHIPS, 1.0))
+        features.data[:] = 1.0
+        timings['load_s'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        df = np.diff(features.tocsc().indptr)
+        hubs = df > max(max_df * len(arxiv_ids), min_cooccurrence)
+        core = np.flatnonzero(~hubs)
+        core_labels, iterations = label_propagation(cooccurrence_matrix(features[:, core], min_cooccurrence))
+        labels = np.full(len(entities), -1)
+        labels[core] = core[core_labels]
+
+        if hubs.any():
+            # Hubs join the community they share most papers with
+            paper_communities = features @ membership_matrix(labels, len(entities))
+            hub_scores = (features[:, hubs].T @ paper_communities).tocsr()
+            best = np.asarray(hub_scores.argmax(axis=1)).ravel()
+            has_scores = np.diff(hub_scores.indptr) > 0
+            labels[np.flatnonzero(hubs)] = np.where(has_scores, best, np.flatnonzero(hubs))
+
+        # Dense community ids, largest first; small communities get none
+        sizes = np.bincount(labels, minlength=len(entities))
+        kept = np.flatnonzero(sizes >= min_size)
+        kept = kept[np.argsort(-sizes[kept], kind='stable')]
+        community_ids = np.full(len(entities), -1)
+        community_ids[kept] = np.arange(len(kept))
+        communities = community_ids[labels]
+        paper_counts = np.diff((features @ membership_matrix(communities, len(kept))).tocsc().indptr)
+        timings['cluster_s'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        rows = []
+        members: Dict[int, List[Tuple[int, str, str]]] = {}
+        for record in self._entities(['Concept', 'Method']):
+            row = entities.rows.get(record['node'])
+            community = int(communities[row]) if row is not None and communities[row] >= 0 else None
+            rows.append({'node': record['node'], 'community': community})
+            if community is not None:
+                members.setdefault(community, []).append((record['paper_count'] or 0, record['label'], record['name']))
+        self.write_communities(rows, batch_size)
+
+        topics = []
+        for community, entries in sorted(members.items()):
+            entries.sort(key=lambda entry: (-entry[0], entry[2] or ''))
+            concepts = [name for _, label, name in entries if label == 'Concept']
+            methods = [name for _, label, name in entries if label == 'Method']
+            topics.append({
+                'id': community,
+                'name': ' / '.join((concepts or methods)[:3]),
+                'size': len(entries),
+                'concept_count': len(concepts),
+                'method_count': len(methods),
+                'paper_count': int(paper_counts[community]),
+                'concepts': concepts[:summary_names],
+                'methods': methods[:summary_names],
+            })
+        self.write_topics(topics)
+        timings['write_s'] = time.perf_counter() - start
+
+        return {
+            'papers': len(arxiv_ids),
+            'entities': len(entities),
+            'hubs': int(hubs.sum()),
+            'iterations': iterations,
+            'topics': len(topics),
+            'clustered': int(np.count_nonzero(communities >= 0)),
+            **{key: round(value, 3) for key, value in timings.items()},
+        }
+
+
+graph_analytics_service = GraphAnalyticsService()
@@ -0,0 +1,43 @@
+import os
+from typing import Dict, List, Optional
+from app.core.config import settings
+from app.core.job_queue import JobQueue
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Job types run by scripts/job_worker.py
+INGEST_JOB = "ingest"
+ENRICH_JOB = "enrich"
+
+# Relative JOB_QUEUE_PATHs are resolved here, so the API (run from
+# backend/) and workers (run from scripts/) share one queue file
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class JobsService:
+    def __init__(self):
+        self.queue = JobQueue(
+            os.path.join(BACKEND_DIR, settings.JOB_QUEUE_PATH),
+            max_attempts=settings.JOB_MAX_ATTEMPTS,
+            lease_seconds=settings.JOB_LEASE_SECONDS,
+            backoff_seconds=settings.JOB_RETRY_BACKOFF_SECONDS,
+            backoff_max_seconds=settings.JOB_RETRY_BACKOFF_MAX_SECONDS
+        )
+    
+    def submit(self, job_type: str, params: Dict, key: Optional[str] = None) -> Dict:
+        """Enqueue a job; a key already used returns that job instead"""
+        job = self.queue.enqueue(job_type, params, key=key)
+        if job['created']:
+            logger.info(f"Queued {job_type} job {job['id']}")
+        return job
+    
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        return self.queue.get(job_id)
+    
+    def list_jobs(self, status: Optional[str] = None, job_type: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        return self.queue.list(status=status, job_type=job_type, limit=limit)
+    
+    def counts(self) -> Dict[str, int]:
+        return self.queue.counts()
+
+jobs_service = JobsService()
@@ -1,6 +1,8 @@
 from typing import List, Optional
-from app.core.neo4j_driver import get_neo4j_driver
+from app.core.config import settings
+from app.core.neo4j_driver import get_neo4j_driver, dumps_raw
 from app.schemas.paper_schema import PaperCreate, PaperResponse
+from app.services.trends_service import trends_service
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,26 +15,48 @@ class PapersService:
         """Create a new paper"""
         paper_data = paper.model_dump()
         paper_data['published_date'] = paper_data['published_date'].isoformat()
-        return self.driver.create_paper(paper_data)
+        arxiv_id = self.driver.create_paper(paper_data)
+        if arxiv_id:
+            # Counts the categories of a new paper once; a no-op on updates
+            trends_service.rollup_paper(arxiv_id)
+        return arxiv_id
     
     def get_paper(self, arxiv_id: str) -> Optional[dict]:
         """Get paper by ID"""
         return self.driver.get_paper(arxiv_id)
     
-    def list_papers(self, page: int = 1, page_size: int = 20) -> dict:
-        """List papers with pagination"""
+    def debug_paper(self, arxiv_id: str) -> Optional[dict]:
+        """Get paper identifiers and authors"""
+        return self.driver.debug_paper(arxiv_id)
+    
+    def get_paper_graph(self, arxiv_id: str) -> Optional[dict]:
+        """Get paper neighborhood for visualization"""
+        return self.driver.get_paper_graph(arxiv_id)
+    
+    def get_related_papers(self, arxiv_id: str, limit: int = 10) -> Optional[dict]:
+        """Get precomputed related papers"""
+        return self.driver.get_related_papers(arxiv_id, limit)
+    
+    def _papers_page(self, list_papers, page: int, page_size: int, sort: str) -> dict:
+        """One page from `list_papers` (list_papers or list_papers_raw) with the total paper count"""
         offset = (page - 1) * page_size
-        papers = self.driver.list_papers(limit=page_size, offset=offset)
-        
         return {
-            'papers': papers,
+            'papers': list_papers(limit=page_size, offset=offset, sort=sort),
             'page': page,
             'page_size': page_size,
-            'total': len(papers)  # TODO: Add count query
+            'total': self.driver.count_papers()
         }
     
+    def list_papers(self, page: int = 1, page_size: int = 20, sort: str = 'date') -> dict:
+        """List papers with pagination, newest or most influential first"""
+        return self._papers_page(self.driver.list_papers, page, page_size, sort)
+    
+    def list_papers_json(self, page: int = 1, page_size: int = 20, sort: str = 'date') -> bytes:
+        """List papers with pagination, serialized straight to JSON bytes"""
+        return dumps_raw(self._papers_page(self.driver.list_papers_raw, page, page_size, sort))
+    
     def search_papers(self, query: str, limit: int = 20) -> List[dict]:
-        """Search papers by text"""
-        return self.driver.search_papers(query, limit)
+        """Search papers by text, boosted by PageRank influence"""
+        return self.driver.search_papers(query, limit, pagerank_boost=settings.PAGERANK_SEARCH_BOOST)
 
 papers_service = PapersService()
@@ -0,0 +1,35 @@
+from threading import Lock
+from typing import Dict, List, Tuple
+import time
+from app.core.config import settings
+from app.core.neo4j_driver import get_neo4j_driver
+import logging
+
+logger = logging.getLogger(__name__)
+
+class TopicsService:
+    def __init__(self, cache_seconds: int = settings.TOPICS_CACHE_SECONDS):
+        self.driver = get_neo4j_driver()
+        self.cache_seconds = cache_seconds
+        # limit -> (expires at, topics)
+        self._cache: Dict[int, Tuple[float, List[dict]]] = {}
+        self._lock = Lock()
+    
+    def list_topics(self, limit: int = 50) -> List[dict]:
+        """Topic summaries, cached for TOPICS_CACHE_SECONDS"""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(limit)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        
+        topics = self.driver.list_topics(limit)
+        with self._lock:
+            self._cache[limit] = (now + self.cache_seconds, topics)
+        return topics
+    
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+topics_service = TopicsService()
@@ -0,0 +1,174 @@
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+import numpy as np
+from app.core.neo4j_driver import get_neo4j_driver
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Rolled-up relationship type -> trend dimension; papers' categories are the
+# "category" dimension
+TREND_RELATIONSHIPS = {
+    'INTRODUCES': 'concept',
+    'PROPOSES': 'method',
+    'EVALUATES_ON': 'dataset',
+}
+TREND_DIMENSIONS = ('concept', 'method', 'dataset', 'category')
+TREND_GRANULARITIES = ('week', 'month')
+
+# Periods before the current one that momentum is measured against
+TREND_HISTORY_PERIODS = 8
+# Names with fewer papers in the current period are not ranked
+TREND_MIN_COUNT = 3
+
+# Count a paper `p` into its week and month TrendBuckets: each relationship
+# (flagged rolled_up) and the paper's categories (flagged on the paper) are
+# counted once, however often this runs
+ROLLUP_PAPER_BODY = """
+WITH p, [
+    {granularity: 'week', start: date.truncate('week', p.published_date)},
+    {granularity: 'month', start: date.truncate('month', p.published_date)}
+] AS periods
+CALL {
+    WITH p
+    MATCH (p)-[r:INTRODUCES|PROPOSES|EVALUATES_ON]->(e)
+    WHERE r.rolled_up IS NULL AND e.name IS NOT NULL
+    SET r.rolled_up = true
+    RETURN $dimensions[type(r)] AS dimension, e.name AS name
+    UNION ALL
+    WITH p
+    WITH p WHERE p.categories_rolled_up IS NULL
+    SET p.categories_rolled_up = true
+    WITH p
+    UNWIND COALESCE(p.categories, []) AS category
+    RETURN 'category' AS dimension, category AS name
+}
+UNWIND periods AS period
+MERGE (b:TrendBucket {key: dimension + '|' + name + '|' + period.granularity + '|' + toString(period.start)})
+ON CREATE SET
+    b.dimension = dimension,
+    b.name = name,
+    b.granularity = period.granularity,
+    b.start = period.start,
+    b.count = 0
+SET b.count = b.count + 1
+"""
+
+ROLLUP_PAPER_QUERY = """
+MATCH (p:Paper {arxiv_id: $arxiv_id})
+WHERE p.published_date IS NOT NULL
+""" + ROLLUP_PAPER_BODY
+
+
+def rollup_paper_trends(tx, arxiv_id: str):
+    """Add a paper's new entity links and categories to the trend rollups, in the caller's unit of work"""
+    tx.run(ROLLUP_PAPER_QUERY, {
+        'arxiv_id': arxiv_id,
+        'dimensions': TREND_RELATIONSHIPS
+    }, name='trends.rollup_paper')
+
+
+def period_start(day: date, granularity: str) -> date:
+    """Start of the week (Monday, as date.truncate) or month containing `day`"""
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def period_starts(current: date, granularity: str, count: int) -> List[date]:
+    """Starts of the `count` periods ending with `current`, oldest first"""
+    if granularity == 'week':
+        return [current - timedelta(weeks=offset) for offset in range(count - 1, -1, -1)]
+    starts = []
+    year, month = current.year, current.month
+    for _ in range(count):
+        starts.append(date(year, month, 1))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return starts[::-1]
+
+
+def momentum(series: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Per-row momentum of count series (names x periods, last column is the
+    current period): growth over the previous period and the z-score of the
+    current count against the earlier periods.
+    """
+    current = series[:, -1]
+    previous = series[:, -2] if series.shape[1] > 1 else np.zeros(len(series))
+    history = series[:, :-1] if series.shape[1] > 1 else np.zeros((len(series), 1))
+    mean = history.mean(axis=1)
+    # A floor of 1 keeps names with a flat history from getting infinite scores
+    std = np.maximum(history.std(axis=1), 1.0)
+    return {
+        'growth': (current - previous) / np.maximum(previous, 1.0),
+        'zscore': (current - mean) / std,
+        'mean': mean,
+    }
+
+
+class TrendsService:
+    def __init__(self):
+        self.driver = get_neo4j_driver()
+
+    def rollup_paper(self, arxiv_id: str):
+        """Roll up one paper in its own transaction"""
+        with self.driver.transaction(name='trends.rollup') as tx:
+            rollup_paper_trends(tx, arxiv_id)
+
+    def get_trends(
+        self,
+        dimension: str = 'concept',
+        granularity: str = 'month',
+        period: Optional[date] = None,
+        history: int = TREND_HISTORY_PERIODS,
+        min_count: int = TREND_MIN_COUNT,
+        sort: str = 'zscore',
+        limit: int = 20
+    ) -> dict:
+        """
+        Names ranked by momentum in `period` (default: the latest period
+        with data), read from the precomputed TrendBuckets
+        """
+        if period is None:
+            period = self.driver.latest_trend_period(dimension, granularity)
+            if period is None:
+                return {'dimension': dimension, 'granularity': granularity, 'period': None, 'trends': []}
+        else:
+            period = period_start(period, granularity)
+
+        starts = period_starts(period, granularity, history + 1)
+        column = {start: idx for idx, start in enumerate(starts)}
+        buckets = self.driver.get_trend_buckets(dimension, granularity, starts[0], starts[-1])
+
+        names: Dict[str, int] = {}
+        series = np.zeros((len({bucket['name'] for bucket in buckets}), len(starts)))
+        for bucket in buckets:
+            row = names.setdefault(bucket['name'], len(names))
+            series[row, column[date.fromisoformat(str(bucket['start'])[:10])]] = bucket['count']
+
+        scores = momentum(series)
+        ranked = np.flatnonzero(series[:, -1] >= min_count)
+        key = series[:, -1] if sort == 'count' else scores[sort]
+        ranked = ranked[np.lexsort((-series[ranked, -1], -key[ranked]))][:limit]
+
+        by_row = list(names)
+        return {
+            'dimension': dimension,
+            'granularity': granularity,
+            'period': period.isoformat(),
+            'history_periods': history,
+            'trends': [
+                {
+                    'name': by_row[row],
+                    'count': int(series[row, -1]),
+                    'previous': int(series[row, -2]) if len(starts) > 1 else 0,
+                    'mean': round(float(scores['mean'][row]), 2),
+                    'growth': round(float(scores['growth'][row]), 3),
+                    'zscore': round(float(scores['zscore'][row]), 3),
+                    'series': [int(count) for count in series[row]],
+                }
+                for row in ranked
+            ],
+        }
+
+trends_service = TrendsService()
@@ -0,0 +1,164 @@
+"""
+Benchmark: Hugging Face enrichment against a local stub HF server.
+
+Compares the legacy sequential fetch pattern (two blocking requests per
+paper, no session reuse) with the async pooled engine in
+scripts/enrich_huggingface.py. Neo4j writes are replaced by a recording
+driver so only the HTTP + orchestration cost is measured.
+
+Usage (from the repo root):
+    python benchmarks/bench_hf_enrichment.py --papers 200 --latency-ms 50
+"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / 'backend'))
+sys.path.insert(0, str(ROOT / 'scripts'))
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+import enrich_huggingface as hf
+
+hf.logger.setLevel('WARNING')
+
+
+class StubHFHandler(BaseHTTPRequestHandler):
+    """Serves /api/papers/{id} and /api/arxiv/{id}/repos with synthetic data"""
+    protocol_version = "HTTP/1.1"
+    latency = 0.05
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        parts = self.path.strip('/').split('/')
+
+        if parts[:2] == ['api', 'papers'] and len(parts) == 3:
+            body = {
+                'id': parts[2],
+                'upvotes': 42,
+                'discussionId': f"disc-{parts[2]}",
+                'ai_summary': 'A synthetic summary. ' * 10,
+                'ai_keywords': ['transformer', 'attention', 'benchmark'],
+                'publishedAt': '2025-01-01T00:00:00.000Z',
+                'githubRepo': f"https://github.com/stub/{parts[2]}",
+                'githubStars': 123,
+            }
+        elif parts[:2] == ['api', 'arxiv'] and len(parts) == 4:
+            body = {
+                'models': [{'id': f"stub/model-{parts[2]}-{i}", 'likes': i, 'downloads': i * 10, 'author': 'stub'} for i in range(5)],
+                'datasets': [{'id': f"stub/dataset-{parts[2]}-{i}", 'likes': i, 'downloads': i * 10, 'author': 'stub'} for i in range(2)],
+                'spaces': [{'id': f"stub/space-{parts[2]}", 'likes': 1, 'author': 'stub', 'sdk': 'gradio'}],
+            }
+        else:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class RecordingDriver:
+    """Stands in for Neo4jDriver; counts write transactions"""
+
+    def __init__(self):
+        self.writes = 0
+
+    def execute_write(self, query, parameters=None, name=None):
+        self.writes += 1
+        return [{
+            'repo_count': len(parameters.get('repositories', [])),
+            'model_count': len(parameters.get('models', [])),
+            'dataset_count': len(parameters.get('datasets', [])),
+            'space_count': len(parameters.get('spaces', [])),
+        }]
+
+
+def start_stub_server(latency: float):
+    StubHFHandler.latency = latency
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHFHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/api"
+
+
+def run_legacy(base_url: str, arxiv_ids):
+    """Legacy pattern: two blocking requests per paper, one write per entity"""
+    writes = 0
+    for arxiv_id in arxiv_ids:
+        metadata = requests.get(f"{base_url}/papers/{arxiv_id}", timeout=10).json()
+        repos = requests.get(f"{base_url}/arxiv/{arxiv_id}/repos", timeout=10).json()
+        writes += 1 + (1 if metadata.get('githubRepo') else 0)
+        writes += sum(len(repos.get(key, [])[:10]) for key in ('models', 'datasets', 'spaces'))
+    return writes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--papers', type=int, default=200)
+    parser.add_argument('--latency-ms', type=float, default=50)
+    parser.add_argument('--concurrency', type=int, default=hf.HF_MAX_CONCURRENCY)
+    parser.add_argument('--rps', type=float, default=0, help='rate limit for the async engine (0 = unlimited)')
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(args.latency_ms / 1000)
+    arxiv_ids = [f"2501.{i:05d}" for i in range(args.papers)]
+    papers = [{'arxiv_id': arxiv_id, 'title': f"Paper {arxiv_id}"} for arxiv_id in arxiv_ids]
+
+    try:
+        start = time.perf_counter()
+        legacy_writes = run_legacy(base_url, arxiv_ids)
+        legacy_seconds = time.perf_counter() - start
+
+        driver = RecordingDriver()
+        start = time.perf_counter()
+        stats = asyncio.run(hf.enrich_hf_papers(
+            driver,
+            papers,
+            base_url=base_url,
+            concurrency=args.concurrency,
+            requests_per_second=args.rps
+        ))
+        engine_seconds = time.perf_counter() - start
+    finally:
+        server.shutdown()
+
+    results = {
+        'benchmark': 'hf_enrichment',
+        'papers': args.papers,
+        'latency_ms': args.latency_ms,
+        'concurrency': args.concurrency,
+        'legacy': {
+            'seconds': round(legacy_seconds, 3),
+            # The legacy loop also slept 2s per paper
+            'seconds_with_sleep': round(legacy_seconds + 2 * args.papers, 3),
+            'write_transactions': legacy_writes,
+        },
+        'async_engine': {
+            'seconds': round(engine_seconds, 3),
+            'write_transactions': driver.writes,
+            'papers_enriched': stats['papers'],
+        },
+        'speedup': round(legacy_seconds / engine_seconds, 2) if engine_seconds else None,
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
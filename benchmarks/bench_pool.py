@@ -0,0 +1,172 @@
+"""
+Load test: Neo4j connection pool size vs latency under concurrency.
+
+For each pool size, `--concurrency` threads issue a mix of hot reads
+(list_papers first page, get_paper, search_papers) for `--duration`
+seconds through a fresh Neo4jDriver. Pool utilization is sampled while
+the load runs, so the results show where requests start queueing for a
+connection (waiters > 0) and what that does to p99.
+
+Needs a running Neo4j (NEO4J_* settings). With --seed-papers, the
+synthetic corpus is written first; use a scratch database for that.
+
+Usage (from the repo root):
+    python benchmarks/bench_pool.py --pool-sizes 5,10,25,50 --concurrency 64 --duration 20
+    python benchmarks/bench_pool.py --seed-papers 2000 --pool-sizes 10,50
+"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / 'backend'))
+sys.path.insert(0, str(ROOT / 'scripts'))
+
+import argparse
+import json
+import logging
+import random
+import statistics
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from app.core.config import settings
+from app.core.neo4j_driver import Neo4jDriver
+
+from bench_suite import Timings, git_commit, load_corpus, summarize
+from corpus import generate_corpus
+
+PAGE_SIZE = 20
+SAMPLE_INTERVAL_S = 0.05
+
+
+def read_mix(driver: Neo4jDriver, arxiv_ids: List[str], terms: List[str], rng: random.Random):
+    """One request from the API's hot read paths"""
+    roll = rng.random()
+    if roll < 0.4:
+        driver.list_papers(limit=PAGE_SIZE, offset=0)
+    elif roll < 0.8:
+        driver.get_paper(rng.choice(arxiv_ids))
+    else:
+        driver.search_papers(rng.choice(terms), limit=PAGE_SIZE)
+
+
+def run_load(pool_size: int, concurrency: int, duration: float, arxiv_ids: List[str], terms: List[str], seed: int) -> Dict:
+    settings.NEO4J_MAX_CONNECTION_POOL_SIZE = pool_size
+    driver = Neo4jDriver()
+    driver.connect()
+
+    samples: List[float] = []
+    errors: Dict[str, int] = {}
+    utilization: List[Dict] = []
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def worker(worker_id: int):
+        rng = random.Random(seed + worker_id)
+        local = []
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                read_mix(driver, arxiv_ids, terms, rng)
+                local.append(time.perf_counter() - start)
+            except Exception as e:
+                with lock:
+                    errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+        with lock:
+            samples.extend(local)
+
+    def sampler():
+        while not stop.wait(SAMPLE_INTERVAL_S):
+            stats = driver.pool_stats()
+            utilization.append({
+                'in_use': sum(counts['in_use'] for counts in stats['addresses'].values()),
+                'waiters': stats['waiters'],
+            })
+
+    try:
+        # Warm the pool and the page cache before measuring
+        warmup = random.Random(seed)
+        for _ in range(20):
+            read_mix(driver, arxiv_ids, terms, warmup)
+
+        threads = [threading.Thread(target=worker, args=(idx,)) for idx in range(concurrency)]
+        threads.append(threading.Thread(target=sampler))
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        driver.close()
+
+    result = summarize(samples) if samples else {'count': 0}
+    # ops_per_s is per-thread here; report wall-clock throughput instead
+    result.pop('ops_per_s', None)
+    result['throughput_per_s'] = round(len(samples) / elapsed, 1)
+    result['errors'] = errors
+    if utilization:
+        result['pool'] = {
+            'peak_in_use': max(row['in_use'] for row in utilization),
+            'peak_waiters': max(row['waiters'] for row in utilization),
+            'mean_waiters': round(statistics.fmean(row['waiters'] for row in utilization), 2),
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pool-sizes', default='5,10,25,50', help='comma-separated pool sizes to compare')
+    parser.add_argument('--concurrency', type=int, default=64, help='concurrent client threads')
+    parser.add_argument('--duration', type=float, default=20, help='seconds of load per pool size')
+    parser.add_argument('--acquisition-timeout', type=float, default=settings.NEO4J_CONNECTION_ACQUISITION_TIMEOUT)
+    parser.add_argument('--seed-papers', type=int, default=0, help='write a synthetic corpus of this size first')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write results JSON to this file')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    settings.NEO4J_CONNECTION_ACQUISITION_TIMEOUT = args.acquisition_timeout
+
+    driver = Neo4jDriver()
+    driver.connect()
+    try:
+        if args.seed_papers:
+            load_corpus(driver, generate_corpus(args.seed_papers, seed=args.seed), Timings())
+        papers = driver.list_papers(limit=1000)
+    finally:
+        driver.close()
+    if not papers:
+        sys.exit("No papers in the database; run with --seed-papers N")
+
+    arxiv_ids = [paper['arxiv_id'] for paper in papers]
+    terms = sorted({concept for paper in papers for concept in paper.get('graph_concepts') or []}) or ['learning']
+
+    results = {
+        'meta': {
+            'commit': git_commit(),
+            'neo4j_uri': settings.NEO4J_URI,
+            'database': settings.NEO4J_DATABASE or 'default',
+            'concurrency': args.concurrency,
+            'duration_s': args.duration,
+            'acquisition_timeout_s': args.acquisition_timeout,
+            'fetch_size': settings.NEO4J_FETCH_SIZE,
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+        },
+        'pool_sizes': {
+            size: run_load(size, args.concurrency, args.duration, arxiv_ids, terms, args.seed)
+            for size in (int(size) for size in args.pool_sizes.split(','))
+        },
+    }
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
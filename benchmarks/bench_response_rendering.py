@@ -0,0 +1,118 @@
+"""
+Benchmark: response serialization time and bytes-on-wire.
+
+Renders a 100-paper list page and a large paper graph with FastAPI's
+default JSONResponse (jsonable_encoder + json.dumps), ORJSONResponse and
+the raw dumps_raw path, then reports compressed sizes for gzip and
+brotli (when installed).
+
+Usage (from the repo root):
+    python benchmarks/bench_response_rendering.py --papers 100 --graph-nodes 5000
+"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / 'backend'))
+
+import argparse
+import gzip
+import json
+import timeit
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from app.core.config import settings
+from app.core.neo4j_driver import dumps_raw
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def build_papers_page(papers: int) -> dict:
+    return {
+        'papers': [
+            {
+                'arxiv_id': f"2501.{i:05d}v1",
+                'title': f"Synthetic Paper {i}: Scaling Attention for Long Contexts",
+                'abstract': f"We study long-context attention in model {i}. " * 30,
+                'categories': ['cs.CL', 'cs.LG'],
+                'pdf_url': f"https://arxiv.org/pdf/2501.{i:05d}v1",
+                'published_date': '2025-01-01',
+                'created_at': '2025-01-02T03:04:05.123456+00:00',
+                'hf_ai_summary': f"Summary for paper {i}. " * 10,
+                'authors': [f"Author {i}-{a}" for a in range(6)],
+                'graph_concepts': [f"Concept {c}" for c in range(8)],
+                'graph_methods': [f"Method {m}" for m in range(4)],
+            }
+            for i in range(papers)
+        ],
+        'page': 1,
+        'page_size': papers,
+        'total': papers,
+    }
+
+
+def build_graph(nodes: int) -> dict:
+    types = ['Author', 'Concept', 'Method', 'Dataset', 'Metric']
+    return {
+        'nodes': [{'id': '2501.00001', 'label': 'Hub Paper', 'type': 'Paper', 'properties': {}}] + [
+            {
+                'id': f"node-{i}",
+                'label': f"Entity {i}",
+                'type': types[i % len(types)],
+                'properties': {'name': f"Entity {i}", 'category': 'Other', 'description': ''},
+            }
+            for i in range(nodes)
+        ],
+        'edges': [
+            {'source': '2501.00001', 'target': f"node-{i}", 'type': 'INTRODUCES', 'label': 'INTRODUCES'}
+            for i in range(nodes)
+        ],
+        'center_node': '2501.00001',
+    }
+
+
+def measure(payload: dict, repeat: int) -> dict:
+    renderers = {
+        'json_response': lambda: JSONResponse(content=jsonable_encoder(payload)).body,
+        'orjson_response': lambda: ORJSONResponse(content=payload).body,
+        'dumps_raw': lambda: dumps_raw(payload),
+    }
+
+    timings = {}
+    for name, fn in renderers.items():
+        seconds = min(timeit.repeat(fn, number=repeat, repeat=3)) / repeat
+        timings[name] = round(seconds * 1000, 4)
+
+    body = dumps_raw(payload)
+    sizes = {
+        'identity': len(body),
+        f"gzip_{settings.GZIP_COMPRESSION_LEVEL}": len(gzip.compress(body, compresslevel=settings.GZIP_COMPRESSION_LEVEL)),
+    }
+    if brotli is not None:
+        sizes[f"brotli_{settings.BROTLI_QUALITY}"] = len(brotli.compress(body, quality=settings.BROTLI_QUALITY))
+
+    return {'render_ms': timings, 'bytes': sizes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--papers', type=int, default=100)
+    parser.add_argument('--graph-nodes', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    results = {
+        'benchmark': 'response_rendering',
+        'papers_page': measure(build_papers_page(args.papers), args.repeat),
+        'graph': measure(build_graph(args.graph_nodes), args.repeat),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
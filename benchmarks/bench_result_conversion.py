@@ -0,0 +1,127 @@
+"""
+Micro-benchmark: Neo4j result conversion in Neo4jDriver.
+
+Compares the legacy per-call closure converter, the module-level dispatch
+converter (convert_records) and the raw orjson path (dumps_raw) on a
+synthetic list_papers page. No database is needed; records are built from
+the driver's own value types.
+
+Usage (from the repo root):
+    python benchmarks/bench_result_conversion.py --papers 100 --repeat 200
+"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / 'backend'))
+
+import argparse
+import json
+import timeit
+
+from neo4j import Record
+from neo4j.time import Date, DateTime
+
+from app.core.neo4j_driver import convert_records, dumps_raw
+
+
+def legacy_convert_records(result):
+    """The pre-optimization converter, kept verbatim for comparison"""
+    def convert_value(value):
+        from neo4j.graph import Node, Relationship
+        from neo4j.time import DateTime, Date, Time, Duration
+        from datetime import datetime, date, time, timedelta
+
+        if isinstance(value, Node):
+            return {k: convert_value(v) for k, v in dict(value).items()}
+        elif isinstance(value, Relationship):
+            return {k: convert_value(v) for k, v in dict(value).items()}
+        elif isinstance(value, DateTime):
+            return datetime(
+                value.year, value.month, value.day,
+                value.hour, value.minute, value.second,
+                value.nanosecond // 1000
+            ).isoformat()
+        elif isinstance(value, Date):
+            return date(value.year, value.month, value.day).isoformat()
+        elif isinstance(value, Time):
+            return time(value.hour, value.minute, value.second, value.nanosecond // 1000).isoformat()
+        elif isinstance(value, Duration):
+            return value.seconds
+        elif isinstance(value, list):
+            return [convert_value(item) for item in value]
+        elif isinstance(value, dict):
+            return {k: convert_value(v) for k, v in value.items()}
+        else:
+            return value
+
+    return [
+        {key: convert_value(value) for key, value in record.items()}
+        for record in result
+    ]
+
+
+class FakeResult:
+    """Minimal stand-in for neo4j.Result: keys() + iteration over Records"""
+
+    def __init__(self, keys, records):
+        self._keys = keys
+        self._records = records
+
+    def keys(self):
+        return self._keys
+
+    def __iter__(self):
+        return iter(self._records)
+
+
+def build_page(papers: int):
+    records = []
+    for i in range(papers):
+        paper = {
+            'arxiv_id': f"2501.{i:05d}v1",
+            'title': f"Synthetic Paper {i}: Scaling Attention for Long Contexts",
+            'abstract': 'We study long-context attention in large language models. ' * 25,
+            'categories': ['cs.CL', 'cs.LG', 'cs.AI'],
+            'pdf_url': f"https://arxiv.org/pdf/2501.{i:05d}v1",
+            'published_date': Date(2025, 1, 1 + i % 28),
+            'created_at': DateTime(2025, 1, 2, 3, 4, 5, 123456789),
+            'updated_at': DateTime(2025, 2, 2, 3, 4, 5, 0),
+            'enriched': True,
+            'hf_upvotes': i,
+            'hf_keywords': [f"keyword-{k}" for k in range(8)],
+            'authors': [f"Author {i}-{a}" for a in range(6)],
+            'graph_concepts': [f"Concept {c}" for c in range(8)],
+            'graph_methods': [f"Method {m}" for m in range(4)],
+        }
+        records.append(Record({'paper': paper}))
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--papers', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    records = build_page(args.papers)
+    result = FakeResult(['paper'], records)
+
+    scenarios = {
+        'legacy_convert': lambda: legacy_convert_records(result),
+        'convert_records': lambda: convert_records(result),
+        'legacy_convert+json': lambda: json.dumps(legacy_convert_records(result)).encode(),
+        'convert_records+json': lambda: json.dumps(convert_records(result)).encode(),
+        'raw+orjson': lambda: dumps_raw([dict(zip(result.keys(), r)) for r in result]),
+    }
+
+    results = {'benchmark': 'result_conversion', 'papers': args.papers, 'repeat': args.repeat, 'ms_per_page': {}}
+    for name, fn in scenarios.items():
+        seconds = min(timeit.repeat(fn, number=args.repeat, repeat=3)) / args.repeat
+        results['ms_per_page'][name] = round(seconds * 1000, 4)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
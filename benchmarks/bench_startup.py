@@ -0,0 +1,183 @@
+"""
+Benchmark: API cold start and import-time budget.
+
+Each run is a fresh interpreter, as on a new serverless/autoscaled
+instance:
+    import    `python -X importtime -c "import app.main"`; the total, and
+              self time summed per top-level package (what to cut next)
+    startup   import app.main, run the lifespan startup (graph backend
+              connect) and serve the first GET /health, timed per phase
+              from inside the process; `ready_ms` is the wall time from
+              spawning the process to that first response
+
+The median app.main import time is checked against IMPORT_BUDGET_MS
+(exit 1 when over), so a module that starts doing heavy work at import
+fails the benchmark instead of slowing every cold start. The budget sits
+above the current 0.7-0.85 s (neo4j and fastapi are most of it) and
+below the 1.1 s it took when the OpenAI SDK was imported at startup;
+pass --budget-ms on slower hosts.
+
+Runs against the in-process backend (default), so no Neo4j is needed.
+
+Usage (from the repo root):
+    python benchmarks/bench_startup.py --runs 10
+    python benchmarks/bench_startup.py --backend neo4j --budget-ms 1200 --output startup.json
+"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / 'backend'))
+sys.path.insert(0, str(ROOT / 'scripts'))
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from bench_suite import git_commit, summarize
+
+BACKEND_DIR = ROOT / 'backend'
+
+# Median `import app.main` time allowed, in milliseconds
+IMPORT_BUDGET_MS = 1000
+
+# Top-level packages reported in the import breakdown
+TOP_PACKAGES = 10
+
+# Runs inside the measured process; prints per-phase timings as JSON
+STARTUP_SCRIPT = """
+import json, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from starlette.testclient import TestClient
+client_imported = time.perf_counter()
+with TestClient(app.main.app) as client:
+    ready = time.perf_counter()
+    status = client.get('/health').status_code
+    served = time.perf_counter()
+    served_at = time.time()
+print(json.dumps({
+    'import_s': imported - started,
+    'startup_s': ready - client_imported,
+    'first_request_s': served - ready,
+    'test_client_import_s': client_imported - imported,
+    'served_at': served_at,
+    'status': status,
+}))
+"""
+
+
+def child_env(backend: str) -> Dict[str, str]:
+    return {**os.environ, 'GRAPH_BACKEND': backend, 'PYTHONDONTWRITEBYTECODE': '1'}
+
+
+def run_importtime(env: Dict[str, str]) -> Dict:
+    """One `-X importtime` run: app.main cumulative time and self time per top-level package"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app.main'],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    total_us = None
+    packages: Dict[str, int] = defaultdict(int)
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        module = module.strip()
+        packages[module.split('.')[0]] += int(self_us)
+        if module == 'app.main':
+            total_us = int(cumulative_us)
+    return {'total_s': total_us / 1e6, 'packages': packages}
+
+
+def run_startup(env: Dict[str, str]) -> Dict:
+    """
+    One cold start. ready_s runs from spawning the process to the first
+    response (not to exit, which includes shutdown), less the test
+    client's own import.
+    """
+    spawned_at = time.time()
+    result = subprocess.run(
+        [sys.executable, '-c', STARTUP_SCRIPT],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings['ready_s'] = timings.pop('served_at') - spawned_at - timings.pop('test_client_import_s')
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=['memory', 'neo4j'], default='memory')
+    parser.add_argument('--runs', type=int, default=10, help='fresh processes per measurement')
+    parser.add_argument('--budget-ms', type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument('--output', help='write results JSON to this file')
+    args = parser.parse_args()
+
+    env = child_env(args.backend)
+    # Warm the OS file cache and write bytecode once, so runs measure a
+    # deployed image rather than the first import after a checkout
+    subprocess.run([sys.executable, '-c', 'import app.main'], cwd=BACKEND_DIR, env=os.environ, check=True,
+                   capture_output=True)
+
+    interpreter: List[float] = []
+    imports: List[Dict] = []
+    startups: List[Dict] = []
+    for _ in range(args.runs):
+        spawned = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], env=env, check=True)
+        interpreter.append(time.perf_counter() - spawned)
+        imports.append(run_importtime(env))
+        startups.append(run_startup(env))
+
+    packages: Dict[str, List[int]] = defaultdict(list)
+    for run in imports:
+        for package, self_us in run['packages'].items():
+            packages[package].append(self_us)
+    slowest = sorted(packages.items(), key=lambda item: statistics.median(item[1]), reverse=True)[:TOP_PACKAGES]
+
+    import_ms = statistics.median(run['total_s'] for run in imports) * 1000
+    results = {
+        'meta': {
+            'commit': git_commit(),
+            'backend': args.backend,
+            'runs': args.runs,
+            'python': platform.python_version(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+        },
+        'budget': {
+            'import_budget_ms': args.budget_ms,
+            'import_p50_ms': round(import_ms, 1),
+            'over_budget': import_ms > args.budget_ms,
+        },
+        'import_by_package_ms': {
+            package: round(statistics.median(samples) / 1000, 1) for package, samples in slowest
+        },
+        'scenarios': {
+            'interpreter': summarize(interpreter),
+            'import_app': summarize([run['total_s'] for run in imports]),
+            'startup.import': summarize([run['import_s'] for run in startups]),
+            'startup.lifespan': summarize([run['startup_s'] for run in startups]),
+            'startup.first_request': summarize([run['first_request_s'] for run in startups]),
+            'startup.ready': summarize([run['ready_s'] for run in startups]),
+        },
+    }
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    print(json.dumps(results, indent=2))
+
+    if results['budget']['over_budget']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
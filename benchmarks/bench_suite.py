@@ -0,0 +1,299 @@
+"""
+Benchmark suite: hot read paths and every ingest/enrich writer on a
+synthetic corpus (see benchmarks/corpus.py).
+
+The corpus is loaded through the real script writers, each call timed,
+then the read scenarios run against the loaded graph:
+    list_papers (first and deep pages), search_papers, get_paper,
+    get_paper_graph on hub papers, assistant retrieval (paper/concept/
+    method lookups per term). Enrichment claims (the lease-taking
+    selection queries) are timed with the writers.
+
+Runs against the in-process backend (default) or a local Neo4j with the
+schema from shared/graph_schema.cypher applied. Use a scratch database:
+the corpus is written into it.
+
+Results are JSON (per-scenario latency percentiles). Save them per
+commit and compare to catch regressions:
+    python benchmarks/bench_suite.py --papers 5000 --output before.json
+    python benchmarks/bench_suite.py --papers 5000 --compare before.json
+
+Usage (from the repo root):
+    python benchmarks/bench_suite.py --backend memory --papers 2000
+"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / 'backend'))
+sys.path.insert(0, str(ROOT / 'scripts'))
+
+import argparse
+import json
+import logging
+import platform
+import random
+import statistics
+import subprocess
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+from app.core.neo4j_driver import create_graph_backend, dumps_raw
+import enrich_authors_from_arxiv as authors_enrichment
+import enrich_huggingface as hf_enrichment
+import enrich_papers as entity_enrichment
+import ingest_arxiv
+import ingest_hf_papers
+
+from corpus import generate_corpus, hf_daily_entry
+
+# Scenarios whose p50 grew by more than this fraction are reported as regressions
+DEFAULT_REGRESSION_THRESHOLD = 0.2
+
+PAGE_SIZE = 20
+
+# Worker id the enrichment claims lease papers to
+BENCH_WORKER_ID = 'bench'
+
+
+class Timings:
+    """Per-scenario latency samples in seconds"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def time(self, scenario: str, func: Callable, *args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.samples[scenario].append(time.perf_counter() - start)
+        return result
+
+    def summary(self) -> Dict[str, Dict]:
+        return {scenario: summarize(samples) for scenario, samples in sorted(self.samples.items())}
+
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    idx = min(len(sorted_samples) - 1, max(0, round(pct / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[idx]
+
+
+def summarize(samples: List[float]) -> Dict:
+    ordered = sorted(samples)
+    total = sum(ordered)
+    return {
+        'count': len(ordered),
+        'total_s': round(total, 4),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 4),
+        'p50_ms': round(percentile(ordered, 50) * 1000, 4),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 4),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 4),
+        'max_ms': round(ordered[-1] * 1000, 4),
+        'ops_per_s': round(len(ordered) / total, 1) if total else None,
+    }
+
+
+def load_corpus(driver, papers: List[Dict], timings: Timings):
+    """Write the corpus through the script writers, timing every call"""
+    papers_by_id = {paper['arxiv_id']: paper for paper in papers}
+    arxiv_papers = [paper for paper in papers if paper['source'] == 'arxiv']
+    hf_papers = [paper for paper in papers if paper['source'] == 'huggingface']
+
+    for start in range(0, len(arxiv_papers), ingest_arxiv.INGEST_BATCH_SIZE):
+        timings.time(
+            'write.ingest_arxiv_batch', ingest_arxiv.write_arxiv_papers,
+            driver, arxiv_papers[start:start + ingest_arxiv.INGEST_BATCH_SIZE]
+        )
+    for start in range(0, len(hf_papers), ingest_hf_papers.INGEST_BATCH_SIZE):
+        timings.time(
+            'write.ingest_hf_batch', ingest_hf_papers.create_papers_from_hf,
+            driver, [hf_daily_entry(paper) for paper in hf_papers[start:start + ingest_hf_papers.INGEST_BATCH_SIZE]]
+        )
+
+    # HF daily papers arrive without authors
+    missing = timings.time(
+        'read.select_papers_without_authors', authors_enrichment.select_papers_without_authors,
+        driver, len(papers)
+    )
+    batch = [
+        {
+            'arxiv_id': row['arxiv_id'],
+            'arxiv_base_id': authors_enrichment.strip_version(row['arxiv_id']),
+            'authors': papers_by_id[row['arxiv_id']]['authors'],
+        }
+        for row in missing if row['arxiv_id'] in papers_by_id
+    ]
+    for start in range(0, len(batch), authors_enrichment.ARXIV_BATCH_SIZE):
+        timings.time(
+            'write.add_authors_batch', authors_enrichment.add_authors_to_papers,
+            driver, batch[start:start + authors_enrichment.ARXIV_BATCH_SIZE]
+        )
+
+    timings.time('write.claim_unenriched', entity_enrichment.claim_unenriched_papers, driver, BENCH_WORKER_ID, 200)
+    writers = (
+        ('concepts', entity_enrichment.create_concept),
+        ('methods', entity_enrichment.create_method),
+        ('datasets', entity_enrichment.create_dataset),
+        ('metrics', entity_enrichment.create_metric),
+    )
+
+    def enrich_paper(paper: Dict):
+        # Mirrors enrich_papers: all entity writes of a paper in one transaction
+        with driver.transaction(name='enrich.paper') as tx:
+            for key, writer in writers:
+                for entity in paper['entities'][key]:
+                    writer(tx, entity, paper['arxiv_id'])
+            entity_enrichment.rollup_paper_trends(tx, paper['arxiv_id'])
+            entity_enrichment.mark_paper_enriched(tx, paper['arxiv_id'])
+
+    for paper in papers:
+        timings.time('write.enrich_paper', enrich_paper, paper)
+
+    due = timings.time('write.claim_hf_due', hf_enrichment.claim_due_papers, driver, BENCH_WORKER_ID, len(papers))
+    for row in due:
+        paper = papers_by_id[row['arxiv_id']]
+        if paper['hf_metadata'] is None:
+            timings.time(
+                'write.hf_mark_not_found', hf_enrichment.mark_not_on_huggingface,
+                driver, row['arxiv_id'], row['published_date']
+            )
+            continue
+        params = hf_enrichment.build_hf_write_params(
+            row['arxiv_id'], paper['hf_metadata'], paper['hf_repos'], row['published_date']
+        )
+        timings.time('write.hf_enrichment', hf_enrichment.write_hf_enrichment, driver, params)
+
+
+def hub_papers(papers: List[Dict], count: int) -> List[str]:
+    """Papers with the most neighbors (authors + entities + HF repos)"""
+    def degree(paper):
+        return (
+            len(paper['authors'])
+            + sum(len(entities) for entities in paper['entities'].values())
+            + sum(len(repos) for repos in paper['hf_repos'].values())
+        )
+    return [paper['arxiv_id'] for paper in sorted(papers, key=degree, reverse=True)[:count]]
+
+
+def run_reads(driver, papers: List[Dict], timings: Timings, iterations: int, rng: random.Random):
+    total = len(papers)
+    deep_offset = max(0, total - PAGE_SIZE - total // 10)
+    concept_terms = sorted({c['name'] for p in papers for c in p['entities']['concepts']})
+    search_terms = [rng.choice(concept_terms) for _ in range(iterations)]
+
+    for _ in range(iterations):
+        timings.time('read.list_papers.first_page', driver.list_papers, limit=PAGE_SIZE, offset=0)
+        timings.time('read.list_papers.deep_page', driver.list_papers, limit=PAGE_SIZE, offset=deep_offset)
+        timings.time(
+            'read.list_papers_json.deep_page',
+            lambda: dumps_raw(driver.list_papers_raw(limit=PAGE_SIZE, offset=deep_offset))
+        )
+
+    for term in search_terms:
+        timings.time('read.search_papers', driver.search_papers, term, limit=20)
+
+    for _ in range(iterations):
+        timings.time('read.get_paper', driver.get_paper, rng.choice(papers)['arxiv_id'])
+
+    hubs = hub_papers(papers, min(10, total))
+    for idx in range(iterations):
+        timings.time('read.get_paper_graph.hub', driver.get_paper_graph, hubs[idx % len(hubs)])
+
+    def assistant_retrieval(term: str):
+        # Mirrors AssistantService._get_relevant_context for one extracted term
+        return (
+            driver.find_papers_by_term(term, limit=5),
+            driver.find_concepts_by_term(term, limit=5),
+            driver.find_methods_by_term(term, limit=5),
+        )
+
+    for term in search_terms:
+        timings.time('read.assistant_retrieval', assistant_retrieval, term.split()[-1])
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[Dict]:
+    """p50 change per scenario present in both runs"""
+    rows = []
+    for scenario, current in results['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(scenario)
+        if not before or not before['p50_ms']:
+            continue
+        change = current['p50_ms'] / before['p50_ms'] - 1
+        rows.append({
+            'scenario': scenario,
+            'baseline_p50_ms': before['p50_ms'],
+            'p50_ms': current['p50_ms'],
+            'change': round(change, 3),
+            'regression': change > threshold,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=['memory', 'neo4j'], default='memory')
+    parser.add_argument('--papers', type=int, default=2000)
+    parser.add_argument('--abstract-words', type=int, default=250)
+    parser.add_argument('--iterations', type=int, default=200, help='calls per read scenario')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write results JSON to this file')
+    parser.add_argument('--compare', help='baseline results JSON; exits 1 on regressions')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    rng = random.Random(args.seed)
+
+    generated = time.perf_counter()
+    papers = generate_corpus(args.papers, seed=args.seed, abstract_words=args.abstract_words)
+    generated = time.perf_counter() - generated
+
+    driver = create_graph_backend(args.backend)
+    driver.connect()
+    timings = Timings()
+    try:
+        load_corpus(driver, papers, timings)
+        run_reads(driver, papers, timings, args.iterations, rng)
+    finally:
+        driver.close()
+
+    results = {
+        'meta': {
+            'commit': git_commit(),
+            'backend': args.backend,
+            'papers': args.papers,
+            'abstract_words': args.abstract_words,
+            'iterations': args.iterations,
+            'seed': args.seed,
+            'corpus_generation_s': round(generated, 3),
+            'python': platform.python_version(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+        },
+        'scenarios': timings.summary(),
+    }
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        results['comparison'] = compare(results, baseline, args.threshold)
+
+    print(json.dumps(results, indent=2))
+
+    if args.compare and any(row['regression'] for row in results['comparison']):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
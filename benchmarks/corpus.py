@@ -0,0 +1,231 @@
+"""
+Synthetic corpus generator for the benchmark suite.
+
+Produces papers shaped like the inputs of the ingest/enrich writers:
+arXiv metadata with authors, extracted entities (concepts, methods,
+datasets, metrics) and Hugging Face metadata/repos. Entity and author
+popularity follow a Zipf (power-law) distribution, so a few hubs are
+linked from many papers while most entities appear once or twice.
+Abstracts are long (~250 words by default) and mention the paper's
+concepts, so text search and assistant retrieval have realistic hits.
+
+Deterministic for a given seed.
+"""
+import random
+from bisect import bisect
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Dict, List
+
+WORDS = (
+    "model models learning neural network networks training data dataset task tasks "
+    "performance results method approach propose proposed show demonstrate achieve "
+    "state art benchmark benchmarks large language vision image text representation "
+    "representations attention transformer layer layers parameters efficient efficiency "
+    "scaling scale inference generation generative diffusion reinforcement policy agent "
+    "reward optimization gradient loss objective supervised unsupervised self contrastive "
+    "pretraining fine tuning downstream evaluation accuracy robust robustness "
+    "generalization distribution shift adversarial graph node embedding embeddings "
+    "retrieval augmented reasoning chain thought prompt prompting instruction alignment "
+    "human feedback preference safety multimodal audio speech video temporal spatial "
+    "sparse dense mixture experts memory compute latency throughput hardware quantization "
+    "pruning distillation teacher student architecture module encoder decoder token "
+    "tokens sequence length context window long short framework analysis theoretical "
+    "empirical experiments extensive significant improvement baseline baselines novel "
+    "simple effective existing prior work limitations future code available"
+).split()
+
+CONCEPT_HEADS = (
+    "Attention", "Transformer", "Diffusion", "Contrastive Learning", "Reinforcement Learning",
+    "Graph Neural Network", "Retrieval", "Alignment", "Distillation", "Quantization",
+    "Tokenization", "Embedding", "Reasoning", "Planning", "Memory", "Mixture of Experts",
+    "Scaling Law", "Representation Learning", "Domain Adaptation", "Federated Learning",
+)
+MODIFIERS = (
+    "Sparse", "Linear", "Hierarchical", "Multi-Scale", "Causal", "Latent", "Adaptive",
+    "Efficient", "Robust", "Self-Supervised", "Multimodal", "Recurrent", "Conditional",
+    "Continual", "Bayesian", "Differentiable", "Implicit", "Structured", "Streaming", "Neural",
+)
+METHOD_HEADS = (
+    "Optimizer", "Dropout", "Normalization", "Sampling", "Decoding", "Pruning", "Warmup",
+    "Regularization", "Augmentation", "Loss", "Routing", "Caching", "Search", "Estimator",
+)
+DATASET_HEADS = ("Bench", "QA", "Net", "Corpus", "Eval", "Suite", "Set", "Arena")
+METRIC_NAMES = (
+    "Accuracy", "F1 Score", "BLEU", "ROUGE-L", "Perplexity", "Exact Match", "mAP", "FID",
+    "Recall@10", "NDCG@10", "Top-1 Accuracy", "Win Rate", "Pass@1", "Latency", "Throughput",
+)
+FIRST_NAMES = (
+    "Wei", "Anna", "Rahul", "Maria", "Chen", "David", "Yuki", "Fatima", "Lucas", "Sara",
+    "Jin", "Omar", "Elena", "Kwame", "Priya", "Noah", "Mei", "Ivan", "Aisha", "Tom",
+)
+LAST_NAMES = (
+    "Zhang", "Smith", "Patel", "Garcia", "Wang", "Kim", "Nguyen", "Müller", "Silva", "Rossi",
+    "Tanaka", "Ali", "Kowalski", "Okafor", "Li", "Brown", "Ivanova", "Haddad", "Chen", "Lopez",
+)
+CATEGORIES = ("cs.AI", "cs.CL", "cs.LG", "cs.CV", "cs.NE", "stat.ML")
+CONCEPT_CATEGORIES = ("Architecture", "Training", "Evaluation", "Other")
+ALGORITHM_TYPES = ("optimization", "regularization", "attention", "other")
+DOMAINS = ("Computer Vision", "NLP", "Audio", "Other")
+
+
+class ZipfSampler:
+    """Draw items with probability proportional to 1 / rank**exponent"""
+
+    def __init__(self, items: List, exponent: float, rng: random.Random):
+        self.items = items
+        self.rng = rng
+        self.cumulative = list(accumulate(1.0 / (rank ** exponent) for rank in range(1, len(items) + 1)))
+
+    def sample(self, k: int) -> List:
+        """k distinct items (fewer if the pool is smaller)"""
+        k = min(k, len(self.items))
+        chosen = {}
+        total = self.cumulative[-1]
+        while len(chosen) < k:
+            idx = bisect(self.cumulative, self.rng.random() * total)
+            chosen.setdefault(min(idx, len(self.items) - 1), None)
+        return [self.items[idx] for idx in chosen]
+
+
+def _names(heads, modifiers, count: int, rng: random.Random) -> List[str]:
+    """`count` unique names from modifier/head combinations, numbered once exhausted"""
+    combos = [f"{modifier} {head}" for head in heads for modifier in modifiers] + list(heads)
+    rng.shuffle(combos)
+    names = combos[:count]
+    generation = 2
+    while len(names) < count:
+        names.extend(f"{name} {generation}" for name in combos[:count - len(names)])
+        generation += 1
+    return names
+
+
+def _abstract(rng: random.Random, words: ZipfSampler, concepts: List[str], length: int) -> str:
+    tokens = [words.items[idx] for idx in _zipf_indices(words, length)]
+    for concept in concepts:
+        tokens.insert(rng.randrange(len(tokens) + 1), concept.lower())
+    sentences, start = [], 0
+    while start < len(tokens):
+        end = start + rng.randint(12, 28)
+        sentences.append(" ".join(tokens[start:end]).capitalize() + ".")
+        start = end
+    return " ".join(sentences)
+
+
+def _zipf_indices(sampler: ZipfSampler, count: int) -> List[int]:
+    """Draw with replacement (word frequencies), returning item indices"""
+    total = sampler.cumulative[-1]
+    last = len(sampler.items) - 1
+    return [min(bisect(sampler.cumulative, sampler.rng.random() * total), last) for _ in range(count)]
+
+
+def generate_corpus(
+    n_papers: int,
+    seed: int = 42,
+    abstract_words: int = 250,
+    exponent: float = 1.1,
+    hf_fraction: float = 0.1
+) -> List[Dict]:
+    """
+    Generate `n_papers` papers. A `hf_fraction` share is marked as coming
+    from the Hugging Face daily feed (ingested without authors, which are
+    added later by the arXiv author enrichment). Papers not on Hugging Face
+    have `hf_metadata` set to None.
+    """
+    rng = random.Random(seed)
+
+    authors = [
+        f"{rng.choice(FIRST_NAMES)} {chr(65 + idx % 26)}. {rng.choice(LAST_NAMES)} {idx}"
+        for idx in range(max(50, int(n_papers * 0.8)))
+    ]
+    concepts = _names(CONCEPT_HEADS, MODIFIERS, max(40, n_papers // 8), rng)
+    methods = _names(METHOD_HEADS, MODIFIERS, max(30, n_papers // 10), rng)
+    datasets = _names(DATASET_HEADS, [name.split()[0] for name in CONCEPT_HEADS], max(20, n_papers // 25), rng)
+
+    author_sampler = ZipfSampler(authors, exponent, rng)
+    concept_sampler = ZipfSampler(concepts, exponent, rng)
+    method_sampler = ZipfSampler(methods, exponent, rng)
+    dataset_sampler = ZipfSampler(datasets, exponent, rng)
+    metric_sampler = ZipfSampler(list(METRIC_NAMES), exponent, rng)
+    word_sampler = ZipfSampler(WORDS, 1.0, rng)
+    # Paper popularity (upvotes, repos) is power-law too
+    upvote_ranks = ZipfSampler(list(range(n_papers)), exponent, rng)
+    popular = set(upvote_ranks.sample(max(1, n_papers // 20)))
+
+    start = date(2023, 1, 1)
+    papers = []
+    for idx in range(n_papers):
+        arxiv_id = f"{2301 + idx // 20000}.{idx % 20000:05d}v1"
+        paper_concepts = concept_sampler.sample(rng.randint(3, 8))
+        paper_methods = method_sampler.sample(rng.randint(2, 5))
+        published = start + timedelta(days=rng.randrange(700))
+        is_popular = idx in popular
+        upvotes = int(rng.paretovariate(1.2) * (40 if is_popular else 2))
+
+        source = 'huggingface' if rng.random() < hf_fraction else 'arxiv'
+        # Some arXiv papers never show up on Hugging Face
+        on_huggingface = source == 'huggingface' or is_popular or rng.random() < 0.7
+
+        papers.append({
+            'arxiv_id': arxiv_id,
+            'title': f"{paper_concepts[0]} with {paper_methods[0]} for {rng.choice(WORDS)} {rng.choice(WORDS)}",
+            'abstract': _abstract(rng, word_sampler, paper_concepts, abstract_words),
+            'published_date': published.isoformat(),
+            'pdf_url': f"https://arxiv.org/pdf/{arxiv_id}",
+            'categories': rng.sample(CATEGORIES, rng.randint(1, 3)),
+            'authors': author_sampler.sample(max(1, int(rng.expovariate(1 / 4.0)) + 1)),
+            'source': source,
+            'entities': {
+                'concepts': [
+                    {'name': name, 'category': rng.choice(CONCEPT_CATEGORIES), 'confidence': round(rng.uniform(0.7, 1.0), 2)}
+                    for name in paper_concepts
+                ],
+                'methods': [
+                    {'name': name, 'algorithm_type': rng.choice(ALGORITHM_TYPES)}
+                    for name in paper_methods
+                ],
+                'datasets': [
+                    {'name': name, 'domain': rng.choice(DOMAINS)}
+                    for name in dataset_sampler.sample(rng.randint(1, 3))
+                ],
+                'metrics': [
+                    {'name': name, 'higher_is_better': name not in ('Perplexity', 'FID', 'Latency')}
+                    for name in metric_sampler.sample(rng.randint(1, 3))
+                ],
+            },
+            'hf_metadata': None if not on_huggingface else {
+                'upvotes': upvotes,
+                'discussionId': f"d{idx}",
+                'ai_summary': f"Summary of {paper_concepts[0]}.",
+                'ai_keywords': [name.lower() for name in paper_concepts[:3]],
+                'publishedAt': f"{published.isoformat()}T00:00:00.000Z",
+                'githubRepo': f"https://github.com/lab{idx % 500}/repo{idx}" if is_popular or rng.random() < 0.3 else None,
+                'githubStars': upvotes * 10,
+            },
+            'hf_repos': {
+                'models': [
+                    {'id': f"org{idx % 300}/model-{idx}-{k}", 'likes': upvotes, 'downloads': upvotes * 100, 'author': f"org{idx % 300}"}
+                    for k in range(rng.randint(0, 6 if is_popular else 1))
+                ],
+                'datasets': [
+                    {'id': f"org{idx % 300}/data-{idx}-{k}", 'likes': upvotes // 2, 'downloads': upvotes * 20, 'author': f"org{idx % 300}"}
+                    for k in range(rng.randint(0, 2 if is_popular else 1))
+                ],
+                'spaces': [
+                    {'id': f"org{idx % 300}/space-{idx}-{k}", 'likes': upvotes // 4, 'author': f"org{idx % 300}", 'sdk': 'gradio'}
+                    for k in range(rng.randint(0, 3 if is_popular else 0))
+                ],
+            },
+        })
+    return papers
+
+
+def hf_daily_entry(paper: Dict) -> Dict:
+    """The paper as returned by the Hugging Face daily papers feed"""
+    return {
+        'id': paper['arxiv_id'],
+        'title': paper['title'],
+        'summary': paper['abstract'],
+        'publishedAt': paper['hf_metadata']['publishedAt'],
+        'upvotes': paper['hf_metadata']['upvotes'],
+    }
@@ -4,6 +4,8 @@ import { Badge } from "@/components/ui/badge";
 import { ScrollArea } from "@/components/ui/scroll-area";
 import { Network, Sparkles, FileText, ExternalLink } from "lucide-react";
 import { useNavigate } from "react-router-dom";
+import { useEffect, useState } from "react";
+import { paperAPI } from "@/services/api";
 
 export interface PaperData {
   title: string;
@@ -28,6 +30,13 @@ export interface PaperData {
   on_huggingface?: boolean;
 }
 
+interface RelatedPaper {
+  arxiv_id: string;
+  title: string;
+  published_date?: string;
+  score: number;
+}
+
 interface PaperDetailModalProps {
   paper: PaperData | null;
   open: boolean;
@@ -36,6 +45,24 @@ interface PaperDetailModalProps {
 
 export const PaperDetailModal = ({ paper, open, onOpenChange }: PaperDetailModalProps) => {
   const navigate = useNavigate();
+  const [relatedPapers, setRelatedPapers] = useState<RelatedPaper[]>([]);
+
+  // Load precomputed related papers when the modal opens
+  useEffect(() => {
+    setRelatedPapers([]);
+    if (!open || !paper?.arxiv_id) return;
+
+    let cancelled = false;
+    paperAPI
+      .getRelated(paper.arxiv_id)
+      .then((data) => {
+        if (!cancelled) setRelatedPapers(data.related || []);
+      })
+      .catch((error) => console.error("Failed to load related papers:", error));
+    return () => {
+      cancelled = true;
+    };
+  }, [open, paper?.arxiv_id]);
 
   if (!paper) return null;
 
@@ -187,6 +214,32 @@ export const PaperDetailModal = ({ paper, open, onOpenChange }: PaperDetailModal
                 </div>
               </div>
 
+              {/* Related papers */}
+              {relatedPapers.length > 0 && (
+                <div>
+                  <h3 className="text-xs font-bold text-muted-foreground uppercase tracking-wider mb-3">
+                    RELATED PAPERS
+                  </h3>
+                  <ul className="space-y-2">
+                    {relatedPapers.map((related) => (
+                      <li key={related.arxiv_id} className="flex items-baseline justify-between gap-4">
+                        <a
+                          href={`https://arxiv.org/abs/${related.arxiv_id}`}
+                          target="_blank"
+                          rel="noopener noreferrer"
+                          className="text-foreground hover:text-accent-primary font-medium"
+                        >
+                          {related.title}
+                        </a>
+                        <span className="text-muted-foreground text-sm flex-shrink-0">
+                          {related.published_date?.slice(0, 4)}
+                        </span>
+                      </li>
+                    ))}
+                  </ul>
+                </div>
+              )}
+
               {/* Action buttons */}
               <div className="flex flex-wrap gap-3 pt-4 border-t border-border">
                 <Button
@@ -5,7 +5,7 @@ import heroBackground from "@/assets/hero-background.jpg";
 import { PaperDetailModal, type PaperData } from "@/components/PaperDetailModal";
 import { EnhancedSearchBar } from "@/components/EnhancedSearchBar";
 import { useNavigate } from "react-router-dom";
-import { paperAPI } from "@/services/api";
+import { paperAPI, trendsAPI, type Trend } from "@/services/api";
 
 const Dashboard = () => {
   const [searchQuery, setSearchQuery] = useState("");
@@ -15,11 +15,16 @@ const Dashboard = () => {
   const [searchResults, setSearchResults] = useState<PaperData[]>([]);
   const [loading, setLoading] = useState(true);
   const [searching, setSearching] = useState(false);
+  const [risingConcepts, setRisingConcepts] = useState<Trend[]>([]);
   const [error, setError] = useState<string | null>(null);
   const navigate = useNavigate();
 
   useEffect(() => {
     loadTrendingPapers();
+    // Rising concepts are optional; the dashboard works without them
+    trendsAPI.get('concept', 'month', 8)
+      .then((data) => setRisingConcepts(data.trends || []))
+      .catch((err) => console.error('Failed to load trends:', err));
   }, []);
 
   // Search as user types (with debouncing)
@@ -338,6 +343,39 @@ const Dashboard = () => {
         </div>
       </section>
 
+      {/* Rising Concepts */}
+      {risingConcepts.length > 0 && (
+        <section className="max-w-7xl mx-auto px-6 lg:px-8 py-12">
+          <div className="mb-12">
+            <h2 className="text-4xl font-bold text-foreground mb-3">Rising Concepts</h2>
+            <p className="text-muted-foreground text-lg">Concepts growing fastest this month</p>
+          </div>
+
+          <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-8">
+            {risingConcepts.map((trend, idx) => (
+              <Card
+                key={trend.name}
+                className="group p-8 hover:shadow-xl transition-all duration-500 bg-card border-border rounded-2xl hover:-translate-y-1"
+                style={{
+                  animationDelay: `${idx * 0.1}s`,
+                  animation: 'slideIn 0.6s var(--ease-out-expo) forwards'
+                }}
+              >
+                <h3 className="font-bold text-xl mb-3 text-foreground leading-tight group-hover:text-accent-primary transition-colors">
+                  {trend.name}
+                </h3>
+                <p className="text-xs text-muted-foreground mb-4 font-medium">
+                  {trend.count} papers · {trend.previous} last month
+                </p>
+                <Badge className="bg-accent-primary/10 text-accent-primary border-accent-primary/20 text-xs font-medium px-3 py-1.5">
+                  {trend.growth >= 0 ? "+" : ""}{Math.round(trend.growth * 100)}%
+                </Badge>
+              </Card>
+            ))}
+          </div>
+        </section>
+      )}
+
       {/* Popular Concepts */}
       <section className="max-w-7xl mx-auto px-6 lg:px-8 py-12 pb-24">
         <div className="mb-12">
@@ -61,6 +61,34 @@ export const paperAPI = {
         const response = await api.get(API_CONFIG.ENDPOINTS.PAPER_GRAPH(arxivId));
         return response.data;
     },
+
+    // Get precomputed related papers
+    getRelated: async (arxivId: string, limit = 5) => {
+        const response = await api.get(API_CONFIG.ENDPOINTS.PAPER_RELATED(arxivId), {
+            params: { limit },
+        });
+        return response.data;
+    },
+};
+
+export interface Trend {
+    name: string;
+    count: number;
+    previous: number;
+    mean: number;
+    growth: number;
+    zscore: number;
+    series: number[];
+}
+
+export const trendsAPI = {
+    // Fastest-growing concepts/methods/datasets/categories in the latest period
+    get: async (dimension = 'concept', granularity = 'month', limit = 8) => {
+        const response = await api.get(API_CONFIG.ENDPOINTS.TRENDS, {
+            params: { dimension, granularity, limit },
+        });
+        return response.data as { period: string | null; trends: Trend[] };
+    },
 };
 
 export interface Message {
@@ -0,0 +1,150 @@
+import sys
+sys.path.append('../backend')
+
+from app.core.neo4j_driver import get_neo4j_driver
+from ingest_arxiv import COAUTHOR_MAX_AUTHORS
+from recompute_entity_degrees import recompute_degrees
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Rows per inner transaction
+COAUTHOR_BATCH_SIZE = 1000
+
+# Concept names kept per author profile
+AUTHOR_TOP_CONCEPTS = 5
+
+def delete_coauthored(driver, batch_size: int = COAUTHOR_BATCH_SIZE):
+    """Drop every COAUTHORED relationship"""
+    query = """
+    MATCH ()-[c:COAUTHORED]->()
+    CALL {
+        WITH c
+        DELETE c
+    } IN TRANSACTIONS OF $batch_size ROWS
+    """
+    driver.execute_auto_commit(query, {'batch_size': batch_size}, name='coauthors.delete')
+
+def build_coauthored(driver, batch_size: int = COAUTHOR_BATCH_SIZE, max_coauthors: int = COAUTHOR_MAX_AUTHORS):
+    """
+    One COAUTHORED per author pair (lower name first), weighted by shared
+    papers, paper by paper. Same shape as the ingest writers maintain.
+    Adds to existing weights: only run on a graph without COAUTHORED
+    (after delete_coauthored).
+    """
+    query = """
+    MATCH (p:Paper)
+    WHERE COUNT { (p)-[:AUTHORED_BY]->(:Author) } <= $max_coauthors
+    CALL {
+        WITH p
+        MATCH (a:Author)<-[:AUTHORED_BY]-(p)-[:AUTHORED_BY]->(b:Author)
+        WHERE a.name < b.name
+        MERGE (a)-[c:COAUTHORED]->(b)
+        ON CREATE SET c.weight = 0
+        SET c.weight = c.weight + 1,
+            c.first_collaborated = CASE WHEN c.first_collaborated IS NULL OR p.published_date < c.first_collaborated
+                                        THEN p.published_date ELSE c.first_collaborated END,
+            c.last_collaborated = CASE WHEN c.last_collaborated IS NULL OR p.published_date > c.last_collaborated
+                                       THEN p.published_date ELSE c.last_collaborated END
+    } IN TRANSACTIONS OF $batch_size ROWS
+    """
+    driver.execute_auto_commit(query, {
+        'batch_size': batch_size,
+        'max_coauthors': max_coauthors
+    }, name='coauthors.build')
+
+def backfill_coauthored(driver, batch_size: int = COAUTHOR_BATCH_SIZE, max_coauthors: int = COAUTHOR_MAX_AUTHORS) -> int:
+    """
+    Create COAUTHORED for author pairs that share papers but have none yet
+    (papers ingested before the writers maintained it), weighted by all
+    their shared papers. Pairs that already have one are left alone, so
+    re-runs change nothing. Returns relationships created.
+    """
+    query = """
+    MATCH (a:Author)
+    CALL {
+        WITH a
+        MATCH (a)<-[:AUTHORED_BY]-(p:Paper)-[:AUTHORED_BY]->(b:Author)
+        WHERE a.name < b.name
+          AND NOT EXISTS { (a)-[:COAUTHORED]->(b) }
+          AND COUNT { (p)-[:AUTHORED_BY]->(:Author) } <= $max_coauthors
+        WITH a, b, count(p) AS weight, min(p.published_date) AS first, max(p.published_date) AS last
+        CREATE (a)-[:COAUTHORED {weight: weight, first_collaborated: first, last_collaborated: last}]->(b)
+        RETURN count(*) AS created
+    } IN TRANSACTIONS OF $batch_size ROWS
+    RETURN sum(created) AS created
+    """
+    result = driver.execute_auto_commit(query, {
+        'batch_size': batch_size,
+        'max_coauthors': max_coauthors
+    }, name='coauthors.backfill')
+    return result[0]['created'] if result else 0
+
+def refresh_author_profiles(driver, batch_size: int = COAUTHOR_BATCH_SIZE, top_concepts: int = AUTHOR_TOP_CONCEPTS):
+    """Set first/last_published and top_concepts (by papers introducing them) on every author"""
+    query = """
+    MATCH (a:Author)
+    CALL {
+        WITH a
+        SET a.first_published = head(COLLECT {
+                MATCH (a)<-[:AUTHORED_BY]-(p:Paper)
+                WHERE p.published_date IS NOT NULL
+                RETURN p.published_date ORDER BY p.published_date LIMIT 1
+            }),
+            a.last_published = head(COLLECT {
+                MATCH (a)<-[:AUTHORED_BY]-(p:Paper)
+                WHERE p.published_date IS NOT NULL
+                RETURN p.published_date ORDER BY p.published_date DESC LIMIT 1
+            }),
+            a.top_concepts = COLLECT {
+                MATCH (a)<-[:AUTHORED_BY]-(:Paper)-[:INTRODUCES]->(c:Concept)
+                WITH c.name AS concept, count(*) AS papers
+                ORDER BY papers DESC, concept
+                LIMIT $top_concepts
+                RETURN concept
+            }
+    } IN TRANSACTIONS OF $batch_size ROWS
+    """
+    driver.execute_auto_commit(query, {
+        'batch_size': batch_size,
+        'top_concepts': top_concepts
+    }, name='authors.refresh_profiles')
+
+def build_coauthor_graph(rebuild: bool = False):
+    """
+    Batch job: author profile aggregates, and COAUTHORED for author pairs
+    from papers ingested before the writers maintained it. The writers keep
+    COAUTHORED and first/last_published current; top_concepts changes as
+    papers are enriched, so rerun this after enrich_papers.py. Safe to
+    rerun: existing COAUTHORED relationships are not touched.
+    rebuild=True (--rebuild) instead deletes every COAUTHORED and rebuilds
+    them from AUTHORED_BY, recounting weights and dates of existing pairs
+    too; it is destructive and rewrites the whole co-author graph.
+    """
+    driver = get_neo4j_driver()
+    driver.connect()
+
+    if rebuild:
+        logger.info("Rebuilding COAUTHORED relationships...")
+        delete_coauthored(driver)
+        build_coauthored(driver)
+        # COAUTHORED counts towards Author.degree
+        recompute_degrees(driver, 'Author')
+        logger.info("✅ COAUTHORED rebuilt")
+    else:
+        logger.info("Backfilling missing COAUTHORED relationships...")
+        created = backfill_coauthored(driver)
+        if created:
+            recompute_degrees(driver, 'Author')
+        logger.info(f"✅ {created} COAUTHORED relationships created")
+
+    logger.info("Refreshing author profiles...")
+    refresh_author_profiles(driver)
+    logger.info("✅ Author profiles refreshed")
+
+    driver.close()
+
+if __name__ == "__main__":
+    # --rebuild: delete and rebuild every COAUTHORED (destructive)
+    build_coauthor_graph(rebuild='--rebuild' in sys.argv)
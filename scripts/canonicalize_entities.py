@@ -0,0 +1,207 @@
+import sys
+sys.path.append('../backend')
+
+from typing import Dict, List
+from app.core.neo4j_driver import get_neo4j_driver
+from app.services.canonicalization_service import entity_canonicalizer
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Entity label -> incoming Paper relationship type
+CANONICAL_ENTITIES = {
+    'Concept': 'INTRODUCES',
+    'Method': 'PROPOSES',
+}
+
+WRITE_BATCH_SIZE = 500
+
+def fetch_entities(driver, label: str) -> List[Dict]:
+    """All entity names of a label with their paper degree"""
+    query = f"""
+    MATCH (e:{label})
+    RETURN e.name as name,
+           e.canonical_key as canonical_key,
+           COUNT {{ (:Paper)-[:{CANONICAL_ENTITIES[label]}]->(e) }} as degree
+    """
+    return driver.execute_read(
+        query, {'label': label, 'rel_type': CANONICAL_ENTITIES[label]}, name='canonicalize.fetch_entities'
+    )
+
+def plan_merges(entities: List[Dict]) -> List[Dict]:
+    """
+    For every canonical key with several nodes, keep the best-connected
+    node and merge the rest into it.
+    """
+    degree = {e['name']: e['degree'] for e in entities}
+    merges = []
+
+    groups = entity_canonicalizer.group_duplicates(degree)
+    for key, names in groups.items():
+        keep, *duplicates = sorted(names, key=lambda name: (-degree[name], name))
+        merges.extend({'keep': keep, 'duplicate': duplicate} for duplicate in duplicates)
+
+    return merges
+
+def duplicate_relationship_types(driver, label: str, merges: List[Dict]) -> List[Dict]:
+    """Relationship types (and directions) on the nodes about to be merged away"""
+    query = f"""
+    UNWIND $names AS name
+    MATCH (dup:{label} {{name: name}})-[r]-()
+    RETURN DISTINCT type(r) as type, startNode(r) = dup as outgoing
+    """
+    names = [merge['duplicate'] for merge in merges]
+    return driver.execute_read(query, {'label': label, 'names': names}, name='canonicalize.relationship_types')
+
+def move_relationships(driver, label: str, merges: List[Dict], rel_type: str, outgoing: bool) -> int:
+    """Copy one relationship type of every duplicate onto its kept node (MERGE, so re-runs are safe)"""
+    pattern = (
+        f"(dup)-[old:`{rel_type}`]->(other)" if outgoing else f"(other)-[old:`{rel_type}`]->(dup)"
+    )
+    moved = (
+        f"(keep)-[r:`{rel_type}`]->(other)" if outgoing else f"(other)-[r:`{rel_type}`]->(keep)"
+    )
+    query = f"""
+    UNWIND $merges AS merge
+    MATCH (keep:{label} {{name: merge.keep}})
+    MATCH (dup:{label} {{name: merge.duplicate}})
+    MATCH {pattern}
+    // Edges between the two nodes would become self-loops; they go with dup
+    WHERE other <> keep AND other <> dup
+    MERGE {moved}
+    ON CREATE SET r += properties(old)
+    RETURN count(old) as moved
+    """
+
+    total = 0
+    for start in range(0, len(merges), WRITE_BATCH_SIZE):
+        result = driver.execute_write(query, {
+            'label': label,
+            'rel_type': rel_type,
+            'outgoing': outgoing,
+            'merges': merges[start:start + WRITE_BATCH_SIZE]
+        }, name='canonicalize.move_relationships')
+        total += result[0]['moved'] if result else 0
+    return total
+
+def merge_duplicates(driver, label: str, merges: List[Dict]) -> int:
+    """
+    Move every relationship of the duplicates (paper edges and anything
+    else attached to them) onto the kept node, record aliases, delete the
+    duplicates and recount the kept node. Returns relationships moved.
+    """
+    moved = 0
+    for row in duplicate_relationship_types(driver, label, merges):
+        moved += move_relationships(driver, label, merges, row['type'], row['outgoing'])
+
+    query = f"""
+    UNWIND $merges AS merge
+    MATCH (keep:{label} {{name: merge.keep}})
+    MATCH (dup:{label} {{name: merge.duplicate}})
+    WITH keep, dup,
+         COALESCE(keep.aliases, [keep.name]) + COALESCE(dup.aliases, [dup.name]) as all_aliases
+    SET keep.aliases = reduce(acc = [], a IN all_aliases | CASE WHEN a IN acc THEN acc ELSE acc + a END)
+    DETACH DELETE dup
+
+    // Edges moved onto the kept node change its materialized counts
+    WITH DISTINCT keep
+    SET keep.paper_count = COUNT {{ MATCH (keep)--(p:Paper) RETURN DISTINCT p }},
+        keep.degree = COUNT {{ (keep)--() }}
+    """
+    for start in range(0, len(merges), WRITE_BATCH_SIZE):
+        driver.execute_write(
+            query, {'label': label, 'merges': merges[start:start + WRITE_BATCH_SIZE]}, name='canonicalize.merge'
+        )
+    return moved
+
+def backfill_canonical_keys(driver, label: str, entities: List[Dict], merges: List[Dict]) -> int:
+    """
+    Set canonical_key on every surviving node whose stored key is missing
+    or stale. Runs after merge_duplicates, so each computed key belongs to
+    exactly one node (the kept one of its group) and the unique constraint
+    holds. Stale keys are removed before any new key is set, so a key
+    moving from one node to another never exists on both.
+    """
+    removed = {merge['duplicate'] for merge in merges}
+    updates = []
+    for e in entities:
+        canonical_key = entity_canonicalizer.canonical_key(e['name'])
+        if e['name'] not in removed and canonical_key != e['canonical_key']:
+            updates.append({'name': e['name'], 'canonical_key': canonical_key, 'stale': e['canonical_key'] is not None})
+
+    clear_query = f"""
+    UNWIND $names AS name
+    MATCH (e:{label} {{name: name}})
+    REMOVE e.canonical_key
+    """
+    stale = [u['name'] for u in updates if u['stale']]
+    for start in range(0, len(stale), WRITE_BATCH_SIZE):
+        driver.execute_write(
+            clear_query, {'label': label, 'names': stale[start:start + WRITE_BATCH_SIZE]}, name='canonicalize.clear_keys'
+        )
+
+    query = f"""
+    UNWIND $updates AS update
+    MATCH (e:{label} {{name: update.name}})
+    SET e.canonical_key = update.canonical_key
+    """
+    for start in range(0, len(updates), WRITE_BATCH_SIZE):
+        driver.execute_write(
+            query, {'label': label, 'updates': updates[start:start + WRITE_BATCH_SIZE]}, name='canonicalize.backfill_keys'
+        )
+
+    return len(updates)
+
+def ensure_canonical_key_constraint(driver, label: str):
+    """
+    Replace the plain canonical_key index with a uniqueness constraint, so
+    concurrent enrichment workers MERGE onto one node per key. Needs the
+    duplicates merged first; creating the constraint fails otherwise.
+    """
+    name = f"{label.lower()}_canonical_key"
+    driver.execute_auto_commit(f"DROP INDEX {name} IF EXISTS", name='canonicalize.drop_key_index')
+    driver.execute_auto_commit(
+        f"CREATE CONSTRAINT {name}_unique IF NOT EXISTS FOR (e:{label}) REQUIRE e.canonical_key IS UNIQUE",
+        name='canonicalize.key_constraint'
+    )
+
+def canonicalize_entities(dry_run: bool = False, suggestion_threshold: float = 0.9):
+    """
+    Batch job: collapse Concept/Method nodes whose names share a canonical
+    key, backfill the key on the surviving nodes (then enforce one node per
+    key), and report fuzzy merge suggestions for keys that might belong in
+    the alias table. Safe to re-run after adding aliases.
+    """
+    driver = get_neo4j_driver()
+    driver.connect()
+
+    for label in CANONICAL_ENTITIES:
+        entities = fetch_entities(driver, label)
+        merges = plan_merges(entities)
+
+        logger.info(f"\n{'='*60}")
+        logger.info(f"{label}: {len(entities)} nodes, {len(merges)} duplicates to merge")
+        logger.info(f"{'='*60}")
+
+        for merge in merges[:20]:
+            logger.info(f"  {merge['duplicate']!r} -> {merge['keep']!r}")
+
+        if not dry_run:
+            # Merge first: backfilling before would give every duplicate its group's key
+            moved = merge_duplicates(driver, label, merges)
+            updated = backfill_canonical_keys(driver, label, entities, merges)
+            ensure_canonical_key_constraint(driver, label)
+            logger.info(f"  ✅ Edges moved: {moved}, nodes removed: {len(merges)}, keys updated: {updated}")
+
+        keys = {entity_canonicalizer.canonical_key(e['name']) for e in entities}
+        suggestions = entity_canonicalizer.suggest_merges(keys, threshold=suggestion_threshold)
+        if suggestions:
+            logger.info(f"  Fuzzy merge suggestions (add to ENTITY_ALIASES to apply):")
+            for left, right, score in suggestions[:20]:
+                logger.info(f"    {left!r} ~ {right!r} ({score})")
+
+    driver.close()
+
+if __name__ == "__main__":
+    canonicalize_entities(dry_run='--dry-run' in sys.argv)
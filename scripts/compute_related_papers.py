@@ -0,0 +1,32 @@
+import sys
+sys.path.append('../backend')
+
+from app.core.neo4j_driver import get_neo4j_driver
+from app.services.graph_analytics_service import graph_analytics_service
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def compute_related_papers(full: bool = False):
+    """
+    Batch job: top-k related papers per paper as SIMILAR_TO relationships,
+    served by GET /papers/{arxiv_id}/related. Run after enrich_papers.py;
+    by default only papers enriched since their last refresh (and the
+    papers they now rank among) are recomputed. full=True rebuilds all.
+    """
+    driver = get_neo4j_driver()
+    driver.connect()
+
+    logger.info(f"Computing related papers ({'full' if full else 'incremental'})...")
+    stats = graph_analytics_service.refresh_related_papers(full=full)
+    logger.info(
+        f"✅ Refreshed {stats['refreshed']} of {stats['papers']} papers "
+        f"({stats['with_related']} with related papers, {stats['features']} features)"
+    )
+    logger.info(f"  load {stats['load_s']}s, similarity {stats['similarity_s']}s, write {stats['write_s']}s")
+
+    driver.close()
+
+if __name__ == "__main__":
+    compute_related_papers(full='--full' in sys.argv)
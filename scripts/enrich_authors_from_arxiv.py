@@ -1,9 +1,11 @@
 import sys
 sys.path.append('../backend')
 
+import re
 import time
 import requests
 import xml.etree.ElementTree as ET
+from typing import Dict, Iterator, List
 from app.core.neo4j_driver import get_neo4j_driver
 import logging
 
@@ -12,85 +14,148 @@ logger = logging.getLogger(__name__)
 
 ARXIV_API_BASE = "http://export.arxiv.org/api/query"
 
-def fetch_arxiv_metadata(arxiv_id: str):
-    """Fetch paper metadata from arXiv API"""
-    # Remove version suffix if present (e.g., v1, v2)
-    base_id = arxiv_id.split('v')[0] if 'v' in arxiv_id else arxiv_id
-    
+# IDs resolved per arXiv API request (id_list is comma-separated)
+ARXIV_BATCH_SIZE = 100
+
+# Papers with more authors get no COAUTHORED pairs (quadratic in authors)
+COAUTHOR_MAX_AUTHORS = 50
+
+# arXiv asks for no more than one request every 3 seconds
+ARXIV_REQUEST_DELAY = 3
+
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+
+def strip_version(arxiv_id: str) -> str:
+    """Remove version suffix if present (e.g., v1, v2)"""
+    return re.sub(r'v\d+$', '', arxiv_id)
+
+def iter_arxiv_entries(arxiv_ids: List[str]) -> Iterator[Dict]:
+    """
+    Fetch metadata for many papers in one arXiv API request and yield
+    entries as they are parsed from the streamed Atom feed.
+    """
     params = {
-        'id_list': base_id,
-        'max_results': 1
+        'id_list': ','.join(strip_version(arxiv_id) for arxiv_id in arxiv_ids),
+        'max_results': len(arxiv_ids)
     }
-    
-    try:
-        response = requests.get(ARXIV_API_BASE, params=params, timeout=10)
+
+    with requests.get(ARXIV_API_BASE, params=params, timeout=60, stream=True) as response:
         response.raise_for_status()
-        
-        root = ET.fromstring(response.content)
-        ns = {'atom': 'http://www.w3.org/2005/Atom'}
-        
-        entry = root.find('atom:entry', ns)
-        if entry is None:
-            logger.warning(f"No entry found for {arxiv_id}")
-            return None
-        
-        # Extract authors
-        authors = []
-        for author in entry.findall('atom:author', ns):
-            name = author.find('atom:name', ns)
-            if name is not None:
-                authors.append(name.text)
-        
-        # Extract base ID from the response
-        id_url = entry.find('atom:id', ns).text
-        actual_arxiv_id = id_url.split('/abs/')[-1]
-        
-        return {
-            'arxiv_id': arxiv_id,
-            'arxiv_base_id': base_id,
-            'actual_arxiv_id': actual_arxiv_id,
-            'authors': authors
-        }
-        
-    except Exception as e:
-        logger.error(f"Error fetching arXiv metadata for {arxiv_id}: {e}")
-        return None
+        response.raw.decode_content = True
+
+        for _, elem in ET.iterparse(response.raw, events=('end',)):
+            if elem.tag != f'{ATOM_NS}entry':
+                continue
+
+            id_url = elem.findtext(f'{ATOM_NS}id', default='')
+            # Invalid IDs come back as error entries without an /abs/ URL
+            if '/abs/' in id_url:
+                actual_arxiv_id = id_url.split('/abs/')[-1]
+                authors = [
+                    name.text
+                    for name in elem.iterfind(f'{ATOM_NS}author/{ATOM_NS}name')
+                    if name.text
+                ]
+                yield {
+                    'arxiv_base_id': strip_version(actual_arxiv_id),
+                    'actual_arxiv_id': actual_arxiv_id,
+                    'authors': authors
+                }
 
-def add_authors_to_paper(driver, paper_data):
-    """Add authors and update arxiv_base_id for a paper"""
+            elem.clear()
+
+def fetch_arxiv_metadata_batch(arxiv_ids: List[str]) -> Dict[str, Dict]:
+    """
+    Fetch authors for a batch of papers from the arXiv API.
+    Returns metadata keyed by the requested arxiv_id.
+    """
+    by_base_id = {strip_version(arxiv_id): arxiv_id for arxiv_id in arxiv_ids}
+    results = {}
+
+    try:
+        for entry in iter_arxiv_entries(arxiv_ids):
+            arxiv_id = by_base_id.get(entry['arxiv_base_id'])
+            if arxiv_id is None:
+                continue
+            results[arxiv_id] = {'arxiv_id': arxiv_id, **entry}
+
+    except (requests.exceptions.RequestException, ET.ParseError) as e:
+        logger.error(f"Error fetching arXiv metadata for batch of {len(arxiv_ids)}: {e}")
+
+    return results
+
+def add_authors_to_papers(driver, papers: List[Dict]) -> int:
+    """Add authors and update arxiv_base_id for a batch of papers in one transaction"""
     query = """
-    MATCH (p:Paper {arxiv_id: $arxiv_id})
-    SET p.arxiv_base_id = $arxiv_base_id
-    
-    WITH p
-    UNWIND $authors AS author_name
+    UNWIND $papers AS paper
+    MATCH (p:Paper {arxiv_id: paper.arxiv_id})
+    SET p.arxiv_base_id = paper.arxiv_base_id,
+        p.updated_at = datetime()
+
+    WITH p, paper
+    OPTIONAL MATCH (p)-[:AUTHORED_BY]->(existing:Author)
+    WITH p, paper, collect(existing) AS existing_authors
+    UNWIND range(0, size(paper.authors) - 1) AS position
+    WITH p, existing_authors, position, paper.authors[position] AS author_name
     MERGE (a:Author {name: author_name})
-    ON CREATE SET 
+    ON CREATE SET
         a.id = toLower(replace(author_name, ' ', '-')),
-        a.created_at = datetime()
+        a.created_at = datetime(),
+        a.paper_count = 0,
+        a.degree = 0
     MERGE (p)-[r:AUTHORED_BY]->(a)
-    ON CREATE SET r.created_at = datetime()
+    ON CREATE SET
+        r.created_at = datetime(),
+        r.position = position,
+        a.paper_count = COALESCE(a.paper_count, 0) + 1,
+        a.degree = COALESCE(a.degree, 0) + 1,
+        a.first_published = CASE WHEN a.first_published IS NULL OR p.published_date < a.first_published
+                                 THEN p.published_date ELSE a.first_published END,
+        a.last_published = CASE WHEN a.last_published IS NULL OR p.published_date > a.last_published
+                                THEN p.published_date ELSE a.last_published END
+
+    // Co-authorship, as in ingest_arxiv.create_paper_node
+    WITH p, existing_authors, collect(DISTINCT a) AS authors
+    CALL {
+        WITH p, existing_authors, authors
+        UNWIND authors AS a
+        UNWIND authors AS b
+        WITH p, existing_authors, authors, a, b
+        WHERE size(authors) <= $max_coauthors
+          AND a.name < b.name AND NOT (a IN existing_authors AND b IN existing_authors)
+        MERGE (a)-[c:COAUTHORED]->(b)
+        ON CREATE SET
+            c.weight = 0,
+            a.degree = COALESCE(a.degree, 0) + 1,
+            b.degree = COALESCE(b.degree, 0) + 1
+        SET c.weight = c.weight + 1,
+            c.first_collaborated = CASE WHEN c.first_collaborated IS NULL OR p.published_date < c.first_collaborated
+                                        THEN p.published_date ELSE c.first_collaborated END,
+            c.last_collaborated = CASE WHEN c.last_collaborated IS NULL OR p.published_date > c.last_collaborated
+                                       THEN p.published_date ELSE c.last_collaborated END
+    }
+    RETURN count(DISTINCT p) as papers
     """
-    
+
     try:
-        driver.execute_write(query, {
-            'arxiv_id': paper_data['arxiv_id'],
-            'arxiv_base_id': paper_data['arxiv_base_id'],
-            'authors': paper_data['authors']
-        })
-        return True
+        result = driver.execute_write(query, {
+            'papers': [
+                {
+                    'arxiv_id': paper['arxiv_id'],
+                    'arxiv_base_id': paper['arxiv_base_id'],
+                    'authors': paper['authors']
+                }
+                for paper in papers
+            ],
+            'max_coauthors': COAUTHOR_MAX_AUTHORS
+        }, name='authors.add_batch')
+        return result[0]['papers'] if result else 0
     except Exception as e:
-        logger.error(f"Error adding authors to {paper_data['arxiv_id']}: {e}")
-        return False
+        logger.error(f"Error adding authors for batch of {len(papers)} papers: {e}")
+        return 0
 
-def enrich_papers_with_authors(limit: int = 100):
-    """
-    Enrich papers that don't have authors by fetching from arXiv API
-    """
-    driver = get_neo4j_driver()
-    driver.connect()
-    
-    # Get papers without authors
+def select_papers_without_authors(driver, limit: int) -> List[Dict]:
+    """Select papers that have no AUTHORED_BY relationships yet"""
     query = """
     MATCH (p:Paper)
     WHERE NOT EXISTS {
@@ -100,50 +165,51 @@ def enrich_papers_with_authors(limit: int = 100):
     RETURN p.arxiv_id as arxiv_id, p.title as title
     LIMIT $limit
     """
-    
-    papers = driver.execute_read(query, {'limit': limit})
-    
+    return driver.execute_read(query, {'limit': limit}, name='authors.select_missing')
+
+def enrich_papers_with_authors(limit: int = 1000, batch_size: int = ARXIV_BATCH_SIZE):
+    """
+    Enrich papers that don't have authors by fetching from arXiv API,
+    `batch_size` papers per request.
+    """
+    driver = get_neo4j_driver()
+    driver.connect()
+
+    # Get papers without authors
+    papers = select_papers_without_authors(driver, limit)
+
     logger.info(f"\n{'='*60}")
     logger.info(f"Found {len(papers)} papers without authors")
     logger.info(f"{'='*60}\n")
-    
+
     success_count = 0
     failed_count = 0
-    
-    for idx, paper in enumerate(papers, 1):
-        arxiv_id = paper['arxiv_id']
-        title = paper['title']
-        
-        logger.info(f"[{idx}/{len(papers)}] Processing: {arxiv_id}")
-        logger.info(f"  Title: {title[:60]}...")
-        
-        # Fetch metadata from arXiv
-        metadata = fetch_arxiv_metadata(arxiv_id)
-        
-        if metadata and metadata['authors']:
-            # Add authors to paper
-            if add_authors_to_paper(driver, metadata):
-                logger.info(f"  ✅ Added {len(metadata['authors'])} authors")
-                logger.info(f"  📝 Authors: {', '.join(metadata['authors'][:3])}{'...' if len(metadata['authors']) > 3 else ''}")
-                success_count += 1
-            else:
-                logger.error(f"  ❌ Failed to add authors")
-                failed_count += 1
-        else:
-            logger.warning(f"  ⚠️  No authors found on arXiv")
-            failed_count += 1
-        
-        # Rate limiting - arXiv asks for ~1 request per second
-        time.sleep(1.5)
-    
+
+    for start in range(0, len(papers), batch_size):
+        batch = papers[start:start + batch_size]
+        logger.info(f"[{start + len(batch)}/{len(papers)}] Fetching batch of {len(batch)} papers")
+
+        metadata = fetch_arxiv_metadata_batch([paper['arxiv_id'] for paper in batch])
+        found = [entry for entry in metadata.values() if entry['authors']]
+
+        written = add_authors_to_papers(driver, found) if found else 0
+        success_count += written
+        failed_count += len(batch) - written
+
+        logger.info(f"  ✅ Added authors to {written} papers ({len(batch) - written} without authors on arXiv)")
+
+        # Rate limiting - arXiv asks for one request every 3 seconds
+        if start + batch_size < len(papers):
+            time.sleep(ARXIV_REQUEST_DELAY)
+
     logger.info(f"\n{'='*60}")
     logger.info(f"✅ Author enrichment complete!")
     logger.info(f"Successfully enriched: {success_count} papers")
     logger.info(f"Failed: {failed_count} papers")
     logger.info(f"{'='*60}\n")
-    
+
     driver.close()
 
 if __name__ == "__main__":
     # Enrich all papers without authors
-    enrich_papers_with_authors(limit=200)
+    enrich_papers_with_authors(limit=10000)
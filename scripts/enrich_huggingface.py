@@ -1,68 +1,255 @@
 import sys
 sys.path.append('../backend')
 
-import time
-import requests
-from typing import Dict, List, Optional
+import os
+import asyncio
+import httpx
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from app.core.job_queue import default_worker_id
 from app.core.neo4j_driver import get_neo4j_driver
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+logging.getLogger("httpx").setLevel(logging.WARNING)
 
-HF_API_BASE = "https://huggingface.co/api"
+HF_API_BASE = os.getenv("HF_API_BASE", "https://huggingface.co/api")
 
-def get_hf_paper_metadata(arxiv_id: str) -> Optional[Dict]:
+# Concurrency / rate limiting (be respectful to the HF API)
+HF_MAX_CONCURRENCY = int(os.getenv("HF_MAX_CONCURRENCY", "8"))
+HF_REQUESTS_PER_SECOND = float(os.getenv("HF_REQUESTS_PER_SECOND", "5"))
+HF_REQUEST_TIMEOUT = 10
+# How long a claimed batch of due papers stays leased to one worker
+HF_LEASE_SECONDS = 600
+# Delay before retrying a paper whose HF requests (5xx, 429, timeouts) or write failed
+HF_RETRY_DELAY = timedelta(hours=1)
+
+# Max models / datasets / spaces linked per paper
+MAX_REPOS_PER_TYPE = 10
+
+EMPTY_REPOS = {'models': [], 'datasets': [], 'spaces': []}
+
+# Staleness tiers, fastest first: (tier, refresh interval)
+HF_REFRESH_TIERS = [
+    ('hourly', timedelta(hours=1)),
+    ('6h', timedelta(hours=6)),
+    ('daily', timedelta(days=1)),
+    ('weekly', timedelta(days=7)),
+    ('monthly', timedelta(days=30)),
+]
+
+# Paper age (days) -> base tier index into HF_REFRESH_TIERS
+HF_AGE_TIERS = [(7, 1), (30, 2), (180, 3)]
+HF_COLD_TIER = 4
+
+# Each threshold reached promotes a paper one tier faster
+HF_POPULARITY_THRESHOLDS = [20, 100]
+
+
+class RateLimiter:
+    """
+    Async rate limiter shared by all requests of one enrichment run.
+    Spaces request start times at least 1 / requests_per_second apart.
+    """
+
+    def __init__(self, requests_per_second: float):
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            wait = self._next_slot - now
+            if wait > 0:
+                await asyncio.sleep(wait)
+                now = loop.time()
+            self._next_slot = max(now, self._next_slot) + self.interval
+
+
+def compute_refresh_tier(
+    published_date: Optional[str],
+    upvotes: int = 0,
+    on_huggingface: bool = True,
+    now: Optional[datetime] = None
+) -> Tuple[str, datetime]:
+    """
+    Assign a staleness tier and next refresh time to a paper.
+    Hot new papers are refreshed hourly, old ones monthly. Papers not
+    (yet) on Hugging Face are retried daily while recent, then monthly.
+    """
+    now = now or datetime.now(timezone.utc)
+
+    try:
+        published = date.fromisoformat(str(published_date)[:10])
+        age_days = (now.date() - published).days
+    except (TypeError, ValueError):
+        age_days = None
+
+    if age_days is None:
+        tier_idx = HF_COLD_TIER
+    else:
+        tier_idx = next(
+            (idx for max_age, idx in HF_AGE_TIERS if age_days <= max_age),
+            HF_COLD_TIER
+        )
+
+    if not on_huggingface:
+        tier_idx = 2 if age_days is not None and age_days <= 30 else HF_COLD_TIER
+    else:
+        tier_idx -= sum(1 for threshold in HF_POPULARITY_THRESHOLDS if (upvotes or 0) >= threshold)
+        tier_idx = max(tier_idx, 0)
+
+    tier, interval = HF_REFRESH_TIERS[tier_idx]
+    return tier, now + interval
+
+def create_hf_client(base_url: str = HF_API_BASE, concurrency: int = HF_MAX_CONCURRENCY) -> httpx.AsyncClient:
+    """Create a pooled keep-alive HTTP client for the Hugging Face API"""
+    # Each in-flight paper issues two requests (metadata + repos)
+    return httpx.AsyncClient(
+        base_url=base_url,
+        timeout=HF_REQUEST_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=concurrency * 2,
+            max_keepalive_connections=concurrency * 2,
+        ),
+        headers={'Accept': 'application/json'},
+    )
+
+
+async def get_hf_paper_metadata(client: httpx.AsyncClient, limiter: RateLimiter, arxiv_id: str) -> Optional[Dict]:
     """
     Fetch paper metadata from Hugging Face Papers API.
     Endpoint: GET /api/papers/{arxiv_id}
+    Returns None only when the paper is not on Hugging Face (404); other
+    errors raise, so a transient failure is never recorded as "not found".
     """
     clean_id = arxiv_id.split('v')[0]
-    
+
     try:
-        url = f"{HF_API_BASE}/papers/{clean_id}"
-        logger.info(f"  🔍 Fetching metadata: {url}")
-        response = requests.get(url, timeout=10)
-        
+        await limiter.acquire()
+        response = await client.get(f"/papers/{clean_id}")
+
         if response.status_code == 404:
-            logger.info(f"  ℹ️  Paper not found on Hugging Face")
+            logger.info(f"  ℹ️  {arxiv_id}: paper not found on Hugging Face")
             return None
-        
+
         response.raise_for_status()
         return response.json()
-        
-    except requests.exceptions.RequestException as e:
-        logger.error(f"  ❌ Error fetching HF paper metadata: {e}")
-        return None
 
-def get_hf_paper_repos(arxiv_id: str) -> Optional[Dict]:
+    except httpx.HTTPError as e:
+        logger.error(f"  ❌ Error fetching HF paper metadata for {arxiv_id}: {e}")
+        raise
+
+async def get_hf_paper_repos(client: httpx.AsyncClient, limiter: RateLimiter, arxiv_id: str) -> Dict:
     """
     Fetch all models, datasets, and Spaces referencing this paper.
     Endpoint: GET /api/arxiv/{arxiv_id}/repos
+    Empty repos on 404; other errors raise, like get_hf_paper_metadata.
     """
     clean_id = arxiv_id.split('v')[0]
-    
+
     try:
-        url = f"{HF_API_BASE}/arxiv/{clean_id}/repos"
-        logger.info(f"  🔍 Fetching repos: {url}")
-        response = requests.get(url, timeout=10)
-        
+        await limiter.acquire()
+        response = await client.get(f"/arxiv/{clean_id}/repos")
+
         if response.status_code == 404:
-            logger.info(f"  ℹ️  No repos found")
-            return {'models': [], 'datasets': [], 'spaces': []}
-        
+            return dict(EMPTY_REPOS)
+
         response.raise_for_status()
         return response.json()
-        
-    except requests.exceptions.RequestException as e:
-        logger.error(f"  ❌ Error fetching HF repos: {e}")
-        return {'models': [], 'datasets': [], 'spaces': []}
 
-def update_paper_metadata(driver, arxiv_id: str, metadata: Dict):
-    """Update paper node with Hugging Face metadata"""
+    except httpx.HTTPError as e:
+        logger.error(f"  ❌ Error fetching HF repos for {arxiv_id}: {e}")
+        raise
+
+async def fetch_hf_paper(client: httpx.AsyncClient, limiter: RateLimiter, arxiv_id: str) -> Tuple[Optional[Dict], Dict]:
+    """Fetch metadata and repos for one paper concurrently; raises httpx.HTTPError on non-404 failures"""
+    metadata, repos = await asyncio.gather(
+        get_hf_paper_metadata(client, limiter, arxiv_id),
+        get_hf_paper_repos(client, limiter, arxiv_id),
+    )
+    return metadata, repos or dict(EMPTY_REPOS)
+
+def build_hf_write_params(arxiv_id: str, metadata: Dict, repos: Dict, published_date: Optional[str] = None) -> Dict:
+    """Flatten HF metadata + repos into parameters for the batched write"""
+    clean_id = arxiv_id.split('v')[0]
+    refresh_tier, next_refresh = compute_refresh_tier(published_date, metadata.get('upvotes', 0))
+
+    # GitHub repo from metadata is the PRIMARY source of repos for papers
+    repositories = []
+    github_repo = metadata.get('githubRepo')
+    if github_repo:
+        repositories.append({
+            'url': github_repo,
+            'name': github_repo.replace('https://github.com/', '').strip('/'),
+            'stars': metadata.get('githubStars', 0),
+        })
+
+    models = [
+        {
+            'id': model.get('id', ''),
+            'likes': model.get('likes', 0),
+            'downloads': model.get('downloads', 0),
+            'url': f"https://huggingface.co/{model.get('id', '')}",
+            'author': model.get('author', ''),
+        }
+        for model in (repos.get('models') or [])[:MAX_REPOS_PER_TYPE]
+        if model.get('id')
+    ]
+
+    datasets = [
+        {
+            'id': dataset.get('id', ''),
+            'likes': dataset.get('likes', 0),
+            'downloads': dataset.get('downloads', 0),
+            'url': f"https://huggingface.co/datasets/{dataset.get('id', '')}",
+            'author': dataset.get('author', ''),
+        }
+        for dataset in (repos.get('datasets') or [])[:MAX_REPOS_PER_TYPE]
+        if dataset.get('id')
+    ]
+
+    spaces = [
+        {
+            'id': space.get('id', ''),
+            'likes': space.get('likes', 0),
+            'url': f"https://huggingface.co/spaces/{space.get('id', '')}",
+            'author': space.get('author', ''),
+            'sdk': space.get('sdk', ''),
+        }
+        for space in (repos.get('spaces') or [])[:MAX_REPOS_PER_TYPE]
+        if space.get('id')
+    ]
+
+    return {
+        'arxiv_id': arxiv_id,
+        'upvotes': metadata.get('upvotes', 0),
+        'discussion_id': metadata.get('discussionId', ''),
+        'ai_summary': metadata.get('ai_summary', ''),
+        'keywords': metadata.get('ai_keywords', []),
+        'hf_url': f"https://huggingface.co/papers/{clean_id}",
+        'published_at': metadata.get('publishedAt', ''),
+        'refresh_tier': refresh_tier,
+        'next_refresh': next_refresh.isoformat(),
+        'repositories': repositories,
+        'models': models,
+        'datasets': datasets,
+        'spaces': spaces,
+    }
+
+def write_hf_enrichment(driver, params: Dict) -> Dict:
+    """
+    Write paper metadata plus all repositories, models, datasets and spaces
+    for one paper in a single transaction.
+    """
     query = """
     MATCH (p:Paper {arxiv_id: $arxiv_id})
-    SET 
+    SET
         p.hf_upvotes = $upvotes,
         p.hf_discussion_id = $discussion_id,
         p.hf_ai_summary = $ai_summary,
@@ -71,260 +258,348 @@ def update_paper_metadata(driver, arxiv_id: str, metadata: Dict):
         p.hf_published_at = $published_at,
         p.hf_enriched = true,
         p.hf_enriched_at = datetime(),
-        p.on_huggingface = true
+        p.hf_refresh_tier = $refresh_tier,
+        p.hf_next_refresh = datetime($next_refresh),
+        p.on_huggingface = true,
+        p.hf_claimed_by = null,
+        p.hf_lease_until = null,
+        p.updated_at = datetime()
+
+    WITH p
+    CALL {
+        WITH p
+        UNWIND $repositories AS repo
+        MERGE (r:Repository {url: repo.url})
+        ON CREATE SET
+            r.name = repo.name,
+            r.stars = repo.stars,
+            r.source = 'huggingface',
+            r.created_at = datetime()
+        ON MATCH SET
+            r.stars = repo.stars,
+            r.updated_at = datetime()
+        MERGE (r)-[rel:IMPLEMENTS]->(p)
+        ON CREATE SET rel.source = 'huggingface'
+        RETURN count(r) as repo_count
+    }
+    CALL {
+        WITH p
+        UNWIND $models AS model
+        MERGE (m:Model {id: model.id})
+        ON CREATE SET
+            m.name = model.id,
+            m.likes = model.likes,
+            m.downloads = model.downloads,
+            m.url = model.url,
+            m.author = model.author,
+            m.created_at = datetime()
+        ON MATCH SET
+            m.likes = model.likes,
+            m.downloads = model.downloads,
+            m.updated_at = datetime()
+        MERGE (m)-[r:CITES]->(p)
+        ON CREATE SET r.source = 'huggingface'
+        RETURN count(m) as model_count
+    }
+    CALL {
+        WITH p
+        UNWIND $datasets AS dataset
+        MERGE (d:Dataset {id: dataset.id})
+        ON CREATE SET
+            d.name = dataset.id,
+            d.likes = dataset.likes,
+            d.downloads = dataset.downloads,
+            d.url = dataset.url,
+            d.author = dataset.author,
+            d.created_at = datetime(),
+            d.paper_count = 0,
+            d.degree = 0
+        ON MATCH SET
+            d.likes = dataset.likes,
+            d.downloads = dataset.downloads,
+            d.updated_at = datetime()
+        MERGE (d)-[r:REFERENCES]->(p)
+        ON CREATE SET
+            r.source = 'huggingface',
+            d.paper_count = COALESCE(d.paper_count, 0)
+                + CASE WHEN COUNT { (p)--(d) } = 1 THEN 1 ELSE 0 END,
+            d.degree = COALESCE(d.degree, 0) + 1
+        RETURN count(d) as dataset_count
+    }
+    CALL {
+        WITH p
+        UNWIND $spaces AS space
+        MERGE (s:Space {id: space.id})
+        ON CREATE SET
+            s.name = space.id,
+            s.likes = space.likes,
+            s.url = space.url,
+            s.author = space.author,
+            s.sdk = space.sdk,
+            s.created_at = datetime()
+        ON MATCH SET
+            s.likes = space.likes,
+            s.updated_at = datetime()
+        MERGE (s)-[r:DEMONSTRATES]->(p)
+        ON CREATE SET r.source = 'huggingface'
+        RETURN count(s) as space_count
+    }
+    RETURN repo_count, model_count, dataset_count, space_count
     """
-    
-    try:
-        driver.execute_write(query, {
-            'arxiv_id': arxiv_id,
-            'upvotes': metadata.get('upvotes', 0),
-            'discussion_id': metadata.get('discussionId', ''),
-            'ai_summary': metadata.get('ai_summary', ''),
-            'keywords': metadata.get('ai_keywords', []),
-            'hf_url': f"https://huggingface.co/papers/{arxiv_id.split('v')[0]}",
-            'published_at': metadata.get('publishedAt', '')
-        })
-    except Exception as e:
-        logger.error(f"  ❌ Error updating paper metadata: {e}")
 
-def create_repository_from_metadata(driver, metadata: Dict, arxiv_id: str):
+    result = driver.execute_write(query, params, name='hf.write_enrichment')
+    return result[0] if result else {}
+
+def mark_not_on_huggingface(driver, arxiv_id: str, published_date: Optional[str] = None):
+    """Mark paper as attempted even if not found on HF and schedule a retry"""
+    refresh_tier, next_refresh = compute_refresh_tier(published_date, on_huggingface=False)
+    driver.execute_write("""
+        MATCH (p:Paper {arxiv_id: $arxiv_id})
+        SET p.hf_enriched = true,
+            p.hf_enriched_at = datetime(),
+            p.hf_refresh_tier = $refresh_tier,
+            p.hf_next_refresh = datetime($next_refresh),
+            p.on_huggingface = false,
+            p.hf_claimed_by = null,
+            p.hf_lease_until = null
+    """, {
+        'arxiv_id': arxiv_id,
+        'refresh_tier': refresh_tier,
+        'next_refresh': next_refresh.isoformat()
+    }, name='hf.mark_not_found')
+
+def reschedule_hf_retry(driver, arxiv_id: str):
     """
-    Create Repository node from paper metadata (githubRepo field).
-    This is the PRIMARY source of GitHub repos for papers.
+    Release a paper and retry it after HF_RETRY_DELAY when its requests
+    or its write failed, keeping its HF data, on_huggingface flag and
+    refresh tier as they were
+    """
+    driver.execute_write("""
+        MATCH (p:Paper {arxiv_id: $arxiv_id})
+        SET p.hf_next_refresh = datetime($next_refresh),
+            p.hf_claimed_by = null,
+            p.hf_lease_until = null
+    """, {
+        'arxiv_id': arxiv_id,
+        'next_refresh': (datetime.now(timezone.utc) + HF_RETRY_DELAY).isoformat()
+    }, name='hf.reschedule_retry')
+
+def schedule_unscheduled_papers(driver, batch_size: int = 1000) -> int:
+    """
+    Backfill hf_next_refresh for enriched papers that have never been
+    scheduled, making them due immediately.
     """
-    github_repo = metadata.get('githubRepo')
-    github_stars = metadata.get('githubStars', 0)
-    
-    if not github_repo:
-        return
-    
     query = """
-    MERGE (r:Repository {url: $url})
-    ON CREATE SET
-        r.name = $name,
-        r.stars = $stars,
-        r.source = 'huggingface',
-        r.created_at = datetime()
-    ON MATCH SET
-        r.stars = $stars,
-        r.updated_at = datetime()
-    
-    WITH r
-    MATCH (p:Paper {arxiv_id: $arxiv_id})
-    MERGE (r)-[rel:IMPLEMENTS]->(p)
-    ON CREATE SET rel.source = 'huggingface'
+    MATCH (p:Paper)
+    WHERE p.enriched = true AND p.hf_next_refresh IS NULL
+    WITH p LIMIT $batch_size
+    SET p.hf_next_refresh = datetime()
+    RETURN count(p) as scheduled
     """
-    
-    try:
-        repo_name = github_repo.replace('https://github.com/', '').strip('/')
-        driver.execute_write(query, {
-            'url': github_repo,
-            'name': repo_name,
-            'stars': github_stars,
-            'arxiv_id': arxiv_id
-        })
-        logger.info(f"  ✅ Repository: {repo_name} ({github_stars} ⭐)")
-    except Exception as e:
-        logger.error(f"  ❌ Error creating repository: {e}")
 
-def create_or_update_model(driver, model_data: Dict, arxiv_id: str):
-    """Create Model node and link to paper"""
+    total = 0
+    while True:
+        result = driver.execute_write(query, {'batch_size': batch_size}, name='hf.schedule_unscheduled')
+        scheduled = result[0]['scheduled'] if result else 0
+        total += scheduled
+        if scheduled < batch_size:
+            return total
+
+def claim_due_papers(
+    driver,
+    worker_id: str,
+    limit: int,
+    lease_seconds: int = HF_LEASE_SECONDS
+) -> List[Dict]:
+    """
+    Select up to `limit` due papers not leased to another worker, most
+    overdue first, and lease them to worker_id in one write transaction.
+    Uses its own hf_ lease fields so it never blocks entity enrichment.
+    """
     query = """
-    MERGE (m:Model {id: $model_id})
-    ON CREATE SET
-        m.name = $name,
-        m.likes = $likes,
-        m.downloads = $downloads,
-        m.url = $url,
-        m.author = $author,
-        m.created_at = datetime()
-    ON MATCH SET
-        m.likes = $likes,
-        m.downloads = $downloads,
-        m.updated_at = datetime()
-    
-    WITH m
-    MATCH (p:Paper {arxiv_id: $arxiv_id})
-    MERGE (m)-[r:CITES]->(p)
-    ON CREATE SET r.source = 'huggingface'
+    MATCH (p:Paper)
+    WHERE p.hf_next_refresh <= datetime()
+      AND (p.hf_lease_until IS NULL OR p.hf_lease_until < datetime())
+    WITH p ORDER BY p.hf_next_refresh LIMIT $limit
+    // Lock, then re-check: another worker may have claimed p since it was matched
+    SET p._claim_lock = true
+    REMOVE p._claim_lock
+    WITH p
+    WHERE p.hf_next_refresh <= datetime()
+      AND (p.hf_lease_until IS NULL OR p.hf_lease_until < datetime())
+    SET p.hf_claimed_by = $worker_id,
+        p.hf_lease_until = datetime() + duration({seconds: $lease_seconds})
+    RETURN p.arxiv_id as arxiv_id,
+           p.title as title,
+           p.published_date as published_date
     """
-    
-    try:
-        driver.execute_write(query, {
-            'model_id': model_data.get('id', ''),
-            'name': model_data.get('id', ''),
-            'likes': model_data.get('likes', 0),
-            'downloads': model_data.get('downloads', 0),
-            'url': f"https://huggingface.co/{model_data.get('id', '')}",
-            'author': model_data.get('author', ''),
-            'arxiv_id': arxiv_id
-        })
-    except Exception as e:
-        logger.error(f"  ❌ Error creating model: {e}")
+    return driver.execute_write(query, {
+        'worker_id': worker_id,
+        'limit': limit,
+        'lease_seconds': lease_seconds
+    }, name='hf.claim_due')
 
-def create_or_update_dataset(driver, dataset_data: Dict, arxiv_id: str):
-    """Create Dataset node and link to paper"""
+def has_unclaimed_due_papers(driver) -> bool:
+    """
+    Whether due papers remain that no worker holds a lease on.
+    claim_due_papers also returns nothing (or a partial batch) when
+    another worker claimed the same candidates first; this tells that
+    apart from having nothing due.
+    """
     query = """
-    MERGE (d:Dataset {id: $dataset_id})
-    ON CREATE SET
-        d.name = $name,
-        d.likes = $likes,
-        d.downloads = $downloads,
-        d.url = $url,
-        d.author = $author,
-        d.created_at = datetime()
-    ON MATCH SET
-        d.likes = $likes,
-        d.downloads = $downloads,
-        d.updated_at = datetime()
-    
-    WITH d
-    MATCH (p:Paper {arxiv_id: $arxiv_id})
-    MERGE (d)-[r:REFERENCES]->(p)
-    ON CREATE SET r.source = 'huggingface'
+    RETURN EXISTS {
+        MATCH (p:Paper)
+        WHERE p.hf_next_refresh <= datetime()
+          AND (p.hf_lease_until IS NULL OR p.hf_lease_until < datetime())
+    } as unclaimed
     """
-    
-    try:
-        driver.execute_write(query, {
-            'dataset_id': dataset_data.get('id', ''),
-            'name': dataset_data.get('id', ''),
-            'likes': dataset_data.get('likes', 0),
-            'downloads': dataset_data.get('downloads', 0),
-            'url': f"https://huggingface.co/datasets/{dataset_data.get('id', '')}",
-            'author': dataset_data.get('author', ''),
-            'arxiv_id': arxiv_id
-        })
-    except Exception as e:
-        logger.error(f"  ❌ Error creating dataset: {e}")
+    result = driver.execute_read(query, name='hf.has_unclaimed_due')
+    return bool(result and result[0]['unclaimed'])
 
-def create_or_update_space(driver, space_data: Dict, arxiv_id: str):
-    """Create Space node and link to paper"""
+def claim_papers(
+    driver,
+    worker_id: str,
+    arxiv_ids: List[str],
+    lease_seconds: int = HF_LEASE_SECONDS
+) -> List[Dict]:
+    """
+    Lease the given papers to worker_id, like claim_due_papers but for
+    papers picked elsewhere (e.g. just through entity extraction). Papers
+    not due or leased to another worker are left out; leases already held
+    by worker_id are renewed.
+    """
     query = """
-    MERGE (s:Space {id: $space_id})
-    ON CREATE SET
-        s.name = $name,
-        s.likes = $likes,
-        s.url = $url,
-        s.author = $author,
-        s.sdk = $sdk,
-        s.created_at = datetime()
-    ON MATCH SET
-        s.likes = $likes,
-        s.updated_at = datetime()
-    
-    WITH s
-    MATCH (p:Paper {arxiv_id: $arxiv_id})
-    MERGE (s)-[r:DEMONSTRATES]->(p)
-    ON CREATE SET r.source = 'huggingface'
+    UNWIND $arxiv_ids AS arxiv_id
+    MATCH (p:Paper {arxiv_id: arxiv_id})
+    WHERE p.hf_next_refresh <= datetime()
+      AND (p.hf_lease_until IS NULL OR p.hf_lease_until < datetime() OR p.hf_claimed_by = $worker_id)
+    // Lock, then re-check: another worker may have claimed p since it was matched
+    SET p._claim_lock = true
+    REMOVE p._claim_lock
+    WITH p
+    WHERE p.hf_next_refresh <= datetime()
+      AND (p.hf_lease_until IS NULL OR p.hf_lease_until < datetime() OR p.hf_claimed_by = $worker_id)
+    SET p.hf_claimed_by = $worker_id,
+        p.hf_lease_until = datetime() + duration({seconds: $lease_seconds})
+    RETURN p.arxiv_id as arxiv_id,
+           p.title as title,
+           p.published_date as published_date
     """
-    
-    try:
-        driver.execute_write(query, {
-            'space_id': space_data.get('id', ''),
-            'name': space_data.get('id', ''),
-            'likes': space_data.get('likes', 0),
-            'url': f"https://huggingface.co/spaces/{space_data.get('id', '')}",
-            'author': space_data.get('author', ''),
-            'sdk': space_data.get('sdk', ''),
-            'arxiv_id': arxiv_id
-        })
-    except Exception as e:
-        logger.error(f"  ❌ Error creating space: {e}")
+    return driver.execute_write(query, {
+        'worker_id': worker_id,
+        'arxiv_ids': arxiv_ids,
+        'lease_seconds': lease_seconds
+    }, name='hf.claim_papers')
 
-def enrich_huggingface(limit: int = 10):
+async def enrich_hf_papers(
+    driver,
+    papers: List[Dict],
+    base_url: str = HF_API_BASE,
+    concurrency: int = HF_MAX_CONCURRENCY,
+    requests_per_second: float = HF_REQUESTS_PER_SECOND
+) -> Dict[str, int]:
+    """
+    Async HF enrichment engine.
+    Fetches papers concurrently over one pooled client (bounded by `concurrency`
+    and `requests_per_second`) and writes each paper in one transaction.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(requests_per_second)
+    stats = {
+        'papers': 0,
+        'not_found': 0,
+        'failed': 0,
+        'repos': 0,
+        'models': 0,
+        'datasets': 0,
+        'spaces': 0,
+    }
+
+    async def process(client: httpx.AsyncClient, idx: int, paper: Dict):
+        arxiv_id = paper['arxiv_id']
+        title = paper.get('title') or ''
+
+        try:
+            async with semaphore:
+                metadata, repos = await fetch_hf_paper(client, limiter, arxiv_id)
+        except httpx.HTTPError:
+            await asyncio.to_thread(reschedule_hf_retry, driver, arxiv_id)
+            stats['failed'] += 1
+            return
+
+        try:
+            if not metadata:
+                await asyncio.to_thread(mark_not_on_huggingface, driver, arxiv_id, paper.get('published_date'))
+                stats['not_found'] += 1
+                return
+
+            params = build_hf_write_params(arxiv_id, metadata, repos, paper.get('published_date'))
+            counts = await asyncio.to_thread(write_hf_enrichment, driver, params)
+        except Exception as e:
+            logger.error(f"  ❌ Error writing HF data for {arxiv_id}: {e}")
+            # Release the claim; the paper is retried after HF_RETRY_DELAY
+            await asyncio.to_thread(reschedule_hf_retry, driver, arxiv_id)
+            stats['failed'] += 1
+            return
+
+        stats['papers'] += 1
+        stats['repos'] += counts.get('repo_count', 0)
+        stats['models'] += counts.get('model_count', 0)
+        stats['datasets'] += counts.get('dataset_count', 0)
+        stats['spaces'] += counts.get('space_count', 0)
+        logger.info(
+            f"[{idx}/{len(papers)}] ✅ {title[:60]}: {metadata.get('upvotes', 0)} upvotes, "
+            f"{len(params['models'])} models, {len(params['datasets'])} datasets, "
+            f"{len(params['spaces'])} spaces (next refresh: {params['refresh_tier']})"
+        )
+
+    async with create_hf_client(base_url, concurrency) as client:
+        await asyncio.gather(*(
+            process(client, idx, paper) for idx, paper in enumerate(papers, 1)
+        ))
+
+    return stats
+
+def enrich_huggingface(
+    limit: int = 10,
+    concurrency: int = HF_MAX_CONCURRENCY,
+    requests_per_second: float = HF_REQUESTS_PER_SECOND
+):
     """
     Main Hugging Face enrichment loop.
-    Fetches paper metadata + all related models, datasets, spaces, and repos.
+    Fetches paper metadata + all related models, datasets, spaces, and repos
+    for papers that are due per their staleness tier. See
+    refresh_huggingface.py for the continuous version.
     """
     driver = get_neo4j_driver()
     driver.connect()
-    
-    # Get papers without HF enrichment
-    query = """
-    MATCH (p:Paper)
-    WHERE p.enriched = true 
-    AND (p.hf_enriched IS NULL OR p.hf_enriched = false)
-    RETURN p.arxiv_id as arxiv_id, p.title as title
-    LIMIT $limit
-    """
-    
-    papers = driver.execute_read(query, {'limit': limit})
-    logger.info(f"Found {len(papers)} papers to enrich from Hugging Face\n")
-    
-    enriched_count = 0
-    total_models = 0
-    total_datasets = 0
-    total_spaces = 0
-    total_repos = 0
-    
-    for idx, paper in enumerate(papers, 1):
-        arxiv_id = paper['arxiv_id']
-        title = paper['title']
-        
-        logger.info(f"[{idx}/{len(papers)}] Processing: {title[:60]}...")
-        
-        # 1. Fetch paper metadata
-        metadata = get_hf_paper_metadata(arxiv_id)
-        
-        if not metadata:
-            # Mark as attempted even if not found
-            driver.execute_write("""
-                MATCH (p:Paper {arxiv_id: $arxiv_id})
-                SET p.hf_enriched = true, 
-                    p.hf_enriched_at = datetime(),
-                    p.on_huggingface = false
-            """, {'arxiv_id': arxiv_id})
-            logger.info("")
-            continue
-        
-        # Update paper with metadata
-        update_paper_metadata(driver, arxiv_id, metadata)
-        logger.info(f"  ✅ Metadata: {metadata.get('upvotes', 0)} upvotes")
-        
-        # Extract GitHub repo from metadata (PRIMARY SOURCE)
-        create_repository_from_metadata(driver, metadata, arxiv_id)
-        if metadata.get('githubRepo'):
-            total_repos += 1
-        
-        # 2. Fetch related repos (models, datasets, spaces)
-        repos_data = get_hf_paper_repos(arxiv_id)
-        
-        models = repos_data.get('models', [])
-        datasets = repos_data.get('datasets', [])
-        spaces = repos_data.get('spaces', [])
-        
-        logger.info(f"  ✅ Repos: {len(models)} models, {len(datasets)} datasets, {len(spaces)} spaces")
-        
-        # Create Model nodes
-        for model in models[:10]:  # Limit to 10 models
-            create_or_update_model(driver, model, arxiv_id)
-            total_models += 1
-        
-        # Create Dataset nodes
-        for dataset in datasets[:10]:  # Limit to 10 datasets
-            create_or_update_dataset(driver, dataset, arxiv_id)
-            total_datasets += 1
-        
-        # Create Space nodes
-        for space in spaces[:10]:  # Limit to 10 spaces
-            create_or_update_space(driver, space, arxiv_id)
-            total_spaces += 1
-        
-        enriched_count += 1
-        logger.info("")
-        
-        # Rate limiting (be respectful)
-        time.sleep(2)
-    
-    logger.info(f"✅ HF enrichment complete!")
-    logger.info(f"   Papers enriched: {enriched_count}")
-    logger.info(f"   GitHub repos linked: {total_repos}")
-    logger.info(f"   Models linked: {total_models}")
-    logger.info(f"   Datasets linked: {total_datasets}")
-    logger.info(f"   Spaces linked: {total_spaces}")
-    
+
+    scheduled = schedule_unscheduled_papers(driver)
+    if scheduled:
+        logger.info(f"Scheduled {scheduled} papers for their first HF enrichment")
+
+    papers = claim_due_papers(driver, default_worker_id(), limit)
+    logger.info(f"Claimed {len(papers)} papers due for Hugging Face enrichment")
+    logger.info(f"Concurrency: {concurrency}, rate limit: {requests_per_second} req/s\n")
+
+    stats = asyncio.run(enrich_hf_papers(
+        driver,
+        papers,
+        concurrency=concurrency,
+        requests_per_second=requests_per_second
+    ))
+
+    logger.info(f"\n✅ HF enrichment complete!")
+    logger.info(f"   Papers enriched: {stats['papers']}")
+    logger.info(f"   Not on Hugging Face: {stats['not_found']}")
+    logger.info(f"   Failed: {stats['failed']}")
+    logger.info(f"   GitHub repos linked: {stats['repos']}")
+    logger.info(f"   Models linked: {stats['models']}")
+    logger.info(f"   Datasets linked: {stats['datasets']}")
+    logger.info(f"   Spaces linked: {stats['spaces']}")
+
     driver.close()
 
 if __name__ == "__main__":
-    # Process all papers that have been enriched but not HF-enriched
+    # Process papers that are due for (re-)enrichment
     enrich_huggingface(limit=200)  # Process up to 200 papers
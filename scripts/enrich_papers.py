@@ -6,7 +6,12 @@ import json
 import time
 from typing import Dict, List
 import google.generativeai as genai
+from neo4j.exceptions import ConstraintError
+from app.core.job_queue import default_worker_id
 from app.core.neo4j_driver import get_neo4j_driver
+from app.core.tracing import span
+from app.services.canonicalization_service import entity_canonicalizer
+from app.services.trends_service import rollup_paper_trends
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -17,7 +22,17 @@ load_dotenv()  # Load environment variables from .env file
 
 # Initialize Gemini client
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-model = genai.GenerativeModel('gemini-2.5-flash')
+GEMINI_MODEL = 'gemini-2.5-flash'
+model = genai.GenerativeModel(GEMINI_MODEL)
+
+# Papers claimed per round trip, and how long a claim lasts (it must cover
+# extracting and writing a whole claim batch)
+ENRICH_CLAIM_SIZE = 10
+ENRICH_LEASE_SECONDS = 900
+
+# Attempts at a paper's entity write when it loses a race for a new
+# entity name to another worker (unique-constraint violation)
+ENTITY_WRITE_ATTEMPTS = 3
 
 EXTRACTION_PROMPT = """You are an AI research expert. Analyze this academic paper and extract structured information.
 
@@ -59,20 +74,21 @@ def extract_entities(title, abstract, max_retries=3):
     for attempt in range(max_retries):
         try:
             prompt = EXTRACTION_PROMPT.format(title=title, abstract=abstract[:1500])
-            response = model.generate_content(
-                prompt, 
-                generation_config={
-                    "temperature": 0, 
-                    "max_output_tokens": 2000,
-                    "response_mime_type": "application/json"  # Force JSON response
-                },
-                safety_settings=[
-                    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
-                    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
-                    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
-                    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
-                ]
-            )
+            with span('llm.gemini', **{'llm.model': GEMINI_MODEL, 'llm.purpose': 'extract_entities', 'attempt': attempt + 1}):
+                response = model.generate_content(
+                    prompt, 
+                    generation_config={
+                        "temperature": 0, 
+                        "max_output_tokens": 2000,
+                        "response_mime_type": "application/json"  # Force JSON response
+                    },
+                    safety_settings=[
+                        {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
+                        {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
+                        {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
+                        {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
+                    ]
+                )
             
             # Check if response was blocked
             if not response.candidates:
@@ -105,19 +121,20 @@ def extract_entities(title, abstract, max_retries=3):
                     f"{response_text}"
                 )
                 
-                correction_response = model.generate_content(
-                    fix_prompt,
-                    generation_config={
-                        "temperature": 0,
-                        "response_mime_type": "application/json"
-                    },
-                    safety_settings=[
-                        {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
-                        {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
-                        {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
-                        {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
-                    ]
-                )
+                with span('llm.gemini', **{'llm.model': GEMINI_MODEL, 'llm.purpose': 'fix_json', 'attempt': attempt + 1}):
+                    correction_response = model.generate_content(
+                        fix_prompt,
+                        generation_config={
+                            "temperature": 0,
+                            "response_mime_type": "application/json"
+                        },
+                        safety_settings=[
+                            {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
+                            {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
+                            {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
+                            {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
+                        ]
+                    )
                 
                 corrected_text = correction_response.text.strip()
                 entities = json.loads(corrected_text)
@@ -136,154 +153,385 @@ def extract_entities(title, abstract, max_retries=3):
 
 
 
-def create_concept(driver, concept_data: Dict, paper_arxiv_id: str):
-    """Create concept node and link to paper"""
+def create_concept(tx, concept_data: Dict, paper_arxiv_id: str):
+    """Create concept node (resolved by canonical key) and link to paper"""
     query = """
-    MERGE (c:Concept {name: $name})
+    // A node written under this name before canonicalization (or under an
+    // older key) is adopted only when no node has the key yet...
+    OPTIONAL MATCH (legacy:Concept {name: $name})
+    WHERE COALESCE(legacy.canonical_key, '') <> $canonical_key
+      AND NOT EXISTS { MATCH (:Concept {canonical_key: $canonical_key}) }
+    SET legacy.canonical_key = $canonical_key
+    
+    WITH count(*) AS adopted
+    MERGE (c:Concept {canonical_key: $canonical_key})
     ON CREATE SET
+        c.name = $name,
         c.description = $description,
         c.category = $category,
-        c.created_at = datetime()
+        c.created_at = datetime(),
+        c.paper_count = 0,
+        c.degree = 0
+    SET c.aliases = CASE
+        WHEN $name IN COALESCE(c.aliases, []) THEN c.aliases
+        ELSE COALESCE(c.aliases, []) + $name
+    END
     
+    // ...otherwise it is folded into the keyed node
     WITH c
+    OPTIONAL MATCH (legacy:Concept {name: $name})
+    WHERE legacy <> c
+    CALL {
+        WITH c, legacy
+        MATCH (other:Paper)-[old:INTRODUCES]->(legacy)
+        MERGE (other)-[moved:INTRODUCES]->(c)
+        ON CREATE SET
+            moved += properties(old),
+            c.paper_count = COALESCE(c.paper_count, 0)
+                + CASE WHEN COUNT { (other)--(c) } = 1 THEN 1 ELSE 0 END,
+            c.degree = COALESCE(c.degree, 0) + 1
+        RETURN count(old) AS moved
+    }
+    WITH c, legacy,
+         COALESCE(c.aliases, []) + CASE WHEN legacy IS NULL THEN [] ELSE COALESCE(legacy.aliases, [legacy.name]) END AS all_aliases
+    SET c.aliases = reduce(acc = [], a IN all_aliases | CASE WHEN a IN acc THEN acc ELSE acc + a END)
+    DETACH DELETE legacy
+    
+    // paper_count counts distinct papers over any relationship type, as
+    // recompute_entity_degrees.py does: only a paper's first link adds one
+    WITH DISTINCT c
     MATCH (p:Paper {arxiv_id: $arxiv_id})
     MERGE (p)-[r:INTRODUCES]->(c)
-    ON CREATE SET r.confidence = $confidence
+    ON CREATE SET
+        r.confidence = $confidence,
+        c.paper_count = COALESCE(c.paper_count, 0)
+            + CASE WHEN COUNT { (p)--(c) } = 1 THEN 1 ELSE 0 END,
+        c.degree = COALESCE(c.degree, 0) + 1
     """
     
-    driver.execute_write(query, {
+    tx.run(query, {
         'name': concept_data['name'],
+        'canonical_key': entity_canonicalizer.canonical_key(concept_data['name']),
         'description': '',
         'category': concept_data.get('category', 'Other'),
         'arxiv_id': paper_arxiv_id,
         'confidence': concept_data.get('confidence', 0.9)
-    })
+    }, name='enrich.concept')
 
-def create_method(driver, method_data: Dict, paper_arxiv_id: str):
-    """Create method node and link to paper"""
+def create_method(tx, method_data: Dict, paper_arxiv_id: str):
+    """Create method node (resolved by canonical key) and link to paper"""
     query = """
-    MERGE (m:Method {name: $name})
+    // A node written under this name before canonicalization (or under an
+    // older key) is adopted only when no node has the key yet...
+    OPTIONAL MATCH (legacy:Method {name: $name})
+    WHERE COALESCE(legacy.canonical_key, '') <> $canonical_key
+      AND NOT EXISTS { MATCH (:Method {canonical_key: $canonical_key}) }
+    SET legacy.canonical_key = $canonical_key
+    
+    WITH count(*) AS adopted
+    MERGE (m:Method {canonical_key: $canonical_key})
     ON CREATE SET
+        m.name = $name,
         m.description = '',
         m.algorithm_type = $algorithm_type,
-        m.created_at = datetime()
+        m.created_at = datetime(),
+        m.paper_count = 0,
+        m.degree = 0
+    SET m.aliases = CASE
+        WHEN $name IN COALESCE(m.aliases, []) THEN m.aliases
+        ELSE COALESCE(m.aliases, []) + $name
+    END
     
+    // ...otherwise it is folded into the keyed node
     WITH m
+    OPTIONAL MATCH (legacy:Method {name: $name})
+    WHERE legacy <> m
+    CALL {
+        WITH m, legacy
+        MATCH (other:Paper)-[old:PROPOSES]->(legacy)
+        MERGE (other)-[moved:PROPOSES]->(m)
+        ON CREATE SET
+            moved += properties(old),
+            m.paper_count = COALESCE(m.paper_count, 0)
+                + CASE WHEN COUNT { (other)--(m) } = 1 THEN 1 ELSE 0 END,
+            m.degree = COALESCE(m.degree, 0) + 1
+        RETURN count(old) AS moved
+    }
+    WITH m, legacy,
+         COALESCE(m.aliases, []) + CASE WHEN legacy IS NULL THEN [] ELSE COALESCE(legacy.aliases, [legacy.name]) END AS all_aliases
+    SET m.aliases = reduce(acc = [], a IN all_aliases | CASE WHEN a IN acc THEN acc ELSE acc + a END)
+    DETACH DELETE legacy
+    
+    WITH DISTINCT m
     MATCH (p:Paper {arxiv_id: $arxiv_id})
     MERGE (p)-[r:PROPOSES]->(m)
-    ON CREATE SET r.is_primary = true
+    ON CREATE SET
+        r.is_primary = true,
+        m.paper_count = COALESCE(m.paper_count, 0)
+            + CASE WHEN COUNT { (p)--(m) } = 1 THEN 1 ELSE 0 END,
+        m.degree = COALESCE(m.degree, 0) + 1
     """
     
-    driver.execute_write(query, {
+    tx.run(query, {
         'name': method_data['name'],
+        'canonical_key': entity_canonicalizer.canonical_key(method_data['name']),
         'algorithm_type': method_data.get('algorithm_type', 'other'),
         'arxiv_id': paper_arxiv_id
-    })
+    }, name='enrich.method')
 
-def create_dataset(driver, dataset_data: Dict, paper_arxiv_id: str):
+def create_dataset(tx, dataset_data: Dict, paper_arxiv_id: str):
     """Create dataset node and link to paper"""
     query = """
     MERGE (d:Dataset {name: $name})
     ON CREATE SET
         d.description = '',
         d.domain = $domain,
-        d.created_at = datetime()
+        d.created_at = datetime(),
+        d.paper_count = 0,
+        d.degree = 0
     
     WITH d
     MATCH (p:Paper {arxiv_id: $arxiv_id})
     MERGE (p)-[r:EVALUATES_ON]->(d)
+    ON CREATE SET
+        d.paper_count = COALESCE(d.paper_count, 0)
+            + CASE WHEN COUNT { (p)--(d) } = 1 THEN 1 ELSE 0 END,
+        d.degree = COALESCE(d.degree, 0) + 1
     """
     
-    driver.execute_write(query, {
+    tx.run(query, {
         'name': dataset_data['name'],
         'domain': dataset_data.get('domain', 'Other'),
         'arxiv_id': paper_arxiv_id
-    })
+    }, name='enrich.dataset')
 
-def create_metric(driver, metric_data: Dict, paper_arxiv_id: str):
+def create_metric(tx, metric_data: Dict, paper_arxiv_id: str):
     """Create metric node and link to paper"""
     query = """
     MERGE (m:Metric {name: $name})
     ON CREATE SET
         m.description = '',
         m.higher_is_better = $higher_is_better,
-        m.created_at = datetime()
+        m.created_at = datetime(),
+        m.paper_count = 0,
+        m.degree = 0
     
     WITH m
     MATCH (p:Paper {arxiv_id: $arxiv_id})
     MERGE (p)-[r:USES_METRIC]->(m)
+    ON CREATE SET
+        m.paper_count = COALESCE(m.paper_count, 0)
+            + CASE WHEN COUNT { (p)--(m) } = 1 THEN 1 ELSE 0 END,
+        m.degree = COALESCE(m.degree, 0) + 1
     """
     
-    driver.execute_write(query, {
+    tx.run(query, {
         'name': metric_data['name'],
         'higher_is_better': metric_data.get('higher_is_better', True),
         'arxiv_id': paper_arxiv_id
-    })
+    }, name='enrich.metric')
 
-def enrich_papers(limit: int = 10, skip_enriched: bool = True):
+def claim_unenriched_papers(
+    driver,
+    worker_id: str,
+    limit: int,
+    lease_seconds: int = ENRICH_LEASE_SECONDS
+) -> List[Dict]:
     """
-    Main enrichment loop: extract entities and update graph.
+    Select up to `limit` unenriched papers not leased to another worker and
+    lease them to worker_id, in one write transaction. Concurrent workers
+    get disjoint papers; a crashed worker's papers are claimable again once
+    the lease runs out.
     """
-    driver = get_neo4j_driver()
-    driver.connect()
-    
-    # Get papers to enrich
     query = """
     MATCH (p:Paper)
-    WHERE p.enriched IS NULL OR p.enriched = false
-    RETURN p.arxiv_id as arxiv_id, p.title as title, p.abstract as abstract
-    LIMIT $limit
+    WHERE (p.enriched IS NULL OR p.enriched = false)
+      AND (p.lease_until IS NULL OR p.lease_until < datetime())
+    WITH p LIMIT $limit
+    // Lock, then re-check: another worker may have claimed p since it was matched
+    SET p._claim_lock = true
+    REMOVE p._claim_lock
+    WITH p
+    WHERE (p.enriched IS NULL OR p.enriched = false)
+      AND (p.lease_until IS NULL OR p.lease_until < datetime())
+    SET p.claimed_by = $worker_id,
+        p.lease_until = datetime() + duration({seconds: $lease_seconds})
+    RETURN p.arxiv_id as arxiv_id, p.title as title, p.abstract as abstract,
+           p.published_date as published_date
+    """
+    
+    return driver.execute_write(query, {
+        'worker_id': worker_id,
+        'limit': limit,
+        'lease_seconds': lease_seconds
+    }, name='enrich.claim_papers')
+
+def has_unclaimed_papers(driver) -> bool:
+    """
+    Whether unenriched papers remain that no worker holds a lease on.
+    claim_unenriched_papers also returns nothing when another worker
+    claimed the same candidates first; this tells that apart from an
+    empty backlog.
+    """
+    query = """
+    RETURN EXISTS {
+        MATCH (p:Paper)
+        WHERE (p.enriched IS NULL OR p.enriched = false)
+          AND (p.lease_until IS NULL OR p.lease_until < datetime())
+    } as unclaimed
+    """
+    
+    result = driver.execute_read(query, name='enrich.has_unclaimed')
+    return bool(result and result[0]['unclaimed'])
+
+def claim_papers(
+    driver,
+    worker_id: str,
+    arxiv_ids: List[str],
+    lease_seconds: int = ENRICH_LEASE_SECONDS
+) -> List[Dict]:
+    """
+    Lease the given papers to worker_id, like claim_unenriched_papers but
+    for papers picked elsewhere (e.g. just ingested by the pipeline).
+    Papers already enriched or leased to another worker are left out;
+    leases already held by worker_id are renewed.
+    """
+    query = """
+    UNWIND $arxiv_ids AS arxiv_id
+    MATCH (p:Paper {arxiv_id: arxiv_id})
+    WHERE (p.enriched IS NULL OR p.enriched = false)
+      AND (p.lease_until IS NULL OR p.lease_until < datetime() OR p.claimed_by = $worker_id)
+    // Lock, then re-check: another worker may have claimed p since it was matched
+    SET p._claim_lock = true
+    REMOVE p._claim_lock
+    WITH p
+    WHERE (p.enriched IS NULL OR p.enriched = false)
+      AND (p.lease_until IS NULL OR p.lease_until < datetime() OR p.claimed_by = $worker_id)
+    SET p.claimed_by = $worker_id,
+        p.lease_until = datetime() + duration({seconds: $lease_seconds})
+    RETURN p.arxiv_id as arxiv_id, p.title as title, p.abstract as abstract,
+           p.published_date as published_date
     """
     
-    papers = driver.execute_read(query, {'limit': limit})
+    return driver.execute_write(query, {
+        'worker_id': worker_id,
+        'arxiv_ids': arxiv_ids,
+        'lease_seconds': lease_seconds
+    }, name='enrich.claim_papers_by_id')
+
+def release_paper_claim(driver, paper_arxiv_id: str, worker_id: str):
+    """Give a claimed paper back before its lease runs out (e.g. after a failed write)"""
+    query = """
+    MATCH (p:Paper {arxiv_id: $arxiv_id})
+    WHERE p.claimed_by = $worker_id
+    SET p.claimed_by = null, p.lease_until = null
+    """
     
-    logger.info(f"Found {len(papers)} papers to enrich")
+    driver.execute_write(query, {'arxiv_id': paper_arxiv_id, 'worker_id': worker_id}, name='enrich.release_claim')
+
+def mark_paper_enriched(tx, paper_arxiv_id: str):
+    """Mark paper as enriched (releasing any claim) and due for its first HF refresh"""
+    query = """
+    MATCH (p:Paper {arxiv_id: $arxiv_id})
+    SET p.enriched = true, p.enriched_at = datetime(),
+        p.updated_at = datetime(),
+        p.hf_next_refresh = COALESCE(p.hf_next_refresh, datetime()),
+        p.claimed_by = null, p.lease_until = null
+    """
     
-    for idx, paper in enumerate(papers, 1):
-        arxiv_id = paper['arxiv_id']
-        title = paper['title']
-        abstract = paper['abstract'] or ''
-        
-        logger.info(f"\n[{idx}/{len(papers)}] Processing: {title[:60]}...")
-        
-        # Extract entities
-        entities = extract_entities(title, abstract)
-        
-        # Log extracted entities
-        logger.info(f"  Concepts: {len(entities.get('concepts', []))}")
-        logger.info(f"  Methods: {len(entities.get('methods', []))}")
-        logger.info(f"  Datasets: {len(entities.get('datasets', []))}")
-        logger.info(f"  Metrics: {len(entities.get('metrics', []))}")
-        
-        # Create nodes and relationships
+    tx.run(query, {'arxiv_id': paper_arxiv_id}, name='enrich.mark_enriched')
+
+def write_paper_entities(driver, arxiv_id: str, entities: Dict):
+    """
+    Create nodes and relationships for one paper's entities and mark it
+    enriched, in one transaction. A unique-constraint violation means a
+    concurrent worker committed the same entity first; the retry MERGEs
+    onto its node.
+    """
+    for attempt in range(1, ENTITY_WRITE_ATTEMPTS + 1):
         try:
-            for concept in entities.get('concepts', []):
-                create_concept(driver, concept, arxiv_id)
-            
-            for method in entities.get('methods', []):
-                create_method(driver, method, arxiv_id)
+            _write_paper_entities(driver, arxiv_id, entities)
+            return
+        except ConstraintError as e:
+            if attempt == ENTITY_WRITE_ATTEMPTS:
+                raise
+            logger.warning(f"  Entity write for {arxiv_id} raced another worker, retrying: {e}")
+
+def _write_paper_entities(driver, arxiv_id: str, entities: Dict):
+    with driver.transaction(name='enrich.paper') as tx:
+        for concept in entities.get('concepts', []):
+            create_concept(tx, concept, arxiv_id)
+    
+        for method in entities.get('methods', []):
+            create_method(tx, method, arxiv_id)
+    
+        for dataset in entities.get('datasets', []):
+            create_dataset(tx, dataset, arxiv_id)
+    
+        for metric in entities.get('metrics', []):
+            create_metric(tx, metric, arxiv_id)
+    
+        # Count the new links into the trend rollups
+        rollup_paper_trends(tx, arxiv_id)
+    
+        # Mark paper as enriched
+        mark_paper_enriched(tx, arxiv_id)
+
+def enrich_papers(limit: int = 10, skip_enriched: bool = True):
+    """
+    Main enrichment loop: extract entities and update graph.
+    Papers are claimed ENRICH_CLAIM_SIZE at a time under a lease, so
+    several enrich_papers processes can work through the backlog in
+    parallel without extracting the same paper twice.
+    """
+    driver = get_neo4j_driver()
+    driver.connect()
+    worker_id = default_worker_id()
+    
+    logger.info(f"Worker {worker_id}: enriching up to {limit} papers")
+    
+    idx = 0
+    while idx < limit:
+        # Claim the next papers to enrich
+        papers = claim_unenriched_papers(driver, worker_id, min(ENRICH_CLAIM_SIZE, limit - idx))
+        if not papers:
+            # Lost the race for these candidates: claim the next ones
+            if has_unclaimed_papers(driver):
+                continue
+            break
+        
+        for paper in papers:
+            idx += 1
+            arxiv_id = paper['arxiv_id']
+            title = paper['title']
+            abstract = paper['abstract'] or ''
             
-            for dataset in entities.get('datasets', []):
-                create_dataset(driver, dataset, arxiv_id)
+            logger.info(f"\n[{idx}/{limit}] Processing: {title[:60]}...")
             
-            for metric in entities.get('metrics', []):
-                create_metric(driver, metric, arxiv_id)
+            # One trace per paper: extraction calls and graph writes
+            with span('enrich_papers.paper', arxiv_id=arxiv_id):
+                # Extract entities
+                entities = extract_entities(title, abstract)
             
-            # Mark paper as enriched
-            driver.execute_write("""
-                MATCH (p:Paper {arxiv_id: $arxiv_id})
-                SET p.enriched = true, p.enriched_at = datetime()
-            """, {'arxiv_id': arxiv_id})
+                # Log extracted entities
+                logger.info(f"  Concepts: {len(entities.get('concepts', []))}")
+                logger.info(f"  Methods: {len(entities.get('methods', []))}")
+                logger.info(f"  Datasets: {len(entities.get('datasets', []))}")
+                logger.info(f"  Metrics: {len(entities.get('metrics', []))}")
             
-            logger.info(f"  ✅ Enriched successfully")
+                try:
+                    write_paper_entities(driver, arxiv_id, entities)
+                    logger.info(f"  ✅ Enriched successfully")
+                
+                except Exception as e:
+                    logger.error(f"  ❌ Error enriching paper: {e}")
+                    # Let the next run (or another worker) retry it
+                    release_paper_claim(driver, arxiv_id, worker_id)
             
-        except Exception as e:
-            logger.error(f"  ❌ Error enriching paper: {e}")
-        
-        # Rate limiting (Gemini: ~1 request/sec recommended)
-        time.sleep(1)
+            # Rate limiting (Gemini: ~1 request/sec recommended)
+            time.sleep(1)
     
-    logger.info(f"\n✅ Enrichment complete! Processed {len(papers)} papers")
+    logger.info(f"\n✅ Enrichment complete! Processed {idx} papers")
     driver.close()
 
 if __name__ == "__main__":
@@ -5,14 +5,28 @@ import time
 import requests
 import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from app.core.neo4j_driver import get_neo4j_driver
+from app.services.trends_service import rollup_paper_trends
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 ARXIV_API_BASE = "http://export.arxiv.org/api/query"
+# Papers written per transaction
+INGEST_BATCH_SIZE = 100
+# Papers with more authors get no COAUTHORED pairs (quadratic in authors)
+COAUTHOR_MAX_AUTHORS = 50
+
+DEFAULT_CATEGORIES = [
+    'cs.AI',   # Artificial Intelligence
+    'cs.CL',   # Computation and Language
+    'cs.LG',   # Machine Learning
+    'cs.CV',   # Computer Vision
+    'cs.NE',   # Neural and Evolutionary Computing
+    'stat.ML'  # Machine Learning (Statistics)
+]
 
 def fetch_arxiv_papers(
     categories: List[str] = None,
@@ -119,7 +133,7 @@ def parse_arxiv_entry(entry, ns) -> Optional[Dict]:
         logger.error(f"Error parsing entry: {e}")
         return None
 
-def create_paper_node(driver, paper: Dict):
+def create_paper_node(tx, paper: Dict):
     """Create Paper node in Neo4j"""
     query = """
     MERGE (p:Paper {arxiv_id: $arxiv_id})
@@ -130,31 +144,107 @@ def create_paper_node(driver, paper: Dict):
         p.pdf_url = $pdf_url,
         p.categories = $categories,
         p.created_at = datetime(),
+        p.updated_at = datetime(),
         p.source = 'arxiv',
         p.enriched = false
     ON MATCH SET
         p.updated_at = datetime()
     
     WITH p
-    UNWIND $authors AS author_name
+    OPTIONAL MATCH (p)-[:AUTHORED_BY]->(existing:Author)
+    WITH p, collect(existing) AS existing_authors
+    UNWIND range(0, size($authors) - 1) AS position
+    WITH p, existing_authors, position, $authors[position] AS author_name
     MERGE (a:Author {name: author_name})
-    ON CREATE SET a.created_at = datetime()
-    MERGE (a)-[r:AUTHORED]->(p)
-    ON CREATE SET r.created_at = datetime()
+    ON CREATE SET
+        a.id = toLower(replace(author_name, ' ', '-')),
+        a.created_at = datetime(),
+        a.paper_count = 0,
+        a.degree = 0
+    MERGE (p)-[r:AUTHORED_BY]->(a)
+    ON CREATE SET
+        r.created_at = datetime(),
+        r.position = position,
+        a.paper_count = COALESCE(a.paper_count, 0) + 1,
+        a.degree = COALESCE(a.degree, 0) + 1,
+        a.first_published = CASE WHEN a.first_published IS NULL OR p.published_date < a.first_published
+                                 THEN p.published_date ELSE a.first_published END,
+        a.last_published = CASE WHEN a.last_published IS NULL OR p.published_date > a.last_published
+                                THEN p.published_date ELSE a.last_published END
+
+    // Co-authorship: one COAUTHORED per pair (lower name first), weighted
+    // by shared papers; only pairs with an author new to this paper count
+    WITH p, existing_authors, collect(DISTINCT a) AS authors
+    WHERE size(authors) <= $max_coauthors
+    UNWIND authors AS a
+    UNWIND authors AS b
+    WITH p, a, b
+    WHERE a.name < b.name AND NOT (a IN existing_authors AND b IN existing_authors)
+    MERGE (a)-[c:COAUTHORED]->(b)
+    ON CREATE SET
+        c.weight = 0,
+        a.degree = COALESCE(a.degree, 0) + 1,
+        b.degree = COALESCE(b.degree, 0) + 1
+    SET c.weight = c.weight + 1,
+        c.first_collaborated = CASE WHEN c.first_collaborated IS NULL OR p.published_date < c.first_collaborated
+                                    THEN p.published_date ELSE c.first_collaborated END,
+        c.last_collaborated = CASE WHEN c.last_collaborated IS NULL OR p.published_date > c.last_collaborated
+                                   THEN p.published_date ELSE c.last_collaborated END
     """
     
-    try:
-        driver.execute_write(query, {
-            'arxiv_id': paper['arxiv_id'],
-            'title': paper['title'],
-            'abstract': paper['abstract'],
-            'published_date': paper['published_date'],
-            'pdf_url': paper['pdf_url'],
-            'categories': paper['categories'],
-            'authors': paper['authors']
-        })
-    except Exception as e:
-        logger.error(f"Error creating paper {paper['arxiv_id']}: {e}")
+    tx.run(query, {
+        'arxiv_id': paper['arxiv_id'],
+        'title': paper['title'],
+        'abstract': paper['abstract'],
+        'published_date': paper['published_date'],
+        'pdf_url': paper['pdf_url'],
+        'categories': paper['categories'],
+        'authors': paper['authors'],
+        'max_coauthors': COAUTHOR_MAX_AUTHORS
+    }, name='ingest.arxiv_paper')
+
+def write_papers(
+    driver,
+    papers: List[Dict],
+    write_paper: Callable,
+    name: str,
+    batch_size: int = INGEST_BATCH_SIZE
+) -> int:
+    """
+    Write papers with write_paper(tx, paper), batch_size papers per
+    transaction. A batch that fails is retried one paper per transaction,
+    so a bad paper (an author id collision, an unparseable date) is logged
+    and skipped instead of taking the rest of its batch with it.
+    Returns the number of papers written.
+    """
+    written = 0
+    for start in range(0, len(papers), batch_size):
+        batch = papers[start:start + batch_size]
+        try:
+            with driver.transaction(name=name) as tx:
+                for paper in batch:
+                    write_paper(tx, paper)
+            written += len(batch)
+            continue
+        except Exception as e:
+            logger.warning(f"Batch of {len(batch)} papers failed ({e}), retrying one by one")
+        for paper in batch:
+            try:
+                with driver.transaction(name=name) as tx:
+                    write_paper(tx, paper)
+                written += 1
+            except Exception as e:
+                logger.error(f"Skipping paper {paper.get('arxiv_id')}: {e}")
+    return written
+
+def write_arxiv_paper(tx, paper: Dict):
+    """Paper node with authors, counted into the trend rollups"""
+    create_paper_node(tx, paper)
+    rollup_paper_trends(tx, paper['arxiv_id'])
+
+def write_arxiv_papers(driver, papers: List[Dict]) -> int:
+    """Write papers parsed from the arXiv feed; returns papers written"""
+    return write_papers(driver, papers, write_arxiv_paper, name='ingest.arxiv_batch')
 
 def ingest_arxiv_bulk(
     categories: List[str] = None,
@@ -172,16 +262,8 @@ def ingest_arxiv_bulk(
     driver = get_neo4j_driver()
     driver.connect()
     
-    # Default categories
     if not categories:
-        categories = [
-            'cs.AI',   # Artificial Intelligence
-            'cs.CL',   # Computation and Language
-            'cs.LG',   # Machine Learning
-            'cs.CV',   # Computer Vision
-            'cs.NE',   # Neural and Evolutionary Computing
-            'stat.ML'  # Machine Learning (Statistics)
-        ]
+        categories = DEFAULT_CATEGORIES
     
     # Calculate date range
     end_date = datetime.now().strftime('%Y%m%d%H%M%S')
@@ -208,15 +290,10 @@ def ingest_arxiv_bulk(
         
         logger.info(f"Creating nodes for {len(papers)} papers...")
         
-        for idx, paper in enumerate(papers, 1):
-            create_paper_node(driver, paper)
-            
-            if idx % 10 == 0:
-                logger.info(f"  Progress: {idx}/{len(papers)}")
-                time.sleep(1)  # Rate limiting
+        written = write_arxiv_papers(driver, papers)
         
-        total_ingested += len(papers)
-        logger.info(f"✓ Completed {category}: {len(papers)} papers")
+        total_ingested += written
+        logger.info(f"✓ Completed {category}: {written}/{len(papers)} papers")
         time.sleep(3)  # Rate limiting between categories
     
     logger.info(f"\n{'='*60}")
@@ -3,9 +3,10 @@ sys.path.append('../backend')
 
 import time
 import requests
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import List, Dict, Optional
 from app.core.neo4j_driver import get_neo4j_driver
+from ingest_arxiv import write_papers
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -13,6 +14,8 @@ logger = logging.getLogger(__name__)
 
 HF_PAPERS_SEARCH_API = "https://huggingface.co/api/papers/search"
 HF_DAILY_PAPERS_API = "https://huggingface.co/api/daily_papers"
+# Papers written per transaction
+INGEST_BATCH_SIZE = 100
 
 def fetch_hf_daily_papers(date: str = None) -> List[Dict]:
     """Fetch daily papers from Hugging Face"""
@@ -50,8 +53,8 @@ def search_hf_papers(query: str = None, date: str = None) -> List[Dict]:
         logger.error(f"Error searching HF papers: {e}")
         return []
 
-def create_paper_from_hf(driver, paper: Dict):
-    """Create Paper node from HF data"""
+def create_paper_from_hf(tx, paper: Dict):
+    """Create Paper node from parameters built by hf_paper_params()"""
     query = """
     MERGE (p:Paper {arxiv_id: $arxiv_id})
     ON CREATE SET
@@ -63,6 +66,7 @@ def create_paper_from_hf(driver, paper: Dict):
         p.hf_upvotes = $upvotes,
         p.on_huggingface = true,
         p.created_at = datetime(),
+        p.updated_at = datetime(),
         p.source = 'huggingface',
         p.enriched = false
     ON MATCH SET
@@ -71,20 +75,34 @@ def create_paper_from_hf(driver, paper: Dict):
         p.updated_at = datetime()
     """
     
-    arxiv_id = paper.get('id', '')
-    
+    tx.run(query, paper, name='ingest.hf_paper')
+
+def hf_paper_params(paper: Dict) -> Optional[Dict]:
+    """Query parameters for an HF feed entry; None if it has no arXiv id or publication date"""
+    arxiv_id = paper.get('id')
+    published_date = (paper.get('publishedAt') or '')[:10]
     try:
-        driver.execute_write(query, {
-            'arxiv_id': arxiv_id,
-            'title': paper.get('title', ''),
-            'abstract': paper.get('summary', ''),
-            'published_date': paper.get('publishedAt', '')[:10],
-            'pdf_url': f"https://arxiv.org/pdf/{arxiv_id}",
-            'hf_url': f"https://huggingface.co/papers/{arxiv_id}",
-            'upvotes': paper.get('upvotes', 0)
-        })
-    except Exception as e:
-        logger.error(f"Error creating paper {arxiv_id}: {e}")
+        date.fromisoformat(published_date)
+    except ValueError:
+        arxiv_id = None
+    if not arxiv_id:
+        logger.warning(f"Skipping HF paper without arXiv id or publication date: {paper.get('title')!r}")
+        return None
+    return {
+        'arxiv_id': arxiv_id,
+        'title': paper.get('title', ''),
+        'abstract': paper.get('summary', ''),
+        'published_date': published_date,
+        'pdf_url': f"https://arxiv.org/pdf/{arxiv_id}",
+        'hf_url': f"https://huggingface.co/papers/{arxiv_id}",
+        'upvotes': paper.get('upvotes', 0)
+    }
+
+def create_papers_from_hf(driver, papers: List[Dict]) -> int:
+    """Create Paper nodes, INGEST_BATCH_SIZE per transaction; returns papers written"""
+    params = [row for row in map(hf_paper_params, papers) if row is not None]
+    return write_papers(driver, params, create_paper_from_hf, name='ingest.hf_batch',
+                        batch_size=INGEST_BATCH_SIZE)
 
 def ingest_hf_papers_bulk(
     use_daily: bool = True,
@@ -119,9 +137,7 @@ def ingest_hf_papers_bulk(
             papers = fetch_hf_daily_papers(date)
             logger.info(f"Found {len(papers)} papers")
             
-            for paper in papers:
-                create_paper_from_hf(driver, paper)
-                total_ingested += 1
+            total_ingested += create_papers_from_hf(driver, papers)
             
             time.sleep(2)
     
@@ -137,9 +153,7 @@ def ingest_hf_papers_bulk(
             papers = search_hf_papers(query=query)
             logger.info(f"Found {len(papers)} papers")
             
-            for paper in papers:
-                create_paper_from_hf(driver, paper)
-                total_ingested += 1
+            total_ingested += create_papers_from_hf(driver, papers)
             
             time.sleep(2)
     
@@ -0,0 +1,124 @@
+import sys
+sys.path.append('../backend')
+
+import asyncio
+import time
+from typing import Dict
+from app.core.config import settings
+from app.core.job_queue import JobQueue, QUEUED, default_worker_id
+from app.core.neo4j_driver import get_neo4j_driver
+from app.services.jobs_service import jobs_service, INGEST_JOB, ENRICH_JOB
+from run_pipeline import run_pipeline_async
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Seconds between polls of an empty queue
+JOB_POLL_SECONDS = 5
+
+def pipeline_options(job: Dict) -> Dict:
+    """run_pipeline_async options for a job"""
+    params = job['params']
+    if job['type'] == INGEST_JOB:
+        return {
+            'arxiv': params['arxiv'],
+            'huggingface_daily': params['huggingface_daily'],
+            'categories': params['categories'],
+            'max_results': params['max_results'],
+            'days_back': params['days_back'],
+        }
+    if job['type'] == ENRICH_JOB:
+        return {
+            'arxiv': False,
+            'huggingface_daily': False,
+            'backlog': True,
+            'backlog_limit': params['limit'],
+        }
+    raise ValueError(f"Unknown job type: {job['type']}")
+
+class LeaseLost(Exception):
+    """The job's lease ran out and it was reclaimed (or failed) under another worker"""
+
+class TooManyFailures(Exception):
+    """More than JOB_MAX_FAILURE_RATIO of the job's papers failed"""
+
+def job_result(report: Dict[str, Dict]) -> Dict:
+    """Paper totals over all stages, with the per-stage report"""
+    return {
+        'processed': sum(stats['processed'] for stats in report.values()),
+        'failed': sum(stats['failed'] for stats in report.values()),
+        'stages': report,
+    }
+
+def run_job(driver, queue: JobQueue, job: Dict, worker_id: str) -> Dict:
+    """
+    Run a job's pipeline, renewing the lease with each progress report.
+    Raises LeaseLost, stopping the pipeline, once the job is no longer
+    this worker's, so two workers never run it side by side. Raises
+    TooManyFailures (so the job is retried) when the pipeline's handlers
+    failed on more than JOB_MAX_FAILURE_RATIO of the papers.
+    """
+    def on_report(report: Dict):
+        if not queue.heartbeat(job['id'], worker_id, report):
+            raise LeaseLost(f"Lost the lease on job {job['id']}")
+
+    report = asyncio.run(run_pipeline_async(driver, on_report=on_report, worker_id=worker_id, **pipeline_options(job)))
+    result = job_result(report)
+    attempted = result['processed'] + result['failed']
+    if attempted and result['failed'] / attempted > settings.JOB_MAX_FAILURE_RATIO:
+        # The per-stage counts stay in the job's progress
+        queue.heartbeat(job['id'], worker_id, report)
+        raise TooManyFailures(f"{result['failed']} of {attempted} papers failed")
+    return result
+
+def job_worker(once: bool = False, poll_seconds: float = JOB_POLL_SECONDS):
+    """
+    Worker process for jobs queued through POST /jobs/*. Start several
+    on the same host to run jobs in parallel; each claims one job at a
+    time under a lease. A job that raises, or whose papers mostly fail,
+    is retried with backoff; one whose worker dies is picked up again when its lease expires.
+    once=True exits when the queue is empty (e.g. from cron).
+    """
+    worker_id = default_worker_id()
+    queue = jobs_service.queue
+    driver = get_neo4j_driver()
+    driver.connect()
+
+    logger.info(f"Worker {worker_id} polling {queue.path}...")
+    try:
+        while True:
+            job = queue.claim(worker_id)
+            if job is None:
+                if once:
+                    break
+                time.sleep(poll_seconds)
+                continue
+
+            logger.info(f"\n▶️  {job['type']} job {job['id']} (attempt {job['attempts']}/{job['max_attempts']})")
+            try:
+                result = run_job(driver, queue, job, worker_id)
+            except LeaseLost as e:
+                # Not ours to fail or retry any more
+                logger.warning(f"  ⚠️  {e}; stopped it, another worker may take it over")
+                continue
+            except Exception as e:
+                failed = queue.fail(job['id'], worker_id, f"{type(e).__name__}: {e}")
+                if failed and failed['status'] == QUEUED:
+                    logger.error(f"  ❌ Job {job['id']} failed, retrying in {failed['run_after'] - time.time():.0f}s: {e}")
+                else:
+                    logger.error(f"  ❌ Job {job['id']} failed for good: {e}")
+                continue
+
+            if not queue.complete(job['id'], worker_id, result):
+                logger.warning(f"  ⚠️  Job {job['id']} finished after its lease was lost; result not recorded")
+                continue
+            logger.info(f"✅ Job {job['id']} complete")
+    except KeyboardInterrupt:
+        # A job cut short here is retried once its lease expires
+        logger.info("Stopping worker")
+    finally:
+        driver.close()
+
+if __name__ == "__main__":
+    job_worker(once='--once' in sys.argv)
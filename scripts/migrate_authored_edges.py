@@ -0,0 +1,97 @@
+import sys
+sys.path.append('../backend')
+
+from typing import Dict, List
+from app.core.neo4j_driver import get_neo4j_driver
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Rows per inner transaction
+MIGRATION_BATCH_SIZE = 10000
+
+def count_legacy_edges(driver) -> int:
+    """Count (a:Author)-[:AUTHORED]->(p:Paper) edges left by old ingest runs"""
+    result = driver.execute_read("""
+    MATCH (:Author)-[r:AUTHORED]->(:Paper)
+    RETURN count(r) as edges
+    """, name='migrate.count_legacy_edges')
+    return result[0]['edges'] if result else 0
+
+def find_id_collisions(driver) -> List[Dict]:
+    """
+    Legacy authors without an id whose derived id (as ingest_arxiv.py
+    derives it from the name) is shared with another such author or
+    already held by one, which the author_id unique constraint rejects
+    """
+    return driver.execute_read("""
+    MATCH (a:Author)
+    WHERE a.id IS NULL AND EXISTS { (a)-[:AUTHORED]->(:Paper) }
+    WITH toLower(replace(a.name, ' ', '-')) AS id, collect(a.name) AS names
+    OPTIONAL MATCH (holder:Author {id: id})
+    WITH id, names, holder
+    WHERE size(names) > 1 OR holder IS NOT NULL
+    RETURN id, names, holder.name as holder
+    ORDER BY id
+    """, name='migrate.id_collisions')
+
+def migrate_authored_edges(batch_size: int = MIGRATION_BATCH_SIZE, dry_run: bool = False):
+    """
+    Rewrite legacy (a:Author)-[:AUTHORED]->(p:Paper) edges to the canonical
+    (p:Paper)-[:AUTHORED_BY]->(a:Author) used by every read path.
+    Runs server-side in CALL { } IN TRANSACTIONS batches; nothing is
+    re-fetched from arXiv. Authors whose derived id collides are reported
+    and left without an id (their edges are still migrated), so one
+    collision doesn't fail a whole batch.
+    """
+    driver = get_neo4j_driver()
+    driver.connect()
+
+    legacy_edges = count_legacy_edges(driver)
+
+    logger.info(f"\n{'='*60}")
+    logger.info(f"Found {legacy_edges} legacy AUTHORED edges")
+    logger.info(f"{'='*60}\n")
+
+    collisions = find_id_collisions(driver) if legacy_edges else []
+    if collisions:
+        logger.warning(f"⚠️  {len(collisions)} author ids collide; those authors keep no id (merge or rename them):")
+        for collision in collisions[:20]:
+            held = f", already held by {collision['holder']!r}" if collision['holder'] else ""
+            logger.warning(f"  {collision['id']!r}: {collision['names']}{held}")
+
+    if dry_run or legacy_edges == 0:
+        driver.close()
+        return
+
+    # Keep an existing AUTHORED_BY edge (e.g. from author enrichment) as-is
+    query = """
+    MATCH (a:Author)-[old:AUTHORED]->(p:Paper)
+    CALL {
+        WITH a, old, p
+        SET a.id = COALESCE(a.id, CASE WHEN a.name IN $colliding THEN null ELSE toLower(replace(a.name, ' ', '-')) END)
+        MERGE (p)-[r:AUTHORED_BY]->(a)
+        ON CREATE SET r.created_at = COALESCE(old.created_at, datetime())
+        DELETE old
+    } IN TRANSACTIONS OF $batch_size ROWS
+    """
+
+    colliding = [name for collision in collisions for name in collision['names']]
+    driver.execute_auto_commit(query, {
+        'batch_size': batch_size,
+        'colliding': colliding
+    }, name='migrate.authored_edges')
+
+    remaining = count_legacy_edges(driver)
+
+    logger.info(f"\n{'='*60}")
+    logger.info(f"✅ Migration complete!")
+    logger.info(f"Edges migrated: {legacy_edges - remaining}")
+    logger.info(f"Edges remaining: {remaining}")
+    logger.info(f"{'='*60}\n")
+
+    driver.close()
+
+if __name__ == "__main__":
+    migrate_authored_edges(dry_run='--dry-run' in sys.argv)
@@ -0,0 +1,64 @@
+import sys
+sys.path.append('../backend')
+
+from typing import Dict, List
+from app.core.neo4j_driver import get_neo4j_driver
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Labels carrying materialized paper_count / degree
+DEGREE_LABELS = ('Concept', 'Method', 'Dataset', 'Metric', 'Author')
+
+# Nodes per inner transaction
+RECOMPUTE_BATCH_SIZE = 10000
+
+def recompute_degrees(driver, label: str, batch_size: int = RECOMPUTE_BATCH_SIZE):
+    """
+    Set paper_count (distinct linked papers) and degree (all relationships)
+    on every node of `label`. Runs server-side in CALL { } IN TRANSACTIONS
+    batches.
+    """
+    query = f"""
+    MATCH (n:{label})
+    CALL {{
+        WITH n
+        SET n.paper_count = COUNT {{ MATCH (n)--(p:Paper) RETURN DISTINCT p }},
+            n.degree = COUNT {{ (n)--() }}
+    }} IN TRANSACTIONS OF $batch_size ROWS
+    """
+    driver.execute_auto_commit(query, {'label': label, 'batch_size': batch_size}, name='degrees.recompute')
+
+def top_entities(driver, label: str, limit: int = 10) -> List[Dict]:
+    """Most linked nodes of `label`, read in paper_count index order"""
+    query = f"""
+    MATCH (n:{label})
+    WHERE n.paper_count IS NOT NULL
+    RETURN n.name as name, n.paper_count as paper_count, n.degree as degree
+    ORDER BY n.paper_count DESC
+    LIMIT $limit
+    """
+    return driver.execute_read(query, {'label': label, 'limit': limit}, name='degrees.top')
+
+def recompute_entity_degrees(labels: List[str] = DEGREE_LABELS):
+    """
+    Batch job: rebuild the paper_count / degree properties the enrichment
+    writers maintain incrementally. Run once after deploying the counters,
+    and after bulk changes that bypass the writers (migrations, snapshot
+    restores, manual deletes).
+    """
+    driver = get_neo4j_driver()
+    driver.connect()
+
+    for label in labels:
+        logger.info(f"Recomputing {label} degrees...")
+        recompute_degrees(driver, label)
+
+        top = top_entities(driver, label, limit=5)
+        logger.info(f"  ✅ Top {label}: " + ", ".join(f"{row['name']} ({row['paper_count']})" for row in top))
+
+    driver.close()
+
+if __name__ == "__main__":
+    recompute_entity_degrees()
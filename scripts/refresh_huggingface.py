@@ -0,0 +1,93 @@
+import sys
+sys.path.append('../backend')
+
+import time
+import asyncio
+from typing import Optional
+from app.core.job_queue import default_worker_id
+from app.core.neo4j_driver import get_neo4j_driver
+from enrich_huggingface import (
+    HF_MAX_CONCURRENCY,
+    HF_REQUESTS_PER_SECOND,
+    claim_due_papers,
+    enrich_hf_papers,
+    has_unclaimed_due_papers,
+    schedule_unscheduled_papers,
+)
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def refresh_huggingface(
+    batch_size: int = 50,
+    poll_interval: int = 60,
+    max_cycles: Optional[int] = None,
+    concurrency: int = HF_MAX_CONCURRENCY,
+    requests_per_second: float = HF_REQUESTS_PER_SECOND
+):
+    """
+    Continuous incremental Hugging Face refresh job.
+    Repeatedly picks papers whose hf_next_refresh has passed (indexed range
+    scan), re-fetches upvotes/stars/likes/downloads and reschedules them by
+    staleness tier. Sleeps for `poll_interval` seconds when nothing is due.
+    Due papers are claimed under a lease, so several refresh jobs can run
+    side by side.
+    """
+    driver = get_neo4j_driver()
+    driver.connect()
+    worker_id = default_worker_id()
+
+    cycles = 0
+    total = {'papers': 0, 'not_found': 0, 'failed': 0}
+
+    try:
+        while max_cycles is None or cycles < max_cycles:
+            cycles += 1
+
+            # Pick up newly enriched papers that were never scheduled
+            scheduled = schedule_unscheduled_papers(driver)
+            if scheduled:
+                logger.info(f"Scheduled {scheduled} new papers")
+
+            papers = claim_due_papers(driver, worker_id, batch_size)
+            if not papers and has_unclaimed_due_papers(driver):
+                # Another worker claimed the same candidates first
+                continue
+            if not papers:
+                logger.info(f"No papers due, sleeping {poll_interval}s")
+                time.sleep(poll_interval)
+                continue
+
+            logger.info(f"Cycle {cycles}: refreshing {len(papers)} due papers")
+            stats = asyncio.run(enrich_hf_papers(
+                driver,
+                papers,
+                concurrency=concurrency,
+                requests_per_second=requests_per_second
+            ))
+            for key in total:
+                total[key] += stats[key]
+
+            logger.info(
+                f"  ✅ Refreshed {stats['papers']}, not on HF {stats['not_found']}, "
+                f"failed {stats['failed']}"
+            )
+
+            # A partial batch with nothing left unclaimed means the backlog is drained
+            if len(papers) < batch_size and not has_unclaimed_due_papers(driver):
+                time.sleep(poll_interval)
+
+    except KeyboardInterrupt:
+        logger.info("Stopping HF refresh job")
+
+    finally:
+        logger.info(f"\n✅ HF refresh stopped after {cycles} cycles")
+        logger.info(f"   Papers refreshed: {total['papers']}")
+        logger.info(f"   Not on Hugging Face: {total['not_found']}")
+        logger.info(f"   Failed: {total['failed']}")
+        driver.close()
+
+if __name__ == "__main__":
+    # Run until interrupted
+    refresh_huggingface(batch_size=50, poll_interval=60)
@@ -0,0 +1,84 @@
+import sys
+sys.path.append('../backend')
+
+from app.core.neo4j_driver import get_neo4j_driver
+from app.services.trends_service import ROLLUP_PAPER_BODY, TREND_RELATIONSHIPS
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Rows per inner transaction
+ROLLUP_BATCH_SIZE = 1000
+
+def delete_trend_buckets(driver, batch_size: int = ROLLUP_BATCH_SIZE):
+    """Drop every TrendBucket"""
+    query = """
+    MATCH (b:TrendBucket)
+    CALL {
+        WITH b
+        DELETE b
+    } IN TRANSACTIONS OF $batch_size ROWS
+    """
+    driver.execute_auto_commit(query, {'batch_size': batch_size}, name='trends.delete_buckets')
+
+def reset_rolled_up_flags(driver, batch_size: int = ROLLUP_BATCH_SIZE):
+    """Mark every entity link and paper's categories as not yet counted"""
+    links_query = """
+    MATCH (:Paper)-[r:INTRODUCES|PROPOSES|EVALUATES_ON]->()
+    WHERE r.rolled_up IS NOT NULL
+    CALL {
+        WITH r
+        REMOVE r.rolled_up
+    } IN TRANSACTIONS OF $batch_size ROWS
+    """
+    papers_query = """
+    MATCH (p:Paper)
+    WHERE p.categories_rolled_up IS NOT NULL
+    CALL {
+        WITH p
+        REMOVE p.categories_rolled_up
+    } IN TRANSACTIONS OF $batch_size ROWS
+    """
+    driver.execute_auto_commit(links_query, {'batch_size': batch_size}, name='trends.reset_links')
+    driver.execute_auto_commit(papers_query, {'batch_size': batch_size}, name='trends.reset_papers')
+
+def rollup_all_papers(driver, batch_size: int = ROLLUP_BATCH_SIZE):
+    """Count every link and category not yet in the rollups, paper by paper"""
+    query = """
+    MATCH (p:Paper)
+    WHERE p.published_date IS NOT NULL
+    CALL {
+        WITH p
+    """ + ROLLUP_PAPER_BODY + """
+    } IN TRANSACTIONS OF $batch_size ROWS
+    """
+    driver.execute_auto_commit(query, {
+        'batch_size': batch_size,
+        'dimensions': TREND_RELATIONSHIPS
+    }, name='trends.rollup_all')
+
+def rollup_trends(rebuild: bool = False):
+    """
+    Batch job: backfill the TrendBucket rollups behind GET /trends for
+    papers ingested or enriched before the writers maintained them.
+    ingest_arxiv.py and enrich_papers.py keep them current afterwards.
+    rebuild=True recounts everything from scratch, e.g. after
+    canonicalize_entities.py renames or merges entities.
+    """
+    driver = get_neo4j_driver()
+    driver.connect()
+
+    if rebuild:
+        logger.info("Dropping trend rollups...")
+        delete_trend_buckets(driver)
+        reset_rolled_up_flags(driver)
+
+    logger.info("Rolling up papers into trend buckets...")
+    rollup_all_papers(driver)
+    logger.info("✅ Trend rollups up to date")
+
+    driver.close()
+
+if __name__ == "__main__":
+    rollup_trends(rebuild='--rebuild' in sys.argv)
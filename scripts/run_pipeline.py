@@ -0,0 +1,452 @@
+import sys
+sys.path.append('../backend')
+
+import os
+import asyncio
+import time
+import httpx
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+from app.core.job_queue import default_worker_id
+from app.core.neo4j_driver import get_neo4j_driver
+import enrich_authors_from_arxiv as authors_enrichment
+import enrich_huggingface as hf_enrichment
+import enrich_papers as entity_enrichment
+import ingest_arxiv
+import ingest_hf_papers
+from enrich_huggingface import RateLimiter
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Items buffered between two stages; a full queue blocks the stage feeding it
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "200"))
+PIPELINE_REPORT_SECONDS = 10
+
+# Gemini entity extraction (blocking calls, run in worker threads)
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+GEMINI_REQUESTS_PER_SECOND = float(os.getenv("GEMINI_REQUESTS_PER_SECOND", "1"))
+
+# Seconds the author stage waits to fill an arXiv id_list batch
+AUTHOR_BATCH_WAIT = 5.0
+
+# Seconds between Hugging Face daily papers requests
+HF_DAILY_REQUEST_DELAY = 2
+
+# Papers needing each stage, seeded per stage with --backlog
+BACKLOG_LIMIT = 10000
+# Backlog papers leased per claim query, just ahead of the stage taking them
+BACKLOG_CLAIM_SIZE = 50
+
+Handler = Callable[[List[Dict]], Awaitable[List[Dict]]]
+
+
+class Stage:
+    """
+    One pipeline step. `concurrency` workers take papers from a bounded
+    inbox, call `handler` with up to `batch_size` of them and put what it
+    returns into the next stage's inbox. A full inbox blocks the workers
+    feeding it, so a slow stage throttles everything upstream instead of
+    buffering without bound.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Handler,
+        concurrency: int = 1,
+        limiter: Optional[RateLimiter] = None,
+        batch_size: int = 1,
+        batch_wait: float = 0.0,
+        queue_size: int = PIPELINE_QUEUE_SIZE
+    ):
+        self.name = name
+        self.handler = handler
+        self.concurrency = concurrency
+        self.limiter = limiter
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.inbox: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.downstream: Optional['Stage'] = None
+        # A paper reaching a stage twice in one run (e.g. from the backlog
+        # and from upstream) is processed once
+        self._seen = set()
+        self.stats = {
+            'received': 0,
+            'duplicates': 0,
+            'processed': 0,
+            'failed': 0,
+            'emitted': 0,
+            'busy': 0,
+            'busy_s': 0.0,
+            'blocked_s': 0.0,
+        }
+
+    async def put(self, paper: Dict):
+        """Queue a paper, waiting while the inbox is full"""
+        if paper['arxiv_id'] in self._seen:
+            self.stats['duplicates'] += 1
+            return
+        self._seen.add(paper['arxiv_id'])
+        self.stats['received'] += 1
+        await self.inbox.put(paper)
+
+    async def _take(self) -> List[Dict]:
+        """Next paper, plus up to batch_size - 1 more arriving within batch_wait"""
+        batch = [await self.inbox.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_wait
+        while len(batch) < self.batch_size:
+            if not self.inbox.empty():
+                batch.append(self.inbox.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.inbox.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def work(self):
+        while True:
+            batch = await self._take()
+            self.stats['busy'] += 1
+            start = time.perf_counter()
+            try:
+                if self.limiter:
+                    await self.limiter.acquire()
+                results = await self.handler(batch)
+                self.stats['processed'] += len(batch)
+            except Exception as e:
+                # Failed papers stay selectable for the next run
+                logger.error(f"  ❌ {self.name}: {len(batch)} papers failed: {e}")
+                self.stats['failed'] += len(batch)
+                results = []
+            finally:
+                self.stats['busy'] -= 1
+                self.stats['busy_s'] += time.perf_counter() - start
+
+            if self.downstream:
+                start = time.perf_counter()
+                for paper in results:
+                    await self.downstream.put(paper)
+                self.stats['emitted'] += len(results)
+                self.stats['blocked_s'] += time.perf_counter() - start
+            # Only after emitting, so join() covers the hand-off downstream
+            for _ in batch:
+                self.inbox.task_done()
+
+
+class Pipeline:
+    """Stages chained in order, fed by source coroutines"""
+
+    def __init__(self, stages: List[Stage]):
+        self.stages = stages
+        for upstream, downstream in zip(stages, stages[1:]):
+            upstream.downstream = downstream
+        self.started = time.perf_counter()
+
+    def report(self) -> Dict[str, Dict]:
+        """Per-stage counters, throughput (papers/s) and queue depth"""
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return {
+            stage.name: {
+                **{key: value for key, value in stage.stats.items() if key != 'busy'},
+                'busy_s': round(stage.stats['busy_s'], 2),
+                'blocked_s': round(stage.stats['blocked_s'], 2),
+                'throughput': round(stage.stats['processed'] / elapsed, 3),
+                'queued': stage.inbox.qsize(),
+                'workers_busy': f"{stage.stats['busy']}/{stage.concurrency}",
+            }
+            for stage in self.stages
+        }
+
+    def log_report(self):
+        for name, stats in self.report().items():
+            logger.info(
+                f"  {name}: {stats['processed']} done ({stats['throughput']}/s), {stats['failed']} failed, "
+                f"queue {stats['queued']}, workers {stats['workers_busy']}, "
+                f"blocked downstream {stats['blocked_s']}s"
+            )
+
+    async def _reporter(self, interval: float, on_report: Optional[Callable[[Dict], None]]):
+        while True:
+            await asyncio.sleep(interval)
+            self.log_report()
+            if on_report:
+                # e.g. a SQLite heartbeat: keep it off the event loop
+                await asyncio.to_thread(on_report, self.report())
+
+    async def run(
+        self,
+        sources: List[Awaitable],
+        report_seconds: float = PIPELINE_REPORT_SECONDS,
+        on_report: Optional[Callable[[Dict], None]] = None
+    ) -> Dict[str, Dict]:
+        """
+        Run until the sources are exhausted and every stage has drained.
+        on_report gets the report every report_seconds (e.g. job progress);
+        if it raises, the pipeline is cancelled and run() raises the same.
+        """
+        self.started = time.perf_counter()
+        workers = [
+            asyncio.create_task(stage.work())
+            for stage in self.stages
+            for _ in range(stage.concurrency)
+        ]
+        reporter = asyncio.create_task(self._reporter(report_seconds, on_report))
+        drained = asyncio.create_task(self._drain(sources))
+        try:
+            await asyncio.wait({drained, reporter}, return_when=asyncio.FIRST_COMPLETED)
+            if reporter.done():
+                # on_report raised (e.g. the job's lease was lost): stop here
+                reporter.result()
+            await drained
+        finally:
+            for task in workers + [reporter, drained]:
+                task.cancel()
+            await asyncio.gather(*workers, reporter, drained, return_exceptions=True)
+        return self.report()
+
+    async def _drain(self, sources: List[Awaitable]):
+        await asyncio.gather(*sources)
+        # Upstream first: a drained stage emits nothing more downstream
+        for stage in self.stages:
+            await stage.inbox.join()
+
+
+def paper_status(driver, arxiv_ids: List[str]) -> Dict[str, Dict]:
+    """Stage inputs of each paper, and whether it has authors yet and has been through entity extraction"""
+    query = """
+    UNWIND $arxiv_ids AS arxiv_id
+    MATCH (p:Paper {arxiv_id: arxiv_id})
+    RETURN p.arxiv_id as arxiv_id,
+           p.title as title,
+           p.abstract as abstract,
+           p.published_date as published_date,
+           EXISTS { (p)-[:AUTHORED_BY]->(:Author) } as has_authors,
+           COALESCE(p.enriched, false) as enriched
+    """
+    result = driver.execute_read(query, {'arxiv_ids': arxiv_ids}, name='pipeline.paper_status')
+    return {row['arxiv_id']: row for row in result}
+
+async def arxiv_source(driver, stage: Stage, limiter: RateLimiter, categories: List[str], max_results: int, days_back: int):
+    """Fetch each category from arXiv, write the papers and pass them on"""
+    end_date = datetime.now().strftime('%Y%m%d%H%M%S')
+    start_date = (datetime.now() - timedelta(days=days_back)).strftime('%Y%m%d%H%M%S')
+    for category in categories:
+        await limiter.acquire()
+        papers = await asyncio.to_thread(
+            ingest_arxiv.fetch_arxiv_papers,
+            categories=[category],
+            max_results=max_results,
+            start_date=start_date,
+            end_date=end_date
+        )
+        await asyncio.to_thread(ingest_arxiv.write_arxiv_papers, driver, papers)
+        status = await asyncio.to_thread(paper_status, driver, [paper['arxiv_id'] for paper in papers])
+        for paper in papers:
+            # Re-fetched papers that were already enriched stop here
+            if not status.get(paper['arxiv_id'], {}).get('enriched', True):
+                await stage.put(paper)
+
+async def hf_source(driver, authors: Stage, extract: Stage, days_back: int):
+    """
+    Fetch Hugging Face daily papers day by day, write them and pass them
+    to author enrichment (or straight to extraction if they have authors)
+    """
+    limiter = RateLimiter(1 / HF_DAILY_REQUEST_DELAY)
+    for i in range(days_back):
+        date = (datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d')
+        await limiter.acquire()
+        papers = await asyncio.to_thread(ingest_hf_papers.fetch_hf_daily_papers, date)
+        await asyncio.to_thread(ingest_hf_papers.create_papers_from_hf, driver, papers)
+        status = await asyncio.to_thread(paper_status, driver, [paper['id'] for paper in papers if paper.get('id')])
+        for row in status.values():
+            if not row['has_authors']:
+                await authors.put(row)
+            elif not row['enriched']:
+                await extract.put(row)
+
+async def backlog_source(
+    driver,
+    worker_id: str,
+    authors: Stage,
+    extract: Stage,
+    huggingface: Stage,
+    limit: int = BACKLOG_LIMIT
+):
+    """
+    Seed each stage with the papers already waiting for it. Extraction and
+    Hugging Face backlogs are claimed under a lease, BACKLOG_CLAIM_SIZE at
+    a time as the stage takes them, so concurrent pipelines (job workers)
+    split the backlog instead of each processing all of it.
+    """
+    await asyncio.to_thread(hf_enrichment.schedule_unscheduled_papers, driver)
+    papers = await asyncio.to_thread(authors_enrichment.select_papers_without_authors, driver, limit)
+    logger.info(f"Backlog: {len(papers)} papers for {authors.name}")
+    for paper in papers:
+        await authors.put(paper)
+    for claim, has_unclaimed, stage in (
+        (entity_enrichment.claim_unenriched_papers, entity_enrichment.has_unclaimed_papers, extract),
+        (hf_enrichment.claim_due_papers, hf_enrichment.has_unclaimed_due_papers, huggingface),
+    ):
+        claimed = 0
+        while claimed < limit:
+            papers = await asyncio.to_thread(claim, driver, worker_id, min(BACKLOG_CLAIM_SIZE, limit - claimed))
+            if not papers:
+                # Lost the race for these candidates: claim the next ones
+                if await asyncio.to_thread(has_unclaimed, driver):
+                    continue
+                break
+            claimed += len(papers)
+            for paper in papers:
+                await stage.put(paper)
+        logger.info(f"Backlog: {claimed} papers for {stage.name}")
+
+async def run_pipeline_async(
+    driver,
+    arxiv: bool = True,
+    huggingface_daily: bool = True,
+    backlog: bool = False,
+    categories: List[str] = None,
+    max_results: int = 100,
+    days_back: int = 7,
+    extract_concurrency: int = GEMINI_MAX_CONCURRENCY,
+    extract_requests_per_second: float = GEMINI_REQUESTS_PER_SECOND,
+    hf_concurrency: int = hf_enrichment.HF_MAX_CONCURRENCY,
+    hf_requests_per_second: float = hf_enrichment.HF_REQUESTS_PER_SECOND,
+    backlog_limit: int = BACKLOG_LIMIT,
+    queue_size: int = PIPELINE_QUEUE_SIZE,
+    report_seconds: float = PIPELINE_REPORT_SECONDS,
+    on_report: Optional[Callable[[Dict], None]] = None,
+    worker_id: Optional[str] = None
+) -> Dict[str, Dict]:
+    worker_id = worker_id or default_worker_id()
+    # arXiv search and id_list requests share arXiv's one-request-per-3s budget
+    arxiv_limiter = RateLimiter(1 / authors_enrichment.ARXIV_REQUEST_DELAY)
+    hf_limiter = RateLimiter(hf_requests_per_second)
+
+    async with hf_enrichment.create_hf_client(concurrency=hf_concurrency) as client:
+
+        async def add_authors(papers: List[Dict]) -> List[Dict]:
+            metadata = await asyncio.to_thread(
+                authors_enrichment.fetch_arxiv_metadata_batch, [paper['arxiv_id'] for paper in papers]
+            )
+            found = [entry for entry in metadata.values() if entry['authors']]
+            if found:
+                await asyncio.to_thread(authors_enrichment.add_authors_to_papers, driver, found)
+            # Backlog papers arrive without abstracts; take them from the graph
+            status = await asyncio.to_thread(paper_status, driver, [paper['arxiv_id'] for paper in papers])
+            return [row for row in status.values() if not row['enriched']]
+
+        async def extract_entities(papers: List[Dict]) -> List[Dict]:
+            # Papers enriched or leased by another worker since they were queued are dropped
+            claimed = await asyncio.to_thread(
+                entity_enrichment.claim_papers, driver, worker_id, [paper['arxiv_id'] for paper in papers]
+            )
+            for paper in claimed:
+                try:
+                    entities = await asyncio.to_thread(
+                        entity_enrichment.extract_entities, paper.get('title') or '', paper.get('abstract') or ''
+                    )
+                    await asyncio.to_thread(entity_enrichment.write_paper_entities, driver, paper['arxiv_id'], entities)
+                except Exception:
+                    # Let the next run (or another worker) retry it
+                    await asyncio.to_thread(entity_enrichment.release_paper_claim, driver, paper['arxiv_id'], worker_id)
+                    raise
+            return claimed
+
+        async def enrich_huggingface(papers: List[Dict]) -> List[Dict]:
+            claimed = await asyncio.to_thread(
+                hf_enrichment.claim_papers, driver, worker_id, [paper['arxiv_id'] for paper in papers]
+            )
+            for paper in claimed:
+                arxiv_id = paper['arxiv_id']
+                try:
+                    metadata, repos = await hf_enrichment.fetch_hf_paper(client, hf_limiter, arxiv_id)
+                except httpx.HTTPError:
+                    # Transient failure: keep its HF state, try again later
+                    await asyncio.to_thread(hf_enrichment.reschedule_hf_retry, driver, arxiv_id)
+                    continue
+                try:
+                    if not metadata:
+                        await asyncio.to_thread(
+                            hf_enrichment.mark_not_on_huggingface, driver, arxiv_id, paper.get('published_date')
+                        )
+                        continue
+                    params = hf_enrichment.build_hf_write_params(
+                        arxiv_id, metadata, repos, paper.get('published_date')
+                    )
+                    await asyncio.to_thread(hf_enrichment.write_hf_enrichment, driver, params)
+                except Exception:
+                    # Release the claim; the paper is retried after HF_RETRY_DELAY
+                    await asyncio.to_thread(hf_enrichment.reschedule_hf_retry, driver, arxiv_id)
+                    raise
+            return []
+
+        authors = Stage(
+            'authors', add_authors,
+            limiter=arxiv_limiter,
+            batch_size=authors_enrichment.ARXIV_BATCH_SIZE,
+            batch_wait=AUTHOR_BATCH_WAIT,
+            queue_size=queue_size
+        )
+        extract = Stage(
+            'extract', extract_entities,
+            concurrency=extract_concurrency,
+            limiter=RateLimiter(extract_requests_per_second),
+            queue_size=queue_size
+        )
+        huggingface = Stage('huggingface', enrich_huggingface, concurrency=hf_concurrency, queue_size=queue_size)
+        pipeline = Pipeline([authors, extract, huggingface])
+
+        sources = []
+        if backlog:
+            sources.append(backlog_source(driver, worker_id, authors, extract, huggingface, backlog_limit))
+        if arxiv:
+            # arXiv entries carry their authors
+            sources.append(arxiv_source(
+                driver, extract, arxiv_limiter,
+                categories or ingest_arxiv.DEFAULT_CATEGORIES, max_results, days_back
+            ))
+        if huggingface_daily:
+            sources.append(hf_source(driver, authors, extract, days_back))
+
+        return await pipeline.run(sources, report_seconds, on_report)
+
+def run_pipeline(**options):
+    """
+    Ingestion and enrichment as one streaming pipeline: newly ingested
+    arXiv and Hugging Face papers flow through author enrichment (HF
+    papers only), Gemini entity extraction and Hugging Face enrichment as
+    soon as the stage before is done with them, instead of script by
+    script. Each stage has its own concurrency and rate limit; queues
+    between stages are bounded. backlog=True also feeds each stage the
+    papers already waiting for it.
+    """
+    driver = get_neo4j_driver()
+    driver.connect()
+
+    logger.info("Starting ingestion/enrichment pipeline...")
+    stats = asyncio.run(run_pipeline_async(driver, **options))
+
+    logger.info("\n✅ Pipeline complete!")
+    for name, stage_stats in stats.items():
+        logger.info(
+            f"   {name}: {stage_stats['processed']} processed ({stage_stats['throughput']}/s), "
+            f"{stage_stats['failed']} failed, {stage_stats['duplicates']} duplicates skipped, "
+            f"busy {stage_stats['busy_s']}s, blocked downstream {stage_stats['blocked_s']}s"
+        )
+
+    driver.close()
+
+if __name__ == "__main__":
+    if not os.getenv("GEMINI_API_KEY"):
+        logger.error("❌ GEMINI_API_KEY not set in environment")
+        exit(1)
+
+    run_pipeline(backlog='--backlog' in sys.argv)
@@ -0,0 +1,348 @@
+import sys
+sys.path.append('../backend')
+
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+import orjson
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+from neo4j.time import Date, DateTime, Duration, Time
+from app.core.memory_backend import InMemoryGraphBackend
+from app.core.neo4j_driver import get_neo4j_driver, dumps_raw
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Rows per Arrow record batch when dumping
+DUMP_BATCH_SIZE = 10000
+
+# Rows per UNWIND write transaction when restoring
+RESTORE_BATCH_SIZE = 5000
+
+# Temporary label/property used to wire relationships during restore
+SNAPSHOT_LABEL = '_Snapshot'
+SNAPSHOT_ID = '_snapshot_id'
+
+FORMATS = {
+    'parquet': '.parquet',
+    'arrow': '.arrow',
+}
+
+# Neo4j schema property type -> Arrow type
+ARROW_TYPES = {
+    'String': pa.string(),
+    'Long': pa.int64(),
+    'Double': pa.float64(),
+    'Boolean': pa.bool_(),
+    'Date': pa.date32(),
+    'DateTime': pa.timestamp('us', tz='UTC'),
+    'LocalDateTime': pa.timestamp('us'),
+    'StringArray': pa.list_(pa.string()),
+    'LongArray': pa.list_(pa.int64()),
+    'DoubleArray': pa.list_(pa.float64()),
+    'BooleanArray': pa.list_(pa.bool_()),
+}
+
+
+def quote(name: str) -> str:
+    """Backtick-quote a label, relationship type or property name"""
+    return '`' + name.replace('`', '``') + '`'
+
+
+def to_arrow_value(value):
+    """Neo4j value -> value Arrow can ingest"""
+    if isinstance(value, (DateTime, Date, Time)):
+        return value.to_native()
+    if isinstance(value, Duration):
+        return value.seconds
+    return value
+
+
+def require_neo4j(driver):
+    """
+    Snapshots read Neo4j's schema procedures and element ids, which the
+    memory backend doesn't have; its MEMORY_GRAPH_PATH file already is a
+    snapshot of its graph (copy it to keep one).
+    """
+    if isinstance(driver, InMemoryGraphBackend):
+        raise RuntimeError(
+            "snapshot_graph.py needs GRAPH_BACKEND=neo4j; to snapshot the memory backend, "
+            "copy its MEMORY_GRAPH_PATH file"
+        )
+
+
+# ----------------------------------------------------------------------
+# Dump
+# ----------------------------------------------------------------------
+
+def column_type(types: List[str]) -> str:
+    """Properties with mixed or unsupported types are stored as JSON strings"""
+    return types[0] if len(types) == 1 and types[0] in ARROW_TYPES else 'Json'
+
+
+def node_schema(driver) -> Dict[Tuple[str, ...], Dict[str, str]]:
+    """Property name -> Neo4j type per label combination"""
+    schema: Dict[Tuple[str, ...], Dict[str, str]] = {}
+    for row in driver.execute_read("CALL db.schema.nodeTypeProperties()", name='snapshot.node_schema'):
+        props = schema.setdefault(tuple(sorted(row['nodeLabels'])), {})
+        if row['propertyName']:
+            props[row['propertyName']] = column_type(row['propertyTypes'] or [])
+    return schema
+
+
+def relationship_schema(driver) -> Dict[str, Dict[str, str]]:
+    """Property name -> Neo4j type per relationship type"""
+    schema: Dict[str, Dict[str, str]] = {}
+    for row in driver.execute_read("CALL db.schema.relTypeProperties()", name='snapshot.relationship_schema'):
+        props = schema.setdefault(row['relType'].lstrip(':').strip('`'), {})
+        if row['propertyName']:
+            props[row['propertyName']] = column_type(row['propertyTypes'] or [])
+    return schema
+
+
+def arrow_schema(key_columns: List[Tuple[str, pa.DataType]], properties: Dict[str, str]) -> pa.Schema:
+    fields = [pa.field(name, dtype) for name, dtype in key_columns]
+    for prop, prop_type in sorted(properties.items()):
+        fields.append(pa.field(prop, ARROW_TYPES.get(prop_type, pa.string())))
+    return pa.schema(fields)
+
+
+def open_writer(path: Path, schema: pa.Schema, fmt: str):
+    if fmt == 'parquet':
+        return pq.ParquetWriter(path, schema, compression='zstd')
+    return ipc.new_file(path, schema, options=ipc.IpcWriteOptions(compression='zstd'))
+
+
+def write_batches(path: Path, schema: pa.Schema, fmt: str, rows: Iterator[Dict]) -> int:
+    """Write streamed rows to one columnar file in record batches"""
+    count = 0
+    batch: List[Dict] = []
+
+    with open_writer(path, schema, fmt) as writer:
+        def flush():
+            writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+
+        for row in rows:
+            for key, value in row.items():
+                if isinstance(value, list):
+                    row[key] = [to_arrow_value(v) for v in value]
+                else:
+                    row[key] = to_arrow_value(value)
+            batch.append(row)
+            count += 1
+            if len(batch) >= DUMP_BATCH_SIZE:
+                flush()
+                batch = []
+        if batch or count == 0:
+            flush()
+
+    return count
+
+
+def node_rows(driver, labels: Tuple[str, ...], properties: Dict[str, str]) -> Iterator[Dict]:
+    """Nodes with exactly this label combination, properties flattened into columns"""
+    query = f"""
+    MATCH (n:{':'.join(quote(label) for label in labels)})
+    WHERE size(labels(n)) = $label_count
+    RETURN elementId(n) as id, properties(n) as props
+    """
+    for record in driver.stream_read(query, {'label_count': len(labels)}, name='snapshot.dump_nodes'):
+        row = {'_id': record['id']}
+        for prop, value in record['props'].items():
+            row[prop] = dumps_raw(value).decode() if properties.get(prop) == 'Json' else value
+        yield row
+
+
+def relationship_rows(driver, rel_type: str, properties: Dict[str, str]) -> Iterator[Dict]:
+    query = f"""
+    MATCH (s)-[r:{quote(rel_type)}]->(e)
+    RETURN elementId(r) as id, elementId(s) as start, elementId(e) as end,
+           properties(r) as props
+    """
+    for record in driver.stream_read(query, name='snapshot.dump_relationships'):
+        row = {'_id': record['id'], '_start': record['start'], '_end': record['end']}
+        for prop, value in record['props'].items():
+            row[prop] = dumps_raw(value).decode() if properties.get(prop) == 'Json' else value
+        yield row
+
+
+def dump_snapshot(output_dir: str, fmt: str = 'parquet'):
+    """
+    Dump every node label and relationship type to its own columnar file
+    (Parquet or Arrow IPC) plus a manifest.json describing the snapshot.
+    Neo4j only (see require_neo4j).
+    """
+    driver = get_neo4j_driver()
+    require_neo4j(driver)
+    driver.connect()
+
+    root = Path(output_dir)
+    (root / 'nodes').mkdir(parents=True, exist_ok=True)
+    (root / 'relationships').mkdir(parents=True, exist_ok=True)
+    ext = FORMATS[fmt]
+    started = time.perf_counter()
+
+    node_props = node_schema(driver)
+    rel_props = relationship_schema(driver)
+
+    manifest = {
+        'format': fmt,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'nodes': {},
+        'relationships': {},
+    }
+
+    for labels, properties in node_props.items():
+        if not labels or SNAPSHOT_LABEL in labels:
+            continue
+        name = '_'.join(labels)
+        schema = arrow_schema([('_id', pa.string())], properties)
+        path = root / 'nodes' / f"{name}{ext}"
+        count = write_batches(path, schema, fmt, node_rows(driver, labels, properties))
+        manifest['nodes'][name] = {
+            'file': str(path.relative_to(root)),
+            'labels': list(labels),
+            'count': count,
+            'properties': properties
+        }
+        logger.info(f"  ✅ {':'.join(labels)}: {count} nodes")
+
+    for rel_type, properties in rel_props.items():
+        schema = arrow_schema([('_id', pa.string()), ('_start', pa.string()), ('_end', pa.string())], properties)
+        path = root / 'relationships' / f"{rel_type}{ext}"
+        count = write_batches(path, schema, fmt, relationship_rows(driver, rel_type, properties))
+        manifest['relationships'][rel_type] = {'file': str(path.relative_to(root)), 'count': count, 'properties': properties}
+        logger.info(f"  ✅ {rel_type}: {count} relationships")
+
+    (root / 'manifest.json').write_text(json.dumps(manifest, indent=2))
+
+    logger.info(f"\n✅ Snapshot written to {root} in {time.perf_counter() - started:.1f}s")
+    driver.close()
+
+
+# ----------------------------------------------------------------------
+# Restore
+# ----------------------------------------------------------------------
+
+def read_batches(path: Path, fmt: str) -> Iterator[pa.RecordBatch]:
+    if fmt == 'parquet':
+        yield from pq.ParquetFile(path).iter_batches(batch_size=RESTORE_BATCH_SIZE)
+    else:
+        with ipc.open_file(path) as reader:
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                for offset in range(0, batch.num_rows, RESTORE_BATCH_SIZE):
+                    yield batch.slice(offset, RESTORE_BATCH_SIZE)
+
+
+def restore_rows(batch: pa.RecordBatch, key_columns: Tuple[str, ...], properties: Dict[str, str]) -> List[Dict]:
+    """Split Arrow rows into key columns + a props map, dropping nulls"""
+    rows = []
+    for row in batch.to_pylist():
+        props = {}
+        for prop, value in row.items():
+            if prop in key_columns or value is None:
+                continue
+            props[prop] = orjson.loads(value) if properties.get(prop) == 'Json' else value
+        restored = {key: row[key] for key in key_columns}
+        restored['props'] = props
+        rows.append(restored)
+    return rows
+
+
+def restore_snapshot(input_dir: str, force: bool = False):
+    """
+    Reload a snapshot with batched UNWIND writes. Expects an empty database
+    (use --force to load anyway); run shared/graph_schema.cypher afterwards
+    or before to recreate constraints and indexes. Neo4j only.
+    """
+    driver = get_neo4j_driver()
+    require_neo4j(driver)
+    driver.connect()
+
+    root = Path(input_dir)
+    manifest = json.loads((root / 'manifest.json').read_text())
+    fmt = manifest['format']
+    started = time.perf_counter()
+
+    existing = driver.execute_read(
+        "MATCH (n) RETURN count(n) as nodes", name='snapshot.count_nodes'
+    )[0]['nodes']
+    if existing and not force:
+        logger.error(f"❌ Database is not empty ({existing} nodes); pass --force to restore anyway")
+        driver.close()
+        return
+
+    driver.execute_auto_commit(
+        f"CREATE INDEX snapshot_id IF NOT EXISTS FOR (n:{SNAPSHOT_LABEL}) ON (n.{SNAPSHOT_ID})",
+        name='snapshot.create_index'
+    )
+    driver.execute_auto_commit("CALL db.awaitIndexes(300)", name='snapshot.await_indexes')
+
+    for info in manifest['nodes'].values():
+        labels = ':'.join(quote(label) for label in info['labels'])
+        query = f"""
+        UNWIND $rows AS row
+        CREATE (n:{SNAPSHOT_LABEL}:{labels} {{{SNAPSHOT_ID}: row._id}})
+        SET n += row.props
+        """
+        count = 0
+        for batch in read_batches(root / info['file'], fmt):
+            rows = restore_rows(batch, ('_id',), info['properties'])
+            driver.execute_write(query, {'rows': rows}, name='snapshot.restore_nodes')
+            count += len(rows)
+        logger.info(f"  ✅ {':'.join(info['labels'])}: {count} nodes")
+
+    for rel_type, info in manifest['relationships'].items():
+        query = f"""
+        UNWIND $rows AS row
+        MATCH (s:{SNAPSHOT_LABEL} {{{SNAPSHOT_ID}: row._start}})
+        MATCH (e:{SNAPSHOT_LABEL} {{{SNAPSHOT_ID}: row._end}})
+        CREATE (s)-[r:{quote(rel_type)}]->(e)
+        SET r += row.props
+        """
+        count = 0
+        for batch in read_batches(root / info['file'], fmt):
+            rows = restore_rows(batch, ('_id', '_start', '_end'), info['properties'])
+            driver.execute_write(query, {'rows': rows}, name='snapshot.restore_relationships')
+            count += len(rows)
+        logger.info(f"  ✅ {rel_type}: {count} relationships")
+
+    # Drop the temporary wiring label/property in server-side batches
+    driver.execute_auto_commit(f"""
+    MATCH (n:{SNAPSHOT_LABEL})
+    CALL {{
+        WITH n
+        REMOVE n:{SNAPSHOT_LABEL}, n.{SNAPSHOT_ID}
+    }} IN TRANSACTIONS OF 10000 ROWS
+    """, name='snapshot.cleanup')
+    driver.execute_auto_commit("DROP INDEX snapshot_id IF EXISTS", name='snapshot.drop_index')
+
+    logger.info(f"\n✅ Snapshot restored from {root} in {time.perf_counter() - started:.1f}s")
+    driver.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dump or restore an offline snapshot of the graph")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    dump_parser = subparsers.add_parser('dump', help="Write a snapshot directory")
+    dump_parser.add_argument('path')
+    dump_parser.add_argument('--format', choices=sorted(FORMATS), default='parquet')
+
+    restore_parser = subparsers.add_parser('restore', help="Load a snapshot directory")
+    restore_parser.add_argument('path')
+    restore_parser.add_argument('--force', action='store_true', help="Restore into a non-empty database")
+
+    args = parser.parse_args()
+    if args.command == 'dump':
+        dump_snapshot(args.path, fmt=args.format)
+    else:
+        restore_snapshot(args.path, force=args.force)
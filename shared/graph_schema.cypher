@@ -10,6 +10,9 @@ DROP CONSTRAINT metric_name IF EXISTS;
 DROP CONSTRAINT repo_url IF EXISTS;
 DROP CONSTRAINT benchmark_id IF EXISTS;
 DROP CONSTRAINT model_name IF EXISTS;
+// Replaced by the canonical_key uniqueness constraints below
+DROP INDEX concept_canonical_key IF EXISTS;
+DROP INDEX method_canonical_key IF EXISTS;
 
 // ======================================================
 // 2. Recreate constraints compatible with Community Edition
@@ -51,6 +54,24 @@ FOR (b:Benchmark) REQUIRE b.id IS UNIQUE;
 CREATE CONSTRAINT model_name IF NOT EXISTS
 FOR (m:Model) REQUIRE m.name IS UNIQUE;
 
+// Concept / Method — one node per canonical key, so concurrent enrichment
+// writers MERGE onto the same node. On an existing graph, run
+// scripts/canonicalize_entities.py first to merge nodes sharing a key.
+CREATE CONSTRAINT concept_canonical_key_unique IF NOT EXISTS
+FOR (c:Concept) REQUIRE c.canonical_key IS UNIQUE;
+
+CREATE CONSTRAINT method_canonical_key_unique IF NOT EXISTS
+FOR (m:Method) REQUIRE m.canonical_key IS UNIQUE;
+
+// Topic — community summaries written by scripts/detect_topics.py
+CREATE CONSTRAINT topic_id IF NOT EXISTS
+FOR (t:Topic) REQUIRE t.id IS UNIQUE;
+
+// TrendBucket — per-week/month counts behind GET /trends, keyed
+// "dimension|name|granularity|start"
+CREATE CONSTRAINT trend_bucket_key IF NOT EXISTS
+FOR (b:TrendBucket) REQUIRE b.key IS UNIQUE;
+
 // ======================================================
 // 3. Helpful property indexes
 // ======================================================
@@ -70,6 +91,46 @@ FOR (d:Dataset) ON (d.domain);
 CREATE INDEX repo_stars IF NOT EXISTS
 FOR (r:Repository) ON (r.stars);
 
+// Export filters (published_date ranges, updated_since syncs)
+CREATE INDEX paper_published_date IF NOT EXISTS
+FOR (p:Paper) ON (p.published_date);
+
+CREATE INDEX paper_updated_at IF NOT EXISTS
+FOR (p:Paper) ON (p.updated_at);
+
+// Hugging Face refresh scheduler: selects due papers by range scan
+CREATE INDEX paper_hf_next_refresh IF NOT EXISTS
+FOR (p:Paper) ON (p.hf_next_refresh);
+
+// Materialized paper_count (maintained by the enrichment writers,
+// rebuilt by scripts/recompute_entity_degrees.py): "top N" reads walk
+// these range indexes in order instead of counting relationships
+CREATE INDEX concept_paper_count IF NOT EXISTS
+FOR (c:Concept) ON (c.paper_count);
+
+CREATE INDEX method_paper_count IF NOT EXISTS
+FOR (m:Method) ON (m.paper_count);
+
+CREATE INDEX dataset_paper_count IF NOT EXISTS
+FOR (d:Dataset) ON (d.paper_count);
+
+CREATE INDEX metric_paper_count IF NOT EXISTS
+FOR (met:Metric) ON (met.paper_count);
+
+CREATE INDEX author_paper_count IF NOT EXISTS
+FOR (a:Author) ON (a.paper_count);
+
+// Topic membership (scripts/detect_topics.py)
+CREATE INDEX concept_community_id IF NOT EXISTS
+FOR (c:Concept) ON (c.community_id);
+
+CREATE INDEX method_community_id IF NOT EXISTS
+FOR (m:Method) ON (m.community_id);
+
+// Trend reads: one dimension/granularity over a range of periods
+CREATE INDEX trend_bucket_period IF NOT EXISTS
+FOR (b:TrendBucket) ON (b.dimension, b.granularity, b.start);
+
 // ======================================================
 // 4. Optional: Full-text search
 // ======================================================